@@ -0,0 +1,37 @@
+"""
+Content-addressed cache výsledků Claude analýzy (viz result_cache).
+Klíč = SHA-256 ze vstupů promptu (system, prompt, tool schema) a modelu.
+Opakovaná analýza stejné sady článků (pád auto_publish, re-run z dashboardu) nic nestojí.
+"""
+
+from typing import Any, Optional
+
+import result_cache
+
+_cache = result_cache.ResultCache('analysis', 'ANALYSIS_CACHE_TTL_HOURS', 'ANALYSIS_CACHE_MAX_ENTRIES')
+
+
+def make_key(kind: str, model: str, *parts: Any) -> str:
+    """Spočítá klíč cache z typu analýzy, modelu a vstupů promptu."""
+    return result_cache.make_key(kind, model, *parts)
+
+
+def get(cache_key: str, ttl_hours: int = None) -> Optional[Any]:
+    """Vrátí uložený výsledek nebo None (miss / expirováno)."""
+    return _cache.get(cache_key, ttl_hours)
+
+
+def put(cache_key: str, kind: str, model: str, value: Any, max_entries: int = None,
+        ttl_hours: int = None):
+    """Uloží výsledek analýzy (eviction podle TTL a ANALYSIS_CACHE_MAX_ENTRIES)."""
+    _cache.put(cache_key, value, kind, model, max_entries, ttl_hours)
+
+
+def get_stats() -> dict:
+    """Vrátí hit/miss čítače a počet záznamů v cache."""
+    return _cache.get_stats()
+
+
+def clear():
+    """Smaže všechny záznamy cache (čítače zůstávají)."""
+    _cache.clear()
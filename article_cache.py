@@ -0,0 +1,49 @@
+"""
+Cache vygenerovaných článků (viz result_cache).
+Klíč = SHA-256 z polí tématu použitých v promptu, hashů zdrojových textů, délky,
+verze promptu, modelu a nastavení, která mění prompt nebo formát výstupu.
+Opakované "Napsat článek" ze dashboardu pro stejné téma a zdroje vrátí uložený
+výsledek bez volání API (pokud se nevynutí nové generování).
+"""
+
+import hashlib
+from typing import Dict, List, Optional
+
+import config
+import result_cache
+
+# Pole tématu, ze kterých se skládá prompt článku (jiná pole výsledek nemění)
+TOPIC_FIELDS = ('topic', 'title', 'angle', 'context', 'seo_keywords')
+
+_cache = result_cache.ResultCache('article', 'ARTICLE_CACHE_TTL_HOURS', 'ARTICLE_CACHE_MAX_ENTRIES')
+
+
+def make_key(topic: Dict, source_texts: List[str], length: str, prompt_version: int) -> str:
+    """Spočítá klíč cache z tématu, zdrojů, délky, verze promptu a nastavení generování."""
+    return result_cache.make_key(
+        prompt_version,
+        config.ARTICLE_MODEL,
+        length,
+        # Tool vs. textový výstup a zhuštění zdrojů mění výsledný článek
+        config.ARTICLE_STRUCTURED_OUTPUT,
+        config.SOURCE_CONDENSE,
+        config.SOURCE_TOKEN_BUDGET if config.SOURCE_CONDENSE else None,
+        [topic.get(field, '') for field in TOPIC_FIELDS],
+        [hashlib.sha256((text or '').encode('utf-8')).hexdigest() for text in source_texts],
+    )
+
+
+def get(cache_key: str, ttl_hours: int = None) -> Optional[Dict]:
+    """Vrátí uložený článek nebo None (miss / expirováno)."""
+    return _cache.get(cache_key, ttl_hours)
+
+
+def put(cache_key: str, article: Dict, max_entries: int = None, ttl_hours: int = None):
+    """Uloží článek (eviction podle TTL a ARTICLE_CACHE_MAX_ENTRIES)."""
+    _cache.put(cache_key, article, model=config.ARTICLE_MODEL,
+               max_entries=max_entries, ttl_hours=ttl_hours)
+
+
+def clear():
+    """Smaže všechny záznamy cache."""
+    _cache.clear()
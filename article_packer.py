@@ -0,0 +1,193 @@
+"""
+Article Packer — výběr článků pro analýzu do pevného token budgetu.
+Články se seřadí podle skóre (čerstvost × váha zdroje × velikost clusteru)
+a vkládají se, dokud se nevyčerpá budget. Vyřazené články se reportují.
+"""
+
+import math
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from dateutil import parser as date_parser
+
+import config
+import feed_manager
+import rss_scraper
+from logger import setup_logger
+from text_normalize import normalize_set
+
+log = setup_logger(__name__)
+
+# Průměrně ~3.5 znaku na token (CZ text s diakritikou vychází hůř než EN)
+CHARS_PER_TOKEN = 3.5
+# Poločas rozpadu čerstvosti (hodiny) — 24h starý článek má poloviční váhu
+RECENCY_HALF_LIFE_HOURS = 24
+# Podobnost titulků (Jaccard kmenů) pro zařazení do stejného clusteru
+CLUSTER_SIMILARITY = 0.3
+
+
+def estimate_tokens(text: str) -> int:
+    """Hrubý odhad počtu tokenů pro text."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _parse_published(value: str) -> Optional[datetime]:
+    """Parsuje datum publikace z RSS (RFC 822 i ISO 8601). Vrací aware datetime nebo None."""
+    if not value:
+        return None
+    try:
+        dt = date_parser.parse(value)
+    except (ValueError, OverflowError, TypeError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def latest_published(articles: List[Dict]) -> Optional[datetime]:
+    """Nejnovější datum publikace mezi články (None = žádné nejde parsovat)."""
+    dates = [dt for dt in (_parse_published(a.get('published', '')) for a in articles) if dt]
+    return max(dates) if dates else None
+
+
+def _recency_score(published: str, now: datetime) -> float:
+    """Exponenciální pokles podle stáří článku (1.0 = právě vyšel, neznámé datum = 0.5)."""
+    dt = _parse_published(published)
+    if dt is None:
+        return 0.5
+    age_hours = max(0.0, (now - dt).total_seconds() / 3600)
+    return 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+
+
+def cluster_articles(articles: List[Dict], threshold: float = CLUSTER_SIMILARITY) -> List[int]:
+    """
+    Seskupí články o stejném tématu podle podobnosti titulků.
+
+    Returns:
+        Seznam ID clusteru pro každý článek (ve stejném pořadí)
+    """
+    representatives = []  # (cluster_id, množina kmenů prvního článku)
+    cluster_ids = []
+    for article in articles:
+        words = normalize_set(article.get('title', ''), min_len=3)
+        assigned = None
+        if words:
+            for cluster_id, rep_words in representatives:
+                union = words | rep_words
+                if union and len(words & rep_words) / len(union) >= threshold:
+                    assigned = cluster_id
+                    break
+        if assigned is None:
+            assigned = len(representatives)
+            representatives.append((assigned, words))
+        cluster_ids.append(assigned)
+    return cluster_ids
+
+
+def score_articles(articles: List[Dict], source_weights: Dict[str, float] = None,
+                   now: datetime = None) -> List[float]:
+    """Spočítá skóre článků: čerstvost × váha zdroje × (1 + ln(velikost clusteru))."""
+    if source_weights is None:
+        source_weights = feed_manager.get_source_weights()
+    now = now or datetime.now(timezone.utc)
+
+    cluster_ids = cluster_articles(articles)
+    cluster_sizes = {}
+    for cluster_id in cluster_ids:
+        cluster_sizes[cluster_id] = cluster_sizes.get(cluster_id, 0) + 1
+
+    scores = []
+    for article, cluster_id in zip(articles, cluster_ids):
+        recency = _recency_score(article.get('published', ''), now)
+        weight = source_weights.get(article.get('source', ''), 1.0)
+        cluster_boost = 1 + math.log(cluster_sizes[cluster_id])
+        scores.append(recency * weight * cluster_boost)
+    return scores
+
+
+def group_clusters(articles: List[Dict], source_weights: Dict[str, float] = None,
+                   now: datetime = None) -> List[Dict]:
+    """
+    Seskupí články do clusterů (témat) seřazených podle součtu skóre článků.
+
+    Returns:
+        [{"id": int, "score": float, "articles": [...]}, ...] — id = pořadí (1 = nejlepší)
+    """
+    if not articles:
+        return []
+    scores = score_articles(articles, source_weights, now)
+    groups = {}
+    for article, score, cluster_id in zip(articles, scores, cluster_articles(articles)):
+        group = groups.setdefault(cluster_id, {'score': 0.0, 'articles': []})
+        group['score'] += score
+        group['articles'].append(article)
+
+    ranked = sorted(groups.values(), key=lambda g: g['score'], reverse=True)
+    return [{'id': i, 'score': g['score'], 'articles': g['articles']} for i, g in enumerate(ranked, 1)]
+
+
+def format_clusters_compact(clusters: List[Dict], max_titles: int = 3) -> str:
+    """Kompaktní přehled clusterů pro pre-ranking (jeden řádek na téma, bez popisů a URL)."""
+    lines = []
+    for cluster in clusters:
+        members = cluster['articles']
+        sources = sorted({a.get('source', '?') for a in members})
+        titles = " / ".join(a.get('title', '')[:100] for a in members[:max_titles])
+        lines.append(f"K{cluster['id']} [{len(members)}× | {', '.join(sources)}]: {titles}")
+    return "\n".join(lines)
+
+
+def pack_articles(articles: List[Dict], token_budget: int = None,
+                  source_weights: Dict[str, float] = None, now: datetime = None) -> Dict:
+    """
+    Vybere nejlepší články, které se vejdou do token budgetu, a naformátuje je pro analýzu.
+
+    Args:
+        articles: Seznam článků z rss_scraper
+        token_budget: Limit tokenů pro text článků (None = config, 0 = bez limitu)
+        source_weights: Váhy zdrojů {název feedu: váha} (None = z custom_feeds.json)
+        now: Referenční čas pro výpočet čerstvosti (pro testy)
+
+    Returns:
+        {"text": str, "included": list, "dropped": list, "tokens": int, "budget": int}
+    """
+    if token_budget is None:
+        token_budget = config.ANALYSIS_TOKEN_BUDGET
+
+    if not token_budget or not articles:
+        text = rss_scraper.format_articles_for_analysis(articles)
+        return {'text': text, 'included': list(articles), 'dropped': [],
+                'tokens': estimate_tokens(text), 'budget': token_budget}
+
+    scores = score_articles(articles, source_weights, now)
+    ranked = sorted(range(len(articles)), key=lambda i: scores[i], reverse=True)
+
+    selected = set()
+    used_tokens = 0
+    for idx in ranked:
+        # Odhad na jeden článek (včetně hlavičky "ČLÁNEK N:" a oddělovače)
+        cost = estimate_tokens(rss_scraper.format_articles_for_analysis([articles[idx]])) + 1
+        if used_tokens + cost > token_budget:
+            continue
+        selected.add(idx)
+        used_tokens += cost
+
+    # Zachovej původní pořadí (feedy), ať je prompt deterministický
+    included = [articles[i] for i in range(len(articles)) if i in selected]
+    dropped = [articles[i] for i in ranked if i not in selected]
+
+    text = rss_scraper.format_articles_for_analysis(included)
+    tokens = estimate_tokens(text)
+
+    if dropped:
+        log.info("📦 Token budget %d: vybráno %d/%d článků (~%d tokenů), vyřazeno %d",
+                 token_budget, len(included), len(articles), tokens, len(dropped))
+        for article in dropped[:5]:
+            log.info("   ✂️  %s: %.80s", article.get('source', '?'), article.get('title', ''))
+        if len(dropped) > 5:
+            log.info("   ✂️  ... a dalších %d", len(dropped) - 5)
+
+    return {'text': text, 'included': included, 'dropped': dropped,
+            'tokens': tokens, 'budget': token_budget}
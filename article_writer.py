@@ -4,52 +4,71 @@ Stahne zdrojove clanky, posle do Claude a vygeneruje CZ + EN verzi
 """
 
 import json
+import os
 import re
-import requests
+import threading
+import time
 import anthropic
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 
+import article_cache
 import config
+import html_pipeline
+import llm_ledger
+import page_cache
+import podcast_cache
+import source_condenser
+import source_scraper
+from claude_client import cached_system, estimate_cost, get_client, usage_stats
+from claude_scheduler import is_retryable, retry_wait
 from logger import setup_logger
+from models import ArticleOutput
+from pydantic import ValidationError
 from urllib.parse import urlparse
 
 log = setup_logger(__name__)
 
 try:
-    from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
+    from tenacity import retry, stop_after_attempt, retry_if_exception
     _HAS_TENACITY = True
 except ImportError:
     _HAS_TENACITY = False
 
 
-def _is_retryable(exc):
-    """Retry na overload (529), rate limit (429), server error (5xx) a connection errory."""
-    if isinstance(exc, (anthropic.APIConnectionError, anthropic.APITimeoutError)):
-        return True
-    if isinstance(exc, anthropic.APIStatusError):
-        return exc.status_code in (429, 500, 502, 503, 529)
-    return False
-
-
-def _call_api(client, model, max_tokens, temperature, prompt):
-    """Volání Claude API."""
-    return client.messages.create(
+def _call_api(client, model, max_tokens, temperature, prompt, system=None, stream_parser=None):
+    """
+    Volání Claude API (volitelný system blok s prompt cachingem).
+    Se stream_parser se odpověď streamuje a parser dostává text průběžně; vrací se finální Message.
+    """
+    params = dict(
         model=model,
         max_tokens=max_tokens,
         temperature=temperature,
+        system=cached_system(system) if system else anthropic.NOT_GIVEN,
         messages=[{
             "role": "user",
             "content": prompt
         }]
     )
+    llm_ledger.note_attempt()
+    if stream_parser is None:
+        return client.messages.create(**params)
+
+    # Retry (tenacity) spouští stream znovu — parser začne od nuly, ohlášená pole si pamatuje
+    stream_parser.restart()
+    with client.messages.stream(**params) as stream:
+        for text in stream.text_stream:
+            stream_parser.feed(text)
+        message = stream.get_final_message()
+    stream_parser.close()
+    return message
 
 
 if _HAS_TENACITY:
     _call_api = retry(
         stop=stop_after_attempt(2),
-        wait=wait_exponential(multiplier=4, min=15, max=60),
-        retry=retry_if_exception(_is_retryable),
+        wait=retry_wait,
+        retry=retry_if_exception(is_retryable),
         before_sleep=lambda retry_state: log.warning(
             "⚠️  API volání selhalo (HTTP %s), pokus %d/2, čekám...",
             getattr(retry_state.outcome.exception(), 'status_code', '?'),
@@ -58,6 +77,44 @@ if _HAS_TENACITY:
     )(_call_api)
 
 
+def _call_article_tool_api(client, max_tokens, prompt, stream_parser=None):
+    """Volání Claude API s výstupem přes tool submit_article (streamovaně, pokud je stream_parser)."""
+    params = dict(
+        model=config.ARTICLE_MODEL,
+        max_tokens=max_tokens,
+        temperature=0.7,
+        system=cached_system(ARTICLE_TOOL_SYSTEM_PROMPT),
+        tools=[ARTICLE_TOOL],
+        tool_choice={"type": "tool", "name": ARTICLE_TOOL_NAME},
+        messages=[{"role": "user", "content": prompt}],
+    )
+    llm_ledger.note_attempt()
+    if stream_parser is None:
+        return client.messages.create(**params)
+
+    stream_parser.restart()
+    with client.messages.stream(**params) as stream:
+        for event in stream:
+            if event.type == 'input_json':
+                stream_parser.feed_snapshot(event.snapshot)
+        message = stream.get_final_message()
+    stream_parser.close()
+    return message
+
+
+if _HAS_TENACITY:
+    _call_article_tool_api = retry(
+        stop=stop_after_attempt(2),
+        wait=retry_wait,
+        retry=retry_if_exception(is_retryable),
+        before_sleep=lambda retry_state: log.warning(
+            "⚠️  API volání (tool) selhalo (HTTP %s), pokus %d/2, čekám...",
+            getattr(retry_state.outcome.exception(), 'status_code', '?'),
+            retry_state.attempt_number
+        ),
+    )(_call_article_tool_api)
+
+
 def _build_sources_html(source_urls: List[str], lang: str = 'cs') -> str:
     """Sestaví HTML sekci zdrojů z reálných URL."""
     if not source_urls:
@@ -75,44 +132,6 @@ def _build_sources_html(source_urls: List[str], lang: str = 'cs') -> str:
     return f'\n<h2>{heading}</h2>\n<ul>\n' + '\n'.join(items) + '\n</ul>'
 
 
-def _strip_generated_sources(html: str) -> str:
-    """Odstraní AI-generovanou sekci zdrojů (Zdroje/Sources) pokud existuje."""
-    # Odstraní <h2>Zdroje</h2> nebo <h2>Sources</h2> a následující <ul>...</ul>
-    return re.sub(
-        r'\s*<h2>\s*(?:Zdroje|Sources)\s*</h2>\s*<ul>[\s\S]*?</ul>\s*',
-        '',
-        html,
-        flags=re.IGNORECASE
-    )
-
-
-def _strip_markdown_artifacts(html: str) -> str:
-    """Odstraní markdown artefakty, které Haiku občas přidá do HTML výstupu."""
-    # Odstraň ```html ... ``` code fences
-    html = re.sub(r'```html\s*\n?', '', html)
-    html = re.sub(r'```\s*$', '', html, flags=re.MULTILINE)
-    # Převeď markdown nadpisy (## Nadpis) na <h2>
-    html = re.sub(r'^#{3,}\s+(.+)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
-    html = re.sub(r'^#{2}\s+(.+)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
-    html = re.sub(r'^#\s+(.+)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
-    # Převeď markdown --- na <hr>
-    html = re.sub(r'^-{3,}\s*$', '<hr>', html, flags=re.MULTILINE)
-    # Převeď **bold** na <strong>
-    html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
-    return html.strip()
-
-
-def _make_first_paragraph_quote(html: str) -> str:
-    """Zabalí první <p>...</p> do <blockquote> jako vizuálně odlišený úvod."""
-    return re.sub(
-        r'(<p[^>]*>.*?</p>)',
-        r'<blockquote class="wp-block-quote">\1</blockquote>',
-        html,
-        count=1,
-        flags=re.DOTALL,
-    )
-
-
 def _extract_story_cards(text: str, lang: str) -> Optional[List[Dict]]:
     """
     Najde STORY_CARDS <lang>: [...] v AI výstupu, vrátí list dictů nebo None.
@@ -179,70 +198,88 @@ def _extract_story_cards(text: str, lang: str) -> Optional[List[Dict]]:
     return cards[:5]
 
 
-def _insert_separators_before_h2(html: str) -> str:
-    """Vloží WP blokový oddělovač (<hr>) před každý <h2> kromě prvního."""
-    separator = '\n<hr class="wp-block-separator has-alpha-channel-opacity"/>\n'
-    parts = re.split(r'(?=<h2)', html)
-    if len(parts) <= 1:
-        return html
-    # parts[0] = text před prvním h2 (může být prázdný)
-    # parts[1] = první h2 + obsah (přeskočíme separator)
-    # parts[2+] = další h2 + obsah (přidáme separator)
-    result = parts[0] + parts[1]
-    for part in parts[2:]:
-        result += separator + part
-    return result
-
-
 def scrape_full_article(url: str) -> str:
     """
-    Stahne plny text clanku z URL
+    Stahne plny text clanku z URL (s page cache a revalidaci)
 
     Args:
         url: URL clanku
 
     Returns:
-        Text clanku (max 3000 znaku)
+        Text clanku (max config.SOURCE_MAX_CHARS znaku)
     """
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
-
-        soup = BeautifulSoup(resp.text, 'html.parser')
-
-        # Odstran scripty a styly
-        for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe', 'noscript']):
-            tag.decompose()
-
-        # Zkus najit hlavni obsah
-        content = None
-        for selector in ['article', 'main', '[role="main"]', '.article-body', '.post-content', '.entry-content']:
-            content = soup.select_one(selector)
-            if content:
-                break
-
-        if not content:
-            content = soup.body if soup.body else soup
+    # Cache drží celý vyextrahovaný text — limit závisí na SOURCE_CONDENSE, ořezává se až při čtení
+    limit = config.SOURCE_MAX_CHARS
+    cached = page_cache.get(url)
+    if cached and cached['fresh']:
+        return cached['text'][:limit]
 
-        text = content.get_text(separator='\n', strip=True)
-
-        # Vycisti prazdne radky
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        text = '\n'.join(lines)
-
-        return text[:3000]
+    try:
+        resp = source_scraper.get_session().get(url, timeout=config.SCRAPE_TIMEOUT, stream=True,
+                                                headers=page_cache.conditional_headers(cached))
+        try:
+            if resp.status_code == 304 and cached:
+                page_cache.mark_revalidated(url)
+                return cached['text'][:limit]
+            resp.raise_for_status()
+            text = source_scraper.stream_extract(resp, url, max_chars=0)
+        finally:
+            resp.close()
+
+        if text:
+            page_cache.put(url, text, resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+        return text[:limit]
 
     except Exception as e:
+        if cached:
+            log.warning("Revalidace %s selhala (%s), použiji text z cache", url[:80], e)
+            return cached['text'][:limit]
         return f"[Chyba pri stahovani: {e}]"
 
 
+# Řádky reportu s labelem pole — toleruje markdown bold (**) kolem emoji i labelu
+# ("**LABEL**:", "**LABEL:**", "LABEL:") a emoji s/bez variation selectoru (U+FE0F)
+_REPORT_LABELS = {
+    'NAVRŽENÝ TITULEK': 'title',
+    'ÚHEL POHLEDU': 'angle',
+    'KONTEXT': 'context',
+    'HLAVNÍ HOOK': 'hook',
+    'VIZUÁLNÍ NÁVRH': 'visual',
+    'VIRALITA': 'virality',
+    'PROČ TEĎKA': 'why_now',
+    'ZDROJE': 'sources',
+    'SEO KLÍČOVÁ SLOVA': 'seo_keywords',
+    'NÁZEV HRY': 'game_name',
+    'STATUS TAG': 'status_tag',
+}
+_REPORT_FIELDS = ('topic', 'title', 'angle', 'context', 'hook', 'visual', 'virality',
+                  'why_now', 'seo_keywords', 'game_name', 'status_tag')
+_REPORT_LABEL_RE = re.compile(
+    r'(?:🎮|📰|🎯|📝|💬|🖼|🔥|💡|🔗|🏷|🕹|📌)\ufe0f?\s*\*{0,2}\s*'
+    r'(?P<label>TÉMA\s*\d*|' + '|'.join(_REPORT_LABELS) + r')\s*\*{0,2}\s*:\s*\*{0,2}(?P<value>.*)'
+)
+_REPORT_URL_RE = re.compile(r'https?://[^\s<>"\')\]]+[^\s<>"\')\].,]')
+VALID_STATUS_TAGS = {'news', 'update', 'leak', 'critical', 'success', 'indie', 'review', 'trailer',
+                     'rumor', 'info', 'finance', 'tema', 'preview'}
+
+
+def _finish_topic(topic: Dict) -> Dict:
+    """Dopočítá virality_score a zvaliduje status_tag."""
+    virality_match = re.search(r'\d+', topic['virality'])
+    topic['virality_score'] = int(virality_match.group()) if virality_match else 0
+    raw_tag = (topic['status_tag'] or 'news').lower().strip()
+    topic['status_tag'] = raw_tag if raw_tag in VALID_STATUS_TAGS else 'news'
+    return topic
+
+
 def parse_topics_from_report(report_text: str) -> List[Dict]:
     """
     Parsuje text reportu na strukturovana temata
 
+    Jeden průchod po řádcích: řádek s 🎮 TÉMA začíná nové téma, řádek s labelem
+    nastaví pole (prázdná hodnota = vezme se další neprázdný řádek), za
+    🔗 ZDROJE se sbírají URL až do dalšího labelu.
+
     Args:
         report_text: Plny text report.txt
 
@@ -250,108 +287,89 @@ def parse_topics_from_report(report_text: str) -> List[Dict]:
         List slovniku s tematy
     """
     topics = []
+    topic = None
+    awaiting = None     # pole, jehož hodnota je až na dalším řádku
+    in_sources = False
+
+    for line in report_text.splitlines():
+        match = _REPORT_LABEL_RE.search(line) if ':' in line else None
+        if match:
+            label = match.group('label')
+            key = 'topic' if label.startswith('TÉMA') else _REPORT_LABELS[label]
+            awaiting, in_sources = None, False
+            if key == 'topic':
+                if topic and topic['topic']:
+                    topics.append(_finish_topic(topic))
+                topic = dict.fromkeys(_REPORT_FIELDS, '')
+                topic['sources'] = None
+            if topic is None:
+                continue
+            if key == 'sources':
+                if topic['sources'] is None:
+                    topic['sources'] = _REPORT_URL_RE.findall(match.group('value'))
+                    in_sources = True
+                continue
+            if not topic[key]:
+                value = match.group('value').strip()
+                if value:
+                    topic[key] = value.strip('"\'').strip('*')
+                else:
+                    awaiting = key
+            continue
 
-    # Rozdeleni na bloky podle 🎮 TÉMA (s volitelnym cislem, toleruje **bold**)
-    # Format muze byt: "TÉMA 1:", "**TÉMA 1**:", "**TÉMA 1:**" atd.
-    _tema_pat = r'🎮\s*\*{0,2}\s*TÉMA\s*\d*\s*\*{0,2}\s*:\s*\*{0,2}'
-    blocks = re.split(r'(?=' + _tema_pat + r')', report_text)
-
-    for block in blocks:
-        block = block.strip()
-        if not re.match(r'.*' + _tema_pat, block):
+        if topic is None:
             continue
+        if in_sources:
+            topic['sources'].extend(_REPORT_URL_RE.findall(line))
+        elif awaiting and line.strip():
+            topic[awaiting] = line.strip().strip('"\'').strip('*')
+            awaiting = None
+
+    if topic and topic['topic']:
+        topics.append(_finish_topic(topic))
+    for topic in topics:
+        topic['sources'] = topic['sources'] or []
+    return topics
 
-        topic = {}
-
-        # Parsuj jednotlive sekce
-        # Patterny toleruji markdown bold (**) pred emoji i kolem labelu
-        # Format muze byt: "**LABEL**:" nebo "**LABEL:**" nebo "LABEL:"
-        # Proto: LABEL\*{0,2}\s*:\s*\*{0,2} pokryva vsechny varianty
-        _val = r'\s*\n?\s*(.+)'
-        _b = r'\*{0,2}'  # optional bold markers
-        patterns = {
-            'topic': _b + r'🎮\s*' + _b + r'\s*TÉMA\s*\d*\s*' + _b + r'\s*:\s*' + _b + _val,
-            'title': _b + r'📰\s*' + _b + r'\s*NAVRŽENÝ TITULEK' + _b + r'\s*:\s*' + _b + _val,
-            'angle': _b + r'🎯\s*' + _b + r'\s*ÚHEL POHLEDU' + _b + r'\s*:\s*' + _b + _val,
-            'context': _b + r'📝\s*' + _b + r'\s*KONTEXT' + _b + r'\s*:\s*' + _b + _val,
-            'hook': _b + r'💬\s*' + _b + r'\s*HLAVNÍ HOOK' + _b + r'\s*:\s*' + _b + _val,
-            'visual': _b + r'🖼️\s*' + _b + r'\s*VIZUÁLNÍ NÁVRH' + _b + r'\s*:\s*' + _b + _val,
-            'virality': _b + r'🔥\s*' + _b + r'\s*VIRALITA' + _b + r'\s*:\s*' + _b + _val,
-            'why_now': _b + r'💡\s*' + _b + r'\s*PROČ TEĎKA' + _b + r'\s*:\s*' + _b + _val,
-            'seo_keywords': _b + r'🏷️\s*' + _b + r'\s*SEO KLÍČOVÁ SLOVA' + _b + r'\s*:\s*' + _b + _val,
-            'game_name': _b + r'🕹️\s*' + _b + r'\s*NÁZEV HRY' + _b + r'\s*:\s*' + _b + _val,
-            'status_tag': _b + r'📌\s*' + _b + r'\s*STATUS TAG' + _b + r'\s*:\s*' + _b + _val,
-        }
-
-        for key, pattern in patterns.items():
-            match = re.search(pattern, block)
-            value = match.group(1).strip() if match else ''
-            # Odstranit uvozovky a markdown bold z hodnoty
-            value = value.strip('"\'').strip('*')
-            topic[key] = value
-
-        # Parsuj virality score jako cislo
-        virality_match = re.search(r'(\d+)', topic.get('virality', ''))
-        topic['virality_score'] = int(virality_match.group(1)) if virality_match else 0
-
-        # Validace status_tag — musí být z povolených hodnot
-        valid_status_tags = {'news', 'update', 'leak', 'critical', 'success', 'indie', 'review', 'trailer', 'rumor', 'info', 'finance', 'tema', 'preview'}
-        raw_tag = topic.get('status_tag', 'news').lower().strip()
-        topic['status_tag'] = raw_tag if raw_tag in valid_status_tags else 'news'
-
-        # Parsuj zdroje (URL na samostatnych radcich)
-        sources_section = re.search(r'\*{0,2}🔗\s*\*{0,2}\s*ZDROJE\*{0,2}\s*:\s*\*{0,2}\s*\n?([\s\S]*?)(?=\*{0,2}🏷️|$)', block)
-        if sources_section:
-            urls = re.findall(r'https?://[^\s<>"\')\]]+[^\s<>"\')\].,]', sources_section.group(1))
-            topic['sources'] = urls
-        else:
-            topic['sources'] = []
-
-        if topic.get('topic'):
-            topics.append(topic)
 
-    return topics
+_report_cache = {}  # cesta → (mtime_ns, velikost, témata)
+_report_cache_lock = threading.Lock()
+_REPORT_CACHE_MAX = 32
 
 
-def write_article(topic: Dict, source_texts: List[str], length: str = 'medium') -> Dict:
+def load_topics_from_report(report_path: str) -> List[Dict]:
     """
-    Vygeneruje clanek pomoci Claude API
-
-    Args:
-        topic: Slovnik s tematem (z parse_topics_from_report)
-        source_texts: Seznam plnych textu zdrojovych clanku
+    Načte a naparsuje report.txt; výsledek se cachuje podle mtime a velikosti souboru.
 
     Returns:
-        {"cs": "<html>...", "en": "<html>..."} nebo {"error": "..."}
+        List témat (kopie — volající je může měnit)
     """
-    client = anthropic.Anthropic(api_key=config.CLAUDE_API_KEY)
-
-    # Pripravi zdrojove texty
-    sources_combined = ""
-    for i, text in enumerate(source_texts, 1):
-        sources_combined += f"\n--- ZDROJ {i} ---\n{text}\n"
-
-    # Pripravi seznam URL zdroju pro konec clanku
-    source_urls = topic.get('sources', [])
-    sources_list = "\n".join(source_urls)
-
-    if length == 'short':
-        length_instruction = "Článek musí mít 600-800 slov (krátká analýza, 5-7 odstavců). MINIMUM je 600 slov — Rank Math pod tím hlásí 'zvažte použití alespoň 600 slov'. Pokud se blížíš ke spodní hranici, přidej další odstavec s kontextem nebo srovnáním."
-    elif length == 'long':
-        length_instruction = "Článek musí mít 1200-1800 slov (deep-dive, 12-18 odstavců, více h2 sekcí, silná analýza a kontext)"
+    stat = os.stat(report_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _report_cache_lock:
+        cached = _report_cache.get(report_path)
+    if cached and cached[0] == stamp:
+        topics = cached[1]
     else:
-        length_instruction = "Článek musí mít 700-1000 slov (střední analýza, 7-10 odstavců). MINIMUM je 600 slov kvůli Rank Math SEO skóre."
+        with open(report_path, 'r', encoding='utf-8') as f:
+            topics = parse_topics_from_report(f.read())
+        with _report_cache_lock:
+            _report_cache.pop(report_path, None)
+            _report_cache[report_path] = (stamp, topics)
+            while len(_report_cache) > _REPORT_CACHE_MAX:
+                _report_cache.pop(next(iter(_report_cache)))
+    return [dict(t, sources=list(t['sources'])) for t in topics]
 
-    prompt = f"""Napíš ANALYTICKÝ herní článek s vlastním úhlem pohledu. Toto NENÍ přepis zprávy — je to komentář redaktora, který zpravodajskou událost zasazuje do kontextu a říká, CO TO ZNAMENÁ.
 
-TÉMA: {topic.get('topic', '')}
-NAVRŽENÝ TITULEK: {topic.get('title', '')}
-ÚHEL POHLEDU: {topic.get('angle', '')}
-KONTEXT: {topic.get('context', '')}
-SEO KLÍČOVÁ SLOVA: {topic.get('seo_keywords', '')}
+# Verze promptu článku (system prompt, user prompt, tool schema) — zvýšit při každé
+# změně, jinak article_cache vrací články vygenerované podle starého zadání
+ARTICLE_PROMPT_VERSION = 1
 
-ZDROJOVÉ TEXTY (použij JEN pro fakta, ne jako šablonu):
-{sources_combined}
+# Statické instrukce pro write_article — posílají se jako cachovaný system blok,
+# mezi voláními se mění jen data tématu a zdrojové texty v user zprávě.
+ARTICLE_SYSTEM_PROMPT = """Napíš ANALYTICKÝ herní článek s vlastním úhlem pohledu. Toto NENÍ přepis zprávy — je to komentář redaktora, který zpravodajskou událost zasazuje do kontextu a říká, CO TO ZNAMENÁ.
+
+Zadání (téma, titulek, úhel, kontext, SEO klíčová slova, délku a zdrojové texty) dostaneš ve zprávě uživatele.
 
 === FILOZOFIE ČLÁNKU (KRITICKÉ) ===
 Zdrojové weby (IGN, PC Gamer...) už napsaly CO se stalo. Náš úkol je říct PROČ TO VADÍ / PROČ TO STOJÍ ZA POZORNOST. Google i čtenáři už tu novinku četli jinde. Pokud článek jen převypráví fakta, NEMÁ DŮVOD EXISTOVAT.
@@ -439,7 +457,7 @@ NIC z následujícího se v článku nesmí objevit. Pokud něco napíšeš, sma
 
 === PRAVIDLA ===
 - Piš VLASTNÍMI SLOVY, ze zdrojů přebírej JEN fakta a čísla, nikdy ne formulace
-- {length_instruction}
+- Délku článku drž přesně podle pokynu DÉLKA ČLÁNKU v zadání
 - Formát: ČISTÉ HTML (<h2>, <p>, <strong>)
 - NEPOUŽÍVEJ markdown! Žádné ```, ---, #, ** — POUZE HTML tagy
 - Styl: analytický, s názorem. NE neutrální zpravodajský tón. Nebojí se mít postoj.
@@ -463,8 +481,8 @@ NIC z následujícího se v článku nesmí objevit. Pokud něco napíšeš, sma
   TITULEK EN: [anglický titulek, MAX 60 znaků, KEYWORD EN v první třetině]
   META CZ: [český meta description, 140-155 znaků, VŽDY ukončené tečkou/otazníkem, obsahuje KEYWORD CZ, musí lákat k prokliku]
   META EN: [anglický meta description, 140-155 znaků, VŽDY ukončené tečkou/otazníkem, obsahuje KEYWORD EN, musí lákat k prokliku]
-  STORY_CARDS CZ: [JEDNO-ŘÁDKOVÝ JSON array 3-5 objektů ve tvaru {{"heading": "max 40 znaků", "body": "max 160 znaků, 1-2 věty"}}. Toto NENÍ shrnutí článku po sekcích — vyber 3-5 nejdůležitějších bodů (klíčový fakt → kontext/úhel → důsledek). Každá karta = 1 myšlenka, čte se na svislé mobilní obrazovce SAMOSTATNĚ, čtenář vidí jen tu jednu kartu a musí pochopit pointu bez ostatních. Bez HTML, bez markdown, plain text v JSON stringu. Heading je věcný (ne otázka, ne clickbait). Body 1-2 reálné věty. Příklad jedné karty: {{"heading":"Rockstar drží termín přes rok","body":"Od oznámení v roce 2024 GTA 6 nezměnilo datum vydání, což je u AAA tahounů nezvyklé."}}]
-  STORY_CARDS EN: [Same logic in English, JSON array 3-5 objects {{"heading": "max 40 chars", "body": "max 160 chars, 1-2 sentences"}}. NEVER mention Czech Republic / Czech players. Plain text only, no HTML, no markdown.]
+  STORY_CARDS CZ: [JEDNO-ŘÁDKOVÝ JSON array 3-5 objektů ve tvaru {"heading": "max 40 znaků", "body": "max 160 znaků, 1-2 věty"}. Toto NENÍ shrnutí článku po sekcích — vyber 3-5 nejdůležitějších bodů (klíčový fakt → kontext/úhel → důsledek). Každá karta = 1 myšlenka, čte se na svislé mobilní obrazovce SAMOSTATNĚ, čtenář vidí jen tu jednu kartu a musí pochopit pointu bez ostatních. Bez HTML, bez markdown, plain text v JSON stringu. Heading je věcný (ne otázka, ne clickbait). Body 1-2 reálné věty. Příklad jedné karty: {"heading":"Rockstar drží termín přes rok","body":"Od oznámení v roce 2024 GTA 6 nezměnilo datum vydání, což je u AAA tahounů nezvyklé."}]
+  STORY_CARDS EN: [Same logic in English, JSON array 3-5 objects {"heading": "max 40 chars", "body": "max 160 chars, 1-2 sentences"}. NEVER mention Czech Republic / Czech players. Plain text only, no HTML, no markdown.]
 - KRITICKÉ: V nadpisech (h2) NEPOUŽÍVEJ Title Case! Velké písmeno POUZE na začátku věty a u vlastních jmen. ŠPATNĚ: "Nová Éra Pro Herní Průmysl". SPRÁVNĚ: "Nová éra pro herní průmysl". ŠPATNĚ: "What This Means For Players". SPRÁVNĚ: "What this means for players".
 - KRITICKÉ: META CZ/EN NESMÍ být uťaté v půli věty! Krátký svébytný popis (1-2 věty) končící interpunkcí — NIKDY NE kopie úvodního odstavce.
 - NEPŘIDÁVEJ sekci "Zdroje" ani "Sources" — přidají se automaticky
@@ -491,140 +509,505 @@ POSTUP:
 === ENGLISH ===
 <přesný překlad českého článku výše>"""
 
-    try:
-        max_tokens = 8192 if length == 'long' else 4096
-        message = _call_api(client, config.ARTICLE_MODEL, max_tokens, 0.7, prompt)
-
-        result_text = message.content[0].text
-
-        # Extrahuj titulky, klíčová slova a meta CZ/EN
-        corrected_title = None
-        en_title = None
-        meta_cs = None
-        meta_en = None
-        keyword_cs = None
-        keyword_en = None
-
-        title_cs_match = re.search(r'^\s*TITULEK\s*CZ:\s*(.+)$', result_text, re.MULTILINE)
-        title_en_match = re.search(r'^\s*TITULEK\s*EN:\s*(.+)$', result_text, re.MULTILINE)
-        meta_cs_match = re.search(r'^\s*META\s*CZ:\s*(.+)$', result_text, re.MULTILINE)
-        meta_en_match = re.search(r'^\s*META\s*EN:\s*(.+)$', result_text, re.MULTILINE)
-        keyword_cs_match = re.search(r'^\s*KEYWORD\s*CZ:\s*(.+)$', result_text, re.MULTILINE)
-        keyword_en_match = re.search(r'^\s*KEYWORD\s*EN:\s*(.+)$', result_text, re.MULTILINE)
-        story_cards_cs = _extract_story_cards(result_text, 'CZ')
-        story_cards_en = _extract_story_cards(result_text, 'EN')
-        # Fallback na starý formát
-        title_old_match = re.search(r'^\s*TITULEK:\s*(.+)$', result_text, re.MULTILINE)
-
-        if title_cs_match:
-            corrected_title = title_cs_match.group(1).strip()
-        elif title_old_match:
-            corrected_title = title_old_match.group(1).strip()
-
-        if title_en_match:
-            en_title = title_en_match.group(1).strip()
-
-        if meta_cs_match:
-            meta_cs = meta_cs_match.group(1).strip().strip('"\'').strip('*')
-        if meta_en_match:
-            meta_en = meta_en_match.group(1).strip().strip('"\'').strip('*')
-
-        if keyword_cs_match:
-            keyword_cs = keyword_cs_match.group(1).strip().strip('"\'').strip('*').lower()
-        if keyword_en_match:
-            keyword_en = keyword_en_match.group(1).strip().strip('"\'').strip('*').lower()
-
-        # Odstraň řádky s titulky, klíčovými slovy a meta popisy z textu, aby se nedostaly do HTML
-        result_text = re.sub(r'^\s*TITULEK\s*(?:CZ|EN)?:\s*.+$', '', result_text, flags=re.MULTILINE)
-        result_text = re.sub(r'^\s*META\s*(?:CZ|EN):\s*.+$', '', result_text, flags=re.MULTILINE)
-        result_text = re.sub(r'^\s*KEYWORD\s*(?:CZ|EN)?:\s*.+$', '', result_text, flags=re.MULTILINE)
-        # STORY_CARDS může být víceřádkový JSON, mažeme od labelu po uzavírací ]
-        result_text = re.sub(r'^\s*STORY_CARDS\s*(?:CZ|EN):\s*\[[\s\S]*?\]\s*$', '', result_text, flags=re.MULTILINE)
-        result_text = result_text.strip()
-
-        # Parsuj CZ a EN casti
-        cs_match = re.search(r'===\s*ČESKY\s*===\s*([\s\S]*?)(?====\s*ENGLISH\s*===|$)', result_text)
-        en_match = re.search(r'===\s*ENGLISH\s*===\s*([\s\S]*?)$', result_text)
-
-        if cs_match:
-            cs_html = cs_match.group(1).strip()
-        elif en_match:
-            cs_html = result_text[:en_match.start()].strip()
-        else:
-            cs_html = result_text
-        en_html = en_match.group(1).strip() if en_match else ''
-
-        # Vyčisti markdown artefakty (Haiku 3.5 je občas přidává)
-        cs_html = _strip_markdown_artifacts(cs_html)
-        cs_html = _insert_separators_before_h2(cs_html)
-        cs_html = _make_first_paragraph_quote(cs_html)
-        if en_html:
-            en_html = _strip_markdown_artifacts(en_html)
-            en_html = _insert_separators_before_h2(en_html)
-            en_html = _make_first_paragraph_quote(en_html)
-
-        # Odstraň AI-generované zdroje (nepřidáváme žádné)
-        cs_html = _strip_generated_sources(cs_html)
-
-        if en_html:
-            en_html = _strip_generated_sources(en_html)
-
-        # Odhad ceny (Claude Sonnet 4 pricing: $3.00/MTok input, $15.00/MTok output)
-        cost_input = (message.usage.input_tokens / 1_000_000) * 3.00
-        cost_output = (message.usage.output_tokens / 1_000_000) * 15.00
-        total_cost = cost_input + cost_output
-
-        result = {
-            'cs': cs_html,
-            'en': en_html,
-            'tokens_in': message.usage.input_tokens,
-            'tokens_out': message.usage.output_tokens,
-            'cost': f"${total_cost:.4f}"
-        }
-        if corrected_title:
-            result['corrected_title'] = corrected_title
-        if en_title:
-            result['en_title'] = en_title
-        if meta_cs:
-            result['meta_description_cs'] = meta_cs
-        if meta_en:
-            result['meta_description_en'] = meta_en
-        if keyword_cs:
-            result['focus_keyword_cs'] = keyword_cs
-        if keyword_en:
-            result['focus_keyword_en'] = keyword_en
-        if story_cards_cs:
-            result['story_cards_cs'] = story_cards_cs
-            log.info("STORY_CARDS CZ: %d karet", len(story_cards_cs))
-        if story_cards_en:
-            result['story_cards_en'] = story_cards_en
-            log.info("STORY_CARDS EN: %d karet", len(story_cards_en))
-        return result
+ARTICLE_TOOL_NAME = "submit_article"
+
+_STORY_CARDS_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "required": ["heading", "body"],
+        "properties": {
+            "heading": {"type": "string", "description": "Věcný nadpis karty, max 40 znaků"},
+            "body": {"type": "string", "description": "1-2 věty, max 160 znaků, plain text"},
+        },
+    },
+}
+
+# Pořadí vlastností = pořadí generování (hlavička → CZ → EN), stream parser na něm staví
+ARTICLE_TOOL = {
+    "name": ARTICLE_TOOL_NAME,
+    "description": "Odešle hotový článek (CZ + EN) včetně titulků, SEO polí a story cards",
+    "input_schema": {
+        "type": "object",
+        "required": ["keyword_cs", "keyword_en", "title_cs", "title_en", "meta_cs", "meta_en",
+                     "story_cards_cs", "story_cards_en", "cs_html", "en_html"],
+        "properties": {
+            "keyword_cs": {"type": "string", "description": "KEYWORD CZ — 1-2 slova"},
+            "keyword_en": {"type": "string", "description": "KEYWORD EN — 1-2 words"},
+            "title_cs": {"type": "string", "description": "TITULEK CZ — max 60 znaků, keyword v první třetině"},
+            "title_en": {"type": "string", "description": "TITULEK EN — max 60 chars, keyword in first third"},
+            "meta_cs": {"type": "string", "description": "META CZ — 140-155 znaků, ukončené interpunkcí"},
+            "meta_en": {"type": "string", "description": "META EN — 140-155 chars, ending with punctuation"},
+            "story_cards_cs": {**_STORY_CARDS_SCHEMA, "description": "STORY_CARDS CZ — 3-5 karet"},
+            "story_cards_en": {**_STORY_CARDS_SCHEMA, "description": "STORY_CARDS EN — 3-5 cards"},
+            "cs_html": {"type": "string", "description": "Celý český článek jako čisté HTML (<h2>, <p>, <strong>), bez h1 a zdrojů"},
+            "en_html": {"type": "string", "description": "Celý anglický článek jako čisté HTML, lokalizovaný pro mezinárodní publikum"},
+        },
+    },
+}
+
+# Tool mode: stejná pravidla, výstup ale jde do polí toolu místo textových řádků a sekcí
+ARTICLE_TOOL_SYSTEM_PROMPT = ARTICLE_SYSTEM_PROMPT + f"""
+
+=== VÝSTUP PŘES TOOL ===
+Nepiš výstup jako text. Odešli ho VŽDY přes tool {ARTICLE_TOOL_NAME}: pole KEYWORD, TITULEK, META
+a STORY_CARDS popsaná výše patří do odpovídajících polí toolu (bez labelů), článek v češtině
+do cs_html a anglickou verzi do en_html (bez oddělovačů === ČESKY === / === ENGLISH ===)."""
+
+
+_STREAM_FIELD_RE = re.compile(r'^\s*(KEYWORD|TITULEK|META)\s*(CZ|EN)?:\s*(.+)$')
+_STREAM_CARDS_RE = re.compile(r'^\s*STORY_CARDS\s*(CZ|EN):')
+_STREAM_CS_RE = re.compile(r'^\s*===\s*ČESKY\s*===')
+_STREAM_EN_RE = re.compile(r'^\s*===\s*ENGLISH\s*===')
+
+# (label, jazyk) → klíč ve výsledku write_article()
+_STREAM_FIELD_KEYS = {
+    ('KEYWORD', 'CZ'): 'focus_keyword_cs',
+    ('KEYWORD', 'EN'): 'focus_keyword_en',
+    ('TITULEK', 'CZ'): 'corrected_title',
+    ('TITULEK', None): 'corrected_title',
+    ('TITULEK', 'EN'): 'en_title',
+    ('META', 'CZ'): 'meta_description_cs',
+    ('META', 'EN'): 'meta_description_en',
+}
+
+
+# Pole toolu submit_article → klíč ve výsledku write_article()
+_TOOL_FIELD_KEYS = {
+    'keyword_cs': 'focus_keyword_cs',
+    'keyword_en': 'focus_keyword_en',
+    'title_cs': 'corrected_title',
+    'title_en': 'en_title',
+    'meta_cs': 'meta_description_cs',
+    'meta_en': 'meta_description_en',
+    'story_cards_cs': 'story_cards_cs',
+    'story_cards_en': 'story_cards_en',
+    'cs_html': 'cs',
+    'en_html': 'en',
+}
+
+
+class ArticleStreamParser:
+    """
+    Inkrementální parser streamované odpovědi write_article.
+
+    Hlavičková pole (KEYWORD/TITULEK/META/STORY_CARDS) a hotovou CZ sekci
+    ohlásí callbackem on_field(klíč, hodnota) hned, jak dorazí — navazující
+    práce (YouTube detekce, RAWG) nemusí čekat na EN polovinu. Klíče odpovídají
+    výsledku write_article(), CZ sekce je 'cs' (surové HTML před post-processingem).
+    Textový formát jde přes feed(), tool mode přes feed_snapshot().
+    Finální výsledek se i tak parsuje z celé odpovědi přes parse_article_response().
+    """
 
+    def __init__(self, on_field: Callable[[str, object], None] = None, clock=time.monotonic):
+        self._on_field = on_field
+        self._clock = clock
+        self._started = clock()
+        self.fields = {}
+        self.timings = {}
+        self.restart()
+
+    def restart(self):
+        """Začne parsovat nový stream (retry). Už ohlášená pole se znovu neohlásí."""
+        self._buffer = ''
+        self._state = 'header'  # header → cs → en
+        self._cards_lang = None
+        self._cards_lines = []
+        self._cs_lines = []
+        self._snapshot = {}
+
+    @property
+    def time_to_first_field(self) -> Optional[float]:
+        return min(self.timings.values()) if self.timings else None
+
+    def _emit(self, key, value):
+        if key in self.fields or value in (None, '', []):
+            return
+        self.fields[key] = value
+        self.timings[key] = self._clock() - self._started
+        if self._on_field:
+            try:
+                self._on_field(key, value)
+            except Exception as e:
+                log.warning("Stream callback pro %s selhal: %s", key, e)
+
+    def _flush_cards(self):
+        if self._cards_lang:
+            cards = _extract_story_cards('\n'.join(self._cards_lines), self._cards_lang)
+            self._emit('story_cards_cs' if self._cards_lang == 'CZ' else 'story_cards_en', cards)
+        self._cards_lang = None
+        self._cards_lines = []
+
+    def _flush_cs(self):
+        if self._state == 'cs':
+            self._emit('cs', '\n'.join(self._cs_lines).strip())
+
+    def _line(self, line: str):
+        if self._state == 'cs':
+            if _STREAM_EN_RE.match(line):
+                self._flush_cs()
+                self._state = 'en'
+            else:
+                self._cs_lines.append(line)
+            return
+        if self._state == 'en':
+            return
+
+        if _STREAM_CS_RE.match(line):
+            self._flush_cards()
+            self._state = 'cs'
+            return
+        cards = _STREAM_CARDS_RE.match(line)
+        field = _STREAM_FIELD_RE.match(line)
+        if cards or field or _STREAM_EN_RE.match(line):
+            self._flush_cards()
+        if cards:
+            self._cards_lang = cards.group(1)
+            self._cards_lines = [line]
+        elif self._cards_lang:
+            self._cards_lines.append(line)
+        elif field:
+            label, lang, value = field.groups()
+            key = _STREAM_FIELD_KEYS.get((label, lang))
+            if key is None:
+                return
+            value = value.strip()
+            if label != 'TITULEK':
+                value = value.strip('"\'').strip('*')
+            if label == 'KEYWORD':
+                value = value.lower()
+            self._emit(key, value)
+
+    def _emit_tool_field(self, name, value):
+        key = _TOOL_FIELD_KEYS.get(name)
+        if key is None:
+            return
+        if isinstance(value, str):
+            value = value.strip()
+            if name.startswith('keyword_'):
+                value = value.lower()
+        elif name.startswith('story_cards_'):
+            value = [card for card in value or [] if isinstance(card, dict) and card.get('body')] or None
+        self._emit(key, value)
+
+    def feed_snapshot(self, snapshot: Dict):
+        """
+        Zpracuje průběžně parsovaný input toolu (event input_json ze streamu).
+        Pole je hotové, jakmile za ním model začne psát další — poslední pole se dokončí v close().
+        """
+        if not isinstance(snapshot, dict):
+            return
+        self._snapshot = snapshot
+        names = list(snapshot)
+        for name in names[:-1]:
+            self._emit_tool_field(name, snapshot[name])
+
+    def feed(self, text: str):
+        """Přidá další kus textu ze streamu."""
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split('\n')
+        for line in lines:
+            self._line(line)
+
+    def close(self):
+        """Zpracuje zbytek bufferu (poslední řádek bez \\n) a uzavře otevřené sekce."""
+        if self._buffer:
+            self._line(self._buffer)
+            self._buffer = ''
+        self._flush_cards()
+        self._flush_cs()
+        for name, value in self._snapshot.items():
+            self._emit_tool_field(name, value)
+
+
+def _article_prompt(topic: Dict, source_texts: List[str], length: str = 'medium') -> str:
+    """Sestaví user prompt článku (proměnná data; statická pravidla jsou v ARTICLE_SYSTEM_PROMPT)."""
+    # Pripravi zdrojove texty (zhustene na vety relevantni k tematu)
+    if config.SOURCE_CONDENSE:
+        source_texts = source_condenser.condense_sources(source_texts, topic)
+    sources_combined = ""
+    for i, text in enumerate(source_texts, 1):
+        sources_combined += f"\n--- ZDROJ {i} ---\n{text}\n"
+
+    if length == 'short':
+        length_instruction = "Článek musí mít 600-800 slov (krátká analýza, 5-7 odstavců). MINIMUM je 600 slov — Rank Math pod tím hlásí 'zvažte použití alespoň 600 slov'. Pokud se blížíš ke spodní hranici, přidej další odstavec s kontextem nebo srovnáním."
+    elif length == 'long':
+        length_instruction = "Článek musí mít 1200-1800 slov (deep-dive, 12-18 odstavců, více h2 sekcí, silná analýza a kontext)"
+    else:
+        length_instruction = "Článek musí mít 700-1000 slov (střední analýza, 7-10 odstavců). MINIMUM je 600 slov kvůli Rank Math SEO skóre."
+
+    return f"""TÉMA: {topic.get('topic', '')}
+NAVRŽENÝ TITULEK: {topic.get('title', '')}
+ÚHEL POHLEDU: {topic.get('angle', '')}
+KONTEXT: {topic.get('context', '')}
+SEO KLÍČOVÁ SLOVA: {topic.get('seo_keywords', '')}
+DÉLKA ČLÁNKU: {length_instruction}
+
+ZDROJOVÉ TEXTY (použij JEN pro fakta, ne jako šablonu):
+{sources_combined}"""
+
+
+def _article_max_tokens(length: str) -> int:
+    return 8192 if length == 'long' else 4096
+
+
+def build_article_request(topic: Dict, source_texts: List[str], length: str = 'medium',
+                          structured: bool = None) -> Dict:
+    """
+    Vrátí parametry messages.create pro článek — stejný prompt jako write_article().
+    Používá se pro Message Batches API (claude_batch).
+    """
+    if structured is None:
+        structured = config.ARTICLE_STRUCTURED_OUTPUT
+    request = {
+        'model': config.ARTICLE_MODEL,
+        'max_tokens': _article_max_tokens(length),
+        'temperature': 0.7,
+        'system': cached_system(ARTICLE_TOOL_SYSTEM_PROMPT if structured else ARTICLE_SYSTEM_PROMPT),
+        'messages': [{'role': 'user', 'content': _article_prompt(topic, source_texts, length)}],
+    }
+    if structured:
+        request['tools'] = [ARTICLE_TOOL]
+        request['tool_choice'] = {'type': 'tool', 'name': ARTICLE_TOOL_NAME}
+    return request
+
+
+def write_article(topic: Dict, source_texts: List[str], length: str = 'medium',
+                  on_field: Callable[[str, object], None] = None, force: bool = False) -> Dict:
+    """
+    Vygeneruje clanek pomoci Claude API (streamovaně)
+
+    Výstup jde přes tool submit_article (ARTICLE_STRUCTURED_OUTPUT), nevalidní
+    výstup toolu se jednou zopakuje v textovém formátu.
+
+    Args:
+        topic: Slovnik s tematem (z parse_topics_from_report)
+        source_texts: Seznam plnych textu zdrojovych clanku
+        on_field: Callback (klíč, hodnota) pro pole hotová během streamu (viz ArticleStreamParser)
+        force: Ignorovat article cache a vygenerovat znovu
+
+    Returns:
+        {"cs": "<html>...", "en": "<html>...", "cached": bool, ...} nebo {"error": "..."}
+    """
+    cache_key = article_cache.make_key(topic, source_texts, length, ARTICLE_PROMPT_VERSION)
+    if not force:
+        cached = article_cache.get(cache_key)
+        if cached is not None:
+            log.info("♻️  Článek nalezen v cache (%s), přeskakuji volání API", cache_key[:12])
+            return {**cached, 'cost': "$0.0000", 'cached': True}
+
+    client = get_client()
+    prompt = _article_prompt(topic, source_texts, length)
+    max_tokens = _article_max_tokens(length)
+    parser = ArticleStreamParser(on_field)
+
+    try:
+        result = None
+        if config.ARTICLE_STRUCTURED_OUTPUT:
+            with llm_ledger.track('article_tool', config.ARTICLE_MODEL) as call:
+                message = _call_article_tool_api(client, max_tokens, prompt, stream_parser=parser)
+                call.set_usage(message.usage)
+            result = parse_article_response(message)
+            if 'error' in result:
+                log.warning("⚠️  Tool výstup článku nevalidní (%s), fallback na textový formát", result['error'])
+                result = None
+        if result is None:
+            with llm_ledger.track('article', config.ARTICLE_MODEL) as call:
+                message = _call_api(client, config.ARTICLE_MODEL, max_tokens, 0.7,
+                                    prompt, ARTICLE_SYSTEM_PROMPT, stream_parser=parser)
+                call.set_usage(message.usage)
+            result = parse_article_response(message)
     except Exception as e:
         return {'error': str(e)}
+    if 'error' in result:
+        return result
+
+    article_cache.put(cache_key, result)
+    result['cached'] = False
+    if parser.time_to_first_field is not None:
+        result['time_to_first_field'] = round(parser.time_to_first_field, 2)
+        log.info("⚡ První pole po %.1f s (%s), CZ sekce po %s",
+                 parser.time_to_first_field,
+                 min(parser.timings, key=parser.timings.get),
+                 f"{parser.timings['cs']:.1f} s" if 'cs' in parser.timings else '—')
+    if 'cs' in parser.timings:
+        result['time_to_cs'] = round(parser.timings['cs'], 2)
+    return result
 
 
-def generate_podcast_script(article_html: str, lang: str = 'cs') -> Dict:
+def parse_article_response(message, batch: bool = False) -> Dict:
     """
-    Vygeneruje podcast script ze clanku (styl NotebookLM - 2 moderatori)
+    Zpracuje odpověď Claude na článek (titulky, meta, story cards, CZ/EN HTML).
 
     Args:
-        article_html: HTML obsah clanku
-        lang: 'cs' pro cestinu, 'en' pro anglictinu
+        message: anthropic Message (přímé volání i výsledek z Message Batches)
+        batch: True = výsledek z Batches API (poloviční cena)
 
     Returns:
-        {"script": "...", "tokens_in": ..., "tokens_out": ..., "cost": "..."} nebo {"error": "..."}
+        Stejný dict jako write_article()
     """
-    client = anthropic.Anthropic(api_key=config.CLAUDE_API_KEY)
+    tool_input = _find_tool_input(message, ARTICLE_TOOL_NAME)
+    if tool_input is not None:
+        return parse_article_tool_response(tool_input, message, batch)
+
+    result_text = message.content[0].text
+
+    # Extrahuj titulky, klíčová slova a meta CZ/EN
+    corrected_title = None
+    en_title = None
+    meta_cs = None
+    meta_en = None
+    keyword_cs = None
+    keyword_en = None
+
+    title_cs_match = re.search(r'^\s*TITULEK\s*CZ:\s*(.+)$', result_text, re.MULTILINE)
+    title_en_match = re.search(r'^\s*TITULEK\s*EN:\s*(.+)$', result_text, re.MULTILINE)
+    meta_cs_match = re.search(r'^\s*META\s*CZ:\s*(.+)$', result_text, re.MULTILINE)
+    meta_en_match = re.search(r'^\s*META\s*EN:\s*(.+)$', result_text, re.MULTILINE)
+    keyword_cs_match = re.search(r'^\s*KEYWORD\s*CZ:\s*(.+)$', result_text, re.MULTILINE)
+    keyword_en_match = re.search(r'^\s*KEYWORD\s*EN:\s*(.+)$', result_text, re.MULTILINE)
+    story_cards_cs = _extract_story_cards(result_text, 'CZ')
+    story_cards_en = _extract_story_cards(result_text, 'EN')
+    # Fallback na starý formát
+    title_old_match = re.search(r'^\s*TITULEK:\s*(.+)$', result_text, re.MULTILINE)
+
+    if title_cs_match:
+        corrected_title = title_cs_match.group(1).strip()
+    elif title_old_match:
+        corrected_title = title_old_match.group(1).strip()
+
+    if title_en_match:
+        en_title = title_en_match.group(1).strip()
+
+    if meta_cs_match:
+        meta_cs = meta_cs_match.group(1).strip().strip('"\'').strip('*')
+    if meta_en_match:
+        meta_en = meta_en_match.group(1).strip().strip('"\'').strip('*')
+
+    if keyword_cs_match:
+        keyword_cs = keyword_cs_match.group(1).strip().strip('"\'').strip('*').lower()
+    if keyword_en_match:
+        keyword_en = keyword_en_match.group(1).strip().strip('"\'').strip('*').lower()
+
+    # Odstraň řádky s titulky, klíčovými slovy a meta popisy z textu, aby se nedostaly do HTML
+    result_text = re.sub(r'^\s*TITULEK\s*(?:CZ|EN)?:\s*.+$', '', result_text, flags=re.MULTILINE)
+    result_text = re.sub(r'^\s*META\s*(?:CZ|EN):\s*.+$', '', result_text, flags=re.MULTILINE)
+    result_text = re.sub(r'^\s*KEYWORD\s*(?:CZ|EN)?:\s*.+$', '', result_text, flags=re.MULTILINE)
+    # STORY_CARDS může být víceřádkový JSON, mažeme od labelu po uzavírací ]
+    result_text = re.sub(r'^\s*STORY_CARDS\s*(?:CZ|EN):\s*\[[\s\S]*?\]\s*$', '', result_text, flags=re.MULTILINE)
+    result_text = result_text.strip()
+
+    # Parsuj CZ a EN casti
+    cs_match = re.search(r'===\s*ČESKY\s*===\s*([\s\S]*?)(?====\s*ENGLISH\s*===|$)', result_text)
+    en_match = re.search(r'===\s*ENGLISH\s*===\s*([\s\S]*?)$', result_text)
+
+    if cs_match:
+        cs_html = cs_match.group(1).strip()
+    elif en_match:
+        cs_html = result_text[:en_match.start()].strip()
+    else:
+        cs_html = result_text
+    en_html = en_match.group(1).strip() if en_match else ''
+
+    # Markdown artefakty (Haiku je občas přidává), AI sekce zdrojů, oddělovače a úvodní citace
+    cs = html_pipeline.process(cs_html, html_pipeline.GENERATED_STAGES)
+    en = html_pipeline.process(en_html, html_pipeline.GENERATED_STAGES) if en_html else {'html': '', 'excerpt': ''}
+
+    return _article_result(message, batch, cs['html'], en['html'], {
+        'excerpt_cs': cs['excerpt'],
+        'excerpt_en': en['excerpt'],
+        'corrected_title': corrected_title,
+        'en_title': en_title,
+        'meta_description_cs': meta_cs,
+        'meta_description_en': meta_en,
+        'focus_keyword_cs': keyword_cs,
+        'focus_keyword_en': keyword_en,
+        'story_cards_cs': story_cards_cs,
+        'story_cards_en': story_cards_en,
+    })
+
+
+def _article_result(message, batch: bool, cs_html: str, en_html: str, fields: Dict) -> Dict:
+    """Sestaví výsledek write_article (HTML, volitelná pole, tokeny a cena)."""
+    # Odhad ceny včetně prompt cache (cache read = 0.1× input)
+    total_cost = estimate_cost(message.usage, batch=batch, model=config.ARTICLE_MODEL)
+    usage = usage_stats(message.usage)
+    log.info("Prompt cache: read %d, write %d tokenů", usage['cache_read_tokens'], usage['cache_write_tokens'])
+
+    result = {
+        'cs': cs_html,
+        'en': en_html,
+        'tokens_in': message.usage.input_tokens,
+        'tokens_out': message.usage.output_tokens,
+        'cache_read_tokens': usage['cache_read_tokens'],
+        'cache_write_tokens': usage['cache_write_tokens'],
+        'cost': f"${total_cost:.4f}"
+    }
+    for key, value in fields.items():
+        if value:
+            result[key] = value
+    if result.get('story_cards_cs'):
+        log.info("STORY_CARDS CZ: %d karet", len(result['story_cards_cs']))
+    if result.get('story_cards_en'):
+        log.info("STORY_CARDS EN: %d karet", len(result['story_cards_en']))
+    return result
+
 
+def _find_tool_input(message, name: str) -> Optional[Dict]:
+    """Vrátí input tool_use bloku daného jména (None = odpověď je text)."""
+    for block in message.content:
+        if getattr(block, 'type', None) == 'tool_use' and block.name == name:
+            return block.input
+    return None
+
+
+def _story_cards_from_model(cards) -> Optional[List[Dict]]:
+    """Převede validované StoryCard na list dictů (stejné limity jako _extract_story_cards)."""
+    result = [{'heading': c.heading.strip()[:60], 'body': c.body.strip()[:200]} for c in cards if c.body.strip()]
+    return result[:5] or None
+
+
+def parse_article_tool_response(data: Dict, message, batch: bool = False) -> Dict:
+    """
+    Zpracuje strukturovaný výstup (tool submit_article) validovaný přes ArticleOutput.
+    Pole jsou oddělená schématem, regexy ani čištění markdownu nejsou potřeba.
+
+    Returns:
+        Stejný dict jako write_article(), při nevalidním výstupu {"error": "..."}
+    """
+    try:
+        output = ArticleOutput.model_validate(data)
+    except ValidationError as e:
+        log.warning("⚠️  Pydantic validace článku selhala: %s", e.errors()[:3])
+        return {'error': f"invalid_tool_output: {e.error_count()} chyb"}
+
+    cs = html_pipeline.process(output.cs_html.strip(), html_pipeline.TOOL_STAGES)
+    en_html = output.en_html.strip()
+    en = html_pipeline.process(en_html, html_pipeline.TOOL_STAGES) if en_html else {'html': '', 'excerpt': ''}
+
+    return _article_result(message, batch, cs['html'], en['html'], {
+        'excerpt_cs': cs['excerpt'],
+        'excerpt_en': en['excerpt'],
+        'corrected_title': output.title_cs.strip(),
+        'en_title': output.title_en.strip(),
+        'meta_description_cs': output.meta_cs.strip(),
+        'meta_description_en': output.meta_en.strip(),
+        'focus_keyword_cs': output.keyword_cs.strip().lower(),
+        'focus_keyword_en': output.keyword_en.strip().lower(),
+        'story_cards_cs': _story_cards_from_model(output.story_cards_cs),
+        'story_cards_en': _story_cards_from_model(output.story_cards_en),
+    })
+
+
+def _podcast_prompt(article_html: str, lang: str = 'cs') -> str:
+    """Sestaví prompt pro podcast script (CZ nebo EN)."""
     # Odstran HTML tagy pro citelnejsi vstup
     from bs4 import BeautifulSoup
     soup = BeautifulSoup(article_html, 'html.parser')
     article_text = soup.get_text(separator='\n', strip=True)
 
     if lang == 'cs':
-        prompt = f"""Vytvoř podcast script ze následujícího článku. Formát: konverzace dvou moderátorů (ALEX a MAYA).
+        return f"""Vytvoř podcast script ze následujícího článku. Formát: konverzace dvou moderátorů (ALEX a MAYA).
 
 ČLÁNEK:
 {article_text}
@@ -649,8 +1032,7 @@ ALEX: [text]
 
 Začni přímo scriptem, bez úvodu."""
 
-    else:
-        prompt = f"""Create a podcast script from the following article. Format: conversation between two hosts (ALEX and MAYA).
+    return f"""Create a podcast script from the following article. Format: conversation between two hosts (ALEX and MAYA).
 
 ARTICLE:
 {article_text}
@@ -675,22 +1057,60 @@ ALEX: [text]
 
 Start directly with the script, no preamble."""
 
-    try:
-        message = _call_api(client, config.ARTICLE_MODEL, 4000, 0.8, prompt)
 
-        script = message.content[0].text.strip()
+def build_podcast_request(article_html: str, lang: str = 'cs') -> Dict:
+    """Vrátí parametry messages.create pro podcast script (pro Message Batches API)."""
+    return {
+        'model': config.ARTICLE_MODEL,
+        'max_tokens': 4000,
+        'temperature': 0.8,
+        'messages': [{'role': 'user', 'content': _podcast_prompt(article_html, lang)}],
+    }
+
 
-        # Odhad ceny (Claude Sonnet 4 pricing: $3.00/MTok input, $15.00/MTok output)
-        cost_input = (message.usage.input_tokens / 1_000_000) * 3.00
-        cost_output = (message.usage.output_tokens / 1_000_000) * 15.00
-        total_cost = cost_input + cost_output
+def generate_podcast_script(article_html: str, lang: str = 'cs', force: bool = False) -> Dict:
+    """
+    Vygeneruje podcast script ze clanku (styl NotebookLM - 2 moderatori)
 
-        return {
-            'script': script,
-            'tokens_in': message.usage.input_tokens,
-            'tokens_out': message.usage.output_tokens,
-            'cost': f"${total_cost:.4f}"
-        }
+    Výsledek se ukládá do podcast cache pod hashem promptu (= obsahu článku),
+    opakovaný požadavek na stejný článek nic nestojí.
+
+    Args:
+        article_html: HTML obsah clanku
+        lang: 'cs' pro cestinu, 'en' pro anglictinu
+        force: Ignorovat cache a vygenerovat znovu
 
+    Returns:
+        {"script": "...", "tokens_in": ..., "tokens_out": ..., "cost": "...", "cached": bool} nebo {"error": "..."}
+    """
+    prompt = _podcast_prompt(article_html, lang)
+    cache_key = podcast_cache.make_key(prompt)
+    if not force:
+        cached = podcast_cache.get(cache_key)
+        if cached is not None:
+            log.info("♻️  Podcast script (%s) nalezen v cache (%s)", lang, cache_key[:12])
+            return {**cached, 'cost': "$0.0000", 'cached': True}
+
+    client = get_client()
+    try:
+        with llm_ledger.track('podcast', config.ARTICLE_MODEL) as call:
+            message = _call_api(client, config.ARTICLE_MODEL, 4000, 0.8, prompt)
+            call.set_usage(message.usage)
+        result = parse_podcast_response(message)
     except Exception as e:
         return {'error': str(e)}
+    podcast_cache.put(cache_key, result)
+    return {**result, 'cached': False}
+
+
+def parse_podcast_response(message, batch: bool = False) -> Dict:
+    """Zpracuje odpověď Claude na podcast script (batch=True → cena z Batches API)."""
+    script = message.content[0].text.strip()
+    total_cost = estimate_cost(message.usage, batch=batch, model=config.ARTICLE_MODEL)
+
+    return {
+        'script': script,
+        'tokens_in': message.usage.input_tokens,
+        'tokens_out': message.usage.output_tokens,
+        'cost': f"${total_cost:.4f}"
+    }
@@ -2,14 +2,17 @@
 Auto Publish Pipeline
 Automaticky stahne RSS, analyzuje, napise clanky a publikuje na GAMEfo.cz
 Spousteno 5x denne pres launchd (8:00, 11:00, 14:00, 17:00, 20:00)
+Odlozena opakovani analyzy spousti `--run-due` (launchd po par minutach)
 """
 
+import argparse
 import json
 import os
 import re
 import sys
-import time
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Zajisti spravny working directory (dulezite pro launchd)
@@ -17,333 +20,306 @@ os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
 import config
 import rss_scraper
+import article_packer
 import claude_analyzer
+import claude_batch
 import article_writer
 import article_history
+import html_pipeline
 import file_manager
 import wp_publisher
 import publish_log
 import youtube_embed
-import section_images
+import media_prefetch
+import source_scraper
 import social_poster
 import topic_dedup
+import topic_pool
+import text_normalize
 import internal_linking
+import llm_ledger
+import run_checkpoint
+import retry_jobs
 from logger import setup_logger
 from fb_generator.generate_fb_post import generate_fb_post
 
 log = setup_logger('auto_publish')
 
-
-def search_rawg_image(game_name):
-    """Vyhleda obrazek hry na RAWG.io. Vraci URL nebo None."""
-    if not config.RAWG_API_KEY:
-        return None
-
-    try:
-        resp = requests.get(
-            'https://api.rawg.io/api/games',
-            params={'key': config.RAWG_API_KEY, 'search': game_name, 'page_size': 1},
-            timeout=10,
-        )
-        if resp.status_code != 200:
-            return None
-
-        results = resp.json().get('results', [])
-        if results and results[0].get('background_image'):
-            return results[0]['background_image']
-    except Exception as e:
-        log.warning("RAWG search error for '%s': %s", game_name, e)
-
-    return None
+# Sociální sítě hlídají sloty a denní limit — souběžná témata postují po jednom
+_social_lock = threading.Lock()
 
 
 def _extract_excerpt(html_content, max_len=200):
     """Vyextrahuje první odstavec z HTML a ořízne na max délku."""
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
-    # Najdi první <p> s textem
-    for p in soup.find_all('p'):
-        text = p.get_text(strip=True)
-        if len(text) > 30:  # přeskoč krátké úvodní řádky
-            if len(text) > max_len:
-                # Ořízni na celé slovo
-                truncated = text[:max_len]
-                last_space = truncated.rfind(' ')
-                if last_space > max_len // 2:
-                    truncated = truncated[:last_space]
-                return truncated + '…'
-            return text
-    return ''
-
-
-def run():
-    """Hlavni pipeline: RSS -> analyza -> clanky -> publish."""
-    start_time = datetime.now()
-    log.info("=" * 60)
-    log.info("AUTO PUBLISH - %s", start_time.strftime('%d.%m.%Y %H:%M'))
-    log.info("=" * 60)
-
-    # 1. Validace
-    if not config.validate_config():
-        log.error("Chybi konfigurace (CLAUDE_API_KEY)")
-        return
+    return html_pipeline.excerpt(html_content, max_len=max_len)
 
-    if not config.is_wp_configured():
-        log.error("WordPress neni nakonfigurovan (WP_URL, WP_USER, WP_APP_PASSWORD)")
-        return
 
-    # 2. Vytvoreni output slozky
-    run_dir = file_manager.create_run_directory()
-    log.info("Output: %s", run_dir)
-
-    # 3. Nacteni historie a stahnuti novych clanku
-    history = article_history.load_history()
-    processed_urls = article_history.get_processed_urls(history)
-
-    articles = rss_scraper.scrape_all_feeds(skip_urls=processed_urls)
-    if not articles:
-        log.info("Zadne nove clanky k analyze. Koncim.")
-        return
-
-    log.info("Stazeno %d novych clanku", len(articles))
-
-    # 4. Ulozeni clanku
-    rss_scraper.save_articles_to_json(articles, run_dir)
-
-    # 5. Claude analyza -> TOP 2 temata (strukturovaný výstup s fallbackem)
-    #    Retry: pokud API vrátí 529 (Overloaded), čekáme 30 min a zkusíme znovu (max 3 pokusy)
-    articles_text = rss_scraper.format_articles_for_analysis(articles)
+def _saved_batch_id(run_dir, custom_ids):
+    """ID dávky z claude_batch.json přerušeného běhu, pokud obsahuje všechny požadované články."""
+    try:
+        with open(os.path.join(run_dir, 'claude_batch.json'), encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if set(custom_ids) <= set(saved.get('custom_ids', [])):
+        return saved.get('batch_id')
+    return None
 
-    MAX_ANALYSIS_RETRIES = 3
-    RETRY_WAIT_MINUTES = 30
-    analysis = None
-    topics = None
 
-    for attempt in range(1, MAX_ANALYSIS_RETRIES + 1):
-        structured = claude_analyzer.analyze_articles_structured(articles_text)
-        if structured:
-            analysis = structured["text"]
-            topics = structured["topics"]
-            log.info("Strukturovaná analýza: %d témat", len(topics))
-            break
-
-        log.info("Fallback na textovou analýzu + regex parsování")
-        analysis = claude_analyzer.analyze_gaming_articles(articles_text)
-        if analysis:
-            topics = article_writer.parse_topics_from_report(analysis)
-            break
-
-        # Obě metody selhaly — retry pokud nejsme na posledním pokusu
-        if attempt < MAX_ANALYSIS_RETRIES:
-            log.warning("⏳ Claude API nedostupná (pokus %d/%d). Čekám %d minut před dalším pokusem...",
-                        attempt, MAX_ANALYSIS_RETRIES, RETRY_WAIT_MINUTES)
-            time.sleep(RETRY_WAIT_MINUTES * 60)
+def _write_articles_batch(prepared, run_dir):
+    """
+    Vygeneruje články všech témat jednou dávkou (Message Batches API).
+
+    Při --resume naváže na dávku uloženou v claude_batch.json (nic se neplatí znovu);
+    expirovaná nebo nedostupná dávka skončí chybou a témata se dogenerují přímo.
+
+    Returns:
+        {index tématu: výsledek jako write_article()}; chybějící/chybné
+        výsledky mají klíč 'error' a volající je dogeneruje přímo
+    """
+    requests_by_id = {
+        f"topic-{item['index']}": article_writer.build_article_request(item['topic'], item['source_texts'])
+        for item in prepared
+    }
+
+    def save_batch_id(batch_id):
+        # ID dávky do run adresáře — výsledky lze dohledat i po pádu běhu
+        with open(os.path.join(run_dir, 'claude_batch.json'), 'w', encoding='utf-8') as f:
+            json.dump({'batch_id': batch_id, 'custom_ids': list(requests_by_id)}, f, indent=2)
+
+    log.info("Generuji %d clanku davkou (Message Batches API)...", len(requests_by_id))
+    results = claude_batch.run_batch(requests_by_id, on_submitted=save_batch_id, purpose='article_batch',
+                                     batch_id=_saved_batch_id(run_dir, requests_by_id))
+
+    articles = {}
+    for item in prepared:
+        i = item['index']
+        outcome = results[f"topic-{i}"]
+        if 'message' in outcome:
+            try:
+                articles[i] = article_writer.parse_article_response(outcome['message'], batch=True)
+            except Exception as e:
+                articles[i] = {'error': str(e)}
         else:
-            log.error("❌ Claude analýza selhala po %d pokusech. Končím.", MAX_ANALYSIS_RETRIES)
-            return
-
-    file_manager.save_report(analysis, claude_analyzer.extract_key_insights(articles), run_dir, articles)
-
-    if not topics:
-        log.error("Zadna temata k publikaci")
-        return
-
-    log.info("Nalezeno %d temat", len(topics))
+            articles[i] = {'error': outcome['error']}
+    return articles
+
+
+def _prepare_topic(i, total, topic, articles):
+    """
+    Stáhne zdroje tématu (s fallbackem na alternativní URL z RSS).
+
+    Returns:
+        (topic, source_texts, source_urls) nebo None, když žádný zdroj nejde stáhnout
+    """
+    topic_name = topic.get('topic', 'Neznámé')
+    virality = topic.get('virality_score', 0)
+
+    log.info("-" * 40)
+    log.info("TEMA %d/%d: %s (viralita: %d)", i, total, topic_name, virality)
+
+    # Stahnuti zdrojovych clanku (+ filtrování nefunkčních URL)
+    source_urls = topic.get('sources', [])
+    # Max 3 zdroje souběžně (sdílená session, deadline) — nedostupné nebudou v odkazech
+    scraped = source_scraper.scrape_sources(source_urls[:3])
+    source_texts = [text for _, text in scraped]
+    source_urls = [url for url, _ in scraped]
+
+    # Fallback: pokud všechny zdroje selhaly, zkus najít alternativní URL z RSS článků
+    if not source_texts:
+        log.warning("Všechny zdroje selhaly pro '%s', hledám alternativní URL z RSS...", topic_name)
+        # Normalizace bez diakritiky/koncovek/stopwords — "Gothicu" najde i "Gothic"
+        topic_keywords = text_normalize.normalize_set(topic_name)
+        fallback_urls = []
+        for art in articles:
+            art_words = text_normalize.normalize_set(f"{art.get('title', '')} {art.get('summary', '')}")
+            # Článek je relevantní pokud obsahuje alespoň 2 klíčová slova z názvu tématu
+            matches = len(topic_keywords & art_words)
+            if matches >= min(2, len(topic_keywords)) and art['link'] not in [u for u in source_urls]:
+                fallback_urls.append(art['link'])
+        if fallback_urls:
+            log.info("Nalezeno %d alternativních URL, zkouším stáhnout...", len(fallback_urls))
+            # Max 5 pokusů souběžně, stačí 2 úspěšné zdroje
+            for url, text in source_scraper.scrape_sources(fallback_urls[:5], want=2):
+                source_texts.append(text)
+                source_urls.append(url)
+                log.info("Fallback zdroj OK: %s", url[:80])
 
-    # 6. Deduplikace témat (kontrola proti publish_log)
-    topics, dup_topics = topic_dedup.filter_duplicate_topics(topics)
-    for dup in dup_topics:
+    if not source_texts:
+        log.warning("Zadne zdrojove texty pro '%s' (ani po fallbacku), preskakuji", topic_name)
         publish_log.log_decision({
             'action': 'skipped',
-            'reason': 'duplicate_topic',
-            'topic': dup.get('topic', ''),
-            'score': dup.get('virality_score', 0),
+            'reason': 'no_source_texts',
+            'topic': topic_name,
+            'score': virality,
         })
+        return None
+    return topic, source_texts, source_urls
+
+
+def _publish_topic(i, total, topic, source_texts, source_urls, media, article=None, run_id=None, state=None):
+    """
+    Vygeneruje článek tématu (pokud nepřišel z dávky), vyzvedne média z prefetche
+    (MediaPrefetch spuštěný po analýze) a publikuje CZ + EN.
+
+    Každý dokončený krok (článek, média, CZ/EN post) se uloží do checkpointu tématu;
+    při --resume se z `state` převezme a neopakuje (žádné duplicitní posty ani uploady).
+
+    Returns:
+        True pokud byl článek publikován
+    """
+    topic_name = topic.get('topic', 'Neznámé')
+    title = topic.get('title', topic_name)
+    virality = topic.get('virality_score', 0)
+    state = state or {}
+
+    def checkpoint(stage, **artifacts):
+        if run_id:
+            run_checkpoint.save_topic(run_id, i, stage, **artifacts)
+
+    log.info("-" * 40)
+    log.info("CLANEK %d/%d: %s", i, total, topic_name)
+
+    game_name_raw = topic.get('game_name', '')
+    game_name = media_prefetch.topic_game_name(topic)
+    video_query = f"{game_name} official trailer 2026"
+
+    # RAWG obrázek a tagy se hledají v prefetchi od konce analýzy, uploady od přípravy tématu.
+    # YouTube search startuje hned, jak stream dodá CZ sekci se zmínkou o videu.
+    media_pool = ThreadPoolExecutor(max_workers=1)
+    video_future = None
+
+    def on_article_field(key, value):
+        nonlocal video_future
+        if key == 'cs' and youtube_embed.has_video_reference(value, lang='cs'):
+            log.info("CZ sekce zmiňuje video, hledám YouTube předem: %s", video_query)
+            video_future = media_pool.submit(youtube_embed.search_youtube, video_query)
+
+    if 'article' in state:
+        log.info("Článek z checkpointu, negeneruji znovu")
+        article = state['article']
+    elif article is None or 'error' in article:
+        if article is not None:
+            log.warning("Dávka nevrátila článek (%s), generuji přímo", article['error'])
+        log.info("Generuji clanek...")
+        article = article_writer.write_article(topic, source_texts, on_field=on_article_field)
+        if 'error' not in article:
+            checkpoint('written', article=article)
+    media_pool.shutdown(wait=False)
+    if 'error' in article:
+        log.error("Chyba pri generovani: %s", article['error'])
+        publish_log.log_decision({
+            'action': 'skipped',
+            'reason': 'write_error',
+            'topic': topic_name,
+            'error': article['error'],
+        })
+        return False
 
-    if not topics:
-        log.info("Všechna témata jsou duplicitní. Končím.")
-        return
+    # Pouzij opraveny titulek pokud existuje
+    if article.get('corrected_title'):
+        title = article['corrected_title']
+        log.info("Titulek opraven na: %s", title)
 
-    log.info("Po deduplikaci: %d témat k publikaci", len(topics))
+    log.info("Clanek vygenerovan (%s)", article.get('cost', '?'))
 
-    # 7. Pro kazde tema: napsat clanek + publikovat
-    published_count = 0
-    for i, topic in enumerate(topics, 1):
-        topic_name = topic.get('topic', 'Neznámé')
-        title = topic.get('title', topic_name)
-        virality = topic.get('virality_score', 0)
-
-        log.info("-" * 40)
-        log.info("TEMA %d/%d: %s (viralita: %d)", i, len(topics), topic_name, virality)
-
-        # Stahnuti zdrojovych clanku (+ filtrování nefunkčních URL)
-        source_urls = topic.get('sources', [])
-        source_texts = []
-        valid_source_urls = []
-        for url in source_urls[:3]:  # max 3 zdroje
-            text = article_writer.scrape_full_article(url)
-            if not text.startswith('[Chyba'):
-                source_texts.append(text)
-                valid_source_urls.append(url)
-            else:
-                log.warning("Zdroj nedostupný, nebude v odkazech: %s", url[:80])
-        source_urls = valid_source_urls
-
-        # Fallback: pokud všechny zdroje selhaly, zkus najít alternativní URL z RSS článků
-        if not source_texts:
-            log.warning("Všechny zdroje selhaly pro '%s', hledám alternativní URL z RSS...", topic_name)
-            topic_keywords = set(topic_name.lower().split())
-            # Odfiltruj stopwords
-            topic_keywords -= {'a', 'the', 'of', 'in', 'for', 'on', 'to', 'is', '-', '–', 'and', 'pro', 'nový', 'nová', 'nové', 'že', 'se', 'na', 'je', 'z', 'do', 'od', 'při', 'za'}
-            fallback_urls = []
-            for art in articles:
-                art_text = f"{art.get('title', '')} {art.get('summary', '')}".lower()
-                # Článek je relevantní pokud obsahuje alespoň 2 klíčová slova z názvu tématu
-                matches = sum(1 for kw in topic_keywords if kw in art_text)
-                if matches >= min(2, len(topic_keywords)) and art['link'] not in [u for u in source_urls]:
-                    fallback_urls.append(art['link'])
-            if fallback_urls:
-                log.info("Nalezeno %d alternativních URL, zkouším stáhnout...", len(fallback_urls))
-                for url in fallback_urls[:5]:  # max 5 pokusů
-                    text = article_writer.scrape_full_article(url)
-                    if not text.startswith('[Chyba'):
-                        source_texts.append(text)
-                        source_urls.append(url)
-                        log.info("Fallback zdroj OK: %s", url[:80])
-                        if len(source_texts) >= 2:
-                            break
-                    else:
-                        log.warning("Fallback zdroj nedostupný: %s", url[:80])
-
-        if not source_texts:
-            log.warning("Zadne zdrojove texty pro '%s' (ani po fallbacku), preskakuji", topic_name)
-            publish_log.log_decision({
-                'action': 'skipped',
-                'reason': 'no_source_texts',
-                'topic': topic_name,
-                'score': virality,
-            })
-            continue
+    # YouTube embed (pokud kterakoliv verze zminuje video/trailer)
+    # Video se hleda jednou a vlozi do obou verzi — CZ ctenari umi anglicky
+    cs_has_video = youtube_embed.has_video_reference(article['cs'], lang='cs')
+    en_has_video = article.get('en') and youtube_embed.has_video_reference(article['en'], lang='en')
 
-        # Generovani clanku (CZ + EN)
-        log.info("Generuji clanek...")
-        article = article_writer.write_article(topic, source_texts)
-        if 'error' in article:
-            log.error("Chyba pri generovani: %s", article['error'])
-            publish_log.log_decision({
-                'action': 'skipped',
-                'reason': 'write_error',
-                'topic': topic_name,
-                'error': article['error'],
-            })
-            continue
-
-        # Pouzij opraveny titulek pokud existuje
-        if article.get('corrected_title'):
-            title = article['corrected_title']
-            log.info("Titulek opraven na: %s", title)
-
-        log.info("Clanek vygenerovan (%s)", article.get('cost', '?'))
-
-        # YouTube embed (pokud kterakoliv verze zminuje video/trailer)
-        # Video se hleda jednou a vlozi do obou verzi — CZ ctenari umi anglicky
-        game_name_raw = topic.get('game_name', '')
-        game_name = game_name_raw if (game_name_raw and game_name_raw != 'N/A') else topic_name
-
-        cs_has_video = youtube_embed.has_video_reference(article['cs'], lang='cs')
-        en_has_video = article.get('en') and youtube_embed.has_video_reference(article['en'], lang='en')
-
-        if cs_has_video or en_has_video:
-            query = f"{game_name} official trailer 2026"
-            log.info("Hledám YouTube video: %s", query)
-            videos = youtube_embed.search_youtube(query)
-            if videos:
-                video = videos[0]
-                log.info("Nalezeno video: %s (%s)", video['title'], video['url'])
-                video_id = video['id']
-                # Vloz do CS — bud normalne (ma keyword) nebo force (EN trigger)
-                if cs_has_video:
-                    article['cs'] = youtube_embed.embed_youtube_in_html(article['cs'], game_name, lang='cs')
-                else:
-                    log.info("CS článek nemá video keyword, vkládám embed z EN detekce")
-                    article['cs'] = youtube_embed.force_embed_youtube(article['cs'], video_id, lang='cs')
-                # Vloz do EN
-                if article.get('en'):
-                    if en_has_video:
-                        article['en'] = youtube_embed.embed_youtube_in_html(article['en'], game_name, lang='en')
-                    else:
-                        log.info("EN článek nemá video keyword, vkládám embed z CS detekce")
-                        article['en'] = youtube_embed.force_embed_youtube(article['en'], video_id, lang='en')
-            else:
-                log.warning("YouTube video nenalezeno pro: %s", query)
+    if cs_has_video or en_has_video:
+        if video_future is not None:
+            videos = video_future.result()
         else:
-            log.info("Žádná zmínka o videu v článku, přeskakuji YouTube embed")
-
-        # Rychlý test dostupnosti WP před jakýmkoliv odesíláním
-        if not wp_publisher.check_wp_available():
-            log.error("WP nedostupný — přeskakuji článek '%s' (prevence Fail2Ban)", topic_name)
-            publish_log.log_decision({
-                'action': 'skipped',
-                'reason': 'wp_unavailable',
-                'topic': topic_name,
-            })
-            continue
+            log.info("Hledám YouTube video: %s", video_query)
+            videos = youtube_embed.search_youtube(video_query)
+        if videos:
+            video = videos[0]
+            log.info("Nalezeno video: %s (%s)", video['title'], video['url'])
+            video_id = video['id']
+            # Vloz do obou verzi — video uz je nalezene, dalsi search neni potreba
+            if not cs_has_video:
+                log.info("CS článek nemá video keyword, vkládám embed z EN detekce")
+            article['cs'] = youtube_embed.force_embed_youtube(article['cs'], video_id, lang='cs')
+            if article.get('en'):
+                if not en_has_video:
+                    log.info("EN článek nemá video keyword, vkládám embed z CS detekce")
+                article['en'] = youtube_embed.force_embed_youtube(article['en'], video_id, lang='en')
+        else:
+            log.warning("YouTube video nenalezeno pro: %s", video_query)
+    else:
+        log.info("Žádná zmínka o videu v článku, přeskakuji YouTube embed")
 
+    # Rychlý test dostupnosti WP před jakýmkoliv odesíláním
+    if not wp_publisher.check_wp_available():
+        log.error("WP nedostupný — přeskakuji článek '%s' (prevence Fail2Ban)", topic_name)
+        publish_log.log_decision({
+            'action': 'skipped',
+            'reason': 'wp_unavailable',
+            'topic': topic_name,
+        })
+        return False
+
+    # SEO keywords jako tagy (existující tagy už dohledal prefetch)
+    tag_names = media_prefetch.topic_tag_names(topic)
+
+    if 'media' in state:
+        # Média už jsou uploadnutá z přerušeného běhu
+        image_url = state['media']['image_url']
+        featured_image_id = state['media']['featured_image_id']
+        section_images_meta = state['media']['section_images']
+    else:
+        if media is None:
+            media = media_prefetch.MediaPrefetch(topic)
         # RAWG screenshoty → WP meta pro Story Mode v appce (ne inline v HTML)
-        # Nejdřív hledá existující ve WP, fallback na RAWG API + upload
-        section_images_meta = section_images.get_or_fetch_screenshots(game_name)
-
-        # Hledani featured image pres RAWG (pouzij cisty nazev hry)
-        featured_image_id = None
-        image_url = search_rawg_image(game_name)
-        if image_url:
-            log.info("RAWG image nalezen, uploaduji...")
-            media_id, _, err = wp_publisher.upload_media(image_url, title=title)
-            if media_id:
-                featured_image_id = media_id
-                log.info("Featured image uploaded (ID: %d)", media_id)
-            else:
-                log.warning("Upload image selhal: %s", err)
-
-        # SEO keywords jako tagy
-        seo_keywords = topic.get('seo_keywords', '')
-        tag_names = [kw.strip() for kw in seo_keywords.split(',') if kw.strip()] if seo_keywords else None
-
-        # Status tag z Claude analýzy (dynamický místo hardcoded 'news')
-        valid_status_tags = {'news', 'update', 'leak', 'critical', 'success', 'indie', 'review', 'trailer', 'rumor', 'info', 'finance', 'tema', 'preview'}
-        raw_status_tag = topic.get('status_tag', 'news').lower().strip()
-        status_tag = raw_status_tag if raw_status_tag in valid_status_tags else 'news'
-        log.info("Status tag: '%s'", status_tag)
-
-        # Informace o zdroji pro WP meta pole
-        source_info = '\n'.join(source_urls) if source_urls else None
-
-        # Rank Math focus keyword — krátké 1-2 slova (přesná shoda v titulku zvedá score)
-        focus_kw = article.get('focus_keyword_cs')
-        if focus_kw and len(focus_kw.split()) > 2:
-            log.info("AI vrátilo dlouhý keyword '%s' (%d slov) → fallback na game_name", focus_kw, len(focus_kw.split()))
-            focus_kw = None
+        # Nejdřív hledá existující ve WP, fallback na RAWG API + upload (prefetch)
+        section_images_meta = media.section_images()
+
+        # Featured image přes RAWG (čistý název hry), uploadnutý v prefetchi
+        image_url, featured_image_id = media.featured_image()
+        media.tags()
+        checkpoint('media', media={'image_url': image_url, 'featured_image_id': featured_image_id,
+                                   'section_images': section_images_meta})
+
+    # Status tag z Claude analýzy (dynamický místo hardcoded 'news')
+    valid_status_tags = {'news', 'update', 'leak', 'critical', 'success', 'indie', 'review', 'trailer', 'rumor', 'info', 'finance', 'tema', 'preview'}
+    raw_status_tag = topic.get('status_tag', 'news').lower().strip()
+    status_tag = raw_status_tag if raw_status_tag in valid_status_tags else 'news'
+    log.info("Status tag: '%s'", status_tag)
+
+    # Informace o zdroji pro WP meta pole
+    source_info = '\n'.join(source_urls) if source_urls else None
+
+    # Rank Math focus keyword — krátké 1-2 slova (přesná shoda v titulku zvedá score)
+    focus_kw = article.get('focus_keyword_cs')
+    if focus_kw and len(focus_kw.split()) > 2:
+        log.info("AI vrátilo dlouhý keyword '%s' (%d slov) → fallback na game_name", focus_kw, len(focus_kw.split()))
+        focus_kw = None
+    if focus_kw:
+        log.info("Focus keyword (AI): '%s'", focus_kw)
+    else:
+        focus_kw = game_name if game_name and game_name != 'N/A' else None
         if focus_kw:
-            log.info("Focus keyword (AI): '%s'", focus_kw)
-        else:
-            focus_kw = game_name if game_name and game_name != 'N/A' else None
-            if focus_kw:
-                focus_kw = re.sub(r'\s+(\d+|[IVXLCDM]+)$', '', focus_kw).strip()
-                if focus_kw.lower() not in title.lower():
-                    log.info("Fallback focus keyword '%s' není v CZ titulku, přeskakuji", focus_kw)
-                    focus_kw = None
-                else:
-                    log.info("Focus keyword (fallback game_name): '%s'", focus_kw)
-
-        # Publikace CZ verze
+            focus_kw = re.sub(r'\s+(\d+|[IVXLCDM]+)$', '', focus_kw).strip()
+            if focus_kw.lower() not in title.lower():
+                log.info("Fallback focus keyword '%s' není v CZ titulku, přeskakuji", focus_kw)
+                focus_kw = None
+            else:
+                log.info("Focus keyword (fallback game_name): '%s'", focus_kw)
+
+    story_cards_cs_json = json.dumps(article['story_cards_cs'], ensure_ascii=False) if article.get('story_cards_cs') else None
+    story_cards_en_json = json.dumps(article['story_cards_en'], ensure_ascii=False) if article.get('story_cards_en') else None
+
+    # Publikace CZ verze
+    if 'cs_result' in state:
+        cs_result = state['cs_result']
+        log.info("CZ už publikován v přerušeném běhu: %s", cs_result['view_url'])
+    else:
         log.info("Publikuji CZ verzi...")
         cs_content = wp_publisher.strip_first_heading(article['cs'])
         if tag_names:
             cs_content = internal_linking.enrich_with_internal_links(cs_content, tag_names, lang='cs')
-
-        story_cards_cs_json = json.dumps(article['story_cards_cs'], ensure_ascii=False) if article.get('story_cards_cs') else None
-        story_cards_en_json = json.dumps(article['story_cards_en'], ensure_ascii=False) if article.get('story_cards_en') else None
-
         cs_result, cs_err = wp_publisher.create_draft(
             title=title,
             content=cs_content,
@@ -368,131 +344,136 @@ def run():
                 'topic': topic_name,
                 'error': cs_err,
             })
-            continue
+            return False
 
         log.info("CZ publikovan: %s", cs_result['view_url'])
-
-        # Publikace EN verze
-        en_result = None
-        en_title = None
-        if article.get('en'):
-            # Anglicky titulek z article_writer
-            en_title = article.get('en_title')
-            if not en_title:
-                en_title = topic.get('topic', title)
-                log.warning("EN titulek chybí v article_writer výstupu, fallback na CZ: %s", en_title)
-
-            log.info("Publikuji EN verzi...")
-            en_content = wp_publisher.strip_first_heading(article['en'])
-            if tag_names:
-                en_content = internal_linking.enrich_with_internal_links(en_content, tag_names, lang='en')
-            # Focus keyword pro EN — krátké 1-2 slova
-            en_focus_kw = article.get('focus_keyword_en')
-            if en_focus_kw and len(en_focus_kw.split()) > 2:
-                log.info("AI vrátilo dlouhý EN keyword '%s' (%d slov) → fallback na game_name", en_focus_kw, len(en_focus_kw.split()))
-                en_focus_kw = None
+        checkpoint('cs_published', cs_result=cs_result)
+
+    # Publikace EN verze
+    en_result = state.get('en_result')
+    en_title = state.get('en_title')
+    if en_result:
+        log.info("EN už publikován v přerušeném běhu: %s", en_result['view_url'])
+    elif article.get('en'):
+        # Anglicky titulek z article_writer
+        en_title = article.get('en_title')
+        if not en_title:
+            en_title = topic.get('topic', title)
+            log.warning("EN titulek chybí v article_writer výstupu, fallback na CZ: %s", en_title)
+
+        log.info("Publikuji EN verzi...")
+        en_content = wp_publisher.strip_first_heading(article['en'])
+        if tag_names:
+            en_content = internal_linking.enrich_with_internal_links(en_content, tag_names, lang='en')
+        # Focus keyword pro EN — krátké 1-2 slova
+        en_focus_kw = article.get('focus_keyword_en')
+        if en_focus_kw and len(en_focus_kw.split()) > 2:
+            log.info("AI vrátilo dlouhý EN keyword '%s' (%d slov) → fallback na game_name", en_focus_kw, len(en_focus_kw.split()))
+            en_focus_kw = None
+        if en_focus_kw:
+            log.info("EN focus keyword (AI): '%s'", en_focus_kw)
+        else:
+            en_focus_kw = game_name if game_name and game_name != 'N/A' else None
             if en_focus_kw:
-                log.info("EN focus keyword (AI): '%s'", en_focus_kw)
-            else:
-                en_focus_kw = game_name if game_name and game_name != 'N/A' else None
-                if en_focus_kw:
-                    en_focus_kw = re.sub(r'\s+(\d+|[IVXLCDM]+)$', '', en_focus_kw).strip()
-                if en_focus_kw and en_focus_kw.lower() not in en_title.lower():
-                    log.info("EN fallback focus keyword '%s' není v EN titulku, přeskakuji", en_focus_kw)
-                    en_focus_kw = None
-            en_result, en_err = wp_publisher.create_draft(
-                title=en_title,
-                content=en_content,
-                category_ids=[12],  # News
-                tag_names=tag_names,
-                lang='en',
-                featured_image_id=featured_image_id,
-                status_tag=status_tag,
-                source_info=source_info,
-                status='publish',
-                focus_keyword=en_focus_kw,
-                section_images=section_images_meta,
-                meta_description=article.get('meta_description_en'),
-                story_cards=story_cards_en_json,
-            )
-
-            if en_err:
-                log.warning("EN publish selhal: %s", en_err)
-            else:
-                log.info("EN publikovan: %s", en_result['view_url'])
+                en_focus_kw = re.sub(r'\s+(\d+|[IVXLCDM]+)$', '', en_focus_kw).strip()
+            if en_focus_kw and en_focus_kw.lower() not in en_title.lower():
+                log.info("EN fallback focus keyword '%s' není v EN titulku, přeskakuji", en_focus_kw)
+                en_focus_kw = None
+        en_result, en_err = wp_publisher.create_draft(
+            title=en_title,
+            content=en_content,
+            category_ids=[12],  # News
+            tag_names=tag_names,
+            lang='en',
+            featured_image_id=featured_image_id,
+            status_tag=status_tag,
+            source_info=source_info,
+            status='publish',
+            focus_keyword=en_focus_kw,
+            section_images=section_images_meta,
+            meta_description=article.get('meta_description_en'),
+            story_cards=story_cards_en_json,
+        )
 
-                # Propojeni CZ <-> EN pres Polylang
-                link_ok, link_err = wp_publisher.link_translations(cs_result['id'], en_result['id'])
-                if link_ok:
-                    log.info("CZ/EN propojeni OK")
-                else:
-                    log.warning("Propojeni selhalo: %s", link_err)
+        if en_err:
+            log.warning("EN publish selhal: %s", en_err)
+        else:
+            log.info("EN publikovan: %s", en_result['view_url'])
+            checkpoint('en_published', en_result=en_result, en_title=en_title)
 
-        # Generovani FB post obrazku (CZ + EN)
-        if image_url:
-            try:
-                # Stahni thumbnail lokalne
-                local_thumb = f"/tmp/fb_thumb_{datetime.now().strftime('%H%M%S')}.jpg"
-                thumb_resp = requests.get(image_url, timeout=15)
-                with open(local_thumb, 'wb') as f:
-                    f.write(thumb_resp.content)
-
-                safe_name = "".join(c if c.isalnum() or c in '-_ ' else '' for c in game_name).strip().replace(' ', '_')
-                date_str = datetime.now().strftime('%Y-%m-%d')
-
-                # CZ verze
-                fb_output_cs = os.path.join(os.path.dirname(__file__), 'output', 'fb-posts', f'{date_str}_{safe_name}_CZ.png')
-                fb_path_cs = generate_fb_post(
-                    thumbnail_path=local_thumb,
-                    title=game_name,
-                    subtitle=title,
-                    output_path=fb_output_cs,
-                )
-                log.info("FB post obrazek CZ vygenerovan: %s", fb_path_cs)
-
-                # EN verze (pokud existuje anglicky clanek)
-                if article.get('en') and en_title:
-                    fb_output_en = os.path.join(os.path.dirname(__file__), 'output', 'fb-posts', f'{date_str}_{safe_name}_EN.png')
-                    # Pro EN obrázek: title = anglický název hry (z analyzeru), ne český topic
-                    en_fb_title = game_name_raw if (game_name_raw and game_name_raw != 'N/A') else ''
-                    fb_path_en = generate_fb_post(
-                        thumbnail_path=local_thumb,
-                        title=en_fb_title,
-                        subtitle=en_title,
-                        output_path=fb_output_en,
-                    )
-                    log.info("FB post obrazek EN vygenerovan: %s", fb_path_en)
-
-                # Cleanup temp souboru
-                if os.path.exists(local_thumb):
-                    os.remove(local_thumb)
-            except Exception as e:
-                log.warning("FB post generovani selhalo: %s", e)
+            # Propojeni CZ <-> EN pres Polylang
+            link_ok, link_err = wp_publisher.link_translations(cs_result['id'], en_result['id'])
+            if link_ok:
+                log.info("CZ/EN propojeni OK")
+            else:
+                log.warning("Propojeni selhalo: %s", link_err)
 
-        # Social media posting
-        social_results = {}
+    # Generovani FB post obrazku (CZ + EN)
+    if image_url:
         try:
-            excerpt = _extract_excerpt(article.get('cs', ''), max_len=200)
-            hashtags = [f"#{tag.strip().replace(' ', '')}" for tag in topic.get('seo_keywords', '').split(',') if tag.strip()]
-            hashtags.append("#GAMEfo")
+            # Stahni thumbnail lokalne
+            local_thumb = f"/tmp/fb_thumb_{datetime.now().strftime('%H%M%S')}_{i}.jpg"
+            thumb_resp = requests.get(image_url, timeout=15)
+            with open(local_thumb, 'wb') as f:
+                f.write(thumb_resp.content)
 
-            # CZ FB obrázek
             safe_name = "".join(c if c.isalnum() or c in '-_ ' else '' for c in game_name).strip().replace(' ', '_')
             date_str = datetime.now().strftime('%Y-%m-%d')
-            social_image_cs = None
-            social_image_en = None
-            if image_url:
-                candidate_cs = os.path.join(os.path.dirname(__file__), 'output', 'fb-posts', f'{date_str}_{safe_name}_CZ.png')
-                if os.path.exists(candidate_cs):
-                    social_image_cs = candidate_cs
-                candidate_en = os.path.join(os.path.dirname(__file__), 'output', 'fb-posts', f'{date_str}_{safe_name}_EN.png')
-                if os.path.exists(candidate_en):
-                    social_image_en = candidate_en
-
-            # EN data pro Facebook EN stránku (en_title vypočítán výše na ř. 312)
-            en_excerpt_social = _extract_excerpt(article.get('en', ''), max_len=200) if en_result else None
-            en_url_social = en_result['view_url'] if en_result else None
 
+            # CZ verze
+            fb_output_cs = os.path.join(os.path.dirname(__file__), 'output', 'fb-posts', f'{date_str}_{safe_name}_CZ.png')
+            fb_path_cs = generate_fb_post(
+                thumbnail_path=local_thumb,
+                title=game_name,
+                subtitle=title,
+                output_path=fb_output_cs,
+            )
+            log.info("FB post obrazek CZ vygenerovan: %s", fb_path_cs)
+
+            # EN verze (pokud existuje anglicky clanek)
+            if article.get('en') and en_title:
+                fb_output_en = os.path.join(os.path.dirname(__file__), 'output', 'fb-posts', f'{date_str}_{safe_name}_EN.png')
+                # Pro EN obrázek: title = anglický název hry (z analyzeru), ne český topic
+                en_fb_title = game_name_raw if (game_name_raw and game_name_raw != 'N/A') else ''
+                fb_path_en = generate_fb_post(
+                    thumbnail_path=local_thumb,
+                    title=en_fb_title,
+                    subtitle=en_title,
+                    output_path=fb_output_en,
+                )
+                log.info("FB post obrazek EN vygenerovan: %s", fb_path_en)
+
+            # Cleanup temp souboru
+            if os.path.exists(local_thumb):
+                os.remove(local_thumb)
+        except Exception as e:
+            log.warning("FB post generovani selhalo: %s", e)
+
+    # Social media posting
+    social_results = {}
+    try:
+        excerpt = article.get('excerpt_cs') or _extract_excerpt(article.get('cs', ''), max_len=200)
+        hashtags = [f"#{tag.strip().replace(' ', '')}" for tag in topic.get('seo_keywords', '').split(',') if tag.strip()]
+        hashtags.append("#GAMEfo")
+
+        # CZ FB obrázek
+        safe_name = "".join(c if c.isalnum() or c in '-_ ' else '' for c in game_name).strip().replace(' ', '_')
+        date_str = datetime.now().strftime('%Y-%m-%d')
+        social_image_cs = None
+        social_image_en = None
+        if image_url:
+            candidate_cs = os.path.join(os.path.dirname(__file__), 'output', 'fb-posts', f'{date_str}_{safe_name}_CZ.png')
+            if os.path.exists(candidate_cs):
+                social_image_cs = candidate_cs
+            candidate_en = os.path.join(os.path.dirname(__file__), 'output', 'fb-posts', f'{date_str}_{safe_name}_EN.png')
+            if os.path.exists(candidate_en):
+                social_image_en = candidate_en
+
+        # EN data pro Facebook EN stránku (en_title vypočítán výše na ř. 312)
+        en_excerpt_social = (article.get('excerpt_en') or _extract_excerpt(article.get('en', ''), max_len=200)) if en_result else None
+        en_url_social = en_result['view_url'] if en_result else None
+
+        with _social_lock:
             social_results = social_poster.post_to_all(
                 title=title,
                 excerpt=excerpt,
@@ -505,42 +486,304 @@ def run():
                 en_url=en_url_social,
                 image_url=image_url,
             )
-            log.info("Social posting: %s", social_results)
-        except Exception as e:
-            log.warning("Social posting selhalo: %s", e)
+        log.info("Social posting: %s", social_results)
+    except Exception as e:
+        log.warning("Social posting selhalo: %s", e)
+
+    # Log
+    publish_log.log_decision({
+        'action': 'published',
+        'topic': topic_name,
+        'title': title,
+        'score': virality,
+        'cs_post_id': cs_result['id'],
+        'en_post_id': en_result['id'] if en_result else None,
+        'cs_url': cs_result['view_url'],
+        'en_url': en_result['view_url'] if en_result else None,
+        'sources': source_urls,
+        'cost': article.get('cost', '?'),
+        'social': social_results,
+    })
+    checkpoint('published')
+
+    return True
+
+
+def _run_id_arg(value):
+    """Validace --resume: ID běhu je název run adresáře (bez lomítek a teček)."""
+    if not re.match(r'^[\w\-]+$', value):
+        raise argparse.ArgumentTypeError(f"Neplatné ID běhu: {value}")
+    return value
+
+
+def run(batch=None, tiered=None, resume=None):
+    """
+    Hlavni pipeline: RSS -> analyza -> clanky -> publish.
+
+    Args:
+        batch: True = články přes Message Batches API (None = config.AUTO_PUBLISH_BATCH)
+        tiered: True = dvoustupňová analýza s pre-rankingem (None = config.ANALYSIS_TIERED)
+        resume: ID přerušeného běhu — naváže od poslední dokončené fáze (run_checkpoint)
+    """
+    start_time = datetime.now()
+    log.info("=" * 60)
+    log.info("AUTO PUBLISH - %s", start_time.strftime('%d.%m.%Y %H:%M'))
+    log.info("=" * 60)
 
-        # Log
-        publish_log.log_decision({
-            'action': 'published',
-            'topic': topic_name,
-            'title': title,
-            'score': virality,
-            'cs_post_id': cs_result['id'],
-            'en_post_id': en_result['id'] if en_result else None,
-            'cs_url': cs_result['view_url'],
-            'en_url': en_result['view_url'] if en_result else None,
-            'sources': source_urls,
-            'cost': article.get('cost', '?'),
-            'social': social_results,
-        })
+    # 1. Validace
+    if not config.validate_config():
+        log.error("Chybi konfigurace (CLAUDE_API_KEY)")
+        return
+
+    if not config.is_wp_configured():
+        log.error("WordPress neni nakonfigurovan (WP_URL, WP_USER, WP_APP_PASSWORD)")
+        return
+
+    # 2. Vytvoreni output slozky (nebo navázání na přerušený běh)
+    if resume:
+        saved = run_checkpoint.load_run(resume)
+        if saved is None:
+            log.error("Checkpoint běhu %s neexistuje", resume)
+            return
+        if saved['status'] == 'done':
+            log.info("Běh %s je už dokončený, není na co navázat", resume)
+            return
+        run_id, run_dir = resume, saved['run_dir']
+        stage, done = saved['stage'], saved['artifacts']
+        log.info("♻️ Navazuji na běh %s (dokončená fáze: %s)", run_id, stage)
+    else:
+        run_dir = file_manager.create_run_directory()
+        run_id = os.path.basename(run_dir)
+        run_checkpoint.start_run(run_id, run_dir)
+        stage, done = 'started', {}
+    log.info("Output: %s", run_dir)
+    llm_ledger.set_run_id(run_id)
 
-        published_count += 1
+    # 3. Nacteni historie a stahnuti novych clanku
+    history = article_history.load_history()
+    processed_urls = article_history.get_processed_urls(history)
+
+    if run_checkpoint.stage_reached(stage, 'scraped'):
+        articles = done['articles']
+    else:
+        articles = rss_scraper.scrape_all_feeds(skip_urls=processed_urls)
+        if not articles:
+            log.info("Zadne nove clanky k analyze. Koncim.")
+            run_checkpoint.finish_run(run_id)
+            return
+
+        # 4. Ulozeni clanku
+        rss_scraper.save_articles_to_json(articles, run_dir)
+        run_checkpoint.save_run(run_id, 'scraped', articles=articles)
+
+    log.info("Stazeno %d novych clanku", len(articles))
+
+    # 5. Claude analyza -> TOP 2 temata (strukturovaný výstup s fallbackem)
+    #    Retry: pokud API nedostupná (529 Overloaded), běh naplánuje odložený pokus
+    #    (retry_jobs, ANALYSIS_RETRY_MINUTES) a hned skončí — bez blokujícího čekání
+    #    Token budget: do promptu jdou jen nejlepší články (čerstvost, váha zdroje, cluster)
+    #    Tiered: levný model nejdřív vybere nejslibnější témata, drahý analyzuje jen je
+    if run_checkpoint.stage_reached(stage, 'analyzed'):
+        analysis, topics = done['analysis'], done['topics']
+        analyzed_links = done.get('analyzed_links', [])
+        log.info("Analýza z checkpointu: %d témat", len(topics or []))
+    else:
+        use_tiered = config.ANALYSIS_TIERED if tiered is None else tiered
+        packed = article_packer.pack_articles(articles)
+        articles_text = packed['text']
+        attempt = done.get('analysis_attempts', 0) + 1
+
+        if use_tiered:
+            structured = claude_analyzer.analyze_articles_tiered(articles)
+        else:
+            structured = claude_analyzer.analyze_articles_structured(articles_text)
+        if structured:
+            analysis = structured["text"]
+            topics = structured["topics"]
+            log.info("Strukturovaná analýza: %d témat", len(topics))
+            analyzed = structured.get('included', packed['included'])
+        else:
+            log.info("Fallback na textovou analýzu + regex parsování")
+            analysis = claude_analyzer.analyze_gaming_articles(articles_text)
+            topics = article_writer.parse_topics_from_report(analysis) if analysis else None
+            analyzed = packed['included']
+
+        # Obě metody selhaly — odložený pokus nad uloženými články, pokud nejsme na posledním
+        if not analysis:
+            if attempt < config.ANALYSIS_MAX_ATTEMPTS:
+                run_checkpoint.save_run(run_id, 'scraped', analysis_attempts=attempt)
+                due_at = retry_jobs.schedule(run_id, 'analysis', config.ANALYSIS_RETRY_MINUTES,
+                                             options={'batch': batch, 'tiered': tiered})
+                log.warning("⏳ Claude API nedostupná (pokus %d/%d). Další pokus naplánován na %s, končím.",
+                            attempt, config.ANALYSIS_MAX_ATTEMPTS, due_at[:16].replace('T', ' '))
+            else:
+                log.error("❌ Claude analýza selhala po %d pokusech. Končím.", config.ANALYSIS_MAX_ATTEMPTS)
+                run_checkpoint.finish_run(run_id, complete=False)
+            return
+
+        file_manager.save_report(analysis, claude_analyzer.extract_key_insights(articles), run_dir, articles)
+        analyzed_links = [article.get('link') for article in analyzed]
+        run_checkpoint.save_run(run_id, 'analyzed', analysis=analysis, topics=topics, analyzed_links=analyzed_links)
+
+    if not topics:
+        log.error("Zadna temata k publikaci")
+        run_checkpoint.finish_run(run_id)
+        return
 
-    # 8. Aktualizace historie
-    history = article_history.mark_as_processed(articles, history)
+    log.info("Nalezeno %d temat", len(topics))
+
+    # 6. Deduplikace témat (kontrola proti publish_log)
+    #    Při resume se nepouští znovu — už publikovaná témata běhu by vyšla jako duplicitní
+    if run_checkpoint.stage_reached(stage, 'deduped'):
+        topics = done['deduped_topics']
+    else:
+        topics, dup_topics = topic_dedup.filter_duplicate_topics(topics)
+        for dup in dup_topics:
+            publish_log.log_decision({
+                'action': 'skipped',
+                'reason': 'duplicate_topic',
+                'topic': dup.get('topic', ''),
+                'score': dup.get('virality_score', 0),
+            })
+        run_checkpoint.save_run(run_id, 'deduped', deduped_topics=topics)
+
+    if not topics:
+        log.info("Všechna témata jsou duplicitní. Končím.")
+        run_checkpoint.finish_run(run_id)
+        return
+
+    log.info("Po deduplikaci: %d témat k publikaci", len(topics))
+
+    # Stav témat z přerušeného běhu — publikovaná a přeskočená se už nezpracovávají
+    topic_states = run_checkpoint.load_topics(run_id) if resume else {}
+    already_published = sum(1 for state in topic_states.values() if state['stage'] == 'published')
+    if already_published:
+        log.info("Z přerušeného běhu už publikováno: %d", already_published)
+
+    # 7. Pro kazde tema: stahnout zdroje
+    #    Témata souběžně (AUTO_PUBLISH_WORKERS), zdroje každého tématu také souběžně.
+    #    Média (RAWG obrázek, tagy) se hledají na pozadí už teď, upload do WP začne až
+    #    po stažení zdrojů tématu; publikace si je vyzvedne, přeskočené téma prefetch zruší
+    prefetches = {
+        i: media_prefetch.MediaPrefetch(topic)
+        for i, topic in enumerate(topics, 1)
+        if topic_states.get(i, {}).get('stage') not in run_checkpoint.TOPIC_DONE_STAGES
+        and 'media' not in topic_states.get(i, {})
+    }
+
+    def prepare(i, topic):
+        state = topic_states.get(i, {})
+        if state.get('stage') in run_checkpoint.TOPIC_DONE_STAGES:
+            return None
+        if 'source_texts' in state:
+            source_texts, source_urls = state['source_texts'], state['source_urls']
+        else:
+            item = _prepare_topic(i, len(topics), topic, articles)
+            if item is None:
+                run_checkpoint.save_topic(run_id, i, 'skipped')
+                prefetches[i].cancel()
+                return None
+            _, source_texts, source_urls = item
+            run_checkpoint.save_topic(run_id, i, 'prepared', source_texts=source_texts, source_urls=source_urls)
+        if i in prefetches:
+            prefetches[i].start_uploads()
+        return {'index': i, 'topic': topic, 'source_texts': source_texts, 'source_urls': source_urls,
+                'media': prefetches.get(i), 'state': state}
+
+    prepared = [p for p in topic_pool.map_topics(prepare, topics) if p]
+
+    # 8. Generovani clanku (CZ + EN) + publikace
+    #    Batch mode: vsechny clanky jednou davkou pres Message Batches API (50 % ceny)
+    if batch is None:
+        batch = config.AUTO_PUBLISH_BATCH
+    to_write = [item for item in prepared if 'article' not in item['state']]
+    batch_articles = _write_articles_batch(to_write, run_dir) if batch and to_write else {}
+    for i, article in batch_articles.items():
+        if 'error' not in article:
+            run_checkpoint.save_topic(run_id, i, 'written', article=article)
+
+    #    Témata běží souběžně (AUTO_PUBLISH_WORKERS), zápisy do WP serializuje wp_publisher
+    def publish(_, item):
+        published_ok = None
+        try:
+            published_ok = _publish_topic(
+                item['index'], len(topics), item['topic'], item['source_texts'], item['source_urls'],
+                item['media'], article=batch_articles.get(item['index']), run_id=run_id, state=item['state'],
+            )
+            return published_ok
+        finally:
+            if not published_ok and item['media'] is not None:
+                # Přeskočené téma (False) žádný post nevytvořilo — nahraná média se smažou.
+                # Po výjimce mohou patřit už vytvořenému postu, proto se jen zastaví uploady.
+                if item['media'].cancel(discard_uploads=published_ok is False):
+                    run_checkpoint.discard_topic_artifacts(run_id, item['index'], 'media')
+
+    published = topic_pool.map_topics(publish, prepared)
+    published_count = already_published + sum(1 for ok in published if ok)
+
+    # 9. Aktualizace historie
+    #    Jen články, které šly do analýzy — vyřazené packerem/pre-rankingem zůstanou pro další běh
+    analyzed = [article for article in articles if article.get('link') in set(analyzed_links)]
+    history = article_history.mark_as_processed(analyzed, history)
     history = article_history.cleanup_old_entries(history)
     article_history.save_history(history)
 
-    # 9. Shrnutí
+    # Běh je hotový, až když každé téma skončilo publikací nebo přeskočením
+    topic_states = run_checkpoint.load_topics(run_id)
+    complete = all(topic_states.get(i, {}).get('stage') in run_checkpoint.TOPIC_DONE_STAGES
+                   for i in range(1, len(topics) + 1))
+    run_checkpoint.finish_run(run_id, complete=complete)
+
+    # 10. Shrnutí
     elapsed = (datetime.now() - start_time).total_seconds()
     log.info("=" * 60)
     log.info("HOTOVO! Publikovano %d/%d clanku za %.0f sekund", published_count, len(topics), elapsed)
+    if not complete:
+        log.warning("⚠️ Některá témata nedoběhla — navázat lze: python auto_publish.py --resume %s", run_id)
     log.info("=" * 60)
 
 
+def run_due_retries():
+    """
+    Spustí odložená opakování, jejichž čas nastal (naváže na běh přes resume).
+
+    Returns:
+        Počet spuštěných opakování
+    """
+    jobs = retry_jobs.claim_due()
+    for job in jobs:
+        log.info("⏰ Odložený pokus (%s) pro běh %s, splatný %s", job['kind'], job['run_id'], job['due_at'][:16])
+        status = 'failed'
+        try:
+            run(resume=job['run_id'], **job['options'])
+            status = 'done'
+        except Exception as e:
+            log.error("Odložený pokus pro běh %s selhal: %s", job['run_id'], e, exc_info=True)
+        finally:
+            retry_jobs.complete(job['id'], status)
+    return len(jobs)
+
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Auto publish pipeline')
+    parser.add_argument('--batch', action='store_true', default=None,
+                        help='Generovat články přes Message Batches API (levnější, pomalejší)')
+    parser.add_argument('--tiered', action=argparse.BooleanOptionalAction, default=None,
+                        help='Dvoustupňová analýza s pre-rankingem (výchozí podle ANALYSIS_TIERED)')
+    parser.add_argument('--resume', metavar='RUN_ID', type=_run_id_arg, default=None,
+                        help='Navázat na přerušený běh od poslední dokončené fáze')
+    parser.add_argument('--run-due', action='store_true',
+                        help='Jen spustit splatná odložená opakování (pro častý launchd interval)')
+    args = parser.parse_args()
     try:
-        run()
+        if args.run_due:
+            run_due_retries()
+        elif args.resume:
+            run(batch=args.batch, tiered=args.tiered, resume=args.resume)
+        else:
+            # Splatná opakování dřív než nový běh — nový slot nesmí převzít jejich články
+            run_due_retries()
+            run(batch=args.batch, tiered=args.tiered)
     except KeyboardInterrupt:
         log.warning("Preruseno uzivatelem")
         sys.exit(0)
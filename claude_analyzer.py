@@ -7,36 +7,35 @@ Podporuje strukturované výstupy přes tool_use (Fáze 1).
 import re
 import anthropic
 import json
+from datetime import datetime
 from typing import List, Dict, Optional
 import config
 import topic_dedup
+import analysis_cache
+import article_packer
+import llm_ledger
+from claude_client import cached_system, get_client, log_usage
+from claude_scheduler import is_retryable, retry_wait
 from logger import setup_logger
 from models import Topic, AnalysisResult
 
 log = setup_logger(__name__)
 
 try:
-    from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
+    from tenacity import retry, stop_after_attempt, retry_if_exception
     _HAS_TENACITY = True
 except ImportError:
     _HAS_TENACITY = False
 
 
-def _is_retryable(exc):
-    """Retry na overload (529), rate limit (429), server error (5xx) a connection errory."""
-    if isinstance(exc, (anthropic.APIConnectionError, anthropic.APITimeoutError)):
-        return True
-    if isinstance(exc, anthropic.APIStatusError):
-        return exc.status_code in (429, 500, 502, 503, 529)
-    return False
-
-
-def _call_analysis_api(client, prompt):
-    """Volání Claude API."""
+def _call_analysis_api(client, prompt, system=None):
+    """Volání Claude API (statické instrukce v cachovaném system bloku)."""
+    llm_ledger.note_attempt()
     message = client.messages.create(
         model=config.ANALYSIS_MODEL,
         max_tokens=4000,
         temperature=0.7,
+        system=cached_system(system) if system else anthropic.NOT_GIVEN,
         messages=[{
             "role": "user",
             "content": prompt
@@ -48,8 +47,8 @@ def _call_analysis_api(client, prompt):
 if _HAS_TENACITY:
     _call_analysis_api = retry(
         stop=stop_after_attempt(5),
-        wait=wait_exponential(multiplier=4, min=15, max=120),
-        retry=retry_if_exception(_is_retryable),
+        wait=retry_wait,
+        retry=retry_if_exception(is_retryable),
         before_sleep=lambda retry_state: log.warning(
             "⚠️  API volání selhalo (HTTP %s), pokus %d/5, čekám...",
             getattr(retry_state.outcome.exception(), 'status_code', '?'),
@@ -58,25 +57,9 @@ if _HAS_TENACITY:
     )(_call_analysis_api)
 
 
-def analyze_gaming_articles(articles_text: str) -> str:
-    """
-    Pošle články Claude AI k analýze
-
-    Args:
-        articles_text: Naformátované články jako text
-
-    Returns:
-        Analýza a nápady od Claude
-    """
-    log.info("🧠 Analyzuji články pomocí Claude AI...")
-
-    client = anthropic.Anthropic(api_key=config.CLAUDE_API_KEY)
-
-    # Spočítej počet článků pro dynamický prompt
-    article_count = articles_text.count("ČLÁNEK ")
-    max_topics = min(2, max(1, article_count))
-
-    prompt = f"""Analyzuj tyto herní články z dnešního dne a vytvoř report pro českého herního blogera.
+def _build_analysis_system(max_topics: int) -> str:
+    """Statické instrukce textové analýzy (cachovaný system blok, liší se jen počtem témat)."""
+    return f"""Analyzuješ herní články z dnešního dne a vytváříš report pro českého herního blogera.
 
 ÚKOL:
 1. Identifikuj TOP {max_topics} nejvíce relevantních témat pro český herní blog (POUZE {max_topics} - NE VÍCE!)
@@ -94,7 +77,7 @@ Pro každé téma napiš:
 - 🖼️ VIZUÁLNÍ NÁVRH: [co by mělo být na banneru - jaká hra, postava, scéna, barvy, nálada]
 - 🔥 VIRALITA: [hodnocení 1-100, jak virální může být]
 - 💡 PROČ TEĎKA: [proč je to aktuální, proč to napsat teď]
-- 🔗 ZDROJE: [PŘESNÉ URL adresy relevantních článků - zkopíruj celé URL z Link: polí výše]
+- 🔗 ZDROJE: [PŘESNÉ URL adresy relevantních článků - zkopíruj celé URL z Link: polí článků v zadání]
 - 🏷️ SEO KLÍČOVÁ SLOVA: [3-5 klíčových slov pro SEO]
 - 🕹️ NÁZEV HRY: [přesný anglický název hlavní hry v tématu, např. "The Elder Scrolls V: Skyrim" nebo "Grand Theft Auto VI". Pokud téma není o konkrétní hře, napiš "N/A"]
 - 📌 STATUS TAG: [vyber JEDEN z: news, update, leak, critical, success, indie, review, trailer, rumor, info, finance, tema, preview]
@@ -111,8 +94,30 @@ DŮLEŽITÉ:
 - NIKDY nevytvářej prázdná témata! Každé téma musí mít kompletní obsah všech sekcí
 - FAKTICKÁ PŘESNOST: NIKDY nepřipisuj hře českou/slovenskou origin, pokud to není faktem. Neoznačuj hry jako "český", "česká hra", "od českých tvůrců" apod., pokud vývojářské studio skutečně není z ČR/SR. Psaní pro české publikum NEZNAMENÁ, že máš hry falešně vydávat za české!
 - Počet témat musí odpovídat počtu dostupných článků (max {max_topics})
-- STATUS TAG pravidla: "news" = běžná zpráva/oznámení, "update" = patch/aktualizace existující hry, "leak" = únik neoficiálních informací, "critical" = kritická/důležitá zpráva s velkým dopadem, "success" = prodejní rekord/milník/úspěch, "indie" = nezávislá hra, "review" = recenze, "trailer" = nový trailer/video, "rumor" = nepotvrzená spekulace, "info" = obecná informace/analýza, "finance" = finanční zpráva/akvizice/byznys, "tema" = tématický rozbor, "preview" = náhled/hands-on/preview. Defaultní je "news", ale snaž se vybrat co nejpřesnější tag.
-{topic_dedup.format_recent_topics_for_prompt(days=3)}
+- STATUS TAG pravidla: "news" = běžná zpráva/oznámení, "update" = patch/aktualizace existující hry, "leak" = únik neoficiálních informací, "critical" = kritická/důležitá zpráva s velkým dopadem, "success" = prodejní rekord/milník/úspěch, "indie" = nezávislá hra, "review" = recenze, "trailer" = nový trailer/video, "rumor" = nepotvrzená spekulace, "info" = obecná informace/analýza, "finance" = finanční zpráva/akvizice/byznys, "tema" = tématický rozbor, "preview" = náhled/hands-on/preview. Defaultní je "news", ale snaž se vybrat co nejpřesnější tag."""
+
+
+def analyze_gaming_articles(articles_text: str, use_cache: bool = True) -> str:
+    """
+    Pošle články Claude AI k analýze
+
+    Args:
+        articles_text: Naformátované články jako text
+        use_cache: False = analysis cache se nečte ani nezapisuje (benchmarky, porovnání)
+
+    Returns:
+        Analýza a nápady od Claude
+    """
+    log.info("🧠 Analyzuji články pomocí Claude AI...")
+
+    client = get_client()
+
+    # Spočítej počet článků pro dynamický prompt
+    article_count = articles_text.count("ČLÁNEK ")
+    max_topics = min(2, max(1, article_count))
+
+    system = _build_analysis_system(max_topics)
+    prompt = f"""{topic_dedup.format_recent_topics_for_prompt(days=3)}
 ČLÁNKY K ANALÝZE:
 {articles_text}
 
@@ -120,22 +125,24 @@ DŮLEŽITÉ:
 
 VÝSTUP (seřaď od nejdůležitějšího, vytvoř PŘESNĚ {max_topics} témat s kompletním obsahem):"""
 
+    cache_key = analysis_cache.make_key('text', config.ANALYSIS_MODEL, system, prompt)
+    cached = analysis_cache.get(cache_key) if use_cache else None
+    if cached is not None:
+        log.info("♻️  Analýza nalezena v cache (%s), přeskakuji volání API", cache_key[:12])
+        return cached
+
     try:
-        message = _call_analysis_api(client, prompt)
+        with llm_ledger.track('analysis', config.ANALYSIS_MODEL) as call:
+            message = _call_analysis_api(client, prompt, system)
+            call.set_usage(message.usage)
 
         result = message.content[0].text
+        if use_cache:
+            analysis_cache.put(cache_key, 'text', config.ANALYSIS_MODEL, result)
 
-        # Statistiky použití
+        # Statistiky použití (včetně prompt cache)
         log.info("✅ Analýza dokončena")
-        log.info("   📊 Input tokeny: %d", message.usage.input_tokens)
-        log.info("   📊 Output tokeny: %d", message.usage.output_tokens)
-
-        # Odhad ceny (Claude Sonnet 4 pricing: $3.00/MTok input, $15.00/MTok output)
-        cost_input = (message.usage.input_tokens / 1_000_000) * 3.00
-        cost_output = (message.usage.output_tokens / 1_000_000) * 15.00
-        total_cost = cost_input + cost_output
-
-        log.info("   💰 Odhadovaná cena: $%.4f", total_cost)
+        log_usage(log, message.usage, config.ANALYSIS_MODEL)
 
         return result
 
@@ -182,12 +189,14 @@ def _build_analysis_tool(max_topics: int) -> dict:
     }
 
 
-def _call_structured_api(client, prompt, tools):
-    """Volání Claude API se strukturovaným výstupem (tool_use)."""
+def _call_structured_api(client, prompt, tools, system=None):
+    """Volání Claude API se strukturovaným výstupem (tool_use). Tools + system tvoří cachovaný prefix."""
+    llm_ledger.note_attempt()
     return client.messages.create(
         model=config.ANALYSIS_MODEL,
         max_tokens=4000,
         temperature=0.7,
+        system=cached_system(system) if system else anthropic.NOT_GIVEN,
         tools=tools,
         tool_choice={"type": "tool", "name": "submit_analysis"},
         messages=[{"role": "user", "content": prompt}]
@@ -197,8 +206,8 @@ def _call_structured_api(client, prompt, tools):
 if _HAS_TENACITY:
     _call_structured_api = retry(
         stop=stop_after_attempt(5),
-        wait=wait_exponential(multiplier=4, min=15, max=120),
-        retry=retry_if_exception(_is_retryable),
+        wait=retry_wait,
+        retry=retry_if_exception(is_retryable),
         before_sleep=lambda retry_state: log.warning(
             "⚠️  Structured API volání selhalo (HTTP %s), pokus %d/5, čekám...",
             getattr(retry_state.outcome.exception(), 'status_code', '?'),
@@ -232,24 +241,9 @@ def format_topics_as_report(topics: list) -> str:
     return "\n\n".join(parts)
 
 
-def analyze_articles_structured(articles_text: str) -> Optional[dict]:
-    """
-    Analyzuje herní články pomocí Claude s tool_use pro strukturovaný výstup.
-
-    Args:
-        articles_text: Naformátované články jako text
-
-    Returns:
-        {"text": str, "topics": list[dict]} nebo None při selhání
-    """
-    log.info("🧠 Analyzuji články pomocí Claude AI (strukturovaný výstup)...")
-
-    client = anthropic.Anthropic(api_key=config.CLAUDE_API_KEY)
-
-    article_count = articles_text.count("ČLÁNEK ")
-    max_topics = min(2, max(1, article_count))
-
-    prompt = f"""Analyzuj tyto herní články z dnešního dne a vytvoř report pro českého herního blogera.
+def _build_structured_system(max_topics: int) -> str:
+    """Statické instrukce strukturované analýzy (cachovaný system blok)."""
+    return f"""Analyzuješ herní články z dnešního dne a vytváříš report pro českého herního blogera.
 
 ÚKOL:
 1. Identifikuj TOP {max_topics} nejvíce relevantních témat pro český herní blog (PŘESNĚ {max_topics})
@@ -268,15 +262,45 @@ PRAVIDLA:
 - FAKTICKÁ PŘESNOST: NIKDY nepřipisuj hře českou/slovenskou origin, pokud to není faktem
 - Počet témat musí být PŘESNĚ {max_topics}
 - STATUS TAG pravidla: "news" = běžná zpráva/oznámení, "update" = patch/aktualizace existující hry, "leak" = únik neoficiálních informací, "critical" = kritická/důležitá zpráva s velkým dopadem, "success" = prodejní rekord/milník/úspěch, "indie" = nezávislá hra, "review" = recenze, "trailer" = nový trailer/video, "rumor" = nepotvrzená spekulace, "info" = obecná informace/analýza, "finance" = finanční zpráva/akvizice/byznys, "tema" = tématický rozbor, "preview" = náhled/hands-on/preview. Defaultní je "news", ale snaž se vybrat co nejpřesnější tag.
-{topic_dedup.format_recent_topics_for_prompt(days=3)}
+- Výsledky odešli VŽDY přes tool submit_analysis"""
+
+
+def analyze_articles_structured(articles_text: str, use_cache: bool = True) -> Optional[dict]:
+    """
+    Analyzuje herní články pomocí Claude s tool_use pro strukturovaný výstup.
+
+    Args:
+        articles_text: Naformátované články jako text
+        use_cache: False = analysis cache se nečte ani nezapisuje (benchmarky, porovnání)
+
+    Returns:
+        {"text": str, "topics": list[dict]} nebo None při selhání
+    """
+    log.info("🧠 Analyzuji články pomocí Claude AI (strukturovaný výstup)...")
+
+    client = get_client()
+
+    article_count = articles_text.count("ČLÁNEK ")
+    max_topics = min(2, max(1, article_count))
+
+    system = _build_structured_system(max_topics)
+    prompt = f"""{topic_dedup.format_recent_topics_for_prompt(days=3)}
 Použij tool submit_analysis k odeslání výsledků.
 
 ČLÁNKY K ANALÝZE:
 {articles_text}"""
 
+    tool = _build_analysis_tool(max_topics)
+    cache_key = analysis_cache.make_key('structured', config.ANALYSIS_MODEL, system, prompt, tool)
+    cached = analysis_cache.get(cache_key) if use_cache else None
+    if cached is not None:
+        log.info("♻️  Strukturovaná analýza nalezena v cache (%s), přeskakuji volání API", cache_key[:12])
+        return cached
+
     try:
-        tool = _build_analysis_tool(max_topics)
-        message = _call_structured_api(client, prompt, [tool])
+        with llm_ledger.track('analysis_structured', config.ANALYSIS_MODEL) as call:
+            message = _call_structured_api(client, prompt, [tool], system)
+            call.set_usage(message.usage)
 
         # Extrahuj tool_use blok
         topics_data = None
@@ -302,21 +326,136 @@ Použij tool submit_analysis k odeslání výsledků.
 
         # Statistiky
         log.info("✅ Strukturovaná analýza dokončena (%d témat)", len(topics))
-        log.info("   📊 Input tokeny: %d", message.usage.input_tokens)
-        log.info("   📊 Output tokeny: %d", message.usage.output_tokens)
+        log_usage(log, message.usage, config.ANALYSIS_MODEL)
 
-        cost_input = (message.usage.input_tokens / 1_000_000) * 3.00
-        cost_output = (message.usage.output_tokens / 1_000_000) * 15.00
-        total_cost = cost_input + cost_output
-        log.info("   💰 Odhadovaná cena: $%.4f", total_cost)
-
-        return {"text": report_text, "topics": topics}
+        result = {"text": report_text, "topics": topics}
+        if use_cache:
+            analysis_cache.put(cache_key, 'structured', config.ANALYSIS_MODEL, result)
+        return result
 
     except Exception as e:
         log.error("❌ Chyba při strukturované analýze: %s", e)
         return None
 
 
+PRERANK_TOOL = {
+    "name": "submit_shortlist",
+    "description": "Odešle ID nejslibnějších témat pro český herní blog",
+    "input_schema": {
+        "type": "object",
+        "required": ["cluster_ids"],
+        "properties": {
+            "cluster_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "ID témat (číslo za K) seřazená od nejslibnějšího",
+            }
+        }
+    }
+}
+
+PRERANK_SYSTEM_PROMPT = """Předvybíráš témata pro český herní blog. Dostaneš seznam témat
+(K<id> [počet článků | zdroje]: titulky) a vybereš ta, ze kterých vzniknou nejčtenější články.
+
+PRAVIDLA:
+- Preferuj aktuální zprávy, oznámení nových her, trailery, leaky a velké milníky
+- Téma pokryté více zdroji je obvykle důležitější
+- Ignoruj slevy, návody a drobné recenze, pokud nejde o velkou hru
+- Výsledek odešli VŽDY přes tool submit_shortlist"""
+
+
+def _call_prerank_api(client, model, prompt):
+    """Volání levného modelu pro pre-ranking témat (tool_use, krátký výstup)."""
+    llm_ledger.note_attempt()
+    return client.messages.create(
+        model=model,
+        max_tokens=300,
+        temperature=0.0,
+        system=cached_system(PRERANK_SYSTEM_PROMPT),
+        tools=[PRERANK_TOOL],
+        tool_choice={"type": "tool", "name": "submit_shortlist"},
+        messages=[{"role": "user", "content": prompt}]
+    )
+
+
+if _HAS_TENACITY:
+    _call_prerank_api = retry(
+        stop=stop_after_attempt(3),
+        wait=retry_wait,
+        retry=retry_if_exception(is_retryable),
+        reraise=True,
+    )(_call_prerank_api)
+
+
+def shortlist_articles(articles: List[Dict], shortlist: int = None, model: str = None,
+                       now: datetime = None) -> Dict:
+    """
+    První stupeň analýzy: vybere nejslibnější témata (clustery článků).
+
+    Args:
+        articles: Seznam článků z rss_scraper
+        shortlist: Počet témat pro plnou analýzu (None = config.PRERANK_SHORTLIST)
+        model: Pre-ranking model, "local" = jen skóre z article_packer (None = config.PRERANK_MODEL)
+        now: Referenční čas pro čerstvost článků (None = teď)
+
+    Returns:
+        {"articles": list, "cluster_ids": list, "clusters": int, "method": "model" | "local"}
+    """
+    shortlist = shortlist or config.PRERANK_SHORTLIST
+    model = model or config.PRERANK_MODEL
+    clusters = article_packer.group_clusters(articles, now=now)
+    by_id = {cluster['id']: cluster for cluster in clusters}
+
+    chosen = None
+    method = 'local'
+    if len(clusters) > shortlist and model != 'local':
+        prompt = (f"Vyber {shortlist} nejslibnějších témat z {len(clusters)}:\n\n"
+                  f"{article_packer.format_clusters_compact(clusters)}")
+        try:
+            with llm_ledger.track('prerank', model) as call:
+                message = _call_prerank_api(get_client(), model, prompt)
+                call.set_usage(message.usage)
+            for block in message.content:
+                if block.type == "tool_use" and block.name == "submit_shortlist":
+                    ids = [i for i in block.input.get("cluster_ids", []) if i in by_id]
+                    chosen = list(dict.fromkeys(ids))[:shortlist] or None
+                    break
+            if chosen:
+                method = 'model'
+            else:
+                log.warning("⚠️  Pre-ranking nevrátil platná ID, použiji lokální skóre")
+        except Exception as e:
+            log.warning("⚠️  Pre-ranking (%s) selhal: %s, použiji lokální skóre", model, e)
+
+    if chosen is None:
+        chosen = [cluster['id'] for cluster in clusters[:shortlist]]
+
+    selected = [article for cluster_id in chosen for article in by_id[cluster_id]['articles']]
+    log.info("🎯 Pre-ranking (%s): %d/%d témat, %d/%d článků jde do plné analýzy",
+             method, len(chosen), len(clusters), len(selected), len(articles))
+    return {'articles': selected, 'cluster_ids': chosen, 'clusters': len(clusters), 'method': method}
+
+
+def analyze_articles_tiered(articles: List[Dict], shortlist: int = None,
+                            prerank_model: str = None, now: datetime = None,
+                            use_cache: bool = True) -> Optional[dict]:
+    """
+    Dvoustupňová analýza: pre-ranking levným modelem, pak strukturovaná analýza
+    ANALYSIS_MODEL jen nad vybranými tématy. use_cache jako u analyze_articles_structured.
+
+    Returns:
+        {"text", "topics", "shortlist": {...}, "included": [články v plné analýze]}
+        nebo None při selhání (jako analyze_articles_structured)
+    """
+    selection = shortlist_articles(articles, shortlist, prerank_model, now=now)
+    packed = article_packer.pack_articles(selection['articles'], now=now)
+    result = analyze_articles_structured(packed['text'], use_cache=use_cache)
+    if result is None:
+        return None
+    return dict(result, shortlist={k: v for k, v in selection.items() if k != 'articles'},
+                included=packed['included'])
+
+
 def extract_key_insights(articles: List[Dict]) -> Dict:
     """
     Extrahuje základní statistiky z článků
@@ -0,0 +1,138 @@
+"""
+Message Batches API — dávkové generování pro běhy, kde nezáleží na latenci.
+Všechny requesty běhu se odešlou jednou dávkou (50 % ceny), stav se dotazuje
+v intervalu CLAUDE_BATCH_POLL_INTERVAL a výsledky se spárují přes custom_id.
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+import anthropic
+
+import config
+import llm_ledger
+from claude_client import get_client
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+
+def submit_batch(requests: Dict[str, Dict], client=None) -> str:
+    """
+    Odešle dávku requestů.
+
+    Args:
+        requests: {custom_id: parametry messages.create} (custom_id = [a-zA-Z0-9_-], max 64 znaků)
+        client: Anthropic klient (None = sdílený)
+
+    Returns:
+        ID dávky
+    """
+    client = client or get_client()
+    batch = client.messages.batches.create(requests=[
+        {'custom_id': custom_id, 'params': params}
+        for custom_id, params in requests.items()
+    ])
+    log.info("📦 Dávka %s odeslána (%d requestů)", batch.id, len(requests))
+    return batch.id
+
+
+def wait_for_batch(batch_id: str, client=None, poll_interval: float = None, timeout: float = None,
+                   sleep: Callable[[float], None] = time.sleep):
+    """
+    Čeká na dokončení dávky.
+
+    Returns:
+        MessageBatch se stavem 'ended', nebo None při timeoutu (dávka se zruší)
+    """
+    client = client or get_client()
+    poll_interval = config.CLAUDE_BATCH_POLL_INTERVAL if poll_interval is None else poll_interval
+    timeout = config.CLAUDE_BATCH_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+
+    while True:
+        batch = client.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        if batch.processing_status == 'ended':
+            log.info("✅ Dávka %s hotová: %d OK, %d chyb, %d expirováno, %d zrušeno",
+                     batch_id, counts.succeeded, counts.errored, counts.expired, counts.canceled)
+            return batch
+        if time.monotonic() >= deadline:
+            log.error("❌ Dávka %s nedoběhla do %.0f s, ruším ji", batch_id, timeout)
+            try:
+                client.messages.batches.cancel(batch_id)
+            except anthropic.APIError as e:
+                log.warning("Zrušení dávky %s selhalo: %s", batch_id, e)
+            return None
+        log.info("⏳ Dávka %s: %d zpracovává se, %d hotovo — další kontrola za %.0f s",
+                 batch_id, counts.processing, counts.succeeded + counts.errored, poll_interval)
+        sleep(poll_interval)
+
+
+def fetch_results(batch_id: str, client=None) -> Dict[str, Dict]:
+    """
+    Stáhne výsledky dokončené dávky.
+
+    Returns:
+        {custom_id: {"message": Message}} nebo {custom_id: {"error": "..."}}
+    """
+    client = client or get_client()
+    results = {}
+    for item in client.messages.batches.results(batch_id):
+        outcome = item.result
+        if outcome.type == 'succeeded':
+            results[item.custom_id] = {'message': outcome.message}
+        elif outcome.type == 'errored':
+            error = getattr(outcome.error, 'error', None)
+            results[item.custom_id] = {'error': getattr(error, 'message', None) or 'errored'}
+        else:
+            results[item.custom_id] = {'error': outcome.type}
+    return results
+
+
+def run_batch(requests: Dict[str, Dict], client=None, poll_interval: float = None,
+              timeout: float = None, on_submitted: Optional[Callable[[str], None]] = None,
+              sleep: Callable[[float], None] = time.sleep, purpose: str = 'batch',
+              batch_id: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Odešle dávku, počká na výsledky a vrátí je podle custom_id.
+
+    Chybějící výsledky (timeout, chyba API) jsou {"error": "..."} — volající
+    je může dogenerovat přímým voláním.
+
+    Args:
+        on_submitted: Callback s ID dávky (např. uložení do run adresáře)
+        purpose: Účel volání pro LLM ledger (každý request = jeden záznam)
+        batch_id: ID už odeslané dávky se stejnými requesty (navázání po pádu) — neodesílá se znovu
+    """
+    if not requests:
+        return {}
+    client = client or get_client()
+
+    start = time.monotonic()
+    if batch_id:
+        log.info("♻️ Navazuji na odeslanou dávku %s", batch_id)
+    else:
+        try:
+            batch_id = submit_batch(requests, client)
+        except anthropic.APIError as e:
+            log.error("❌ Odeslání dávky selhalo: %s", e)
+            return {custom_id: {'error': str(e)} for custom_id in requests}
+
+        if on_submitted:
+            on_submitted(batch_id)
+
+    try:
+        batch = wait_for_batch(batch_id, client, poll_interval, timeout, sleep)
+        results = fetch_results(batch_id, client) if batch else {}
+    except anthropic.APIError as e:
+        log.error("❌ Dávka %s selhala: %s", batch_id, e)
+        results = {}
+
+    latency = time.monotonic() - start
+    for custom_id, params in requests.items():
+        outcome = results.setdefault(custom_id, {'error': 'batch_incomplete'})
+        llm_ledger.record_call(purpose, params.get('model', ''),
+                               getattr(outcome.get('message'), 'usage', None), latency,
+                               batch=True, error=outcome.get('error'))
+    return results
@@ -0,0 +1,157 @@
+"""
+Sdílené utility pro volání Claude API.
+Sdílený Anthropic klient s connection poolem, prompt caching
+(statické instrukce v system bloku s cache_control) a usage statistiky.
+"""
+
+import threading
+from typing import Dict, List
+
+import anthropic
+import httpx
+
+import config
+
+# Ceník Claude Sonnet 4.x ($ / MTok) — výchozí pro modely mimo MODEL_PRICING
+INPUT_PRICE_PER_MTOK = 3.00
+OUTPUT_PRICE_PER_MTOK = 15.00
+# Ceník podle rodiny modelu (prefix názvu) → (input, output) $ / MTok
+MODEL_PRICING = {
+    'claude-opus-4': (15.00, 75.00),
+    'claude-sonnet-4': (INPUT_PRICE_PER_MTOK, OUTPUT_PRICE_PER_MTOK),
+    'claude-haiku-4': (1.00, 5.00),
+    'claude-3-5-haiku': (0.80, 4.00),
+}
+# Zápis do prompt cache stojí 1.25× input, čtení 0.1× input
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.10
+# Message Batches API účtuje 50 % běžné ceny (input i output)
+BATCH_DISCOUNT = 0.50
+
+_client = None
+_client_key = None
+_client_lock = threading.Lock()
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.CLAUDE_MAX_CONNECTIONS,
+        max_keepalive_connections=config.CLAUDE_MAX_CONNECTIONS,
+        keepalive_expiry=config.CLAUDE_KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(config.CLAUDE_TIMEOUT, connect=config.CLAUDE_CONNECT_TIMEOUT)
+
+
+def _client_settings():
+    """Klíč, podle kterého se pozná změna konfigurace sdíleného klienta."""
+    return config.CLAUDE_API_KEY, config.CLAUDE_BASE_URL
+
+
+def get_client() -> anthropic.Anthropic:
+    """
+    Vrátí sdílený (process-wide) Anthropic klient.
+
+    Klient drží httpx connection pool — opakovaná volání (analýza, write_article,
+    podcasty z dashboardu) znovu používají otevřená TLS spojení. Vytváří se líně
+    při prvním volání a znovu jen při změně CLAUDE_API_KEY / CLAUDE_BASE_URL. Thread-safe.
+
+    Vestavěné retry SDK je vypnuté (max_retries=0) — retry řeší tenacity
+    s retry-after (claude_scheduler.retry_wait), jinak by se pokusy násobily.
+    Hlavičky anthropic-ratelimit-* každé odpovědi jdou do sdíleného trackeru
+    claude_scheduler a request před odesláním počká, pokud by limit nestačil.
+    """
+    from claude_scheduler import sync_request_hook, sync_response_hook
+
+    global _client, _client_key
+    with _client_lock:
+        if _client is None or _client_key != _client_settings():
+            _client = anthropic.Anthropic(
+                api_key=config.CLAUDE_API_KEY,
+                base_url=config.CLAUDE_BASE_URL or None,
+                http_client=anthropic.DefaultHttpxClient(
+                    limits=_pool_limits(),
+                    event_hooks={'request': [sync_request_hook], 'response': [sync_response_hook]},
+                ),
+                timeout=_timeout(),
+                max_retries=0,
+            )
+            _client_key = _client_settings()
+        return _client
+
+
+def reset_client():
+    """Zahodí sdílený klient (uzavře pool). Další get_client() vytvoří nový."""
+    global _client, _client_key
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _client_key = None
+
+
+def cached_system(text: str) -> List[Dict]:
+    """
+    Vrátí system blok označený pro prompt caching.
+
+    Statický text (pravidla, formát výstupu) musí být v system bloku PŘED
+    proměnnými daty, aby se prefix shodoval napříč voláními. Cache drží 5 minut
+    a funguje od ~1024 tokenů (Sonnet), kratší bloky API tiše necachuje.
+    """
+    return [{
+        "type": "text",
+        "text": text,
+        "cache_control": {"type": "ephemeral"},
+    }]
+
+
+def _usage_int(usage, name: str) -> int:
+    """Bezpečně vrátí int hodnotu z usage objektu (chybějící/None → 0)."""
+    value = getattr(usage, name, None)
+    return value if isinstance(value, int) else 0
+
+
+def usage_stats(usage) -> Dict[str, int]:
+    """Převede usage z Claude odpovědi na dict včetně cache tokenů."""
+    return {
+        'input_tokens': _usage_int(usage, 'input_tokens'),
+        'output_tokens': _usage_int(usage, 'output_tokens'),
+        'cache_read_tokens': _usage_int(usage, 'cache_read_input_tokens'),
+        'cache_write_tokens': _usage_int(usage, 'cache_creation_input_tokens'),
+    }
+
+
+def model_pricing(model: str = None):
+    """Vrátí (input, output) cenu v $ / MTok pro model (neznámý model = ceník Sonnet)."""
+    for prefix, pricing in MODEL_PRICING.items():
+        if model and model.startswith(prefix):
+            return pricing
+    return INPUT_PRICE_PER_MTOK, OUTPUT_PRICE_PER_MTOK
+
+
+def estimate_cost(usage, batch: bool = False, model: str = None) -> float:
+    """Odhad ceny volání v USD (input_tokens u Claude nezahrnují cachované tokeny, batch = sleva 50 %)."""
+    stats = usage_stats(usage)
+    input_price, output_price = model_pricing(model)
+    input_cost = (
+        stats['input_tokens']
+        + stats['cache_write_tokens'] * CACHE_WRITE_MULTIPLIER
+        + stats['cache_read_tokens'] * CACHE_READ_MULTIPLIER
+    ) / 1_000_000 * input_price
+    output_cost = stats['output_tokens'] / 1_000_000 * output_price
+    total = input_cost + output_cost
+    return total * BATCH_DISCOUNT if batch else total
+
+
+def log_usage(log, usage, model: str = None) -> float:
+    """Zaloguje usage statistiky (včetně prompt cache) a vrátí odhad ceny."""
+    stats = usage_stats(usage)
+    total_cost = estimate_cost(usage, model=model)
+    log.info("   📊 Input tokeny: %d", stats['input_tokens'])
+    log.info("   📊 Output tokeny: %d", stats['output_tokens'])
+    log.info("   📊 Cache read/write tokeny: %d / %d",
+             stats['cache_read_tokens'], stats['cache_write_tokens'])
+    log.info("   💰 Odhadovaná cena: $%.4f", total_cost)
+    return total_cost
@@ -0,0 +1,519 @@
+"""
+Lokální náhrada Claude Messages API pro offline testy a benchmarky.
+
+Režimy:
+- replay: odpovědi ze souborů v cassette adresáři (klíč = hash requestu)
+- record: request se přepošle na skutečné API a odpověď se uloží
+- mock:   každý request dostane stejnou (zadanou) odpověď
+
+Server umí přidat latenci, vracet 429/529 podle skriptu poruch (deterministicky,
+v pořadí příchodu requestů) a streamovat odpověď jako SSE. Klient se na něj
+přepne přes CLAUDE_BASE_URL=http://127.0.0.1:<port>.
+
+Použití:
+    python claude_replay.py serve --mode record --port 8765
+    python claude_replay.py bench --requests 20 --latency 0.5 --faults 529,429
+    python claude_replay.py compare-analysis output/<běh>/articles.json --mode record
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import tempfile
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import httpx
+
+import topic_dedup
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CASSETTE_DIR = os.path.join(BASE_DIR, 'data', 'claude_cassettes')
+UPSTREAM_URL = 'https://api.anthropic.com'
+
+# Hlavičky, které se při nahrávání přeposílají na skutečné API
+_FORWARD_HEADERS = ('x-api-key', 'anthropic-version', 'anthropic-beta')
+
+_ERROR_TYPES = {
+    400: 'invalid_request_error',
+    404: 'not_found_error',
+    429: 'rate_limit_error',
+    500: 'api_error',
+    529: 'overloaded_error',
+}
+
+
+# Části promptu, které se mění s časem, ne se vstupem (nedávno publikovaná témata
+# z publish_log) — v klíči by nahrávky analýzy přestaly sedět, jakmile se log posune
+_VOLATILE_BLOCKS = re.compile(
+    re.escape(topic_dedup.RECENT_TOPICS_HEADER) + '.*?' + re.escape(topic_dedup.RECENT_TOPICS_FOOTER),
+    re.DOTALL,
+)
+
+
+def _strip_volatile(value):
+    if isinstance(value, str):
+        return _VOLATILE_BLOCKS.sub('', value)
+    if isinstance(value, list):
+        return [_strip_volatile(item) for item in value]
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items()}
+    return value
+
+
+def request_key(path: str, body: Dict) -> str:
+    """Hash requestu nezávislý na pořadí klíčů, příznaku stream a bloku nedávných témat."""
+    payload = _strip_volatile({k: v for k, v in body.items() if k != 'stream'})
+    canonical = json.dumps([path, payload], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+def make_message(text: str = 'OK', model: str = 'claude-sonnet-4-6', input_tokens: int = 100,
+                 output_tokens: int = 50, content: List[Dict] = None) -> Dict:
+    """Sestaví JSON odpovědi Messages API (pro mock režim a testy)."""
+    return {
+        'id': 'msg_replay',
+        'type': 'message',
+        'role': 'assistant',
+        'model': model,
+        'content': content if content is not None else [{'type': 'text', 'text': text}],
+        'stop_reason': 'tool_use' if content and content[-1].get('type') == 'tool_use' else 'end_turn',
+        'stop_sequence': None,
+        'usage': {'input_tokens': input_tokens, 'output_tokens': output_tokens},
+    }
+
+
+def sse_events(message: Dict, chunk_size: int = 40) -> List[tuple]:
+    """Rozloží hotovou odpověď na SSE eventy streamovacího API: [(event, data), ...]."""
+    start = dict(message, content=[], stop_reason=None,
+                 usage=dict(message.get('usage', {}), output_tokens=0))
+    events = [('message_start', {'type': 'message_start', 'message': start})]
+    for index, block in enumerate(message.get('content', [])):
+        if block.get('type') == 'tool_use':
+            events.append(('content_block_start', {
+                'type': 'content_block_start', 'index': index,
+                'content_block': dict(block, input={}),
+            }))
+            raw = json.dumps(block.get('input', {}), ensure_ascii=False)
+            delta_type, field, source = 'input_json_delta', 'partial_json', raw
+        else:
+            events.append(('content_block_start', {
+                'type': 'content_block_start', 'index': index,
+                'content_block': {'type': 'text', 'text': ''},
+            }))
+            delta_type, field, source = 'text_delta', 'text', block.get('text', '')
+        for i in range(0, len(source), chunk_size):
+            events.append(('content_block_delta', {
+                'type': 'content_block_delta', 'index': index,
+                'delta': {'type': delta_type, field: source[i:i + chunk_size]},
+            }))
+        events.append(('content_block_stop', {'type': 'content_block_stop', 'index': index}))
+    events.append(('message_delta', {
+        'type': 'message_delta',
+        'delta': {'stop_reason': message.get('stop_reason'), 'stop_sequence': None},
+        'usage': {'output_tokens': message.get('usage', {}).get('output_tokens', 0)},
+    }))
+    events.append(('message_stop', {'type': 'message_stop'}))
+    return events
+
+
+class ReplayServer:
+    """
+    HTTP náhrada /v1/messages. Spouští se jako context manager (vlákno na pozadí).
+
+    Args:
+        mode: 'replay', 'record' nebo 'mock'
+        cassette_dir: Adresář s nahranými odpověďmi (<hash>.json)
+        response: Odpověď pro mock režim (dict z make_message, nebo funkce body → dict)
+        latency: Zpoždění každé odpovědi (sekundy)
+        stream_delay: Zpoždění mezi SSE eventy (sekundy)
+        faults: Skript poruch v pořadí příchodu requestů — HTTP status nebo None (= normální odpověď)
+        retry_after: Hodnota retry-after u 429/529 (None = bez hlavičky)
+        replay_latency: V replay režimu čekat tak dlouho, jak trvalo nahrané volání
+        rate_limit: Vracet hlavičky anthropic-ratelimit-requests-* s tímto limitem
+        upstream_url: Skutečné API pro record režim
+        host, port: Adresa serveru (port 0 = volný port)
+    """
+
+    def __init__(self, mode: str = 'replay', cassette_dir: str = None, response: Dict = None,
+                 latency: float = 0.0, stream_delay: float = 0.0, faults: List[Optional[int]] = None,
+                 retry_after: Optional[float] = None, rate_limit: Optional[int] = None,
+                 replay_latency: bool = False, upstream_url: str = UPSTREAM_URL, host: str = '127.0.0.1', port: int = 0):
+        if mode not in ('replay', 'record', 'mock'):
+            raise ValueError(f"Neznámý režim: {mode}")
+        self.mode = mode
+        self.cassette_dir = cassette_dir or CASSETTE_DIR
+        self.response = response or make_message()
+        self.latency = latency
+        self.stream_delay = stream_delay
+        self.faults = list(faults or [])
+        self.retry_after = retry_after
+        self.rate_limit = rate_limit
+        self.replay_latency = replay_latency
+        self.upstream_url = upstream_url.rstrip('/')
+        self.log = []  # [(request_key, status)]
+        self._lock = threading.Lock()
+        self._served = 0
+        self._in_flight = 0
+        self.max_in_flight = 0
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.base_url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = None
+
+    # --- Cassettes ---
+
+    def _cassette_path(self, key: str) -> str:
+        return os.path.join(self.cassette_dir, f"{key}.json")
+
+    def load(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._cassette_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def save(self, key: str, body: Dict, status: int, response: Dict, latency: float = 0.0):
+        os.makedirs(self.cassette_dir, exist_ok=True)
+        with open(self._cassette_path(key), 'w', encoding='utf-8') as f:
+            json.dump({'request': body, 'status': status, 'response': response,
+                       'latency': round(latency, 3)}, f, ensure_ascii=False, indent=2)
+
+    def _record(self, path: str, body: Dict, headers) -> tuple:
+        forward = {name: headers[name] for name in _FORWARD_HEADERS if headers.get(name)}
+        upstream_body = dict(body, stream=False)
+        resp = httpx.post(self.upstream_url + path, json=upstream_body, headers=forward, timeout=600)
+        return resp.status_code, resp.json()
+
+    # --- Plánování odpovědí ---
+
+    def _next_fault(self) -> Optional[int]:
+        with self._lock:
+            index = self._served
+            self._served += 1
+        return self.faults[index] if index < len(self.faults) else None
+
+    def _rate_limit_headers(self) -> Dict[str, str]:
+        if self.rate_limit is None:
+            return {}
+        with self._lock:
+            remaining = max(0, self.rate_limit - self._served)
+        return {
+            'anthropic-ratelimit-requests-limit': str(self.rate_limit),
+            'anthropic-ratelimit-requests-remaining': str(remaining),
+        }
+
+    def respond(self, path: str, body: Dict, headers) -> tuple:
+        """Vrátí (status, json odpovědi, extra hlavičky) pro jeden request."""
+        key = request_key(path, body)
+        extra = self._rate_limit_headers()
+
+        fault = self._next_fault()
+        if fault:
+            if self.retry_after is not None and fault in (429, 529):
+                extra['retry-after'] = str(self.retry_after)
+            error = {'type': 'error', 'error': {
+                'type': _ERROR_TYPES.get(fault, 'api_error'), 'message': f"Injected {fault}"}}
+            self.log.append((key, fault))
+            return fault, error, extra
+
+        if self.mode == 'mock':
+            status, response = 200, self.response(body) if callable(self.response) else self.response
+        else:
+            cassette = self.load(key)
+            if cassette is not None:
+                status, response = cassette['status'], cassette['response']
+                if self.replay_latency:
+                    time.sleep(cassette.get('latency', 0.0))
+            elif self.mode == 'record':
+                start = time.monotonic()
+                status, response = self._record(path, body, headers)
+                if status == 200:
+                    self.save(key, body, status, response, time.monotonic() - start)
+                    log.info("💾 Nahrána odpověď %s", key)
+            else:
+                status, response = 404, {'type': 'error', 'error': {
+                    'type': 'not_found_error', 'message': f"Žádná nahrávka pro request {key}"}}
+        self.log.append((key, status))
+        return status, response, extra
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, payload, extra):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in extra.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, message, extra):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                for name, value in extra.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                for event, data in sse_events(message):
+                    chunk = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+                    self.wfile.write(chunk.encode('utf-8'))
+                    self.wfile.flush()
+                    if server.stream_delay:
+                        time.sleep(server.stream_delay)
+                self.close_connection = True
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                except json.JSONDecodeError:
+                    return self._send_json(400, {'type': 'error', 'error': {
+                        'type': 'invalid_request_error', 'message': 'Neplatný JSON'}}, {})
+                path = self.path.split('?', 1)[0]
+                if path != '/v1/messages':
+                    return self._send_json(404, {'type': 'error', 'error': {
+                        'type': 'not_found_error', 'message': f"Nepodporovaný endpoint {path}"}}, {})
+
+                with server._lock:
+                    server._in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server._in_flight)
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    status, payload, extra = server.respond(path, body, self.headers)
+                    if status == 200 and body.get('stream'):
+                        self._send_stream(payload, extra)
+                    else:
+                        self._send_json(status, payload, extra)
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+
+        return Handler
+
+    # --- Životní cyklus ---
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+@contextmanager
+def isolated_db():
+    """
+    Dočasná SQLite databáze po dobu benchmarku / porovnání — LLM ledger, cache
+    a jejich čítače nezapisují do produkční DB (/api/llm/usage, analysis cache).
+    """
+    import database
+
+    saved = database.DB_PATH
+    with tempfile.TemporaryDirectory(prefix='claude_replay_') as tmp:
+        database.DB_PATH = os.path.join(tmp, 'replay.db')
+        try:
+            database.ensure_schema()
+            yield database.DB_PATH
+        finally:
+            database.DB_PATH = saved
+
+
+def benchmark(requests: int = 20, latency: float = 0.5, faults: List[Optional[int]] = None,
+              retry_after: Optional[float] = 0.0, concurrency_levels: List[int] = None) -> List[Dict]:
+    """
+    Změří sync cestu pipeline proti mock serveru: analýzy přes sdílený get_client()
+    (tenacity retry, rate-limit hooky) souběžně v topic_pool jako témata v auto_publish.
+    Analýzy obcházejí cache a běží nad dočasnou DB (isolated_db) — produkční
+    ledger ani cache se nezmění.
+
+    Returns:
+        [{"concurrency", "wall", "calls", "retries", "errors", "max_in_flight"}, ...]
+    """
+    import claude_analyzer
+    import claude_client
+    import config
+    import topic_pool
+
+    texts = [f"ČLÁNEK 1:\nTitulek: Benchmark {i}\n" for i in range(requests)]
+    saved = (config.CLAUDE_BASE_URL, config.CLAUDE_API_KEY)
+    results = []
+    try:
+        for concurrency in concurrency_levels or [1, 4, 8]:
+            with ReplayServer(mode='mock', latency=latency, faults=faults, retry_after=retry_after) as server, \
+                    isolated_db():
+                config.CLAUDE_BASE_URL = server.base_url
+                config.CLAUDE_API_KEY = 'sk-ant-replay'
+                claude_client.reset_client()
+                start = time.monotonic()
+                outcomes = topic_pool.map_topics(
+                    lambda _, text: claude_analyzer.analyze_gaming_articles(text, use_cache=False),
+                    texts, max_workers=concurrency)
+                wall = time.monotonic() - start
+                results.append({
+                    'concurrency': concurrency,
+                    'wall': round(wall, 3),
+                    'calls': len(server.log),
+                    'retries': sum(1 for _, status in server.log if status != 200),
+                    'errors': sum(1 for outcome in outcomes if outcome is None),
+                    'max_in_flight': server.max_in_flight,
+                })
+    finally:
+        config.CLAUDE_BASE_URL, config.CLAUDE_API_KEY = saved
+        claude_client.reset_client()
+    return results
+
+
+def compare_analysis(articles: List[Dict], mode: str = 'replay', cassette_dir: str = None,
+                     shortlist: int = None, prerank_model: str = None,
+                     upstream_url: str = UPSTREAM_URL) -> Dict[str, Dict]:
+    """
+    Porovná jednostupňovou a dvoustupňovou analýzu na stejných článcích.
+
+    Volání jdou přes ReplayServer (record = skutečné API + nahrání, replay = nahrávky
+    včetně původní latence). Analysis cache se obchází (use_cache=False), cena a tokeny
+    jsou z LLM ledgeru v dočasné DB (isolated_db) — produkční ledger ani cache se nezmění.
+    Čerstvost článků se počítá k nejnovějšímu z nich (ne k dnešku), takže výběr
+    do promptu a tím i klíče nahrávek jsou stejné v kterýkoliv den.
+
+    Returns:
+        {"single": {...}, "tiered": {...}} — součty z llm_ledger.get_run_usage + "wall" a "topics"
+    """
+    import article_packer
+    import claude_analyzer
+    import claude_client
+    import config
+    import llm_ledger
+
+    now = article_packer.latest_published(articles)
+    paths = {
+        'single': lambda: claude_analyzer.analyze_articles_structured(
+            article_packer.pack_articles(articles, now=now)['text'], use_cache=False),
+        'tiered': lambda: claude_analyzer.analyze_articles_tiered(
+            articles, shortlist=shortlist, prerank_model=prerank_model, now=now, use_cache=False),
+    }
+    saved = (config.CLAUDE_BASE_URL, config.CLAUDE_API_KEY, llm_ledger.get_run_id())
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    report = {}
+    with ReplayServer(mode=mode, cassette_dir=cassette_dir, replay_latency=True,
+                      upstream_url=upstream_url) as server, isolated_db():
+        config.CLAUDE_BASE_URL = server.base_url
+        # Replay nepotřebuje skutečný klíč, SDK ale bez klíče request neodešle
+        config.CLAUDE_API_KEY = config.CLAUDE_API_KEY or 'sk-ant-replay'
+        claude_client.reset_client()
+        try:
+            for label, analyze in paths.items():
+                run_id = f"compare-{label}-{stamp}"
+                llm_ledger.set_run_id(run_id)
+                start = time.monotonic()
+                result = analyze()
+                report[label] = dict(llm_ledger.get_run_usage(run_id),
+                                     wall=round(time.monotonic() - start, 3),
+                                     topics=[t['topic'] for t in (result or {}).get('topics', [])])
+        finally:
+            config.CLAUDE_BASE_URL, config.CLAUDE_API_KEY, run_id = saved
+            llm_ledger.set_run_id(run_id)
+            claude_client.reset_client()
+    return report
+
+
+def _parse_faults(value: str) -> List[Optional[int]]:
+    """'529,429,-,-,500' → [529, 429, None, None, 500]."""
+    if not value:
+        return []
+    return [None if item.strip() in ('', '-', '0') else int(item) for item in value.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Lokální náhrada Claude Messages API')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help='Spustit server (CLAUDE_BASE_URL=http://host:port)')
+    serve.add_argument('--mode', choices=('replay', 'record', 'mock'), default='replay')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--cassettes', default=CASSETTE_DIR)
+    serve.add_argument('--latency', type=float, default=0.0)
+    serve.add_argument('--stream-delay', type=float, default=0.0)
+    serve.add_argument('--faults', default='', help='Např. 529,429,-,500 (- = normální odpověď)')
+    serve.add_argument('--retry-after', type=float, default=None)
+
+    bench = sub.add_parser('bench', help='Benchmark souběžnosti + retry (sync get_client() jako auto_publish)')
+    bench.add_argument('--requests', type=int, default=20)
+    bench.add_argument('--latency', type=float, default=0.5)
+    bench.add_argument('--faults', default='529,429')
+    bench.add_argument('--retry-after', type=float, default=0.0)
+    bench.add_argument('--concurrency', default='1,4,8')
+
+    compare = sub.add_parser('compare-analysis', help='Jednostupňová vs. dvoustupňová analýza')
+    compare.add_argument('articles', help='articles.json z output/<běh>/')
+    compare.add_argument('--mode', choices=('replay', 'record'), default='replay')
+    compare.add_argument('--cassettes', default=CASSETTE_DIR)
+    compare.add_argument('--shortlist', type=int, default=None)
+    compare.add_argument('--prerank-model', default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare-analysis':
+        with open(args.articles, 'r', encoding='utf-8') as f:
+            articles = json.load(f)['articles']
+        report = compare_analysis(articles, args.mode, args.cassettes, args.shortlist, args.prerank_model)
+        single, tiered = report['single'], report['tiered']
+        for label, row in report.items():
+            log.info("📊 %-6s: %d volání, %d in / %d out tokenů, $%.4f, %.2f s — %s",
+                     label, row['calls'], row['input_tokens'], row['output_tokens'],
+                     row['cost'], row['wall'], ", ".join(row['topics']) or "bez témat")
+        if single['cost'] and single['wall']:
+            log.info("💰 Úspora: %.0f %% ceny, %.0f %% času",
+                     100 * (1 - tiered['cost'] / single['cost']), 100 * (1 - tiered['wall'] / single['wall']))
+        return
+
+    if args.command == 'serve':
+        server = ReplayServer(mode=args.mode, cassette_dir=args.cassettes, latency=args.latency,
+                              stream_delay=args.stream_delay, faults=_parse_faults(args.faults),
+                              retry_after=args.retry_after, port=args.port)
+        log.info("🎭 Claude replay server (%s) na %s", args.mode, server.base_url)
+        try:
+            server.server.serve_forever()
+        except KeyboardInterrupt:
+            server.server.server_close()
+        return
+
+    rows = benchmark(requests=args.requests, latency=args.latency, faults=_parse_faults(args.faults),
+                     retry_after=args.retry_after,
+                     concurrency_levels=[int(c) for c in args.concurrency.split(',')])
+    for row in rows:
+        log.info("⏱️  souběžnost %2d: %.2f s, %d volání, %d retry, %d chyb, max %d současně",
+                 row['concurrency'], row['wall'], row['calls'], row['retries'],
+                 row['errors'], row['max_in_flight'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""
+Retry a rate-limit plánování pro Claude API (sdílený klient get_client).
+
+- Sleduje zbývající requesty a tokeny z hlaviček anthropic-ratelimit-*
+  (httpx event hooky klienta) a před odesláním počká přesně do resetu,
+  pokud by limit nestačil.
+- Při 429/529/5xx čeká přesně podle retry-after (v sekundách), bez hlavičky
+  krátký exponenciální backoff (1 s, 2 s, 4 s … max CLAUDE_MAX_BACKOFF) —
+  retry_wait je wait strategie pro tenacity.
+
+Souběžnost řeší volající thread pooly (topic_pool, podcast_batch).
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import anthropic
+
+import config
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 529)
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Převede RFC 3339 reset timestamp na počet sekund od teď (None = neznámé)."""
+    if not value:
+        return None
+    try:
+        reset_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if reset_at.tzinfo is None:
+        reset_at = reset_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Vrátí počet sekund z retry-after hlavičky chybové odpovědi (None = hlavička chybí)."""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(retry_at.tzinfo or timezone.utc)).total_seconds())
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Retry na overload (529), rate limit (429), server error (5xx) a connection errory."""
+    if isinstance(exc, (anthropic.APIConnectionError, anthropic.APITimeoutError)):
+        return True
+    if isinstance(exc, anthropic.APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS
+    return False
+
+
+def backoff_seconds(attempt: int, exc: Exception = None) -> float:
+    """
+    Doba čekání před dalším pokusem: retry-after ze serveru (max CLAUDE_MAX_RETRY_AFTER),
+    jinak 1, 2, 4 … s (max CLAUDE_MAX_BACKOFF).
+    """
+    server_delay = retry_after_seconds(exc) if exc is not None else None
+    if server_delay is not None:
+        return min(config.CLAUDE_MAX_RETRY_AFTER, server_delay)
+    return min(config.CLAUDE_MAX_BACKOFF, float(2 ** max(0, attempt - 1)))
+
+
+def retry_wait(retry_state) -> float:
+    """Wait strategie pro tenacity — retry-after ze serveru, jinak backoff_seconds."""
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    return backoff_seconds(retry_state.attempt_number, exc)
+
+
+class RateLimitTracker:
+    """Sdílený stav rate limitů podle hlaviček anthropic-ratelimit-* (thread-safe)."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.requests_remaining = None
+        self.requests_reset_at = None
+        self.input_tokens_remaining = None
+        self.input_tokens_reset_at = None
+        self.output_tokens_remaining = None
+        self.output_tokens_reset_at = None
+
+    def _deadline(self, header_value):
+        seconds = _parse_reset(header_value)
+        return None if seconds is None else self._clock() + seconds
+
+    def update(self, headers) -> None:
+        """Aktualizuje stav z hlaviček odpovědi."""
+        if not headers:
+            return
+        with self._lock:
+            value = _parse_int(headers.get('anthropic-ratelimit-requests-remaining'))
+            if value is not None:
+                self.requests_remaining = value
+                self.requests_reset_at = self._deadline(headers.get('anthropic-ratelimit-requests-reset'))
+            value = _parse_int(headers.get('anthropic-ratelimit-input-tokens-remaining'))
+            if value is not None:
+                self.input_tokens_remaining = value
+                self.input_tokens_reset_at = self._deadline(headers.get('anthropic-ratelimit-input-tokens-reset'))
+            value = _parse_int(headers.get('anthropic-ratelimit-output-tokens-remaining'))
+            if value is not None:
+                self.output_tokens_remaining = value
+                self.output_tokens_reset_at = self._deadline(headers.get('anthropic-ratelimit-output-tokens-reset'))
+
+    def reserve(self, estimated_input_tokens: int = 0, max_output_tokens: int = 0) -> float:
+        """
+        Rezervuje kapacitu pro jeden request.
+
+        Returns:
+            0.0 pokud lze odeslat hned (kapacita se odečte), jinak počet sekund do resetu
+        """
+        with self._lock:
+            now = self._clock()
+            waits = []
+            if self.requests_remaining is not None and self.requests_remaining <= 0:
+                waits.append(self.requests_reset_at)
+            if (self.input_tokens_remaining is not None and estimated_input_tokens
+                    and self.input_tokens_remaining < estimated_input_tokens):
+                waits.append(self.input_tokens_reset_at)
+            if (self.output_tokens_remaining is not None and max_output_tokens
+                    and self.output_tokens_remaining < max_output_tokens):
+                waits.append(self.output_tokens_reset_at)
+
+            deadlines = [d for d in waits if d is not None and d > now]
+            if deadlines:
+                return max(deadlines) - now
+            if waits:
+                # Reset už proběhl (nebo ho neznáme) — limit se obnovil, stav zahodíme
+                self.requests_remaining = None
+                self.input_tokens_remaining = None
+                self.output_tokens_remaining = None
+
+            if self.requests_remaining is not None:
+                self.requests_remaining -= 1
+            if self.input_tokens_remaining is not None:
+                self.input_tokens_remaining -= estimated_input_tokens
+            if self.output_tokens_remaining is not None:
+                self.output_tokens_remaining -= max_output_tokens
+            return 0.0
+
+
+# Sdílený tracker pro celý proces
+tracker = RateLimitTracker()
+
+
+def estimate_request_tokens(kwargs: Dict) -> int:
+    """Hrubý odhad input tokenů requestu (~3.5 znaku/token) pro plánování rate limitu."""
+    chars = len(str(kwargs.get('system', '')))
+    for message in kwargs.get('messages', []):
+        chars += len(str(message.get('content', '')))
+    return int(chars / 3.5)
+
+
+def _is_messages_request(request) -> bool:
+    # Jen messages.create / stream — batches a count_tokens mají vlastní limity
+    return request.method == 'POST' and request.url.path.endswith('/v1/messages')
+
+
+def sync_request_hook(request) -> None:
+    """
+    httpx request hook sync klienta: před odesláním počká do resetu rate limitu,
+    pokud by zbývající kapacita (podle posledních hlaviček) nestačila.
+    """
+    if not _is_messages_request(request):
+        return
+    try:
+        body = json.loads(request.content or b'{}')
+    except ValueError:
+        body = {}
+    estimated = estimate_request_tokens(body)
+    while True:
+        delay = tracker.reserve(estimated, body.get('max_tokens', 0))
+        if delay <= 0:
+            return
+        log.info("⏳ Rate limit: čekám %.1f s do resetu", delay)
+        time.sleep(delay)
+
+
+def sync_response_hook(response) -> None:
+    """httpx response hook sync klienta: aktualizuje sdílený tracker z hlaviček (i u chyb)."""
+    if _is_messages_request(response.request):
+        tracker.update(response.headers)
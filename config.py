@@ -29,6 +29,8 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
 WP_URL = os.getenv("WP_URL", "")
 WP_USER = os.getenv("WP_USER", "")
 WP_APP_PASSWORD = os.getenv("WP_APP_PASSWORD", "")
+# Min. odstup (s) mezi zápisy do WP — zápisy jdou sériově i při souběžných tématech
+WP_WRITE_INTERVAL = float(os.getenv("WP_WRITE_INTERVAL", "1.0"))
 
 # RAWG.io API (herní databáze - obrázky)
 RAWG_API_KEY = os.getenv("RAWG_API_KEY", "")
@@ -87,18 +89,99 @@ MIN_VIRALITY_SCORE = int(os.getenv("MIN_VIRALITY_SCORE", "50"))
 
 # Model pro generování článků
 ARTICLE_MODEL = "claude-sonnet-4-6"
+# Článek přes tool_use (validovaná pole místo regex parsování textu), false = textový formát
+ARTICLE_STRUCTURED_OUTPUT = os.getenv("ARTICLE_STRUCTURED_OUTPUT", "true").lower() in ("1", "true", "yes")
+
+# Sdílený Claude klient — connection pool a timeouty (sekundy)
+CLAUDE_MAX_CONNECTIONS = int(os.getenv("CLAUDE_MAX_CONNECTIONS", "10"))
+CLAUDE_KEEPALIVE_EXPIRY = float(os.getenv("CLAUDE_KEEPALIVE_EXPIRY", "120"))
+CLAUDE_TIMEOUT = float(os.getenv("CLAUDE_TIMEOUT", "300"))
+CLAUDE_CONNECT_TIMEOUT = float(os.getenv("CLAUDE_CONNECT_TIMEOUT", "10"))
+# Alternativní endpoint Claude API (např. lokální claude_replay server), prázdné = api.anthropic.com
+CLAUDE_BASE_URL = os.getenv("CLAUDE_BASE_URL", "")
+# Max souběžných Claude volání (výchozí pro PODCAST_MAX_WORKERS) a strop backoffu (sekundy)
+CLAUDE_MAX_CONCURRENCY = int(os.getenv("CLAUDE_MAX_CONCURRENCY", "4"))
+CLAUDE_MAX_BACKOFF = float(os.getenv("CLAUDE_MAX_BACKOFF", "30"))
+# Strop čekání podle retry-after ze serveru (sekundy) — delší pauzu neblokujeme
+CLAUDE_MAX_RETRY_AFTER = float(os.getenv("CLAUDE_MAX_RETRY_AFTER", "120"))
+# Message Batches API — auto_publish generuje články dávkově (50 % ceny, výsledek do ~1 h)
+AUTO_PUBLISH_BATCH = os.getenv("AUTO_PUBLISH_BATCH", "false").lower() in ("1", "true", "yes")
+# Interval dotazování na stav dávky a max. doba čekání (sekundy)
+CLAUDE_BATCH_POLL_INTERVAL = float(os.getenv("CLAUDE_BATCH_POLL_INTERVAL", "30"))
+CLAUDE_BATCH_TIMEOUT = float(os.getenv("CLAUDE_BATCH_TIMEOUT", "7200"))
+
+# Souběžnost auto_publish
+# Počet témat zpracovávaných v auto_publish souběžně (1 = sériově jako dřív)
+AUTO_PUBLISH_WORKERS = int(os.getenv("AUTO_PUBLISH_WORKERS", "2"))
+# Vlákna pro prefetch médií (RAWG, screenshoty, tagy) spuštěný hned po analýze
+MEDIA_PREFETCH_WORKERS = int(os.getenv("MEDIA_PREFETCH_WORKERS", "4"))
+
+# Selhaná analýza (Claude nedostupný): max. pokusů a odklad dalšího pokusu
+# (běh skončí a opakování převezme auto_publish.py --run-due)
+ANALYSIS_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+ANALYSIS_RETRY_MINUTES = float(os.getenv("ANALYSIS_RETRY_MINUTES", "30"))
+# Převzatá úloha, která nedoběhla (pád/kill procesu), se po této době převezme znovu.
+# Musí pokrýt nejdelší běh — dávka článků čeká až CLAUDE_BATCH_TIMEOUT (2 h) + publikace
+RETRY_JOB_STALE_MINUTES = float(os.getenv("RETRY_JOB_STALE_MINUTES", "240"))
+
+# Checkpointy běhů pro --resume (SQLite) — po kolika dnech se mažou
+RUN_CHECKPOINT_DAYS = int(os.getenv("RUN_CHECKPOINT_DAYS", "7"))
+
+# Podcasty — max. souběžně generovaných scriptů při dávce pro celý běh
+PODCAST_MAX_WORKERS = int(os.getenv("PODCAST_MAX_WORKERS", str(CLAUDE_MAX_CONCURRENCY)))
 
 # Model pro analýzu (přepisovatelný přes .env)
 ANALYSIS_MODEL = os.getenv("ANALYSIS_MODEL", "claude-sonnet-4-6")
+# Dvoustupňová analýza: levný model (nebo lokální skóre) vybere nejslibnější témata,
+# drahý ANALYSIS_MODEL pak analyzuje jen je. Lze přepnout i per běh (auto_publish --tiered)
+ANALYSIS_TIERED = os.getenv("ANALYSIS_TIERED", "false").lower() in ("1", "true", "yes")
+# Model pro pre-ranking ("local" = bez API, jen skóre z article_packer)
+PRERANK_MODEL = os.getenv("PRERANK_MODEL", "claude-haiku-4-5")
+# Počet témat (clusterů článků), která postoupí do plné analýzy
+PRERANK_SHORTLIST = int(os.getenv("PRERANK_SHORTLIST", "8"))
 
 # Maximální délka summary při scrapování RSS (znaky)
 SUMMARY_MAX_LENGTH = int(os.getenv("SUMMARY_MAX_LENGTH", "500"))
 
+# Token budget pro články v analytickém promptu (0 = bez limitu)
+ANALYSIS_TOKEN_BUDGET = int(os.getenv("ANALYSIS_TOKEN_BUDGET", "30000"))
+
+# Cache výsledků analýzy (SQLite, klíč = hash vstupů promptu + model)
+ANALYSIS_CACHE_TTL_HOURS = int(os.getenv("ANALYSIS_CACHE_TTL_HOURS", "24"))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "200"))
+# Cache vygenerovaných článků (SQLite, klíč = hash tématu, zdrojů, délky a verze promptu)
+ARTICLE_CACHE_TTL_HOURS = int(os.getenv("ARTICLE_CACHE_TTL_HOURS", "72"))
+ARTICLE_CACHE_MAX_ENTRIES = int(os.getenv("ARTICLE_CACHE_MAX_ENTRIES", "100"))
+# Cache podcast scriptů (SQLite, klíč = hash promptu s obsahem článku + model)
+PODCAST_CACHE_TTL_HOURS = int(os.getenv("PODCAST_CACHE_TTL_HOURS", "72"))
+PODCAST_CACHE_MAX_ENTRIES = int(os.getenv("PODCAST_CACHE_MAX_ENTRIES", "100"))
+
 # Async RSS scraping
 FEED_TIMEOUT = int(os.getenv("FEED_TIMEOUT", "15"))
 MAX_CONCURRENT_FEEDS = int(os.getenv("MAX_CONCURRENT_FEEDS", "8"))
 MAX_CONCURRENT_PER_DOMAIN = int(os.getenv("MAX_CONCURRENT_PER_DOMAIN", "2"))
 
+# Stahování zdrojových článků — timeout jednoho požadavku, celkový deadline (sekundy),
+# max. souběžných stažení celkem a na jednu doménu
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", "15"))
+SCRAPE_DEADLINE = float(os.getenv("SCRAPE_DEADLINE", "20"))
+SCRAPE_MAX_WORKERS = int(os.getenv("SCRAPE_MAX_WORKERS", "6"))
+SCRAPE_PER_HOST = int(os.getenv("SCRAPE_PER_HOST", "2"))
+# Max. stažených bajtů jedné zdrojové stránky (stahování končí dřív, když se uzavře hlavní obsah)
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(512 * 1024)))
+# Extrakce textu zdrojových článků: auto (nejrychlejší dostupný), selectolax, lxml, html.parser, bs4
+CONTENT_EXTRACTOR = os.getenv("CONTENT_EXTRACTOR", "auto")
+# Cache stažených zdrojů (SQLite) — po TTL se stránka revaliduje (ETag / Last-Modified)
+PAGE_CACHE_TTL_HOURS = int(os.getenv("PAGE_CACHE_TTL_HOURS", "6"))
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "500"))
+# Zhuštění zdrojů před psaním článku: věty relevantní k tématu (BM25) do token budgetu, bez duplicit
+SOURCE_CONDENSE = os.getenv("SOURCE_CONDENSE", "true").lower() in ("1", "true", "yes")
+# Budget ~ dřívější vstup 3 zdroje × 3000 znaků (~2600 tokenů): zhuštění neposílá méně textu,
+# jen relevantnější věty z delších (12000 znaků) zdrojů
+SOURCE_TOKEN_BUDGET = int(os.getenv("SOURCE_TOKEN_BUDGET", "2600"))
+# Max. znaků textu jednoho zdroje ze scrapingu (bez zhuštění se drží původních 3000)
+SOURCE_MAX_CHARS = int(os.getenv("SOURCE_MAX_CHARS", "12000")) if SOURCE_CONDENSE else 3000
+
 # Dashboard autentizace (volitelný bearer token, POVINNÝ v produkci)
 DASHBOARD_TOKEN = os.getenv("DASHBOARD_TOKEN", "")
 
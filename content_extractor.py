@@ -0,0 +1,598 @@
+"""
+Content Extractor — vytažení hlavního textu článku z HTML zdrojové stránky.
+
+Readability-style skórování: každý delší odstavec přidá body rodiči (a polovinu
+prarodiči) podle délky a počtu čárek, kandidát se upraví podle class/id
+(content/article vs. nav/cookie/comments) a hustoty odkazů. Pro známé weby
+mají přednost selektory z DOMAIN_HINTS.
+
+Parser je zaměnitelný (CONTENT_EXTRACTOR): selectolax a lxml jsou volitelné
+C parsery, html.parser ze stdlib je vždy k dispozici, bs4 = původní extrakce.
+
+Benchmark na uloženém korpusu stránek:
+    python content_extractor.py tests/fixtures/extractor_corpus
+"""
+
+import codecs
+import json
+import os
+import re
+import sys
+import time
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import config
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+    _HAS_SELECTOLAX = True
+except ImportError:
+    _HAS_SELECTOLAX = False
+
+try:
+    import lxml.html as _lxml_html
+    _HAS_LXML = True
+except ImportError:
+    _HAS_LXML = False
+
+# Tagy, jejichž obsah nikdy není text článku
+REMOVE_TAGS = ('script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe',
+               'noscript', 'form', 'svg', 'button', 'template')
+# Bloky, ze kterých se skládá výsledný text
+TEXT_TAGS = ('p', 'h1', 'h2', 'h3', 'h4', 'li', 'blockquote', 'pre', 'figcaption')
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+              'meta', 'param', 'source', 'track', 'wbr'}
+
+POSITIVE_PATTERN = re.compile(r'article|body|content|entry|main|post|story|text|prose', re.I)
+NEGATIVE_PATTERN = re.compile(
+    r'comment|footer|footnote|nav|menu|sidebar|widget|cookie|consent|gdpr|banner|promo|'
+    r'related|share|social|newsletter|subscribe|advert|sponsor|breadcrumb|tags|popup|modal', re.I)
+
+# Min. délka odstavce, který se započítá do skóre
+MIN_PARAGRAPH_CHARS = 25
+# Kandidát s kratším textem se považuje za neúspěch → fallback selektory
+MIN_CONTENT_CHARS = 200
+# Původní pořadí selektorů (fallback, když skórování nic nenajde)
+FALLBACK_SELECTORS = ('article', 'main', '.article-body', '.post-content', '.entry-content')
+# Kontejnery, po jejichž uzavření může streamované stahování skončit
+STREAM_CONTAINERS = FALLBACK_SELECTORS + ('.article-content', '.story-body')
+
+# Selektory hlavního obsahu pro konkrétní weby (doména bez www → tag#id.class)
+DOMAIN_HINTS = {
+    'pcgamer.com': '#article-body',
+    'gamesradar.com': '#article-body',
+    'techradar.com': '#article-body',
+}
+
+
+# --- Jednoduché selektory (tag, #id, .class a jejich kombinace) ---
+
+_SELECTOR_RE = re.compile(r'^(?P<tag>[a-z0-9]+)?(?P<rest>(?:[#.][\w-]+)*)$', re.I)
+
+
+def _parse_selector(selector: str):
+    match = _SELECTOR_RE.match(selector.strip())
+    if not match:
+        raise ValueError(f"Nepodporovaný selektor: {selector}")
+    rest = match.group('rest')
+    ids = re.findall(r'#([\w-]+)', rest)
+    classes = re.findall(r'\.([\w-]+)', rest)
+    return (match.group('tag') or '').lower(), ids[0] if ids else None, set(classes)
+
+
+def _matches(parsed, tag: str, el_id: str, el_classes: str) -> bool:
+    want_tag, want_id, want_classes = parsed
+    if want_tag and tag != want_tag:
+        return False
+    if want_id and el_id != want_id:
+        return False
+    return not want_classes or want_classes <= set((el_classes or '').split())
+
+
+# --- Backendy ---
+
+class _Node:
+    """Uzel stromu pro html.parser backend."""
+    __slots__ = ('tag', 'attrs', 'parent', 'children')
+
+    def __init__(self, tag, attrs, parent):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []  # _Node nebo str
+
+
+def _node_text(el) -> str:
+    parts = []
+    stack = [el]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            parts.append(node)
+        else:
+            stack.extend(reversed(node.children))
+    return ' '.join(''.join(parts).split())
+
+
+class _TreeBuilder(HTMLParser):
+    """Jednoprůchodový builder; obsah REMOVE_TAGS se vůbec nestaví."""
+
+    def __init__(self, watch=()):
+        super().__init__(convert_charrefs=True)
+        self.root = _Node('#root', {}, None)
+        self._stack = [self.root]
+        self._skip = 0
+        # Selektory kontejneru hlavního obsahu — jeho uzavření nastaví container_closed
+        self._watch = [_parse_selector(selector) for selector in watch]
+        self.container_closed = False
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip:
+            if tag in REMOVE_TAGS:
+                self._skip += 1
+            return
+        if tag in REMOVE_TAGS:
+            self._skip = 1
+            return
+        if tag == 'p' and self._stack[-1].tag == 'p':
+            self._stack.pop()  # neuzavřený <p> se implicitně zavírá dalším
+        node = _Node(tag, dict(attrs), self._stack[-1])
+        self._stack[-1].children.append(node)
+        if tag not in _VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_endtag(self, tag):
+        if self._skip:
+            if tag in REMOVE_TAGS:
+                self._skip -= 1
+            return
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                if self._watch and not self.container_closed:
+                    self.container_closed = any(self._is_container(node) for node in self._stack[i:])
+                del self._stack[i:]
+                return
+
+    def _is_container(self, node) -> bool:
+        attrs = node.attrs
+        if not any(_matches(parsed, node.tag, attrs.get('id'), attrs.get('class')) for parsed in self._watch):
+            return False
+        # <article> v sidebaru / bloku souvisejících článků není hlavní obsah
+        ancestor = node
+        while ancestor is not None:
+            if NEGATIVE_PATTERN.search(f"{ancestor.attrs.get('class') or ''} {ancestor.attrs.get('id') or ''}"):
+                return False
+            ancestor = ancestor.parent
+        return len(_node_text(node)) >= MIN_CONTENT_CHARS
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._stack[-1].children.append(data)
+
+
+class StdlibBackend:
+    """html.parser ze standardní knihovny (bez závislostí)."""
+    name = 'html.parser'
+
+    def parse(self, html):
+        builder = _TreeBuilder()
+        builder.feed(html)
+        builder.close()
+        return builder.root
+
+    def iter(self, root):
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(child for child in reversed(node.children) if isinstance(child, _Node))
+
+    def tag(self, el):
+        return el.tag
+
+    def attr(self, el, name):
+        return el.attrs.get(name) or ''
+
+    def parent(self, el):
+        return el.parent
+
+    def key(self, el):
+        return id(el)
+
+    def text(self, el):
+        return _node_text(el)
+
+
+class LxmlBackend:
+    """lxml.html (libxml2, C parser)."""
+    name = 'lxml'
+
+    def parse(self, html):
+        root = _lxml_html.fromstring(html)
+        for el in list(root.iter(*REMOVE_TAGS)):
+            el.drop_tree()
+        return root
+
+    def iter(self, root):
+        return (el for el in root.iter() if isinstance(el.tag, str))
+
+    def tag(self, el):
+        return el.tag.lower()
+
+    def attr(self, el, name):
+        return el.get(name) or ''
+
+    def parent(self, el):
+        return el.getparent()
+
+    def key(self, el):
+        return el
+
+    def text(self, el):
+        return ' '.join(el.text_content().split())
+
+
+class SelectolaxBackend:
+    """selectolax (Lexbor engine, C parser)."""
+    name = 'selectolax'
+
+    def parse(self, html):
+        tree = _SelectolaxParser(html)
+        for node in tree.css(','.join(REMOVE_TAGS)):
+            node.decompose()
+        return tree.root
+
+    def iter(self, root):
+        return (node for node in root.traverse() if node.tag and not node.tag.startswith('-'))
+
+    def tag(self, el):
+        return el.tag
+
+    def attr(self, el, name):
+        return el.attributes.get(name) or ''
+
+    def parent(self, el):
+        return el.parent
+
+    def key(self, el):
+        return el.mem_id
+
+    def text(self, el):
+        return ' '.join(el.text(separator=' ').split())
+
+
+class Bs4Backend:
+    """Původní extrakce přes BeautifulSoup (pro porovnání v benchmarku)."""
+    name = 'bs4'
+
+
+BACKENDS = {
+    'selectolax': SelectolaxBackend,
+    'lxml': LxmlBackend,
+    'html.parser': StdlibBackend,
+    'bs4': Bs4Backend,
+}
+
+
+def available_backends() -> List[str]:
+    """Názvy backendů, které lze v tomto prostředí použít."""
+    names = []
+    if _HAS_SELECTOLAX:
+        names.append('selectolax')
+    if _HAS_LXML:
+        names.append('lxml')
+    return names + ['html.parser', 'bs4']
+
+
+def get_backend(name: str = None):
+    """Vrátí backend podle názvu ("auto" = nejrychlejší dostupný)."""
+    name = name or config.CONTENT_EXTRACTOR
+    if name == 'auto':
+        name = available_backends()[0]
+    if name not in available_backends():
+        log.warning("Extractor '%s' není dostupný, použiji html.parser", name)
+        name = 'html.parser'
+    return BACKENDS[name]()
+
+
+# --- Extrakce ---
+
+def _class_weight(backend, el) -> float:
+    label = f"{backend.attr(el, 'class')} {backend.attr(el, 'id')}"
+    weight = 0.0
+    if NEGATIVE_PATTERN.search(label):
+        weight -= 25
+    if POSITIVE_PATTERN.search(label):
+        weight += 25
+    return weight
+
+
+def _link_density(backend, el, text_len: int) -> float:
+    if not text_len:
+        return 1.0
+    link_chars = sum(len(backend.text(a)) for a in backend.iter(el) if backend.tag(a) == 'a')
+    return min(1.0, link_chars / text_len)
+
+
+def _collect_text(backend, el) -> str:
+    """Text kandidáta po blocích (odstavce, nadpisy, položky seznamu) oddělených řádkem."""
+    lines = []
+    for node in backend.iter(el):
+        if backend.tag(node) not in TEXT_TAGS:
+            continue
+        text = backend.text(node)
+        if text and (not lines or lines[-1] != text):
+            lines.append(text)
+    if not lines:
+        return backend.text(el)
+    # Vnořené bloky (li > p) by se opakovaly — ponech jen první výskyt
+    seen = set()
+    unique = []
+    for line in lines:
+        if line not in seen:
+            seen.add(line)
+            unique.append(line)
+    return '\n'.join(unique)
+
+
+def _find_first(backend, root, selector: str):
+    parsed = _parse_selector(selector)
+    for el in backend.iter(root):
+        if _matches(parsed, backend.tag(el), backend.attr(el, 'id'), backend.attr(el, 'class')):
+            return el
+    return None
+
+
+def _best_candidate(backend, root):
+    """Readability-style výběr elementu s nejvyšším skóre."""
+    candidates = {}
+    for el in backend.iter(root):
+        if backend.tag(el) not in ('p', 'pre'):
+            continue
+        text = backend.text(el)
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        points = 1 + text.count(',') + min(len(text) // 100, 3)
+        parent = backend.parent(el)
+        grandparent = backend.parent(parent) if parent is not None else None
+        for ancestor, share in ((parent, 1.0), (grandparent, 0.5)):
+            if ancestor is None:
+                continue
+            key = backend.key(ancestor)
+            if key not in candidates:
+                candidates[key] = [ancestor, _class_weight(backend, ancestor)]
+            candidates[key][1] += points * share
+
+    if not candidates:
+        return None
+    # Hustotu odkazů stačí spočítat pro nejlepší kandidáty
+    top = sorted(candidates.values(), key=lambda c: c[1], reverse=True)[:5]
+    best, best_score = None, float('-inf')
+    for el, score in top:
+        adjusted = score * (1 - _link_density(backend, el, len(backend.text(el))))
+        if adjusted > best_score:
+            best, best_score = el, adjusted
+    return best
+
+
+def _domain_hint(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    host = urlparse(url).netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return DOMAIN_HINTS.get(host)
+
+
+def _extract_bs4(html: str) -> str:
+    """Původní algoritmus: decompose + první shoda z pevného seznamu selektorů."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe', 'noscript']):
+        tag.decompose()
+    content = None
+    for selector in ['article', 'main', '[role="main"]', '.article-body', '.post-content', '.entry-content']:
+        content = soup.select_one(selector)
+        if content:
+            break
+    if not content:
+        content = soup.body if soup.body else soup
+    text = content.get_text(separator='\n', strip=True)
+    return '\n'.join(line.strip() for line in text.split('\n') if line.strip())
+
+
+def extract_text(html: str, url: str = None, max_chars: int = 3000, backend=None) -> str:
+    """
+    Vytáhne hlavní text článku.
+
+    Args:
+        html: HTML stránky
+        url: URL stránky (pro DOMAIN_HINTS)
+        max_chars: Max. délka výsledku (0 = bez limitu)
+        backend: Název nebo instance backendu (None = config.CONTENT_EXTRACTOR)
+
+    Returns:
+        Text po odstavcích oddělených novým řádkem
+    """
+    if backend is None or isinstance(backend, str):
+        backend = get_backend(backend)
+    if not html or not html.strip():
+        return ''
+    if isinstance(backend, Bs4Backend):
+        text = _extract_bs4(html)
+        return text[:max_chars] if max_chars else text
+    return _extract_tree(backend, backend.parse(html), url, max_chars)
+
+
+def _extract_tree(backend, root, url: Optional[str], max_chars: int) -> str:
+    text = ''
+
+    hint = _domain_hint(url)
+    if hint:
+        el = _find_first(backend, root, hint)
+        if el is not None:
+            text = _collect_text(backend, el)
+
+    if len(text) < MIN_CONTENT_CHARS:
+        el = _best_candidate(backend, root)
+        if el is not None:
+            text = _collect_text(backend, el)
+
+    if len(text) < MIN_CONTENT_CHARS:
+        for selector in FALLBACK_SELECTORS:
+            el = _find_first(backend, root, selector)
+            if el is not None:
+                candidate = _collect_text(backend, el)
+                if len(candidate) > len(text):
+                    text = candidate
+                    break
+
+    if not text:
+        text = _collect_text(backend, root)
+    return text[:max_chars] if max_chars else text
+
+
+# --- Streamované stahování ---
+
+_SNIFF_BYTES = 2048
+_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+
+def sniff_encoding(head: bytes) -> str:
+    """Kódování z <meta charset> na začátku stránky (výchozí UTF-8)."""
+    match = _CHARSET_RE.search(head[:_SNIFF_BYTES])
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode('ascii')).name
+        except LookupError:
+            pass
+    return 'utf-8'
+
+
+class StreamingExtractor:
+    """
+    Inkrementální parsování stránky stahované po blocích.
+
+    feed() vrací True, jakmile se uzavře kontejner hlavního obsahu (selektor
+    z DOMAIN_HINTS nebo STREAM_CONTAINERS s aspoň MIN_CONTENT_CHARS textu, který
+    ani jeho předek nemá class/id z NEGATIVE_PATTERN) —
+    zbytek stránky (komentáře, patička, skripty) už není potřeba stahovat.
+    Pro html.parser backend se extrahuje přímo z rozpracovaného stromu,
+    ostatní backendy parsují dosud stažené HTML.
+    """
+
+    def __init__(self, url: str = None, encoding: str = None):
+        self.url = url
+        self.encoding = encoding
+        self.bytes_read = 0
+        self._decoder = None
+        self._head = b''
+        self._parts = []
+        hint = _domain_hint(url)
+        self._builder = _TreeBuilder(watch=((hint,) if hint else ()) + STREAM_CONTAINERS)
+
+    @property
+    def container_closed(self) -> bool:
+        return self._builder.container_closed
+
+    def feed(self, data: bytes) -> bool:
+        if not data:
+            return self.container_closed
+        self.bytes_read += len(data)
+        if self._decoder is None:
+            # Začátek stránky se drží, dokud nestačí na hledání <meta charset>
+            self._head += data
+            if self.encoding is None and len(self._head) < _SNIFF_BYTES:
+                return False
+            data, self._head = self._start_decoding(), b''
+        self._parse(self._decoder.decode(data))
+        return self.container_closed
+
+    def close(self):
+        if self._decoder is None:
+            self._parse(self._start_decoding().decode(self.encoding, errors='replace'))
+        else:
+            self._parse(self._decoder.decode(b'', final=True))
+        self._builder.close()
+
+    def _start_decoding(self) -> bytes:
+        self.encoding = self.encoding or sniff_encoding(self._head)
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+        return self._head
+
+    def _parse(self, chunk: str):
+        if chunk:
+            self._parts.append(chunk)
+            self._builder.feed(chunk)
+
+    @property
+    def html(self) -> str:
+        return ''.join(self._parts)
+
+    def extract(self, max_chars: int = 3000, backend=None) -> str:
+        """Text hlavního obsahu z dosud stažené části stránky (po close())."""
+        if backend is None or isinstance(backend, str):
+            backend = get_backend(backend)
+        if isinstance(backend, StdlibBackend):
+            return _extract_tree(backend, self._builder.root, self.url, max_chars)
+        return extract_text(self.html, self.url, max_chars, backend)
+
+
+# --- Benchmark ---
+
+def load_corpus(corpus_dir: str) -> List[Dict]:
+    """Načte korpus: corpus.json ([{file, url, expected, unwanted}]) + uložené HTML stránky."""
+    with open(os.path.join(corpus_dir, 'corpus.json'), 'r', encoding='utf-8') as f:
+        cases = json.load(f)
+    for case in cases:
+        with open(os.path.join(corpus_dir, case['file']), 'r', encoding='utf-8') as f:
+            case['html'] = f.read()
+    return cases
+
+
+def score_case(text: str, case: Dict) -> Dict:
+    """Kvalita extrakce: podíl nalezených očekávaných vět a počet prosáklých nežádoucích."""
+    expected = case.get('expected', [])
+    unwanted = case.get('unwanted', [])
+    found = sum(1 for snippet in expected if snippet in text)
+    leaked = sum(1 for snippet in unwanted if snippet in text)
+    return {'recall': found / len(expected) if expected else 1.0, 'leaked': leaked}
+
+
+def benchmark(corpus_dir: str, backends: List[str] = None, repeat: int = 5) -> List[Dict]:
+    """
+    Změří rychlost a kvalitu backendů na korpusu.
+
+    Returns:
+        [{"backend", "ms_per_page", "recall", "leaked"}, ...]
+    """
+    cases = load_corpus(corpus_dir)
+    rows = []
+    for name in backends or available_backends():
+        backend = get_backend(name)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            texts = [extract_text(case['html'], case.get('url'), backend=backend) for case in cases]
+        elapsed = (time.perf_counter() - start) / (repeat * len(cases))
+        scores = [score_case(text, case) for text, case in zip(texts, cases)]
+        rows.append({
+            'backend': name,
+            'ms_per_page': round(elapsed * 1000, 2),
+            'recall': round(sum(s['recall'] for s in scores) / len(scores), 3),
+            'leaked': sum(s['leaked'] for s in scores),
+        })
+    return rows
+
+
+if __name__ == '__main__':
+    corpus = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'tests', 'fixtures', 'extractor_corpus')
+    for row in benchmark(corpus):
+        log.info("⏱️  %-12s %7.2f ms/stránka, recall %.0f %%, nežádoucí bloky: %d",
+                 row['backend'], row['ms_per_page'], row['recall'] * 100, row['leaked'])
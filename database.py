@@ -51,6 +51,95 @@ CREATE TABLE IF NOT EXISTS meta (
     value TEXT
 );
 
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    cache_key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    model TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_used TEXT NOT NULL,
+    payload_json TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS article_cache (
+    cache_key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    model TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_used TEXT NOT NULL,
+    payload_json TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS podcast_cache (
+    cache_key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    model TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_used TEXT NOT NULL,
+    payload_json TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS page_cache (
+    url TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at TEXT NOT NULL,
+    last_used TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS llm_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    run_id TEXT,
+    purpose TEXT NOT NULL,
+    model TEXT NOT NULL,
+    input_tokens INTEGER DEFAULT 0,
+    output_tokens INTEGER DEFAULT 0,
+    cache_read_tokens INTEGER DEFAULT 0,
+    cache_write_tokens INTEGER DEFAULT 0,
+    latency_ms INTEGER,
+    retries INTEGER DEFAULT 0,
+    batch INTEGER DEFAULT 0,
+    cost REAL DEFAULT 0,
+    status TEXT NOT NULL,
+    error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_calls_timestamp ON llm_calls (timestamp);
+
+CREATE TABLE IF NOT EXISTS run_checkpoints (
+    run_id TEXT PRIMARY KEY,
+    run_dir TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    artifacts_json TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE TABLE IF NOT EXISTS topic_checkpoints (
+    run_id TEXT NOT NULL,
+    topic_index INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    artifacts_json TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (run_id, topic_index)
+);
+
+CREATE TABLE IF NOT EXISTS retry_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    due_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    claimed_at TEXT,
+    finished_at TEXT,
+    options_json TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE INDEX IF NOT EXISTS idx_retry_jobs_due ON retry_jobs (status, due_at);
+
 CREATE TABLE IF NOT EXISTS cleanup_log (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     timestamp TEXT NOT NULL,
@@ -75,15 +164,24 @@ def get_db(path=None):
     return conn
 
 
+def ensure_schema(path=None):
+    """Doplní chybějící tabulky (CREATE IF NOT EXISTS) — bezpečné volat opakovaně."""
+    conn = get_db(path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def init_db(path=None):
     """Inicializuje schéma databáze."""
-    conn = get_db(path)
-    conn.executescript(SCHEMA)
-    conn.commit()
-    conn.close()
+    ensure_schema(path)
     log.info("SQLite databáze inicializována: %s", path or DB_PATH)
 
 
-# Auto-init při prvním importu
+# Auto-init při prvním importu; existující DB dostane nově přidané tabulky
 if not os.path.exists(DB_PATH):
     init_db()
+else:
+    ensure_schema()
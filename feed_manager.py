@@ -85,6 +85,17 @@ def get_enabled_feeds():
     ]
 
 
+def get_source_weights():
+    """Vrati vahy zdroju pro razeni clanku {nazev feedu: vaha}. Feed bez 'weight' ma vahu 1.0."""
+    weights = {}
+    for f in load_feeds():
+        try:
+            weights[f["name"]] = float(f.get("weight", 1.0))
+        except (TypeError, ValueError):
+            weights[f["name"]] = 1.0
+    return weights
+
+
 def _validate_feed(name, url, lang, feeds=None, exclude_id=None):
     """Validuje feed data. Vraci chybovou hlasku nebo None."""
     if not name or not name.strip():
@@ -0,0 +1,334 @@
+"""
+HTML Pipeline — jednoprůchodové úpravy vygenerovaného HTML článku.
+
+Jeden tokenizér (tagy, komentáře, text a markdown artefakty) a jeden průchod
+po blocích nejvyšší úrovně nahrazuje řetězec regexů:
+    markdown    ```html fence, # nadpisy, ---, **tučně** → HTML
+    sources     AI sekce <h2>Zdroje|Sources</h2><ul>…</ul> pryč (i s oddělovačem)
+    separators  WP oddělovač před každým <h2> kromě prvního
+    quote       první <p> do <blockquote class="wp-block-quote">
+    heading     první h1/h2 (nebo markdown nadpis) pryč — WP má titulek zvlášť
+    blocks      Gutenberg komentáře kolem p, h2, h3, ul, ol, blockquote, <hr/>
+Ve stejném průchodu vzniká excerpt (první odstavec s víc než 30 znaky).
+
+Microbenchmark nad golden články:
+    python html_pipeline.py tests/fixtures/html_pipeline
+"""
+
+import html as html_lib
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+# Úpravy hned po vygenerování (textový výstup / strukturovaný tool výstup)
+GENERATED_STAGES = ('markdown', 'sources', 'separators', 'quote')
+TOOL_STAGES = ('separators', 'quote')
+STAGES = ('markdown', 'sources', 'separators', 'quote', 'heading', 'blocks')
+
+SEPARATOR = '<hr class="wp-block-separator has-alpha-channel-opacity"/>'
+QUOTE_OPEN = '<blockquote class="wp-block-quote">'
+# Min. délka odstavce pro excerpt (kratší úvodní řádky se přeskočí)
+EXCERPT_MIN_CHARS = 30
+
+_BLOCK_COMMENTS = {
+    'p': ('<!-- wp:paragraph -->', '<!-- /wp:paragraph -->'),
+    'h2': ('<!-- wp:heading -->', '<!-- /wp:heading -->'),
+    'h3': ('<!-- wp:heading {"level":3} -->', '<!-- /wp:heading -->'),
+    'ul': ('<!-- wp:list -->', '<!-- /wp:list -->'),
+    'ol': ('<!-- wp:list {"ordered":true} -->', '<!-- /wp:list -->'),
+    'blockquote': ('<!-- wp:quote -->', '<!-- /wp:quote -->'),
+}
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+              'meta', 'param', 'source', 'track', 'wbr'}
+_SOURCES_RE = re.compile(r'\s*(?:Zdroje|Sources)\s*', re.I)
+
+# --- Tokenizér ---
+# Token = (druh, raw, jméno tagu): start / end / void / comment / text,
+# md = nepřevedený markdown artefakt (jméno: fence / heading / bold / rule)
+
+_HTML_TOKENS = (r'(?P<comment><!--[\s\S]*?-->)|'
+                r'(?P<tag><(?P<close>/?)(?P<name>[a-zA-Z][a-zA-Z0-9]*)[^>]*>)|')
+_MARKDOWN_TOKENS = (
+    r'(?P<fence>```html\s*\n?|```\s*$)|'
+    r'(?P<heading>^(?P<hashes>#+)\s+(?P<heading_text>.+)$)|'
+    r'(?P<rule>^-{3,}\s*$)|'
+    r'(?P<bold>\*\*(?P<bold_text>.+?)\*\*)|'
+)
+_HTML_RE = re.compile(_HTML_TOKENS + r'(?P<text>[^<]+|<)')
+# Text končí jen tam, kde může začínat markdown artefakt (`, **, # nebo - na začátku řádku)
+_MARKDOWN_RE = re.compile(
+    _HTML_TOKENS + _MARKDOWN_TOKENS + r'(?P<text>(?:[^<`*\n]|\*(?!\*)|\n(?![#-]))+|[\s\S])', re.M)
+
+_QUOTE_START = ('start', QUOTE_OPEN, 'blockquote')
+_QUOTE_END = ('end', '</blockquote>', 'blockquote')
+_SEPARATOR = [('text', '\n', ''), ('void', SEPARATOR, 'hr'), ('text', '\n', '')]
+
+
+def _tokenize(html: str, markdown: bool, convert: bool) -> Iterable[Tuple[str, str, str]]:
+    """
+    Rozloží HTML na tokeny. S markdown=True rozpozná i markdown artefakty;
+    convert=True je rovnou převede na HTML tokeny, jinak zůstanou jako 'md'
+    (stage heading je umí odstranit na začátku, jinak se vypíší beze změny).
+    """
+    pattern = _MARKDOWN_RE if markdown else _HTML_RE
+    text = []
+    for match in pattern.finditer(html):
+        group = match.lastgroup
+        if group == 'text':
+            text.append(match.group())
+            continue
+        if text:
+            yield ('text', ''.join(text), '')
+            text = []
+        raw = match.group()
+        if group == 'tag':
+            name = match.group('name').lower()
+            if match.group('close'):
+                yield ('end', raw, name)
+            elif name in _VOID_TAGS or raw.endswith('/>'):
+                yield ('void', raw, name)
+            else:
+                yield ('start', raw, name)
+        elif group == 'comment':
+            yield ('comment', raw, '')
+        elif not convert or group == 'fence':
+            yield ('md', raw, group)
+        elif group == 'heading':
+            level = 'h3' if len(match.group('hashes')) >= 3 else 'h2'
+            yield ('start', f'<{level}>', level)
+            yield from _tokenize(match.group('heading_text'), markdown, convert)
+            yield ('end', f'</{level}>', level)
+        elif group == 'bold':
+            yield ('start', '<strong>', 'strong')
+            yield from _tokenize(match.group('bold_text'), markdown, convert)
+            yield ('end', '</strong>', 'strong')
+        else:  # rule
+            yield ('void', '<hr>', 'hr')
+    if text:
+        yield ('text', ''.join(text), '')
+
+
+def _blocks(tokens: Iterable[Tuple[str, str, str]]) -> Iterable[List[Tuple[str, str, str]]]:
+    """Seskupí tokeny do bloků nejvyšší úrovně (element od otevření po uzavření, nebo jeden token)."""
+    block = []
+    stack = []
+    for token in tokens:
+        kind = token[0]
+        if kind == 'md' and token[2] == 'fence':
+            continue  # code fence se zahazuje vždy
+        if not stack:
+            if kind != 'start':
+                yield [token]
+                continue
+            block = [token]
+            stack.append(token[2])
+            continue
+        block.append(token)
+        if kind == 'start':
+            stack.append(token[2])
+        elif kind == 'end' and token[2] in stack:
+            while stack.pop() != token[2]:
+                pass
+            if not stack:
+                yield block
+    if stack:
+        yield block
+
+
+def _block_text(block) -> str:
+    return ' '.join(html_lib.unescape(''.join(t[1] for t in block if t[0] == 'text')).split())
+
+
+def _truncate(text: str, max_len: int) -> str:
+    if len(text) <= max_len:
+        return text
+    # Ořízni na celé slovo
+    truncated = text[:max_len]
+    last_space = truncated.rfind(' ')
+    if last_space > max_len // 2:
+        truncated = truncated[:last_space]
+    return truncated + '…'
+
+
+class _Writer:
+    """Výstup průchodu: Gutenberg komentáře a zachycení excerptu na úrovni tokenů."""
+
+    def __init__(self, blocks: bool, excerpt_len: int):
+        self.parts = []
+        self.blocks = blocks
+        self.excerpt_len = excerpt_len
+        self.excerpt = ''
+        self._stack = []
+        self._paragraph = None  # texty právě otevřeného <p> (dokud není excerpt)
+
+    def write(self, tokens):
+        parts = self.parts
+        stack = self._stack
+        blocks = self.blocks
+        for kind, raw, name in tokens:
+            if kind == 'start':
+                stack.append(name)
+                if blocks and name in _BLOCK_COMMENTS:
+                    parts.append(_BLOCK_COMMENTS[name][0] + '\n')
+                parts.append(raw)
+                if name == 'p' and not self.excerpt:
+                    self._paragraph = []
+            elif kind == 'end':
+                parts.append(raw)
+                if name in stack:
+                    while stack:
+                        closed = stack.pop()
+                        self._close(closed)
+                        if closed == name:
+                            break
+            elif kind == 'void' and blocks and name == 'hr' and raw.endswith('/>'):
+                parts.append(f'<!-- wp:separator -->\n{raw}\n<!-- /wp:separator -->')
+            else:
+                parts.append(raw)
+                if kind == 'text' and self._paragraph is not None:
+                    self._paragraph.append(raw)
+
+    def _close(self, name: str):
+        if self.blocks and name in _BLOCK_COMMENTS:
+            self.parts.append('\n' + _BLOCK_COMMENTS[name][1])
+        if name == 'p' and self._paragraph is not None:
+            text = ' '.join(html_lib.unescape(''.join(self._paragraph)).split())
+            self._paragraph = None
+            if len(text) > EXCERPT_MIN_CHARS:
+                self.excerpt = _truncate(text, self.excerpt_len)
+
+
+def process(html: str, stages: Iterable[str] = GENERATED_STAGES, excerpt_len: int = 200) -> Dict[str, str]:
+    """
+    Provede zvolené úpravy jedním průchodem.
+
+    Args:
+        html: HTML článku
+        stages: Názvy úprav ze STAGES (pořadí nehraje roli)
+        excerpt_len: Max. délka excerptu (oříznutí na celé slovo + „…“)
+
+    Returns:
+        {"html": upravené HTML, "excerpt": první odstavec nebo ""}
+    """
+    stages = set(stages)
+    unknown = stages - set(STAGES)
+    if unknown:
+        raise ValueError(f"Neznámé úpravy HTML: {', '.join(sorted(unknown))}")
+    markdown = 'markdown' in stages
+    strip_heading = 'heading' in stages
+    separators = 'separators' in stages
+    sources = 'sources' in stages
+    tokens = _tokenize(html or '', markdown or strip_heading, convert=markdown)
+
+    out = _Writer('blocks' in stages, excerpt_len)
+    pending = []            # mezery čekající na další blok (zahodí se s odstraněným blokem)
+    held = None             # <h2>Zdroje</h2> čekající na rozhodnutí, zda následuje <ul>
+    skip_space = False      # mezery za odstraněným blokem
+    started = False         # už byl vypsán obsah (pro stage heading)
+    h2_seen = 0
+    quoted = 'quote' not in stages
+
+    for block in _blocks(tokens):
+        kind, raw, name = block[0]
+        if kind == 'text' and len(block) == 1 and not raw.strip():
+            if not skip_space:
+                pending.append(block[0])
+            continue
+
+        if held is not None:
+            if kind == 'start' and raw == '<ul>':
+                held, pending, skip_space = None, [], True
+                continue
+            out.write(held)
+            held = None
+        skip_space = False
+
+        if not started and strip_heading:
+            if kind == 'start' and name in ('h1', 'h2'):
+                started, pending, skip_space = True, [], True
+                h2_seen += name == 'h2'
+                continue
+            if kind == 'md' and name == 'heading' and len(raw) - len(raw.lstrip('#')) <= 3:
+                started, pending, skip_space = True, [], True
+                continue
+        started = True
+
+        if kind == 'start' and name == 'h2':
+            h2_seen += 1
+            prefix = pending + _SEPARATOR if h2_seen > 1 and separators else pending
+            pending = []
+            if sources and raw == '<h2>' and _SOURCES_RE.fullmatch(_block_text(block)):
+                # Rozhodne až další blok: následuje-li <ul>, zmizí sekce i s mezerami okolo
+                held = prefix + block
+                continue
+            out.write(prefix)
+            out.write(block)
+            continue
+
+        if pending:
+            out.write(pending)
+            pending = []
+        if not quoted and kind == 'start' and name == 'p':
+            quoted = True
+            block = [_QUOTE_START] + block + [_QUOTE_END]
+        out.write(block)
+
+    if held is not None:
+        out.write(held)
+    if not skip_space:
+        out.write(pending)
+
+    result = ''.join(out.parts)
+    if markdown:
+        result = result.strip()
+    return {'html': result, 'excerpt': out.excerpt}
+
+
+def excerpt(html: str, max_len: int = 200) -> str:
+    """Jen excerpt — první odstavec s víc než EXCERPT_MIN_CHARS znaky, oříznutý na celé slovo."""
+    return process(html, stages=(), excerpt_len=max_len)['excerpt']
+
+
+# --- Microbenchmark ---
+
+def benchmark(fixtures_dir: str, repeat: int = 200) -> Dict[str, float]:
+    """
+    Změří průměrnou dobu úprav jednoho článku (µs) nad golden vstupy.
+
+    Returns:
+        {"generated_us", "published_us", "excerpt_us"}
+    """
+    with open(os.path.join(fixtures_dir, 'cases.json'), 'r', encoding='utf-8') as f:
+        cases = json.load(f)
+    inputs = []
+    for case in cases:
+        with open(os.path.join(fixtures_dir, f"{case['name']}.input.html"), 'r', encoding='utf-8') as f:
+            inputs.append(f.read())
+    generated = [process(html)['html'] for html in inputs]
+
+    def _time(fn, items):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for item in items:
+                fn(item)
+        return round((time.perf_counter() - start) / (repeat * len(items)) * 1e6, 1)
+
+    return {
+        'generated_us': _time(process, inputs),
+        'published_us': _time(lambda h: process(h, ('heading', 'blocks')), generated),
+        'excerpt_us': _time(excerpt, generated),
+    }
+
+
+if __name__ == '__main__':
+    fixtures = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'tests', 'fixtures', 'html_pipeline')
+    for name, value in benchmark(fixtures).items():
+        log.info("⏱️  %-13s %8.1f µs/článek", name, value)
@@ -0,0 +1,187 @@
+"""
+LLM Ledger — záznam každého volání Claude do SQLite (tabulka llm_calls).
+Model, účel (stage), tokeny včetně prompt cache, latence, retry, run_id a cena.
+Podklad pro /api/llm/usage (denní a per-stage agregace).
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Optional
+
+from claude_client import estimate_cost, usage_stats
+from database import get_db
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+_run_id = None
+_local = threading.local()
+
+
+def set_run_id(run_id: Optional[str]):
+    """Nastaví run_id pro všechna další volání v procesu (None = mimo běh pipeline)."""
+    global _run_id
+    _run_id = run_id
+
+
+def get_run_id() -> Optional[str]:
+    return _run_id
+
+
+def record_call(purpose: str, model: str, usage=None, latency: float = None, retries: int = 0,
+                batch: bool = False, error: str = None, run_id: str = None) -> float:
+    """
+    Zapíše jedno volání do llm_calls. Chyba zápisu se jen zaloguje (ledger nesmí shodit pipeline).
+
+    Args:
+        purpose: Účel volání (analysis, article, podcast, ...)
+        model: Použitý model
+        usage: usage z Claude odpovědi (None u selhaného volání)
+        latency: Doba volání v sekundách (včetně retry)
+        retries: Počet opakovaných pokusů
+        batch: True = Message Batches API (poloviční cena)
+        error: Text chyby (status = 'error')
+
+    Returns:
+        Spočítaná cena v USD
+    """
+    stats = usage_stats(usage)
+    cost = estimate_cost(usage, batch=batch, model=model) if usage is not None else 0.0
+    try:
+        conn = get_db()
+    except sqlite3.Error as e:
+        log.warning("LLM ledger nedostupný: %s", e)
+        return cost
+    try:
+        conn.execute(
+            "INSERT INTO llm_calls (timestamp, run_id, purpose, model, input_tokens, output_tokens, "
+            "cache_read_tokens, cache_write_tokens, latency_ms, retries, batch, cost, status, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (datetime.now().strftime('%Y-%m-%dT%H:%M:%S'), run_id or _run_id, purpose, model,
+             stats['input_tokens'], stats['output_tokens'], stats['cache_read_tokens'],
+             stats['cache_write_tokens'], int(latency * 1000) if latency is not None else None,
+             retries, int(batch), round(cost, 6), 'error' if error else 'ok', error),
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        log.warning("Zápis do LLM ledgeru selhal: %s", e)
+    finally:
+        conn.close()
+    return cost
+
+
+class _TrackedCall:
+    """Stav jednoho sledovaného volání (viz track())."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.usage = None
+
+    def set_usage(self, usage):
+        self.usage = usage
+
+
+@contextmanager
+def track(purpose: str, model: str, batch: bool = False):
+    """
+    Změří volání (latence včetně retry) a zapíše ho do ledgeru.
+
+    Počet pokusů počítá note_attempt() volané z API funkce obalené retry dekorátorem:
+
+        with llm_ledger.track('article', model) as call:
+            message = _call_api(...)
+            call.set_usage(message.usage)
+    """
+    call = _TrackedCall()
+    previous = getattr(_local, 'call', None)
+    _local.call = call
+    start = time.monotonic()
+    try:
+        yield call
+    except Exception as e:
+        record_call(purpose, model, call.usage, time.monotonic() - start,
+                    max(0, call.attempts - 1), batch, error=str(e)[:500])
+        raise
+    else:
+        record_call(purpose, model, call.usage, time.monotonic() - start,
+                    max(0, call.attempts - 1), batch)
+    finally:
+        _local.call = previous
+
+
+def note_attempt():
+    """Započítá pokus o volání API do aktuálního track() bloku (mimo track() nic nedělá)."""
+    call = getattr(_local, 'call', None)
+    if call is not None:
+        call.attempts += 1
+
+
+def get_run_usage(run_id: str) -> dict:
+    """Součty jednoho běhu: {"calls", "errors", "input_tokens", ..., "cost", "latency_ms"}."""
+    conn = get_db()
+    try:
+        row = conn.execute(
+            "SELECT COUNT(*) AS calls, "
+            "SUM(CASE WHEN status = 'error' THEN 1 ELSE 0 END) AS errors, "
+            "COALESCE(SUM(input_tokens), 0) AS input_tokens, "
+            "COALESCE(SUM(output_tokens), 0) AS output_tokens, "
+            "COALESCE(SUM(cache_read_tokens), 0) AS cache_read_tokens, "
+            "COALESCE(SUM(cache_write_tokens), 0) AS cache_write_tokens, "
+            "COALESCE(SUM(cost), 0) AS cost, "
+            "COALESCE(SUM(latency_ms), 0) AS latency_ms "
+            "FROM llm_calls WHERE run_id = ?", (run_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    usage = dict(row)
+    usage['errors'] = usage['errors'] or 0
+    return usage
+
+
+def get_usage(days: int = 7) -> dict:
+    """
+    Agregace za posledních N dní: součty, po dnech a po stage (purpose + model).
+
+    Returns:
+        {"days", "totals": {...}, "daily": [...], "stages": [...]}
+    """
+    since = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%S')
+    columns = """
+        COUNT(*) AS calls,
+        SUM(CASE WHEN status = 'error' THEN 1 ELSE 0 END) AS errors,
+        COALESCE(SUM(input_tokens), 0) AS input_tokens,
+        COALESCE(SUM(output_tokens), 0) AS output_tokens,
+        COALESCE(SUM(cache_read_tokens), 0) AS cache_read_tokens,
+        COALESCE(SUM(cache_write_tokens), 0) AS cache_write_tokens,
+        COALESCE(SUM(retries), 0) AS retries,
+        ROUND(COALESCE(SUM(cost), 0), 4) AS cost,
+        CAST(AVG(latency_ms) AS INTEGER) AS avg_latency_ms,
+        MAX(latency_ms) AS max_latency_ms
+    """
+    conn = get_db()
+    try:
+        totals = conn.execute(
+            f"SELECT {columns} FROM llm_calls WHERE timestamp >= ?", (since,)
+        ).fetchone()
+        daily = conn.execute(
+            f"SELECT substr(timestamp, 1, 10) AS date, {columns} FROM llm_calls "
+            "WHERE timestamp >= ? GROUP BY date ORDER BY date DESC", (since,)
+        ).fetchall()
+        stages = conn.execute(
+            f"SELECT purpose, model, {columns} FROM llm_calls "
+            "WHERE timestamp >= ? GROUP BY purpose, model ORDER BY cost DESC", (since,)
+        ).fetchall()
+    finally:
+        conn.close()
+
+    totals = dict(totals)
+    totals['errors'] = totals['errors'] or 0
+    return {
+        'days': days,
+        'totals': totals,
+        'daily': [dict(row) for row in daily],
+        'stages': [dict(row) for row in stages],
+    }
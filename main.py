@@ -15,9 +15,11 @@ if sys.platform == 'win32':
 
 import config
 import rss_scraper
+import article_packer
 import claude_analyzer
 import file_manager
 import article_history
+import llm_ledger
 from logger import setup_logger
 
 log = setup_logger(__name__)
@@ -55,6 +57,7 @@ def main():
     # 1.5. Vytvoření složky pro tento běh
     run_dir = file_manager.create_run_directory()
     log.info("📁 Výstupní složka: %s", run_dir)
+    llm_ledger.set_run_id(os.path.basename(run_dir))
 
     # 2. Načtení historie zpracovaných článků
     log.info("📚 Načítám historii zpracovaných článků...")
@@ -89,8 +92,9 @@ def main():
 
     # 4. Příprava dat pro analýzu
     log.info("📝 Připravuji články pro analýzu...")
-    articles_text = rss_scraper.format_articles_for_analysis(articles)
-    log.info("✅ Připraveno %d článků", len(articles))
+    packed = article_packer.pack_articles(articles)
+    articles_text = packed['text']
+    log.info("✅ Připraveno %d článků (~%d tokenů)", len(packed['included']), packed['tokens'])
 
     # 5. Analýza pomocí Claude AI
     try:
@@ -115,8 +119,9 @@ def main():
     file_manager.save_report(analysis, stats, run_dir, articles)
 
     # 9. Uložení zpracovaných článků do historie
+    #    Jen články, které se vešly do promptu — vyřazené packerem dostanou šanci v dalším běhu
     log.info("💾 Ukládám zpracované články do historie...")
-    history = article_history.mark_as_processed(articles, history)
+    history = article_history.mark_as_processed(packed['included'], history)
     history = article_history.cleanup_old_entries(history)
     if article_history.save_history(history):
         log.info("✅ Historie aktualizována")
@@ -27,10 +27,12 @@ import wp_publisher
 import social_poster
 import youtube_embed
 import section_images
+import source_scraper
 import publish_log
 import internal_linking
 from logger import setup_logger
-from auto_publish import search_rawg_image, _extract_excerpt
+from auto_publish import _extract_excerpt
+from media_prefetch import search_rawg_image
 from fb_generator.generate_fb_post import generate_fb_post
 
 log = setup_logger('manual_article')
@@ -77,14 +79,11 @@ def publish_manual_article(topic_name, game_name, source_urls, title=None,
     log.info("Stahuji zdrojové články...")
     source_texts = []
     valid_source_urls = []
-    for url in source_urls[:5]:  # max 5 zdrojů
-        text = article_writer.scrape_full_article(url)
-        if not text.startswith('[Chyba'):
-            source_texts.append(text)
-            valid_source_urls.append(url)
-            log.info("  OK: %s (%d znaků)", url[:80], len(text))
-        else:
-            log.warning("  FAIL (nebude v zdrojích): %s — %s", url[:80], text)
+    # Max 5 zdrojů souběžně — nefunkční URL nebudou ve zdrojích
+    for url, text in source_scraper.scrape_sources(source_urls[:5]):
+        source_texts.append(text)
+        valid_source_urls.append(url)
+        log.info("  OK: %s (%d znaků)", url[:80], len(text))
     source_urls = valid_source_urls
 
     if not source_texts:
@@ -312,7 +311,7 @@ def publish_manual_article(topic_name, game_name, source_urls, title=None,
     # 11. Social media posting
     social_results = {}
     try:
-        excerpt = _extract_excerpt(article.get('cs', ''), max_len=200)
+        excerpt = article.get('excerpt_cs') or _extract_excerpt(article.get('cs', ''), max_len=200)
         hashtags = []
         if seo_keywords:
             hashtags = [f"#{kw.strip().replace(' ', '')}" for kw in seo_keywords]
@@ -330,7 +329,7 @@ def publish_manual_article(topic_name, game_name, source_urls, title=None,
             if os.path.exists(candidate_en):
                 social_image_en = candidate_en
 
-        en_excerpt_social = _extract_excerpt(article.get('en', ''), max_len=200) if en_result else None
+        en_excerpt_social = (article.get('excerpt_en') or _extract_excerpt(article.get('en', ''), max_len=200)) if en_result else None
         en_url_social = en_result['view_url'] if en_result else None
 
         social_results = social_poster.post_to_all(
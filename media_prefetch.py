@@ -0,0 +1,186 @@
+"""
+Media Prefetch — média tématu se hledají a uploadují na pozadí hned po analýze.
+
+game_name a seo_keywords jsou známé dřív, než Claude dopíše článek (desítky sekund),
+takže RAWG obrázek a ID tagů se hledají hned po analýze. Do WP se ale nic neuploaduje,
+dokud téma není připravené (start_uploads() po stažení zdrojů) — téma bez zdrojů
+nenechá ve WP nepoužitá média. Upload featured image a screenshoty pro Story Mode
+pak běží souběžně s psaním. Publikace si výsledky vyzvedne přes featured_image(),
+section_images() a tags(). Přeskočené téma prefetch zruší: nespuštěné úlohy se
+nespustí, běžící nezačnou další upload a média, která prefetch už nahrál, se z WP
+smažou (jen nově vytvořená — existující média z dedupu mohou patřit jiným postům).
+"""
+
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+import article_cleanup
+import config
+import section_images
+import wp_publisher
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ThreadPoolExecutor:
+    """Sdílený pool pro prefetch všech témat (uploady stejně serializuje wp_publisher)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=config.MEDIA_PREFETCH_WORKERS,
+                                       thread_name_prefix='media')
+        return _pool
+
+
+def search_rawg_image(game_name):
+    """Vyhleda obrazek hry na RAWG.io. Vraci URL nebo None."""
+    if not config.RAWG_API_KEY:
+        return None
+
+    try:
+        resp = requests.get(
+            'https://api.rawg.io/api/games',
+            params={'key': config.RAWG_API_KEY, 'search': game_name, 'page_size': 1},
+            timeout=10,
+        )
+        if resp.status_code != 200:
+            return None
+
+        results = resp.json().get('results', [])
+        if results and results[0].get('background_image'):
+            return results[0]['background_image']
+    except Exception as e:
+        log.warning("RAWG search error for '%s': %s", game_name, e)
+
+    return None
+
+
+def topic_game_name(topic: Dict) -> str:
+    """Název hry tématu (fallback na název tématu, když analýza vrátí N/A)."""
+    game_name_raw = topic.get('game_name', '')
+    return game_name_raw if (game_name_raw and game_name_raw != 'N/A') else topic.get('topic', 'Neznámé')
+
+
+def topic_tag_names(topic: Dict) -> Optional[List[str]]:
+    """SEO klíčová slova tématu jako názvy WP tagů (None = žádné)."""
+    seo_keywords = topic.get('seo_keywords', '')
+    return [kw.strip() for kw in seo_keywords.split(',') if kw.strip()] if seo_keywords else None
+
+
+class MediaPrefetch:
+    """Média jednoho tématu hledaná a uploadovaná na pozadí."""
+
+    def __init__(self, topic: Dict, pool: ThreadPoolExecutor = None):
+        self.game_name = topic_game_name(topic)
+        self.title = topic.get('title', topic.get('topic', ''))
+        self.tag_names = topic_tag_names(topic)
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._pool = pool or get_pool()
+        # Jen vyhledávání (bez zápisu do WP) — uploady spustí až start_uploads()
+        self._image_url = self._pool.submit(search_rawg_image, self.game_name)
+        self._tags = self._pool.submit(wp_publisher.prefetch_tag_ids, self.tag_names) if self.tag_names else None
+        self._image = None
+        self._screenshots = None
+        # ID médií, která prefetch ve WP nově vytvořil (kandidáti na smazání při zahození)
+        self._created = []
+        self._discarded = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def start_uploads(self):
+        """Téma je připravené — spustí upload featured image a screenshotů (opakované volání nic nedělá)."""
+        with self._lock:
+            if self._image is not None or self.cancelled:
+                return
+            self._image = self._pool.submit(self._upload_featured_image)
+            self._screenshots = self._pool.submit(section_images.get_or_fetch_screenshots, self.game_name,
+                                                  should_stop=self._cancelled.is_set,
+                                                  on_created=self._track_created)
+
+    def _track_created(self, media_id: int):
+        with self._lock:
+            if not self._discarded:
+                self._created.append(media_id)
+                return
+        # Téma bylo zahozeno během uploadu — médium už nikdo nepoužije
+        self._delete([media_id])
+
+    def _delete(self, media_ids: List[int]):
+        deleted = [media_id for media_id in media_ids if article_cleanup.delete_media(media_id)]
+        log.info("Nepoužitá média prefetche smazána (%s): %d/%d", self.game_name, len(deleted), len(media_ids))
+
+    def _upload_featured_image(self) -> Tuple[Optional[str], Optional[int]]:
+        image_url = self._image_url.result()
+        if not image_url or self.cancelled:
+            return image_url, None
+        # Stejná ochrana jako před publikací — při výpadku hostingu neuploadovat (Fail2Ban)
+        if not wp_publisher.check_wp_available():
+            log.warning("WP nedostupný, featured image pro '%s' se neuploaduje", self.game_name)
+            return image_url, None
+        log.info("RAWG image nalezen, uploaduji (prefetch): %s", self.game_name)
+        media_id, _, err = wp_publisher.upload_media(image_url, title=self.title, on_created=self._track_created)
+        if media_id:
+            log.info("Featured image uploaded (ID: %d)", media_id)
+        else:
+            log.warning("Upload image selhal: %s", err)
+        return image_url, media_id
+
+    @staticmethod
+    def _result(future, default):
+        if future is None:
+            return default
+        try:
+            return future.result()
+        except CancelledError:
+            return default
+        except Exception as e:
+            log.warning("Prefetch médií selhal: %s", e)
+            return default
+
+    def featured_image(self) -> Tuple[Optional[str], Optional[int]]:
+        """Počká na RAWG obrázek a upload (nespuštěný upload spustí). Vrací (image_url, media_id)."""
+        self.start_uploads()
+        return self._result(self._image, (None, None))
+
+    def section_images(self) -> Optional[str]:
+        """Počká na screenshoty pro Story Mode (nespuštěné spustí). Vrací JSON pro WP meta nebo None."""
+        self.start_uploads()
+        return self._result(self._screenshots, None)
+
+    def tags(self) -> List[int]:
+        """Počká na dohledání existujících tagů (create_draft je pak vezme z cache)."""
+        return self._result(self._tags, [])
+
+    def cancel(self, discard_uploads: bool = False) -> List[int]:
+        """
+        Zruší prefetch přeskočeného tématu — nespuštěné úlohy neproběhnou, běžící nezačnou upload.
+
+        discard_uploads: média nahraná prefetchem (i ta, jejichž upload právě doběhne)
+        se z WP smažou — jen když je jisté, že je žádný post nepoužívá.
+        Vrací ID smazaných médií.
+        """
+        with self._lock:
+            created = []
+            if discard_uploads and not self._discarded:
+                self._discarded = True
+                created, self._created = self._created, []
+            first = not self.cancelled
+            self._cancelled.set()
+        if first:
+            for future in (self._image_url, self._image, self._screenshots, self._tags):
+                if future is not None:
+                    future.cancel()
+            log.info("Prefetch médií zrušen: %s", self.game_name)
+        if created:
+            self._delete(created)
+        return created
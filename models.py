@@ -26,3 +26,23 @@ class Topic(BaseModel):
 class AnalysisResult(BaseModel):
     """Výsledek analýzy herních článků od Claude."""
     topics: List[Topic] = Field(description="TOP témata seřazená od nejdůležitějšího")
+
+
+class StoryCard(BaseModel):
+    """Jedna karta Story Mode v mobilní appce."""
+    heading: str = Field(default="", description="Věcný nadpis karty, max 40 znaků")
+    body: str = Field(min_length=1, description="1-2 věty, max 160 znaků")
+
+
+class ArticleOutput(BaseModel):
+    """Strukturovaný výstup write_article (tool submit_article)."""
+    keyword_cs: str = Field(description="Hlavní SEO klíčové slovo CZ, 1-2 slova")
+    keyword_en: str = Field(description="Hlavní SEO klíčové slovo EN, 1-2 slova")
+    title_cs: str = Field(min_length=1, description="Český titulek, max 60 znaků")
+    title_en: str = Field(min_length=1, description="Anglický titulek, max 60 znaků")
+    meta_cs: str = Field(description="Český meta description, 140-155 znaků")
+    meta_en: str = Field(description="Anglický meta description, 140-155 znaků")
+    story_cards_cs: List[StoryCard] = Field(default_factory=list, description="3-5 karet Story Mode CZ")
+    story_cards_en: List[StoryCard] = Field(default_factory=list, description="3-5 karet Story Mode EN")
+    cs_html: str = Field(min_length=1, description="Český článek jako čisté HTML")
+    en_html: str = Field(default="", description="Anglický článek jako čisté HTML")
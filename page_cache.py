@@ -0,0 +1,130 @@
+"""
+Cache stažených zdrojových stránek — SQLite backend.
+Klíč = kanonická URL, ukládá se vyextrahovaný text a validátory (ETag, Last-Modified).
+Čerstvý záznam (PAGE_CACHE_TTL_HOURS) se vrací bez požadavku, starší se revaliduje
+podmíněným GETem (304 = text beze změny, jen se obnoví čas stažení).
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import config
+from database import get_db
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+# Query parametry, které nemění obsah stránky (sledování kampaní)
+_TRACKING_PARAMS = ('fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'cmpid')
+
+
+def canonical_url(url: str) -> str:
+    """Normalizuje URL: malá doména, bez fragmentu a tracking parametrů, seřazené query."""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def get(url: str) -> Optional[Dict]:
+    """
+    Vrátí záznam cache nebo None. Obnoví last_used (LRU).
+
+    Returns:
+        {"url", "text", "etag", "last_modified", "fetched_at", "fresh": bool}
+    """
+    key = canonical_url(url)
+    cutoff = (datetime.now() - timedelta(hours=config.PAGE_CACHE_TTL_HOURS)).isoformat()
+    try:
+        conn = get_db()
+    except sqlite3.Error as e:
+        log.warning("Page cache nedostupná: %s", e)
+        return None
+    try:
+        row = conn.execute(
+            "SELECT url, text, etag, last_modified, fetched_at FROM page_cache WHERE url = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE page_cache SET last_used = ? WHERE url = ?", (datetime.now().isoformat(), key))
+        conn.commit()
+        entry = dict(row)
+        entry['fresh'] = entry['fetched_at'] >= cutoff
+        return entry
+    except sqlite3.Error as e:
+        log.warning("Chyba při čtení page cache: %s", e)
+        return None
+    finally:
+        conn.close()
+
+
+def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+    """Hlavičky pro revalidaci záznamu (prázdné = plné stažení)."""
+    headers = {}
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+def put(url: str, text: str, etag: str = None, last_modified: str = None, max_entries: int = None):
+    """Uloží text stránky a odstraní nejdéle nepoužité záznamy nad limit."""
+    max_entries = config.PAGE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    now = datetime.now().isoformat()
+    try:
+        conn = get_db()
+    except sqlite3.Error as e:
+        log.warning("Page cache nedostupná: %s", e)
+        return
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO page_cache (url, text, etag, last_modified, fetched_at, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (canonical_url(url), text, etag, last_modified, now, now),
+        )
+        conn.execute(
+            "DELETE FROM page_cache WHERE url NOT IN "
+            "(SELECT url FROM page_cache ORDER BY last_used DESC LIMIT ?)",
+            (max_entries,),
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        log.warning("Chyba při zápisu do page cache: %s", e)
+    finally:
+        conn.close()
+
+
+def mark_revalidated(url: str):
+    """Server vrátil 304 — záznam je znovu čerstvý."""
+    now = datetime.now().isoformat()
+    try:
+        conn = get_db()
+    except sqlite3.Error as e:
+        log.warning("Page cache nedostupná: %s", e)
+        return
+    try:
+        conn.execute("UPDATE page_cache SET fetched_at = ?, last_used = ? WHERE url = ?",
+                     (now, now, canonical_url(url)))
+        conn.commit()
+    except sqlite3.Error as e:
+        log.warning("Chyba při zápisu do page cache: %s", e)
+    finally:
+        conn.close()
+
+
+def clear():
+    """Smaže všechny záznamy cache."""
+    conn = get_db()
+    try:
+        conn.execute("DELETE FROM page_cache")
+        conn.commit()
+    finally:
+        conn.close()
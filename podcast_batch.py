@@ -0,0 +1,127 @@
+"""
+Podcast Batch — CZ i EN podcast scripty pro všechny články jednoho běhu.
+
+Články (output/<run_id>/article_<i>_<lang>.html) se zpracují souběžně v omezeném
+poolu vláken, scripty se uloží vedle nich jako podcast_<i>_<lang>.txt.
+Opakované spuštění je zdarma — generate_podcast_script cachuje podle obsahu článku.
+
+Použití:
+    python podcast_batch.py <run_id> [--lang cs en] [--workers N] [--force]
+"""
+
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import config
+from article_writer import generate_podcast_script
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
+LANGS = ('cs', 'en')
+
+_ARTICLE_FILE_RE = re.compile(r'^article_(\d+)_(cs|en)\.html$')
+
+
+def find_articles(run_dir: str, langs: Sequence[str] = LANGS) -> List[Tuple[int, str, str]]:
+    """Vrátí [(topic_index, lang, cesta), ...] vygenerovaných článků běhu, seřazené."""
+    if not os.path.isdir(run_dir):
+        return []
+    found = []
+    for name in os.listdir(run_dir):
+        match = _ARTICLE_FILE_RE.match(name)
+        if match and match.group(2) in langs:
+            found.append((int(match.group(1)), match.group(2), os.path.join(run_dir, name)))
+    return sorted(found)
+
+
+def _generate_one(run_dir: str, topic_index: int, lang: str, path: str, force: bool) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        article_html = f.read()
+    result = generate_podcast_script(article_html, lang, force=force)
+    if 'error' not in result:
+        script_path = os.path.join(run_dir, f'podcast_{topic_index}_{lang}.txt')
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write(result['script'])
+    return result
+
+
+def generate_run_podcasts(run_dir: str, langs: Sequence[str] = LANGS, max_workers: int = None,
+                          force: bool = False,
+                          on_result: Callable[[Dict], None] = None) -> List[Dict]:
+    """
+    Vygeneruje podcast scripty pro všechny články běhu souběžně.
+
+    Args:
+        run_dir: Adresář běhu (output/<run_id>)
+        langs: Jazyky článků ke zpracování
+        max_workers: Max. souběžných volání (None = config.PODCAST_MAX_WORKERS)
+        force: Ignorovat cache a vygenerovat znovu
+        on_result: Callback volaný po dokončení každého scriptu (průběh pro dashboard)
+
+    Returns:
+        [{"topic_index", "lang", "cached", "cost"} nebo {"topic_index", "lang", "error"}, ...]
+        seřazené podle topic_index a jazyka
+    """
+    articles = find_articles(run_dir, langs)
+    if not articles:
+        return []
+    max_workers = min(max_workers or config.PODCAST_MAX_WORKERS, len(articles))
+    log.info("🎙️  Podcast scripty: %d článků, %d souběžně", len(articles), max_workers)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='podcast') as pool:
+        futures = {
+            pool.submit(_generate_one, run_dir, index, lang, path, force): (index, lang)
+            for index, lang, path in articles
+        }
+        for future in as_completed(futures):
+            index, lang = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:
+                outcome = {'error': str(e)}
+            if 'error' in outcome:
+                log.warning("⚠️  Podcast %d/%s selhal: %s", index, lang, outcome['error'])
+                entry = {'topic_index': index, 'lang': lang, 'error': outcome['error']}
+            else:
+                entry = {'topic_index': index, 'lang': lang,
+                         'cached': outcome.get('cached', False), 'cost': outcome.get('cost')}
+            results.append(entry)
+            if on_result:
+                on_result(entry)
+
+    results.sort(key=lambda r: (r['topic_index'], r['lang']))
+    done = sum(1 for r in results if 'error' not in r)
+    cached = sum(1 for r in results if r.get('cached'))
+    log.info("✅ Podcast scripty hotové: %d/%d (z cache %d)", done, len(results), cached)
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Podcast scripty pro všechny články běhu')
+    parser.add_argument('run_id', help='ID běhu (adresář v output/)')
+    parser.add_argument('--lang', nargs='+', choices=LANGS, default=list(LANGS),
+                        help='Jazyky (default: cs en)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f'Max. souběžných volání (default: {config.PODCAST_MAX_WORKERS})')
+    parser.add_argument('--force', action='store_true', help='Ignorovat cache a vygenerovat znovu')
+    args = parser.parse_args(argv)
+
+    if not re.match(r'^[\w\-]+$', args.run_id):
+        parser.error('Neplatné run_id')
+    run_dir = os.path.join(OUTPUT_DIR, args.run_id)
+    results = generate_run_podcasts(run_dir, args.lang, args.workers, args.force)
+    if not results:
+        log.error("❌ V %s nejsou žádné články", run_dir)
+        return 1
+    return 1 if any('error' in r for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+Cache podcast scriptů (viz result_cache).
+Klíč = SHA-256 z promptu (obsah článku + jazyk) a modelu. Vlastní tabulka,
+limity i čítače — podcasty nezkreslují statistiky a limit analysis cache.
+"""
+
+from typing import Dict, Optional
+
+import config
+import result_cache
+
+_cache = result_cache.ResultCache('podcast', 'PODCAST_CACHE_TTL_HOURS', 'PODCAST_CACHE_MAX_ENTRIES')
+
+
+def make_key(prompt: str) -> str:
+    """Spočítá klíč cache z promptu a modelu."""
+    return result_cache.make_key('podcast', config.ARTICLE_MODEL, prompt)
+
+
+def get(cache_key: str, ttl_hours: int = None) -> Optional[Dict]:
+    """Vrátí uložený script nebo None (miss / expirováno)."""
+    return _cache.get(cache_key, ttl_hours)
+
+
+def put(cache_key: str, script: Dict, max_entries: int = None, ttl_hours: int = None):
+    """Uloží script (eviction podle TTL a PODCAST_CACHE_MAX_ENTRIES)."""
+    _cache.put(cache_key, script, 'podcast', config.ARTICLE_MODEL, max_entries, ttl_hours)
+
+
+def get_stats() -> dict:
+    """Vrátí hit/miss čítače a počet záznamů v cache."""
+    return _cache.get_stats()
+
+
+def clear():
+    """Smaže všechny záznamy cache (čítače zůstávají)."""
+    _cache.clear()
@@ -0,0 +1,147 @@
+"""
+Content-addressed cache výsledků Claude volání — SQLite backend.
+Jedna implementace pro všechny cache (analýza, články, podcasty); každá má
+vlastní tabulku se stejným schématem, vlastní TTL / limit z config.py a vlastní
+hit/miss čítače v meta tabulce.
+"""
+
+import hashlib
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import config
+from database import get_db
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+
+def make_key(*parts: Any) -> str:
+    """Spočítá SHA-256 klíč cache ze vstupů (JSON se seřazenými klíči)."""
+    payload = json.dumps(list(parts), ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _increment(conn, key: str):
+    """Zvýší čítač v meta tabulce."""
+    conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES (?, '0')", (key,))
+    conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = ?", (key,))
+
+
+class ResultCache:
+    """
+    Cache nad jednou tabulkou (cache_key, kind, model, created_at, last_used, payload_json).
+
+    TTL a max. počet záznamů se čtou z config.py až při volání (podle názvu
+    nastavení), takže změna konfigurace i patch v testech platí hned.
+    """
+
+    def __init__(self, name: str, ttl_setting: str, max_entries_setting: str):
+        self.name = name
+        self.table = f"{name}_cache"
+        self._ttl_setting = ttl_setting
+        self._max_entries_setting = max_entries_setting
+        self._hits_key = f"{name}_cache_hits"
+        self._misses_key = f"{name}_cache_misses"
+
+    def _ttl(self, ttl_hours: Optional[int]) -> int:
+        return getattr(config, self._ttl_setting) if ttl_hours is None else ttl_hours
+
+    def get(self, cache_key: str, ttl_hours: int = None) -> Optional[Any]:
+        """
+        Vrátí uložený výsledek nebo None (miss / expirováno).
+        Započítá hit/miss a u hitu obnoví last_used (LRU).
+        """
+        cutoff = (datetime.now() - timedelta(hours=self._ttl(ttl_hours))).isoformat()
+        try:
+            conn = get_db()
+        except sqlite3.Error as e:
+            log.warning("Cache %s nedostupná: %s", self.name, e)
+            return None
+        try:
+            row = conn.execute(
+                f"SELECT payload_json FROM {self.table} WHERE cache_key = ? AND created_at >= ?",
+                (cache_key, cutoff),
+            ).fetchone()
+            if row is None:
+                _increment(conn, self._misses_key)
+                conn.commit()
+                return None
+
+            conn.execute(
+                f"UPDATE {self.table} SET last_used = ? WHERE cache_key = ?",
+                (datetime.now().isoformat(), cache_key),
+            )
+            _increment(conn, self._hits_key)
+            conn.commit()
+            return json.loads(row["payload_json"])
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            log.warning("Chyba při čtení cache %s: %s", self.name, e)
+            return None
+        finally:
+            conn.close()
+
+    def put(self, cache_key: str, value: Any, kind: str = '', model: str = '',
+            max_entries: int = None, ttl_hours: int = None):
+        """Uloží výsledek a provede eviction (expirované záznamy + nejdéle nepoužité nad limit)."""
+        if max_entries is None:
+            max_entries = getattr(config, self._max_entries_setting)
+        now = datetime.now()
+        cutoff = (now - timedelta(hours=self._ttl(ttl_hours))).isoformat()
+
+        try:
+            conn = get_db()
+        except sqlite3.Error as e:
+            log.warning("Cache %s nedostupná: %s", self.name, e)
+            return
+        try:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} "
+                "(cache_key, kind, model, created_at, last_used, payload_json) VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key, kind, model, now.isoformat(), now.isoformat(),
+                 json.dumps(value, ensure_ascii=False)),
+            )
+            conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (cutoff,))
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE cache_key NOT IN "
+                f"(SELECT cache_key FROM {self.table} ORDER BY last_used DESC LIMIT ?)",
+                (max_entries,),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            log.warning("Chyba při zápisu do cache %s: %s", self.name, e)
+        finally:
+            conn.close()
+
+    def get_stats(self) -> dict:
+        """Vrátí hit/miss čítače a počet záznamů v cache."""
+        conn = get_db()
+        try:
+            rows = conn.execute(
+                "SELECT key, value FROM meta WHERE key IN (?, ?)", (self._hits_key, self._misses_key)
+            ).fetchall()
+            counters = {row["key"]: int(row["value"]) for row in rows}
+            entries = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        finally:
+            conn.close()
+
+        hits = counters.get(self._hits_key, 0)
+        misses = counters.get(self._misses_key, 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 3) if total else 0.0,
+            'entries': entries,
+        }
+
+    def clear(self):
+        """Smaže všechny záznamy cache (čítače zůstávají)."""
+        conn = get_db()
+        try:
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.commit()
+        finally:
+            conn.close()
@@ -0,0 +1,115 @@
+"""
+Odložená opakování běhů auto_publish — SQLite backend.
+
+Když Claude analýza selže (529 Overloaded), běh místo hodinového time.sleep
+naplánuje úlohu na pozdější čas a hned skončí. `auto_publish.py --run-due`
+(launchd po pár minutách, případně začátek každého běžného slotu) si splatné
+úlohy převezme a běh naváže přes run_checkpoint — nad už staženými články.
+Úloha, jejíž běh spadl (status 'running' déle než RETRY_JOB_STALE_MINUTES),
+se převezme znovu.
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import config
+from database import get_db
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+
+def schedule(run_id: str, kind: str, delay_minutes: float, options: Dict = None) -> str:
+    """
+    Naplánuje úlohu pro běh run_id za delay_minutes minut.
+
+    Args:
+        run_id: ID běhu (run_checkpoint), na který úloha naváže
+        kind: Druh úlohy (např. 'analysis')
+        delay_minutes: Za jak dlouho je úloha splatná
+        options: Argumenty pro run() (batch, tiered) — JSON
+
+    Returns:
+        Čas splatnosti (ISO)
+    """
+    now = datetime.now()
+    due_at = (now + timedelta(minutes=delay_minutes)).isoformat()
+    conn = get_db()
+    try:
+        conn.execute(
+            "INSERT INTO retry_jobs (run_id, kind, due_at, status, created_at, options_json) "
+            "VALUES (?, ?, ?, 'pending', ?, ?)",
+            (run_id, kind, due_at, now.isoformat(), json.dumps(options or {})),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return due_at
+
+
+def claim_due(now: datetime = None) -> List[Dict]:
+    """
+    Převezme splatné úlohy (pending → running) a vrátí je od nejstarší.
+    Převzetí je atomické — souběžný --run-due a běžný slot stejnou úlohu nespustí dvakrát.
+    Znovu převezme i úlohy 'running' převzaté před víc než RETRY_JOB_STALE_MINUTES
+    (proces, který je spustil, spadl dřív, než je uzavřel).
+    """
+    now = now or datetime.now()
+    stale_before = (now - timedelta(minutes=config.RETRY_JOB_STALE_MINUTES)).isoformat()
+    now = now.isoformat()
+    claimed = []
+    try:
+        conn = get_db()
+    except sqlite3.Error as e:
+        log.warning("Retry úlohy nedostupné: %s", e)
+        return claimed
+    try:
+        rows = conn.execute(
+            "SELECT id, run_id, kind, due_at, status, claimed_at, options_json FROM retry_jobs "
+            "WHERE (status = 'pending' AND due_at <= ?) OR (status = 'running' AND claimed_at < ?) "
+            "ORDER BY due_at", (now, stale_before)
+        ).fetchall()
+        for row in rows:
+            # Podmínka na původní status a claimed_at — úlohu převezme jen jeden proces
+            cur = conn.execute(
+                "UPDATE retry_jobs SET status = 'running', claimed_at = ? "
+                "WHERE id = ? AND status = ? AND claimed_at IS ?",
+                (now, row["id"], row["status"], row["claimed_at"]),
+            )
+            conn.commit()
+            if cur.rowcount == 1:
+                if row["status"] == 'running':
+                    log.warning("Úloha %d (běh %s) visí ve stavu running od %s, přebírám znovu",
+                                row["id"], row["run_id"], row["claimed_at"][:16])
+                job = {key: row[key] for key in ('id', 'run_id', 'kind', 'due_at')}
+                job['options'] = json.loads(row["options_json"])
+                claimed.append(job)
+    finally:
+        conn.close()
+    return claimed
+
+
+def complete(job_id: int, status: str = 'done'):
+    """Uzavře převzatou úlohu (done / failed)."""
+    conn = get_db()
+    try:
+        conn.execute("UPDATE retry_jobs SET status = ?, finished_at = ? WHERE id = ?",
+                     (status, datetime.now().isoformat(), job_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def list_pending() -> List[Dict]:
+    """Čekající úlohy (bez options) seřazené podle splatnosti."""
+    conn = get_db()
+    try:
+        rows = conn.execute(
+            "SELECT id, run_id, kind, due_at, created_at FROM retry_jobs "
+            "WHERE status = 'pending' ORDER BY due_at"
+        ).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
@@ -0,0 +1,210 @@
+"""
+Checkpointy běhu auto_publish — SQLite backend.
+
+Běh si po každé dokončené fázi (stažené RSS, analýza, deduplikace) uloží stav
+a artefakty, každé téma zvlášť (zdroje, článek, média, ID postů). Po pádu
+(nedostupný WP, kill procesu) `auto_publish.py --resume <run_id>` naváže od
+poslední dokončené fáze — bez nového scrapingu, analýzy a generování článků.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import config
+from database import get_db
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+# Fáze běhu v pořadí, v jakém se dokončují
+RUN_STAGES = ('started', 'scraped', 'analyzed', 'deduped', 'done')
+
+# Koncové fáze tématu — při --resume se už znovu nezpracovávají
+TOPIC_DONE_STAGES = ('published', 'skipped')
+
+# Sloučení artefaktů je read-modify-write — témata se ukládají z více vláken
+_lock = threading.Lock()
+
+
+def stage_reached(current: str, stage: str) -> bool:
+    """True pokud běh ve fázi current už má dokončenou fázi stage."""
+    return RUN_STAGES.index(current) >= RUN_STAGES.index(stage)
+
+
+def start_run(run_id: str, run_dir: str):
+    """Založí checkpoint nového běhu a smaže checkpointy starší než RUN_CHECKPOINT_DAYS."""
+    now = datetime.now()
+    cutoff = (now - timedelta(days=config.RUN_CHECKPOINT_DAYS)).isoformat()
+    conn = get_db()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO run_checkpoints "
+            "(run_id, run_dir, stage, status, started_at, updated_at, artifacts_json) "
+            "VALUES (?, ?, 'started', 'running', ?, ?, '{}')",
+            (run_id, run_dir, now.isoformat(), now.isoformat()),
+        )
+        conn.execute("DELETE FROM topic_checkpoints WHERE run_id IN "
+                     "(SELECT run_id FROM run_checkpoints WHERE updated_at < ?)", (cutoff,))
+        conn.execute("DELETE FROM run_checkpoints WHERE updated_at < ?", (cutoff,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def save_run(run_id: str, stage: str, **artifacts):
+    """
+    Zapíše dokončenou fázi běhu a přidá artefakty (JSON).
+    Chyba zápisu se jen zaloguje — checkpoint nesmí shodit publikaci.
+    """
+    with _lock:
+        try:
+            conn = get_db()
+        except sqlite3.Error as e:
+            log.warning("Checkpointy nedostupné: %s", e)
+            return
+        try:
+            row = conn.execute("SELECT artifacts_json FROM run_checkpoints WHERE run_id = ?",
+                               (run_id,)).fetchone()
+            if row is None:
+                log.warning("Checkpoint běhu %s neexistuje, fáze %s se neuloží", run_id, stage)
+                return
+            merged = {**json.loads(row["artifacts_json"]), **artifacts}
+            conn.execute(
+                "UPDATE run_checkpoints SET stage = ?, updated_at = ?, artifacts_json = ? WHERE run_id = ?",
+                (stage, datetime.now().isoformat(), json.dumps(merged, ensure_ascii=False, default=str), run_id),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            log.warning("Chyba při zápisu checkpointu běhu %s: %s", run_id, e)
+        finally:
+            conn.close()
+
+
+def finish_run(run_id: str, complete: bool = True):
+    """
+    Uzavře běh. complete=True → fáze 'done' (resume už nic nedělá),
+    False → status 'incomplete' (některá témata selhala, --resume je zkusí znovu).
+    """
+    conn = get_db()
+    try:
+        if complete:
+            conn.execute("UPDATE run_checkpoints SET stage = 'done', status = 'done', updated_at = ? "
+                         "WHERE run_id = ?", (datetime.now().isoformat(), run_id))
+        else:
+            conn.execute("UPDATE run_checkpoints SET status = 'incomplete', updated_at = ? WHERE run_id = ?",
+                         (datetime.now().isoformat(), run_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def load_run(run_id: str) -> Optional[Dict]:
+    """
+    Vrátí checkpoint běhu nebo None.
+
+    Returns:
+        {"run_id", "run_dir", "stage", "status", "started_at", "updated_at", "artifacts": {...}}
+    """
+    try:
+        conn = get_db()
+    except sqlite3.Error as e:
+        log.warning("Checkpointy nedostupné: %s", e)
+        return None
+    try:
+        row = conn.execute(
+            "SELECT run_id, run_dir, stage, status, started_at, updated_at, artifacts_json "
+            "FROM run_checkpoints WHERE run_id = ?", (run_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    entry = dict(row)
+    entry['artifacts'] = json.loads(entry.pop('artifacts_json'))
+    return entry
+
+
+def list_runs(status: str = None, limit: int = 20) -> List[Dict]:
+    """Poslední běhy s checkpointem (bez artefaktů), volitelně jen s daným statusem."""
+    conn = get_db()
+    try:
+        query = "SELECT run_id, run_dir, stage, status, started_at, updated_at FROM run_checkpoints"
+        params = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in conn.execute(query, params).fetchall()]
+    finally:
+        conn.close()
+
+
+def save_topic(run_id: str, topic_index: int, stage: str, **artifacts):
+    """Zapíše dokončenou fázi tématu (prepared, written, media, cs_published, en_published, published, skipped)."""
+    with _lock:
+        try:
+            conn = get_db()
+        except sqlite3.Error as e:
+            log.warning("Checkpointy nedostupné: %s", e)
+            return
+        try:
+            row = conn.execute(
+                "SELECT artifacts_json FROM topic_checkpoints WHERE run_id = ? AND topic_index = ?",
+                (run_id, topic_index),
+            ).fetchone()
+            merged = {**(json.loads(row["artifacts_json"]) if row else {}), **artifacts}
+            conn.execute(
+                "INSERT OR REPLACE INTO topic_checkpoints (run_id, topic_index, stage, updated_at, artifacts_json) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_id, topic_index, stage, datetime.now().isoformat(),
+                 json.dumps(merged, ensure_ascii=False, default=str)),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            log.warning("Chyba při zápisu checkpointu tématu %s/%d: %s", run_id, topic_index, e)
+        finally:
+            conn.close()
+
+
+def discard_topic_artifacts(run_id: str, topic_index: int, *keys: str):
+    """Odebere artefakty tématu (fáze zůstává) — např. média smazaná z WP po přeskočení tématu."""
+    with _lock:
+        try:
+            conn = get_db()
+        except sqlite3.Error as e:
+            log.warning("Checkpointy nedostupné: %s", e)
+            return
+        try:
+            row = conn.execute(
+                "SELECT artifacts_json FROM topic_checkpoints WHERE run_id = ? AND topic_index = ?",
+                (run_id, topic_index),
+            ).fetchone()
+            if row is None:
+                return
+            artifacts = {k: v for k, v in json.loads(row["artifacts_json"]).items() if k not in keys}
+            conn.execute(
+                "UPDATE topic_checkpoints SET updated_at = ?, artifacts_json = ? WHERE run_id = ? AND topic_index = ?",
+                (datetime.now().isoformat(), json.dumps(artifacts, ensure_ascii=False, default=str),
+                 run_id, topic_index),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            log.warning("Chyba při zápisu checkpointu tématu %s/%d: %s", run_id, topic_index, e)
+        finally:
+            conn.close()
+
+
+def load_topics(run_id: str) -> Dict[int, Dict]:
+    """Vrátí {topic_index: {"stage", ...artefakty}} pro všechna uložená témata běhu."""
+    conn = get_db()
+    try:
+        rows = conn.execute(
+            "SELECT topic_index, stage, artifacts_json FROM topic_checkpoints WHERE run_id = ?", (run_id,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return {row["topic_index"]: {**json.loads(row["artifacts_json"]), 'stage': row["stage"]} for row in rows}
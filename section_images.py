@@ -110,12 +110,15 @@ def fetch_rawg_screenshots(game_name, max_count=5):
         return []
 
 
-def get_or_fetch_screenshots(game_name, max_count=5):
+def get_or_fetch_screenshots(game_name, max_count=5, should_stop=None, on_created=None):
     """
     Hlavní entry point pro Story Mode screenshoty.
     1. Hledá existující ve WP Media Library (žádný upload)
     2. Fallback: stáhne z RAWG API a uploadne do WP
 
+    should_stop: volitelný callback — True = přerušit sérii uploadů (zrušený prefetch)
+    on_created: volitelný callback(media_id) pro každý nově uploadnutý screenshot
+
     Vrací JSON string pro WP meta, nebo None.
     """
     if not game_name or game_name == 'N/A':
@@ -138,8 +141,12 @@ def get_or_fetch_screenshots(game_name, max_count=5):
     uploaded = []
     slug = _slugify(game_name)
     for i, sc_url in enumerate(urls, 1):
+        if should_stop and should_stop():
+            log.info("Upload screenshotů pro '%s' zrušen", game_name)
+            return None
         fname = f"{slug}-screenshot-{i}.jpg"
-        sc_id, sc_src, sc_err = wp_publisher.upload_media(sc_url, title=game_name, custom_filename=fname)
+        sc_id, sc_src, sc_err = wp_publisher.upload_media(sc_url, title=game_name, custom_filename=fname,
+                                                          on_created=on_created)
         if sc_id and sc_src:
             uploaded.append((sc_id, sc_src))
         else:
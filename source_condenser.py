@@ -0,0 +1,137 @@
+"""
+Source Condenser — zhuštění zdrojových textů do token budgetu před psaním článku.
+Věty všech zdrojů se ohodnotí BM25 proti tématu (téma, titulek, kontext, název hry,
+SEO klíčová slova), vybírají se od nejrelevantnějších, dokud nedojde budget,
+a téměř stejné věty z různých zdrojů se přeskočí. Vybrané věty zůstávají
+v původním pořadí v rámci svého zdroje.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+
+import config
+from article_packer import estimate_tokens
+from logger import setup_logger
+from text_normalize import normalize_tokens
+
+log = setup_logger(__name__)
+
+# BM25 parametry (standardní hodnoty)
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Věta s číslem (datum, cena, prodeje) dostane bonus — prompt článku vyžaduje konkrétní fakta
+NUMBER_BONUS = 1.3
+# Jaccard kmenů, od kterého je věta považována za duplicitu už vybrané
+DUPLICATE_SIMILARITY = 0.6
+# Kratší věty (navigace, "Advertisement", popisky) se nezařazují
+MIN_SENTENCE_CHARS = 30
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?…])["“”»]?\s+(?=["„“«(]?[A-ZÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ0-9])')
+_NUMBER_RE = re.compile(r'\d')
+
+
+def split_sentences(text: str) -> List[List[str]]:
+    """Rozdělí text na bloky (řádky) a věty: [[věta, ...], ...]."""
+    blocks = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            blocks.append([s.strip() for s in _SENTENCE_RE.split(line) if s.strip()])
+    return blocks
+
+
+def _query_terms(topic: Dict) -> Counter:
+    fields = ('topic', 'title', 'context', 'game_name', 'seo_keywords')
+    text = ' '.join(str(topic.get(field) or '') for field in fields if topic.get(field) != 'N/A')
+    return Counter(normalize_tokens(text))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def condense_sources(source_texts: List[str], topic: Dict, token_budget: int = None) -> List[str]:
+    """
+    Zhustí zdrojové texty na nejrelevantnější věty.
+
+    Args:
+        source_texts: Texty zdrojů (bloky oddělené novým řádkem)
+        topic: Téma (topic, title, context, game_name, seo_keywords)
+        token_budget: Max. odhad tokenů všech zdrojů dohromady (None = config.SOURCE_TOKEN_BUDGET)
+
+    Returns:
+        Zhuštěné texty ve stejném pořadí jako vstup (zdroj bez vybrané věty = "")
+    """
+    token_budget = config.SOURCE_TOKEN_BUDGET if token_budget is None else token_budget
+
+    # (zdroj, blok, pořadí, text, kmeny)
+    sentences = []
+    for src, text in enumerate(source_texts):
+        for blk, block in enumerate(split_sentences(text or '')):
+            for pos, sentence in enumerate(block):
+                if len(sentence) >= MIN_SENTENCE_CHARS:
+                    sentences.append((src, blk, pos, sentence, normalize_tokens(sentence)))
+    if not sentences:
+        return list(source_texts)
+
+    total_tokens = sum(estimate_tokens(text or '') for text in source_texts)
+    if total_tokens <= token_budget:
+        return list(source_texts)
+
+    # BM25 — dokument = věta, korpus = věty všech zdrojů tématu
+    query = _query_terms(topic)
+    doc_freq = Counter(term for *_, terms in sentences for term in set(terms))
+    n = len(sentences)
+    avg_len = sum(len(terms) for *_, terms in sentences) / n or 1.0
+    scores = []
+    for index, (_, _, pos, sentence, terms) in enumerate(sentences):
+        counts = Counter(terms)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(terms) / avg_len)
+        score = 0.0
+        for term in query:
+            tf = counts.get(term)
+            if tf:
+                idf = math.log(1 + (n - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+                score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        if _NUMBER_RE.search(sentence):
+            score *= NUMBER_BONUS
+        # Bez shody s dotazem rozhoduje pořadí ve zdroji (úvod nese nejvíc faktů)
+        scores.append((score, -index))
+
+    ranked = sorted(range(n), key=lambda i: scores[i], reverse=True)
+    chosen = []
+    chosen_sets = []
+    used = 0
+    for i in ranked:
+        sentence, terms = sentences[i][3], sentences[i][4]
+        cost = estimate_tokens(sentence) + 1
+        if used + cost > token_budget:
+            continue
+        term_set = frozenset(terms)
+        if any(_jaccard(term_set, other) >= DUPLICATE_SIMILARITY for other in chosen_sets):
+            continue
+        chosen.append(i)
+        chosen_sets.append(term_set)
+        used += cost
+
+    # Složení zpět: původní pořadí, věty jednoho bloku na jednom řádku
+    result = []
+    for src in range(len(source_texts)):
+        picked = sorted(sentences[i][:4] for i in chosen if sentences[i][0] == src)
+        lines = []
+        last_block = None
+        for _, blk, _, sentence in picked:
+            if blk == last_block:
+                lines[-1] += ' ' + sentence
+            else:
+                lines.append(sentence)
+                last_block = blk
+        result.append('\n'.join(lines))
+
+    log.info("📉 Zdroje zhuštěny: ~%d → ~%d tokenů (%d/%d vět)", total_tokens,
+             sum(estimate_tokens(text) for text in result), len(chosen), n)
+    return result
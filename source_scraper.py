@@ -0,0 +1,174 @@
+"""
+Source Scraper — souběžné stahování zdrojových článků pro generování.
+Sdílená requests.Session s connection poolem, limit souběžnosti na doménu
+a celkový deadline. Vrací se hned, jakmile je stažen požadovaný počet zdrojů.
+Stránka se čte po blocích a stahování končí, jakmile se uzavře hlavní obsah
+nebo je dosažen SCRAPE_MAX_BYTES.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, List, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from content_extractor import StreamingExtractor
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+# Velikost bloku při streamovaném čtení stránky
+STREAM_CHUNK_SIZE = 16 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Vrátí sdílenou requests.Session (keep-alive spojení napříč zdroji i tématy).
+
+    Pool je dimenzovaný na SCRAPE_MAX_WORKERS souběžných stažení. Thread-safe
+    pro běžné GET požadavky.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=config.SCRAPE_MAX_WORKERS * 2,
+                                  pool_maxsize=config.SCRAPE_MAX_WORKERS)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+            _session = session
+        return _session
+
+
+def reset_session():
+    """Zavře sdílenou session (další get_session() vytvoří novou)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def is_scrape_error(text: str) -> bool:
+    """True pokud scrape_full_article vrátil chybu místo textu."""
+    return not text or text.startswith('[Chyba')
+
+
+def stream_extract(resp: requests.Response, url: str, max_bytes: int = None,
+                   max_chars: int = 3000) -> str:
+    """
+    Přečte odpověď (stream=True) po blocích a vytáhne text hlavního obsahu.
+
+    Čtení skončí po uzavření kontejneru hlavního obsahu nebo po max_bytes
+    (None = config.SCRAPE_MAX_BYTES); zbytek stránky se nestahuje.
+    Volající odpověď zavírá.
+    """
+    max_bytes = config.SCRAPE_MAX_BYTES if max_bytes is None else max_bytes
+    # Bez charset v hlavičce by requests hádal ISO-8859-1 — kódování se pak určí z <meta>
+    declared = 'charset' in (resp.headers.get('Content-Type') or '').lower()
+    extractor = StreamingExtractor(url, resp.encoding if declared else None)
+    for chunk in resp.iter_content(STREAM_CHUNK_SIZE):
+        if extractor.feed(chunk):
+            log.debug("Hlavní obsah %s uzavřen po %d B", url[:80], extractor.bytes_read)
+            break
+        if extractor.bytes_read >= max_bytes:
+            log.debug("Limit %d B u %s, zbytek stránky se nestahuje", max_bytes, url[:80])
+            break
+    extractor.close()
+    return extractor.extract(max_chars)
+
+
+def scrape_sources(urls: List[str], want: int = None, deadline: float = None,
+                   per_host: int = None, max_workers: int = None,
+                   scrape: Callable[[str], str] = None) -> List[Tuple[str, str]]:
+    """
+    Stáhne zdrojové články souběžně.
+
+    Args:
+        urls: URL v pořadí priority (duplicity se přeskočí)
+        want: Stačí tolik úspěšných zdrojů, pak se zbytek zruší (None = všechny)
+        deadline: Max. celková doba čekání v sekundách (None = config.SCRAPE_DEADLINE)
+        per_host: Max. souběžných stažení z jedné domény (None = config.SCRAPE_PER_HOST)
+        max_workers: Max. souběžných stažení celkem (None = config.SCRAPE_MAX_WORKERS)
+        scrape: Funkce url → text (None = article_writer.scrape_full_article)
+
+    Returns:
+        [(url, text), ...] úspěšně stažených zdrojů v pořadí vstupních URL
+    """
+    if scrape is None:
+        from article_writer import scrape_full_article as scrape
+    urls = list(dict.fromkeys(u for u in urls if u))
+    if not urls:
+        return []
+    deadline = config.SCRAPE_DEADLINE if deadline is None else deadline
+    per_host = per_host or config.SCRAPE_PER_HOST
+    max_workers = min(max_workers or config.SCRAPE_MAX_WORKERS, len(urls))
+
+    host_sems = {}
+    host_lock = threading.Lock()
+    stop = threading.Event()
+    end = time.monotonic() + deadline
+
+    def _host_sem(url):
+        host = urlparse(url).netloc
+        with host_lock:
+            if host not in host_sems:
+                host_sems[host] = threading.Semaphore(per_host)
+            return host_sems[host]
+
+    def _fetch(url):
+        if stop.is_set():
+            return None
+        sem = _host_sem(url)
+        if not sem.acquire(timeout=max(0.0, end - time.monotonic())):
+            return None
+        try:
+            if stop.is_set():
+                return None
+            return scrape(url)
+        finally:
+            sem.release()
+
+    start = time.monotonic()
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scrape')
+    try:
+        pending = {executor.submit(_fetch, url): url for url in urls}
+        while pending:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                log.warning("⏱️  Deadline %.0f s vypršel, %d zdrojů nedoběhlo", deadline, len(pending))
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    text = f"[Chyba pri stahovani: {e}]"
+                if text is None:
+                    continue
+                if is_scrape_error(text):
+                    log.warning("Zdroj nedostupný: %s — %s", url[:80], text[:120])
+                else:
+                    results[url] = text
+            if want and len(results) >= want:
+                break
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    log.info("📥 Staženo %d/%d zdrojů za %.1f s", len(results), len(urls), time.monotonic() - start)
+    ordered = [(url, results[url]) for url in urls if url in results]
+    return ordered[:want] if want else ordered
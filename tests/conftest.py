@@ -13,6 +13,16 @@ from unittest.mock import patch
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+@pytest.fixture(autouse=True)
+def isolated_db(tmp_path):
+    """Každý test zapisuje do vlastní SQLite (LLM ledger apod. nesmí sahat na data/gamefo.db)."""
+    import database
+    db_path = str(tmp_path / 'isolated.db')
+    database.ensure_schema(db_path)
+    with patch.object(database, 'DB_PATH', db_path):
+        yield db_path
+
+
 @pytest.fixture
 def sample_articles():
     """Sample articles for testing."""
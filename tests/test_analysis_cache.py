@@ -0,0 +1,82 @@
+"""Tests for analysis_cache module (SQLite backend)."""
+
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import database
+import analysis_cache
+import claude_analyzer
+
+
+@pytest.fixture(autouse=True)
+def use_tmp_db(tmp_path):
+    """Použije dočasnou SQLite databázi pro každý test."""
+    db_path = str(tmp_path / 'test.db')
+    database.init_db(db_path)
+    with patch.object(database, 'DB_PATH', db_path):
+        yield
+
+
+class TestMakeKey:
+    def test_deterministic(self):
+        assert analysis_cache.make_key('text', 'm', 'a', 'b') == analysis_cache.make_key('text', 'm', 'a', 'b')
+
+    def test_model_changes_key(self):
+        assert analysis_cache.make_key('text', 'm1', 'a') != analysis_cache.make_key('text', 'm2', 'a')
+
+
+class TestGetPut:
+    def test_miss_then_hit(self):
+        key = analysis_cache.make_key('text', 'm', 'prompt')
+        assert analysis_cache.get(key) is None
+        analysis_cache.put(key, 'text', 'm', {'text': 'report'})
+        assert analysis_cache.get(key) == {'text': 'report'}
+
+        stats = analysis_cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+        assert stats['entries'] == 1
+
+    def test_expired_entry_is_miss(self):
+        key = analysis_cache.make_key('text', 'm', 'old')
+        analysis_cache.put(key, 'text', 'm', 'report')
+        old = (datetime.now() - timedelta(hours=48)).isoformat()
+        conn = database.get_db()
+        conn.execute("UPDATE analysis_cache SET created_at = ?", (old,))
+        conn.commit()
+        conn.close()
+        assert analysis_cache.get(key, ttl_hours=24) is None
+
+    def test_size_bounded_eviction(self):
+        for i in range(5):
+            analysis_cache.put(f'key{i}', 'text', 'm', i, max_entries=3)
+        assert analysis_cache.get_stats()['entries'] == 3
+        assert analysis_cache.get('key0') is None
+        assert analysis_cache.get('key4') == 4
+
+
+class TestAnalyzerUsesCache:
+    def test_structured_analysis_cached(self, sample_articles):
+        import rss_scraper
+        articles_text = rss_scraper.format_articles_for_analysis(sample_articles)
+        topic = {
+            'topic': 'GTA 6', 'title': 'GTA 6 trailer', 'angle': 'A', 'context': 'C',
+            'hook': 'H', 'visual': 'V', 'virality_score': 90, 'why_now': 'W',
+            'sources': ['https://ign.com/gta6'], 'seo_keywords': 'gta', 'game_name': 'GTA VI',
+            'status_tag': 'news',
+        }
+        message = SimpleNamespace(
+            content=[SimpleNamespace(type='tool_use', name='submit_analysis', input={'topics': [topic]})],
+            usage=SimpleNamespace(input_tokens=100, output_tokens=50),
+        )
+        with patch.object(claude_analyzer, '_call_structured_api', return_value=message) as mock_api, \
+                patch.object(claude_analyzer, 'get_client'):
+            first = claude_analyzer.analyze_articles_structured(articles_text)
+            second = claude_analyzer.analyze_articles_structured(articles_text)
+
+        assert mock_api.call_count == 1
+        assert first == second
+        assert second['topics'][0]['topic'] == 'GTA 6'
@@ -0,0 +1,109 @@
+"""Tests for article_cache module (SQLite backend)."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import config
+import database
+import article_cache
+import article_writer
+
+TOPIC = {'topic': 'Hra', 'title': 'Titulek', 'angle': 'Úhel', 'context': 'Kontext', 'seo_keywords': 'hra'}
+
+
+def _count():
+    conn = database.get_db()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM article_cache").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestMakeKey:
+    def test_deterministic(self):
+        assert article_cache.make_key(TOPIC, ['a'], 'medium', 1) == article_cache.make_key(dict(TOPIC), ['a'], 'medium', 1)
+
+    def test_inputs_change_key(self):
+        base = article_cache.make_key(TOPIC, ['a'], 'medium', 1)
+        assert article_cache.make_key(TOPIC, ['b'], 'medium', 1) != base
+        assert article_cache.make_key(TOPIC, ['a'], 'long', 1) != base
+        assert article_cache.make_key(TOPIC, ['a'], 'medium', 2) != base
+        assert article_cache.make_key(dict(TOPIC, angle='Jiný'), ['a'], 'medium', 1) != base
+
+    def test_unrelated_topic_fields_ignored(self):
+        base = article_cache.make_key(TOPIC, ['a'], 'medium', 1)
+        assert article_cache.make_key(dict(TOPIC, virality_score=99), ['a'], 'medium', 1) == base
+
+    def test_generation_settings_change_key(self):
+        base = article_cache.make_key(TOPIC, ['a'], 'medium', 1)
+        with patch.object(config, 'ARTICLE_STRUCTURED_OUTPUT', not config.ARTICLE_STRUCTURED_OUTPUT):
+            assert article_cache.make_key(TOPIC, ['a'], 'medium', 1) != base
+        with patch.object(config, 'SOURCE_CONDENSE', not config.SOURCE_CONDENSE):
+            assert article_cache.make_key(TOPIC, ['a'], 'medium', 1) != base
+
+
+class TestGetPut:
+    def test_miss_then_hit(self):
+        assert article_cache.get('k') is None
+        article_cache.put('k', {'cs': '<p>Článek</p>'})
+        assert article_cache.get('k') == {'cs': '<p>Článek</p>'}
+
+    def test_expired_entry_is_miss(self):
+        article_cache.put('k', {'cs': 'x'})
+        old = (datetime.now() - timedelta(hours=100)).isoformat()
+        conn = database.get_db()
+        conn.execute("UPDATE article_cache SET created_at = ?", (old,))
+        conn.commit()
+        conn.close()
+        assert article_cache.get('k', ttl_hours=72) is None
+
+    def test_size_bounded_eviction(self):
+        for i in range(5):
+            article_cache.put(f'key{i}', {'i': i}, max_entries=3)
+        assert _count() == 3
+        assert article_cache.get('key0') is None
+        assert article_cache.get('key4') == {'i': 4}
+
+    def test_clear(self):
+        article_cache.put('k', {'cs': 'x'})
+        article_cache.clear()
+        assert _count() == 0
+
+
+class TestWriteArticleCache:
+    @staticmethod
+    def _message():
+        message = MagicMock()
+        message.content = [MagicMock(text="TITULEK CZ: Titulek\n\n=== ČESKY ===\n<p>Česky.</p>\n\n=== ENGLISH ===\n<p>English.</p>")]
+        message.usage = MagicMock(input_tokens=1000, output_tokens=500)
+        return message
+
+    @patch.object(article_writer.config, 'ARTICLE_STRUCTURED_OUTPUT', False)
+    @patch('article_writer.get_client')
+    @patch('article_writer._call_api')
+    def test_second_call_served_from_cache(self, mock_api, mock_client):
+        mock_api.return_value = self._message()
+        first = article_writer.write_article(TOPIC, ['Zdroj'])
+        second = article_writer.write_article(TOPIC, ['Zdroj'])
+        assert mock_api.call_count == 1
+        assert first['cached'] is False
+        assert second['cached'] is True
+        assert second['cs'] == first['cs']
+        assert second['cost'] == "$0.0000"
+
+    @patch.object(article_writer.config, 'ARTICLE_STRUCTURED_OUTPUT', False)
+    @patch('article_writer.get_client')
+    @patch('article_writer._call_api')
+    def test_force_and_changed_sources_regenerate(self, mock_api, mock_client):
+        mock_api.return_value = self._message()
+        article_writer.write_article(TOPIC, ['Zdroj'])
+        article_writer.write_article(TOPIC, ['Zdroj'], force=True)
+        article_writer.write_article(TOPIC, ['Jiný zdroj'])
+        assert mock_api.call_count == 3
+
+    @patch('article_writer.get_client')
+    @patch('article_writer._call_api', side_effect=Exception("API down"))
+    def test_errors_not_cached(self, mock_api, mock_client):
+        with patch.object(article_writer.config, 'ARTICLE_STRUCTURED_OUTPUT', False):
+            assert 'error' in article_writer.write_article(TOPIC, ['Zdroj'])
+        assert _count() == 0
@@ -0,0 +1,121 @@
+"""Tests for article_packer module (token-budgeted article selection)."""
+
+import pytest
+from datetime import datetime, timezone
+
+import article_packer
+
+NOW = datetime(2025, 1, 15, 14, 0, tzinfo=timezone.utc)
+
+
+def _article(title, source='IGN', published='2025-01-15T12:00:00Z', summary='x' * 300):
+    return {
+        'source': source,
+        'language': 'en',
+        'title': title,
+        'link': f'https://example.com/{title.replace(" ", "-").lower()}',
+        'summary': summary,
+        'published': published,
+    }
+
+
+class TestEstimateTokens:
+    def test_empty(self):
+        assert article_packer.estimate_tokens('') == 0
+
+    def test_rounds_up(self):
+        assert article_packer.estimate_tokens('abcd') == 2
+
+
+class TestClusterArticles:
+    def test_same_story_clustered(self):
+        articles = [
+            _article('GTA 6 trailer breaks records'),
+            _article('New GTA 6 trailer breaks YouTube records', source='PC Gamer'),
+            _article('Palworld hits 2 million players'),
+        ]
+        ids = article_packer.cluster_articles(articles)
+        assert ids[0] == ids[1]
+        assert ids[2] != ids[0]
+
+
+class TestScoreArticles:
+    def test_newer_scores_higher(self):
+        articles = [
+            _article('Old news', published='2025-01-12T12:00:00Z'),
+            _article('Fresh news', published='2025-01-15T13:00:00Z'),
+        ]
+        scores = article_packer.score_articles(articles, source_weights={}, now=NOW)
+        assert scores[1] > scores[0]
+
+    def test_source_weight(self):
+        articles = [_article('Story A', source='Blog'), _article('Story B', source='Xbox Wire')]
+        scores = article_packer.score_articles(articles, source_weights={'Xbox Wire': 2.0}, now=NOW)
+        assert scores[1] == pytest.approx(scores[0] * 2)
+
+    def test_unknown_date_is_neutral(self):
+        scores = article_packer.score_articles([_article('No date', published='')], source_weights={}, now=NOW)
+        assert scores[0] == pytest.approx(0.5)
+
+
+class TestPackArticles:
+    def test_no_budget_keeps_everything(self, sample_articles):
+        result = article_packer.pack_articles(sample_articles, token_budget=0, source_weights={})
+        assert len(result['included']) == 3
+        assert result['dropped'] == []
+        assert 'ČLÁNEK 3:' in result['text']
+
+    def test_budget_drops_lowest_scored(self):
+        articles = [
+            _article('Stale rumor', published='2025-01-10T12:00:00Z'),
+            _article('GTA 6 trailer breaks records'),
+            _article('GTA 6 trailer hits 100 million views', source='PC Gamer'),
+        ]
+        result = article_packer.pack_articles(articles, token_budget=260, source_weights={}, now=NOW)
+        assert result['tokens'] <= 260
+        assert [a['title'] for a in result['dropped']] == ['Stale rumor']
+        assert 'Stale rumor' not in result['text']
+
+    def test_preserves_original_order(self):
+        articles = [
+            _article('First older', published='2025-01-15T08:00:00Z'),
+            _article('Second newer', published='2025-01-15T13:00:00Z'),
+        ]
+        result = article_packer.pack_articles(articles, token_budget=10_000, source_weights={}, now=NOW)
+        assert result['text'].index('First older') < result['text'].index('Second newer')
+
+
+class TestGroupClusters:
+    def test_ranked_by_total_score(self):
+        articles = [
+            _article('Palworld hits 2 million players'),
+            _article('GTA 6 trailer breaks records'),
+            _article('New GTA 6 trailer breaks YouTube records', source='PC Gamer'),
+        ]
+        clusters = article_packer.group_clusters(articles, source_weights={}, now=NOW)
+        assert [c['id'] for c in clusters] == [1, 2]
+        assert len(clusters[0]['articles']) == 2
+        assert clusters[1]['articles'][0]['title'].startswith('Palworld')
+
+    def test_compact_format(self):
+        articles = [
+            _article('GTA 6 trailer breaks records'),
+            _article('New GTA 6 trailer breaks YouTube records', source='PC Gamer'),
+        ]
+        text = article_packer.format_clusters_compact(
+            article_packer.group_clusters(articles, source_weights={}, now=NOW))
+        assert text == ("K1 [2× | IGN, PC Gamer]: GTA 6 trailer breaks records / "
+                        "New GTA 6 trailer breaks YouTube records")
+
+    def test_empty(self):
+        assert article_packer.group_clusters([]) == []
+
+
+class TestLatestPublished:
+    def test_newest_parseable_date(self):
+        articles = [_article('A', published='2025-01-14T12:00:00Z'), _article('B', published='nesmysl'),
+                    _article('C', published='Wed, 15 Jan 2025 13:00:00 GMT')]
+        assert article_packer.latest_published(articles) == datetime(2025, 1, 15, 13, 0, tzinfo=timezone.utc)
+
+    def test_none_without_dates(self):
+        assert article_packer.latest_published([_article('A', published='')]) is None
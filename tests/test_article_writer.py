@@ -4,10 +4,12 @@ import pytest
 from unittest.mock import patch, MagicMock
 
 import article_writer
+import config
+import html_pipeline
 
 
 class TestParseTopicsFromReport:
-    """Testy pro regex parsování témat z reportu."""
+    """Testy pro parsování témat z reportu."""
 
     def test_parses_two_topics(self, sample_report_text):
         topics = article_writer.parse_topics_from_report(sample_report_text)
@@ -66,74 +68,66 @@ https://example.com/article1
         assert topics[0]['virality_score'] == 75
 
 
-class TestStripMarkdownArtifacts:
-    def test_removes_code_fences(self):
-        html = "```html\n<p>Hello</p>\n```"
-        result = article_writer._strip_markdown_artifacts(html)
-        assert "```" not in result
-        assert "<p>Hello</p>" in result
-
-    def test_converts_markdown_headings(self):
-        html = "## Nadpis"
-        result = article_writer._strip_markdown_artifacts(html)
-        assert "<h2>Nadpis</h2>" in result
-
-    def test_converts_bold(self):
-        html = "**important text**"
-        result = article_writer._strip_markdown_artifacts(html)
-        assert "<strong>important text</strong>" in result
-
-    def test_converts_hr(self):
-        html = "---"
-        result = article_writer._strip_markdown_artifacts(html)
-        assert "<hr>" in result
-
-
-class TestMakeFirstParagraphQuote:
-    def test_wraps_first_paragraph(self):
-        html = "<p>First paragraph</p><p>Second paragraph</p>"
-        result = article_writer._make_first_paragraph_quote(html)
-        assert '<blockquote class="wp-block-quote"><p>First paragraph</p></blockquote>' in result
-        # Druhý odstavec zůstává nezměněn
-        assert "<p>Second paragraph</p>" in result
-
-    def test_no_paragraphs(self):
-        html = "<h2>Just a heading</h2>"
-        result = article_writer._make_first_paragraph_quote(html)
-        assert result == html
-
-
-class TestInsertSeparatorsBeforeH2:
-    def test_no_separator_before_first_h2(self):
-        html = "<h2>First</h2><p>text</p>"
-        result = article_writer._insert_separators_before_h2(html)
-        assert '<hr class="wp-block-separator' not in result.split("<h2>First</h2>")[0]
-
-    def test_separator_before_second_h2(self):
-        html = "<h2>First</h2><p>text</p><h2>Second</h2><p>more text</p>"
-        result = article_writer._insert_separators_before_h2(html)
-        assert '<hr class="wp-block-separator' in result
-        # Separator je před druhým h2, ne před prvním
-        before_first = result.split("<h2>First</h2>")[0]
-        assert "hr" not in before_first
-
-
-class TestStripGeneratedSources:
-    def test_strips_czech_sources(self):
-        html = "<p>Content</p><h2>Zdroje</h2><ul><li>src1</li></ul>"
-        result = article_writer._strip_generated_sources(html)
-        assert "<h2>Zdroje</h2>" not in result
-        assert "<p>Content</p>" in result
-
-    def test_strips_english_sources(self):
-        html = "<p>Content</p><h2>Sources</h2><ul><li>src1</li></ul>"
-        result = article_writer._strip_generated_sources(html)
-        assert "<h2>Sources</h2>" not in result
-
-    def test_keeps_non_source_content(self):
-        html = "<p>Content</p><h2>Other</h2><p>More</p>"
-        result = article_writer._strip_generated_sources(html)
-        assert result == html
+class TestParseTopicsVariants:
+    def test_value_on_next_line(self):
+        text = "🎮 TÉMA 1: Téma\n📰 NAVRŽENÝ TITULEK:\n\n  Titulek na dalším řádku\n🔥 VIRALITA: 60/100"
+        topic = article_writer.parse_topics_from_report(text)[0]
+        assert topic['title'] == 'Titulek na dalším řádku'
+        assert topic['virality_score'] == 60
+
+    def test_emoji_without_variation_selector(self):
+        text = "🎮 TÉMA 1: Téma\n\U0001f3f7 SEO KLÍČOVÁ SLOVA: gta, rockstar\n\U0001f579 NÁZEV HRY: GTA 6"
+        topic = article_writer.parse_topics_from_report(text)[0]
+        assert topic['seo_keywords'] == 'gta, rockstar'
+        assert topic['game_name'] == 'GTA 6'
+
+    def test_sources_stop_at_next_label(self):
+        text = ("🎮 TÉMA 1: Téma\n🔗 ZDROJE: https://ign.com/a\n- https://pcgamer.com/b).\n"
+                "🏷️ SEO KLÍČOVÁ SLOVA: x\n🕹️ NÁZEV HRY: https://not-a-source.com")
+        topic = article_writer.parse_topics_from_report(text)[0]
+        assert topic['sources'] == ['https://ign.com/a', 'https://pcgamer.com/b']
+
+    def test_invalid_status_tag_defaults_to_news(self):
+        text = "🎮 TÉMA 1: Téma\n📌 STATUS TAG: **CRITICAL**\n\n🎮 TÉMA 2: Další\n📌 STATUS TAG: neznámý"
+        topics = article_writer.parse_topics_from_report(text)
+        assert [t['status_tag'] for t in topics] == ['critical', 'news']
+
+    def test_roundtrip_with_structured_report(self):
+        from claude_analyzer import format_topics_as_report
+        topic = {'topic': 'Silksong', 'title': 'T', 'angle': 'A', 'context': 'K', 'hook': 'H', 'visual': 'V',
+                 'virality_score': 88, 'why_now': 'W', 'sources': ['https://ign.com/s', 'https://pcgamer.com/s'],
+                 'seo_keywords': 'silksong', 'game_name': 'Hollow Knight: Silksong', 'status_tag': 'leak'}
+        parsed = article_writer.parse_topics_from_report(format_topics_as_report([topic, topic]))
+        assert len(parsed) == 2
+        assert parsed[0]['virality_score'] == 88
+        assert parsed[0]['sources'] == topic['sources']
+        assert parsed[0]['game_name'] == 'Hollow Knight: Silksong'
+
+
+class TestLoadTopicsFromReport:
+    def test_cached_until_file_changes(self, tmp_path, sample_report_text):
+        report = tmp_path / 'report.txt'
+        report.write_text(sample_report_text, encoding='utf-8')
+        with patch('article_writer.parse_topics_from_report',
+                   wraps=article_writer.parse_topics_from_report) as parse:
+            first = article_writer.load_topics_from_report(str(report))
+            second = article_writer.load_topics_from_report(str(report))
+            assert parse.call_count == 1
+            assert first == second
+
+            report.write_text(sample_report_text.split('🎮 TÉMA 2')[0], encoding='utf-8')
+            assert len(article_writer.load_topics_from_report(str(report))) == 1
+            assert parse.call_count == 2
+
+    def test_returns_copies(self, tmp_path, sample_report_text):
+        report = tmp_path / 'report.txt'
+        report.write_text(sample_report_text, encoding='utf-8')
+        topics = article_writer.load_topics_from_report(str(report))
+        topics[0]['topic'] = 'změněno'
+        topics[0]['sources'].append('https://x.com')
+        again = article_writer.load_topics_from_report(str(report))
+        assert again[0]['topic'] == 'GTA 6 Trailer'
+        assert 'https://x.com' not in again[0]['sources']
 
 
 class TestBuildSourcesHtml:
@@ -157,40 +151,47 @@ class TestBuildSourcesHtml:
 
 
 class TestScrapeFullArticle:
-    @patch('article_writer.requests.get')
+    @patch('source_scraper.requests.Session.get')
     def test_scrapes_article_content(self, mock_get):
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.text = """
+        mock_resp.iter_content.return_value = [b"""
         <html><body>
             <article><p>This is the article content about gaming.</p></article>
         </body></html>
-        """
+        """]
+        mock_resp.headers = {}
         mock_resp.raise_for_status = MagicMock()
         mock_get.return_value = mock_resp
 
         result = article_writer.scrape_full_article("https://example.com/article")
         assert "article content" in result
 
-    @patch('article_writer.requests.get')
+    @patch('source_scraper.requests.Session.get')
     def test_handles_timeout(self, mock_get):
         mock_get.side_effect = Exception("Connection timeout")
         result = article_writer.scrape_full_article("https://example.com/article")
         assert "[Chyba" in result
 
-    @patch('article_writer.requests.get')
+    @patch('source_scraper.requests.Session.get')
     def test_truncates_long_content(self, mock_get):
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.text = f"<html><body><article><p>{'A' * 5000}</p></article></body></html>"
+        mock_resp.iter_content.return_value = [f"<html><body><article><p>{'A' * 20000}</p></article></body></html>".encode()]
+        mock_resp.headers = {}
         mock_resp.raise_for_status = MagicMock()
         mock_get.return_value = mock_resp
 
         result = article_writer.scrape_full_article("https://example.com/article")
-        assert len(result) <= 3000
+        assert len(result) == config.SOURCE_MAX_CHARS
 
 
 class TestWriteArticle:
+    @pytest.fixture(autouse=True)
+    def text_mode(self):
+        with patch.object(article_writer.config, 'ARTICLE_STRUCTURED_OUTPUT', False):
+            yield
+
     @patch('article_writer._call_api')
     def test_returns_cs_and_en(self, mock_api):
         mock_message = MagicMock()
@@ -234,3 +235,218 @@ TITULEK EN: Test Title
         topic = {'topic': 'Test', 'title': 'Test', 'angle': '', 'context': '', 'seo_keywords': '', 'sources': []}
         result = article_writer.write_article(topic, ["text"])
         assert 'error' in result
+
+    @patch('article_writer._call_api')
+    def test_static_rules_sent_as_system(self, mock_api):
+        mock_message = MagicMock()
+        mock_message.content = [MagicMock(text="=== ČESKY ===\n<p>Text</p>")]
+        mock_message.usage = MagicMock(input_tokens=100, output_tokens=50,
+                                       cache_read_input_tokens=4000, cache_creation_input_tokens=0)
+        mock_api.return_value = mock_message
+
+        topic = {'topic': 'Gothic', 'title': 'T', 'angle': '', 'context': '', 'seo_keywords': '', 'sources': []}
+        result = article_writer.write_article(topic, ["zdroj"], length='short')
+
+        args = mock_api.call_args[0]
+        prompt, system = args[4], args[5]
+        assert system == article_writer.ARTICLE_SYSTEM_PROMPT
+        assert 'ZAKÁZANÉ AI VZORCE' in system
+        assert 'ZAKÁZANÉ AI VZORCE' not in prompt
+        assert 'TÉMA: Gothic' in prompt
+        assert '600-800 slov' in prompt
+        assert result['cache_read_tokens'] == 4000
+
+
+STREAMED_ARTICLE = """KEYWORD CZ: "Gothic Remake"
+KEYWORD EN: gothic remake
+TITULEK CZ: Gothic remake dostal datum vydání
+TITULEK EN: Gothic remake gets a release date
+META CZ: Remake Gothicu vyjde v březnu.
+META EN: Gothic remake launches in March.
+STORY_CARDS CZ: [{"heading": "Datum", "body": "Vyjde v březnu."},
+{"heading": "Studio", "body": "Alkimia Interactive."}]
+STORY_CARDS EN: [{"heading": "Date", "body": "Out in March."}]
+
+=== ČESKY ===
+<p>Nový trailer ukazuje boj.</p>
+
+=== ENGLISH ===
+<p>The new trailer shows combat.</p>"""
+
+
+def _chunks(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestArticleStreamParser:
+    def test_fields_emitted_before_english_section(self):
+        events = []
+        parser = article_writer.ArticleStreamParser(lambda key, value: events.append(key))
+        en_start = STREAMED_ARTICLE.index('=== ENGLISH ===')
+        for chunk in _chunks(STREAMED_ARTICLE[:en_start + len('=== ENGLISH ===\n')]):
+            parser.feed(chunk)
+
+        assert events == ['focus_keyword_cs', 'focus_keyword_en', 'corrected_title', 'en_title',
+                          'meta_description_cs', 'meta_description_en', 'story_cards_cs',
+                          'story_cards_en', 'cs']
+        assert parser.fields['focus_keyword_cs'] == 'gothic remake'
+        assert parser.fields['corrected_title'] == 'Gothic remake dostal datum vydání'
+        assert len(parser.fields['story_cards_cs']) == 2
+        assert parser.fields['cs'] == '<p>Nový trailer ukazuje boj.</p>'
+
+    def test_cs_without_english_section_emitted_on_close(self):
+        parser = article_writer.ArticleStreamParser()
+        parser.feed("TITULEK CZ: Titulek\n=== ČESKY ===\n<p>Jen česky</p>")
+        assert 'cs' not in parser.fields
+        parser.close()
+        assert parser.fields['cs'] == '<p>Jen česky</p>'
+
+    def test_restart_does_not_repeat_fields(self):
+        events = []
+        parser = article_writer.ArticleStreamParser(lambda key, value: events.append(key))
+        parser.feed("TITULEK CZ: První\n")
+        parser.restart()
+        parser.feed("TITULEK CZ: Druhý\nTITULEK EN: Second\n")
+        assert events == ['corrected_title', 'en_title']
+
+    def test_timings(self):
+        now = [0.0]
+        parser = article_writer.ArticleStreamParser(clock=lambda: now[0])
+        now[0] = 1.5
+        parser.feed("KEYWORD CZ: gta 6\n")
+        now[0] = 4.0
+        parser.feed("=== ČESKY ===\n<p>x</p>\n=== ENGLISH ===\n")
+        assert parser.time_to_first_field == 1.5
+        assert parser.timings['cs'] == 4.0
+
+
+class FakeStream:
+    def __init__(self, text, message):
+        self.text_stream = iter(_chunks(text))
+        self._message = message
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get_final_message(self):
+        return self._message
+
+
+class TestStreamingWrite:
+    @pytest.fixture(autouse=True)
+    def text_mode(self):
+        with patch.object(article_writer.config, 'ARTICLE_STRUCTURED_OUTPUT', False):
+            yield
+
+    @patch('article_writer.get_client')
+    def test_write_article_streams_and_reports_timing(self, mock_get_client):
+        message = MagicMock()
+        message.content = [MagicMock(text=STREAMED_ARTICLE)]
+        message.usage = MagicMock(input_tokens=100, output_tokens=50)
+        client = MagicMock()
+        client.messages.stream.return_value = FakeStream(STREAMED_ARTICLE, message)
+        mock_get_client.return_value = client
+
+        seen = {}
+        topic = {'topic': 'Gothic', 'title': 'T', 'angle': '', 'context': '', 'seo_keywords': '', 'sources': []}
+        result = article_writer.write_article(topic, ["zdroj"], on_field=seen.__setitem__)
+
+        assert 'error' not in result
+        assert result['corrected_title'] == 'Gothic remake dostal datum vydání'
+        assert 'time_to_first_field' in result
+        assert result['time_to_cs'] >= result['time_to_first_field']
+        assert seen['cs'] == '<p>Nový trailer ukazuje boj.</p>'
+        assert client.messages.stream.call_args.kwargs['system'][0]['text'] == article_writer.ARTICLE_SYSTEM_PROMPT
+        client.messages.create.assert_not_called()
+
+
+TOOL_OUTPUT = {
+    'keyword_cs': 'Gothic Remake',
+    'keyword_en': 'gothic remake',
+    'title_cs': 'Gothic remake dostal datum vydání',
+    'title_en': 'Gothic remake gets a release date',
+    'meta_cs': 'Remake Gothicu vyjde v březnu.',
+    'meta_en': 'Gothic remake launches in March.',
+    'story_cards_cs': [{'heading': 'Datum', 'body': 'Vyjde v březnu.'}],
+    'story_cards_en': [{'heading': 'Date', 'body': 'Out in March.'}],
+    'cs_html': '<p>Nový trailer ukazuje boj.</p><h2>Boj</h2><p>Detaily.</p>',
+    'en_html': '<p>The new trailer shows combat.</p>',
+}
+
+
+def _tool_message(data):
+    message = MagicMock()
+    message.content = [MagicMock(type='tool_use', input=data)]
+    message.content[0].name = 'submit_article'
+    message.usage = MagicMock(input_tokens=100, output_tokens=50)
+    return message
+
+
+class FakeToolStream(FakeStream):
+    """Stream s input_json eventy — snapshot roste pole po poli jako u SDK."""
+
+    def __init__(self, data, message):
+        super().__init__('', message)
+        self._events = []
+        snapshot = {}
+        for key, value in data.items():
+            snapshot = {**snapshot, key: value}
+            self._events.append(MagicMock(type='input_json', snapshot=snapshot))
+
+    def __iter__(self):
+        return iter(self._events)
+
+
+class TestStructuredWrite:
+    @pytest.fixture(autouse=True)
+    def tool_mode(self):
+        with patch.object(article_writer.config, 'ARTICLE_STRUCTURED_OUTPUT', True):
+            yield
+
+    @patch('article_writer.get_client')
+    def test_tool_output_mapped_to_result(self, mock_get_client):
+        client = MagicMock()
+        client.messages.stream.return_value = FakeToolStream(TOOL_OUTPUT, _tool_message(TOOL_OUTPUT))
+        mock_get_client.return_value = client
+
+        seen = []
+        topic = {'topic': 'Gothic', 'title': 'T', 'angle': '', 'context': '', 'seo_keywords': '', 'sources': []}
+        result = article_writer.write_article(topic, ["zdroj"], on_field=lambda key, value: seen.append(key))
+
+        assert result['corrected_title'] == 'Gothic remake dostal datum vydání'
+        assert result['focus_keyword_cs'] == 'gothic remake'
+        assert result['story_cards_cs'] == [{'heading': 'Datum', 'body': 'Vyjde v březnu.'}]
+        assert result['cs'] == html_pipeline.process(TOOL_OUTPUT['cs_html'], html_pipeline.TOOL_STAGES)['html']
+        assert seen.index('cs') < seen.index('en')
+        kwargs = client.messages.stream.call_args.kwargs
+        assert kwargs['tool_choice'] == {'type': 'tool', 'name': 'submit_article'}
+        assert kwargs['system'][0]['text'] == article_writer.ARTICLE_TOOL_SYSTEM_PROMPT
+
+    @patch('article_writer._call_api')
+    @patch('article_writer._call_article_tool_api')
+    def test_invalid_tool_output_falls_back_to_text(self, mock_tool_api, mock_text_api):
+        mock_tool_api.return_value = _tool_message({'title_cs': 'Jen titulek'})
+        text_message = MagicMock()
+        text_message.content = [MagicMock(text=STREAMED_ARTICLE)]
+        text_message.usage = MagicMock(input_tokens=100, output_tokens=50)
+        mock_text_api.return_value = text_message
+
+        topic = {'topic': 'Gothic', 'title': 'T', 'angle': '', 'context': '', 'seo_keywords': '', 'sources': []}
+        result = article_writer.write_article(topic, ["zdroj"])
+
+        assert 'error' not in result
+        assert 'Nový trailer' in result['cs']
+        mock_text_api.assert_called_once()
+
+    def test_parse_dispatches_on_tool_block(self):
+        result = article_writer.parse_article_response(_tool_message(TOOL_OUTPUT), batch=True)
+        assert result['en_title'] == 'Gothic remake gets a release date'
+        assert 'English' not in result['cs']
+
+    def test_validation_error_reported(self):
+        bad = {**TOOL_OUTPUT, 'cs_html': ''}
+        result = article_writer.parse_article_response(_tool_message(bad))
+        assert result['error'].startswith('invalid_tool_output')
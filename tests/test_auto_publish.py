@@ -0,0 +1,317 @@
+"""Tests for auto_publish pipeline (run, _publish_topic) s mockovanými službami."""
+
+import importlib
+import json
+import sys
+import threading
+import time
+import types
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import database
+import retry_jobs
+import run_checkpoint
+
+TOPICS = [
+    {'topic': 'Elden Ring DLC', 'title': 'Elden Ring dostane DLC', 'game_name': 'Elden Ring',
+     'virality_score': 90, 'sources': ['https://ign.com/elden'], 'seo_keywords': '', 'status_tag': 'news'},
+    {'topic': 'Hollow Knight Silksong', 'title': 'Silksong má datum', 'game_name': 'Silksong',
+     'virality_score': 80, 'sources': ['https://pcgamer.com/silksong'], 'seo_keywords': '', 'status_tag': 'news'},
+]
+
+
+@pytest.fixture(scope='module')
+def auto_publish():
+    """Import auto_publish se stuby modulů, které v testovacím prostředí chybí (internal_linking, fb_generator)."""
+    internal_linking = types.ModuleType('internal_linking')
+    internal_linking.enrich_with_internal_links = lambda html, tag_names, lang='cs': html
+    fb_generator = types.ModuleType('fb_generator')
+    fb_module = types.ModuleType('fb_generator.generate_fb_post')
+    fb_module.generate_fb_post = MagicMock()
+    fb_generator.generate_fb_post = fb_module
+    stubs = {'internal_linking': internal_linking, 'fb_generator': fb_generator,
+             'fb_generator.generate_fb_post': fb_module}
+    with patch.dict(sys.modules, stubs):
+        sys.modules.pop('auto_publish', None)
+        yield importlib.import_module('auto_publish')
+
+
+def _article(topic):
+    return {'cs': f"<p>{topic['title']} česky.</p>", 'en': f"<p>{topic['title']} in English.</p>",
+            'en_title': topic['title'], 'cost': '$0.0100'}
+
+
+def _media():
+    media = MagicMock()
+    media.featured_image.return_value = (None, None)
+    media.section_images.return_value = None
+    media.tags.return_value = []
+    media.cancel.return_value = []
+    return media
+
+
+@pytest.fixture
+def pipeline(auto_publish, tmp_path, sample_articles):
+    """Celý run() s mockovaným RSS, Claude, zdroji, médii a WP — vrací dict mocků."""
+    ap = auto_publish
+    run_dir = tmp_path / 'run_test'
+    run_dir.mkdir()
+    posts = iter(range(100, 200))
+
+    def create_draft(title, content, lang=None, **kwargs):
+        post_id = next(posts)
+        return {'id': post_id, 'view_url': f'https://gamefo.cz/{lang}/{post_id}'}, None
+
+    mocks = {}
+    with ExitStack() as stack:
+        def mock(target, name, **kwargs):
+            mocks[name] = stack.enter_context(patch.object(target, name, **kwargs))
+            return mocks[name]
+
+        mock(ap.config, 'validate_config', return_value=True)
+        mock(ap.config, 'is_wp_configured', return_value=True)
+        stack.enter_context(patch.object(ap.config, 'WP_WRITE_INTERVAL', 0))
+        mock(ap.file_manager, 'create_run_directory', return_value=str(run_dir))
+        mock(ap.file_manager, 'save_report')
+        for name in ('load_history', 'get_processed_urls', 'mark_as_processed',
+                     'cleanup_old_entries', 'save_history'):
+            mock(ap.article_history, name, return_value={})
+        mock(ap.rss_scraper, 'scrape_all_feeds', return_value=sample_articles)
+        mock(ap.rss_scraper, 'save_articles_to_json')
+        mock(ap.claude_analyzer, 'analyze_articles_structured',
+             return_value={'text': 'report', 'topics': [dict(t) for t in TOPICS]})
+        mock(ap.claude_analyzer, 'extract_key_insights', return_value={})
+        mock(ap.topic_dedup, 'filter_duplicate_topics', side_effect=lambda topics: (topics, []))
+        mock(ap.source_scraper, 'scrape_sources', side_effect=lambda urls, want=None: [(u, 'zdroj') for u in urls])
+        mock(ap.media_prefetch, 'MediaPrefetch', side_effect=lambda topic: _media())
+        mock(ap.article_writer, 'write_article', side_effect=lambda topic, texts, on_field=None: _article(topic))
+        mock(ap.wp_publisher, 'check_wp_available', return_value=True)
+        mock(ap.wp_publisher, 'create_draft', side_effect=create_draft)
+        mock(ap.wp_publisher, 'link_translations', return_value=(True, None))
+        mock(ap.social_poster, 'post_to_all', return_value={'twitter': 'ok'})
+        mocks['run_id'] = run_dir.name
+        yield mocks
+
+
+def _logged_topics(action):
+    conn = database.get_db()
+    try:
+        rows = conn.execute("SELECT topic FROM publish_log WHERE action = ?", (action,)).fetchall()
+    finally:
+        conn.close()
+    return sorted(row["topic"] for row in rows)
+
+
+class TestConcurrentPublish:
+    def test_two_workers_serialize_wp_writes_and_social(self, auto_publish, pipeline):
+        ap = auto_publish
+        barrier = threading.Barrier(2, timeout=5)
+        active = {'post': 0, 'social': 0}
+        peak = {'post': 0, 'social': 0}
+        lock = threading.Lock()
+
+        def tracked(kind, result, duration):
+            def call(*args, **kwargs):
+                with lock:
+                    active[kind] += 1
+                    peak[kind] = max(peak[kind], active[kind])
+                time.sleep(duration)
+                with lock:
+                    active[kind] -= 1
+                return result
+            return call
+
+        def write_article(topic, texts, on_field=None):
+            barrier.wait()  # obě témata se píšou současně — jinak by neběžela paralelně
+            return _article(topic)
+
+        wp_post = tracked('post', MagicMock(status_code=201), 0.02)
+
+        fake_draft = pipeline['create_draft'].side_effect
+
+        def create_draft(title, content, lang=None, **kwargs):
+            # Skutečný create_draft zapisuje přes _post — stejná serializace
+            ap.wp_publisher._post('https://gamefo.cz/wp-json/wp/v2/posts', json={'title': title})
+            return fake_draft(title, content, lang=lang, **kwargs)
+
+        pipeline['write_article'].side_effect = write_article
+        pipeline['create_draft'].side_effect = create_draft
+        pipeline['post_to_all'].side_effect = tracked('social', {'twitter': 'ok'}, 0.2)
+        with patch.object(ap.config, 'AUTO_PUBLISH_WORKERS', 2), \
+                patch.object(ap.wp_publisher.requests, 'post', side_effect=wp_post):
+            ap.run(batch=False, tiered=False)
+
+        assert pipeline['create_draft'].call_count == 4
+        assert pipeline['post_to_all'].call_count == 2
+        assert peak == {'post': 1, 'social': 1}
+        assert _logged_topics('published') == sorted(t['topic'] for t in TOPICS)
+        states = run_checkpoint.load_topics(pipeline['run_id'])
+        assert {i: state['stage'] for i, state in states.items()} == {1: 'published', 2: 'published'}
+
+
+class TestSkippedTopicMedia:
+    def test_cs_error_discards_uploaded_media(self, auto_publish, pipeline):
+        prefetches = {}
+
+        def prefetch(topic):
+            media = prefetches[topic['title']] = _media()
+            media.featured_image.return_value = ('https://rawg/img.jpg', 77)
+            media.cancel.return_value = [77]
+            return media
+
+        fake_draft = pipeline['create_draft'].side_effect
+
+        def wp_down_for_second(title, content, lang=None, **kwargs):
+            if title == TOPICS[1]['title']:
+                return None, 'WP 503'
+            return fake_draft(title, content, lang=lang, **kwargs)
+
+        pipeline['MediaPrefetch'].side_effect = prefetch
+        pipeline['create_draft'].side_effect = wp_down_for_second
+        auto_publish.run(batch=False, tiered=False)
+
+        prefetches[TOPICS[0]['title']].cancel.assert_not_called()
+        prefetches[TOPICS[1]['title']].cancel.assert_called_once_with(discard_uploads=True)
+        # Smazané médium nesmí zůstat v checkpointu — navázaný běh média nahraje znovu
+        state = run_checkpoint.load_topics(pipeline['run_id'])[2]
+        assert state['stage'] == 'media'
+        assert 'media' not in state and 'article' in state
+
+        pipeline['create_draft'].side_effect = fake_draft
+        pipeline['MediaPrefetch'].reset_mock()
+        auto_publish.run(batch=False, resume=pipeline['run_id'])
+        pipeline['MediaPrefetch'].assert_called_once()
+        assert run_checkpoint.load_topics(pipeline['run_id'])[2]['stage'] == 'published'
+
+
+def _interrupted_run(pipeline, sample_articles, topic_stages=None):
+    """Checkpoint běhu přerušeného po deduplikaci (+ volitelně stav témat)."""
+    run_id = pipeline['run_id']
+    run_checkpoint.start_run(run_id, pipeline['create_run_directory'].return_value)
+    run_checkpoint.save_run(run_id, 'deduped', articles=sample_articles, analysis='report',
+                            topics=TOPICS, analyzed_links=[a['link'] for a in sample_articles],
+                            deduped_topics=TOPICS)
+    for i, (stage, artifacts) in (topic_stages or {}).items():
+        run_checkpoint.save_topic(run_id, i, stage, **artifacts)
+    return run_id
+
+
+class TestResume:
+    def test_skips_finished_stages(self, auto_publish, pipeline, sample_articles):
+        run_id = _interrupted_run(pipeline, sample_articles)
+        auto_publish.run(batch=False, resume=run_id)
+
+        pipeline['scrape_all_feeds'].assert_not_called()
+        pipeline['analyze_articles_structured'].assert_not_called()
+        pipeline['filter_duplicate_topics'].assert_not_called()
+        assert pipeline['write_article'].call_count == 2
+        assert run_checkpoint.load_run(run_id)['status'] == 'done'
+
+    def test_published_and_skipped_topics_not_repeated(self, auto_publish, pipeline, sample_articles):
+        run_id = _interrupted_run(pipeline, sample_articles, {1: ('published', {}), 2: ('skipped', {})})
+        auto_publish.run(batch=False, resume=run_id)
+
+        pipeline['scrape_sources'].assert_not_called()
+        pipeline['MediaPrefetch'].assert_not_called()
+        pipeline['write_article'].assert_not_called()
+        pipeline['create_draft'].assert_not_called()
+        assert run_checkpoint.load_run(run_id)['stage'] == 'done'
+
+    def test_cs_published_topic_only_publishes_en(self, auto_publish, pipeline, sample_articles):
+        cs_result = {'id': 42, 'view_url': 'https://gamefo.cz/cs/42'}
+        run_id = _interrupted_run(pipeline, sample_articles, {
+            1: ('published', {}),
+            2: ('cs_published', {'source_texts': ['zdroj'], 'source_urls': ['https://pcgamer.com/silksong'],
+                                 'article': _article(TOPICS[1]),
+                                 'media': {'image_url': None, 'featured_image_id': None, 'section_images': None},
+                                 'cs_result': cs_result}),
+        })
+        auto_publish.run(batch=False, resume=run_id)
+
+        pipeline['write_article'].assert_not_called()
+        assert [c.kwargs['lang'] for c in pipeline['create_draft'].call_args_list] == ['en']
+        pipeline['link_translations'].assert_called_once_with(42, 100)
+        assert run_checkpoint.load_topics(run_id)[2]['stage'] == 'published'
+
+    def test_failed_topic_marks_run_incomplete_and_resume_retries_it(self, auto_publish, pipeline):
+        fake_draft = pipeline['create_draft'].side_effect
+
+        def wp_down_for_second(title, content, lang=None, **kwargs):
+            if title == TOPICS[1]['title']:
+                return None, 'WP 503'
+            return fake_draft(title, content, lang=lang, **kwargs)
+
+        pipeline['create_draft'].side_effect = wp_down_for_second
+        auto_publish.run(batch=False, tiered=False)
+        run_id = pipeline['run_id']
+        assert run_checkpoint.load_run(run_id)['status'] == 'incomplete'
+        assert run_checkpoint.load_topics(run_id)[1]['stage'] == 'published'
+        assert run_checkpoint.load_topics(run_id)[2]['stage'] == 'media'
+
+        pipeline['create_draft'].side_effect = fake_draft
+        pipeline['write_article'].reset_mock()
+        pipeline['create_draft'].reset_mock()
+        auto_publish.run(batch=False, resume=run_id)
+
+        # Článek z checkpointu, publikuje se jen nedokončené téma
+        pipeline['write_article'].assert_not_called()
+        assert {c.kwargs['title'] for c in pipeline['create_draft'].call_args_list} == {TOPICS[1]['title']}
+        assert run_checkpoint.load_run(run_id)['status'] == 'done'
+
+    def test_batch_resumed_from_saved_batch_id(self, auto_publish, pipeline, sample_articles, tmp_path):
+        run_id = _interrupted_run(pipeline, sample_articles)
+        with open(tmp_path / 'run_test' / 'claude_batch.json', 'w', encoding='utf-8') as f:
+            json.dump({'batch_id': 'msgbatch_saved', 'custom_ids': ['topic-1', 'topic-2']}, f)
+
+        with patch.object(auto_publish.article_writer, 'build_article_request', return_value={}), \
+                patch.object(auto_publish.claude_batch, 'run_batch',
+                             return_value={'topic-1': {'error': 'expired'}, 'topic-2': {'error': 'expired'}}) as run_batch:
+            auto_publish.run(batch=True, resume=run_id)
+
+        assert run_batch.call_args.kwargs['batch_id'] == 'msgbatch_saved'
+        # Nedostupné výsledky dávky → články se dogenerují přímo
+        assert pipeline['write_article'].call_count == 2
+
+
+class TestAnalysisRetry:
+    @pytest.fixture
+    def analysis_down(self, auto_publish, pipeline):
+        """Strukturovaná i textová analýza selže (Claude nedostupný)."""
+        pipeline['analyze_articles_structured'].return_value = None
+        with patch.object(auto_publish.claude_analyzer, 'analyze_gaming_articles', return_value=None) as text, \
+                patch.object(auto_publish.config, 'ANALYSIS_RETRY_MINUTES', 0):
+            yield text
+
+    def test_failure_schedules_retry_and_run_due_resumes(self, auto_publish, pipeline, analysis_down):
+        auto_publish.run(batch=False, tiered=False)
+        run_id = pipeline['run_id']
+        saved = run_checkpoint.load_run(run_id)
+        assert (saved['stage'], saved['artifacts']['analysis_attempts']) == ('scraped', 1)
+        assert [job['run_id'] for job in retry_jobs.list_pending()] == [run_id]
+        pipeline['write_article'].assert_not_called()
+
+        # Claude je zase dostupný — --run-due naváže nad uloženými články
+        pipeline['analyze_articles_structured'].return_value = {'text': 'report', 'topics': [dict(t) for t in TOPICS]}
+        assert auto_publish.run_due_retries() == 1
+
+        assert pipeline['scrape_all_feeds'].call_count == 1
+        assert pipeline['analyze_articles_structured'].call_count == 2
+        assert _logged_topics('published') == sorted(t['topic'] for t in TOPICS)
+        assert run_checkpoint.load_run(run_id)['status'] == 'done'
+        assert retry_jobs.list_pending() == []
+        assert retry_jobs.claim_due() == []
+
+    def test_gives_up_after_max_attempts(self, auto_publish, pipeline, analysis_down):
+        with patch.object(auto_publish.config, 'ANALYSIS_MAX_ATTEMPTS', 2):
+            auto_publish.run(batch=False, tiered=False)
+            assert auto_publish.run_due_retries() == 1
+
+        run_id = pipeline['run_id']
+        assert pipeline['analyze_articles_structured'].call_count == 2
+        assert retry_jobs.list_pending() == []
+        saved = run_checkpoint.load_run(run_id)
+        assert saved['status'] == 'incomplete'
+        pipeline['write_article'].assert_not_called()
@@ -0,0 +1,110 @@
+"""Tests for claude_analyzer tiered analysis (pre-ranking + plná analýza)."""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import config
+import claude_analyzer
+
+TOPIC = {
+    'topic': 'GTA 6', 'title': 'GTA 6 trailer', 'angle': 'A', 'context': 'C',
+    'hook': 'H', 'visual': 'V', 'virality_score': 90, 'why_now': 'W',
+    'sources': ['https://ign.com/gta6'], 'seo_keywords': 'gta', 'game_name': 'GTA VI',
+    'status_tag': 'news',
+}
+
+
+def _article(title, source='IGN'):
+    return {'source': source, 'language': 'en', 'title': title, 'summary': 'x' * 200,
+            'link': f"https://example.com/{title.replace(' ', '-').lower()}",
+            'published': '2025-01-15T12:00:00Z'}
+
+
+ARTICLES = [
+    _article('GTA 6 trailer breaks records'),
+    _article('New GTA 6 trailer breaks YouTube records', source='PC Gamer'),
+    _article('Palworld hits 2 million players'),
+    _article('Hollow Knight Silksong release date'),
+    _article('Starfield expansion announced'),
+]
+
+
+def _tool_message(name, data):
+    return SimpleNamespace(
+        content=[SimpleNamespace(type='tool_use', name=name, input=data)],
+        usage=SimpleNamespace(input_tokens=100, output_tokens=20),
+    )
+
+
+@pytest.fixture(autouse=True)
+def local_weights():
+    with patch('feed_manager.get_source_weights', return_value={}):
+        yield
+
+
+class TestShortlistArticles:
+    def test_model_picks_clusters(self):
+        message = _tool_message('submit_shortlist', {'cluster_ids': [3, 99, 3]})
+        with patch.object(claude_analyzer, '_call_prerank_api', return_value=message) as api, \
+                patch.object(claude_analyzer, 'get_client'):
+            result = claude_analyzer.shortlist_articles(ARTICLES, shortlist=2, model='claude-haiku-4-5')
+
+        assert result['method'] == 'model'
+        assert result['cluster_ids'] == [3]
+        assert result['clusters'] == 4
+        assert len(result['articles']) == 1
+        prompt = api.call_args[0][2]
+        assert 'K1 [2×' in prompt
+        assert 'x' * 50 not in prompt
+
+    def test_local_scorer_skips_api(self):
+        with patch.object(claude_analyzer, '_call_prerank_api') as api:
+            result = claude_analyzer.shortlist_articles(ARTICLES, shortlist=1, model='local')
+        api.assert_not_called()
+        assert result['method'] == 'local'
+        # Největší cluster (GTA 6, 2 zdroje) má nejvyšší skóre
+        assert [a['title'] for a in result['articles']] == [ARTICLES[0]['title'], ARTICLES[1]['title']]
+
+    def test_api_failure_falls_back_to_local(self):
+        with patch.object(claude_analyzer, '_call_prerank_api', side_effect=RuntimeError('529')), \
+                patch.object(claude_analyzer, 'get_client'):
+            result = claude_analyzer.shortlist_articles(ARTICLES, shortlist=2, model='claude-haiku-4-5')
+        assert result['method'] == 'local'
+        assert result['cluster_ids'] == [1, 2]
+
+    def test_small_input_not_preranked(self):
+        with patch.object(claude_analyzer, '_call_prerank_api') as api:
+            result = claude_analyzer.shortlist_articles(ARTICLES[:2], shortlist=8, model='claude-haiku-4-5')
+        api.assert_not_called()
+        assert len(result['articles']) == 2
+
+
+class TestAnalyzeTiered:
+    def test_full_analysis_sees_only_shortlist(self):
+        prerank = _tool_message('submit_shortlist', {'cluster_ids': [1]})
+        analysis = _tool_message('submit_analysis', {'topics': [TOPIC]})
+        with patch.object(claude_analyzer, '_call_prerank_api', return_value=prerank), \
+                patch.object(claude_analyzer, '_call_structured_api', return_value=analysis) as api, \
+                patch.object(claude_analyzer, 'get_client'):
+            result = claude_analyzer.analyze_articles_tiered(ARTICLES, shortlist=1,
+                                                             prerank_model='claude-haiku-4-5')
+
+        assert result['topics'][0]['topic'] == 'GTA 6'
+        assert result['shortlist']['method'] == 'model'
+        prompt = api.call_args[0][1]
+        assert 'GTA 6 trailer breaks records' in prompt
+        assert 'Palworld' not in prompt
+        titles = [a['title'] for a in result['included']]
+        assert 'GTA 6 trailer breaks records' in titles
+        assert not any('Palworld' in title for title in titles)
+
+    def test_returns_none_when_analysis_fails(self):
+        with patch.object(claude_analyzer, 'analyze_articles_structured', return_value=None):
+            assert claude_analyzer.analyze_articles_tiered(ARTICLES, prerank_model='local') is None
+
+    def test_uses_configured_defaults(self):
+        with patch.object(config, 'PRERANK_MODEL', 'local'), patch.object(config, 'PRERANK_SHORTLIST', 2):
+            result = claude_analyzer.shortlist_articles(ARTICLES)
+        assert result['method'] == 'local'
+        assert len(result['cluster_ids']) == 2
@@ -0,0 +1,208 @@
+"""Tests for claude_batch module against a local stand-in Message Batches server."""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import anthropic
+import pytest
+
+import article_writer
+import claude_batch
+
+ARTICLE_TEXT = """TITULEK CZ: Gothic remake má datum
+TITULEK EN: Gothic remake gets a date
+
+=== ČESKY ===
+<p>Český článek.</p>
+
+=== ENGLISH ===
+<p>English article.</p>"""
+
+
+class StubBatchServer:
+    """Minimální Message Batches API: dávka skončí po `polls_until_done` dotazech na stav."""
+
+    def __init__(self, polls_until_done=2):
+        self.polls_until_done = polls_until_done
+        self.batches = {}
+        self.polls = 0
+        self.canceled = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type='application/json'):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                cancel = re.fullmatch(r'/v1/messages/batches/(\w+)/cancel', self.path)
+                if cancel:
+                    stub.canceled.append(cancel.group(1))
+                    return self._send(200, json.dumps(stub._batch_json(cancel.group(1), False)))
+                batch_id = f"msgbatch_{len(stub.batches) + 1}"
+                stub.batches[batch_id] = payload['requests']
+                self._send(200, json.dumps(stub._batch_json(batch_id, False)))
+
+            def do_GET(self):
+                results = re.fullmatch(r'/v1/messages/batches/(\w+)/results', self.path)
+                if results:
+                    lines = [json.dumps(stub._result(r)) for r in stub.batches[results.group(1)]]
+                    return self._send(200, '\n'.join(lines), 'application/binary')
+                batch_id = self.path.rsplit('/', 1)[-1]
+                stub.polls += 1
+                self._send(200, json.dumps(stub._batch_json(batch_id, stub.polls >= stub.polls_until_done)))
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _batch_json(self, batch_id, ended):
+        total = len(self.batches.get(batch_id, []))
+        return {
+            'id': batch_id,
+            'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': {'processing': 0 if ended else total, 'succeeded': total if ended else 0,
+                               'errored': 0, 'canceled': 0, 'expired': 0},
+            'created_at': '2026-01-01T00:00:00Z',
+            'expires_at': '2026-01-02T00:00:00Z',
+            'ended_at': '2026-01-01T00:10:00Z' if ended else None,
+            'archived_at': None,
+            'cancel_initiated_at': None,
+            'results_url': f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    @staticmethod
+    def _result(request):
+        custom_id = request['custom_id']
+        if 'fail' in custom_id:
+            return {'custom_id': custom_id, 'result': {
+                'type': 'errored',
+                'error': {'type': 'error', 'error': {'type': 'invalid_request_error', 'message': 'bad request'}},
+            }}
+        return {'custom_id': custom_id, 'result': {'type': 'succeeded', 'message': {
+            'id': f"msg_{custom_id}", 'type': 'message', 'role': 'assistant',
+            'model': request['params']['model'],
+            'content': [{'type': 'text', 'text': ARTICLE_TEXT}],
+            'stop_reason': 'end_turn', 'stop_sequence': None,
+            'usage': {'input_tokens': 2000, 'output_tokens': 1000},
+        }}}
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    with StubBatchServer() as server:
+        yield server
+
+
+@pytest.fixture
+def client(stub):
+    return anthropic.Anthropic(api_key='sk-ant-test', base_url=stub.base_url, max_retries=0)
+
+
+TOPIC = {'topic': 'Gothic', 'title': 'T', 'angle': '', 'context': '', 'seo_keywords': '', 'sources': []}
+
+
+class TestRunBatch:
+    def test_polls_until_ended_and_maps_results(self, stub, client):
+        sleeps = []
+        requests = {
+            'topic-1': article_writer.build_article_request(TOPIC, ['zdroj']),
+            'topic-2': article_writer.build_article_request(TOPIC, ['zdroj'], length='long'),
+        }
+        results = claude_batch.run_batch(requests, client=client, poll_interval=5, sleep=sleeps.append)
+
+        assert set(results) == {'topic-1', 'topic-2'}
+        assert results['topic-1']['message'].content[0].text == ARTICLE_TEXT
+        assert sleeps == [5]
+        sent = stub.batches['msgbatch_1']
+        assert [r['custom_id'] for r in sent] == ['topic-1', 'topic-2']
+        assert sent[1]['params']['max_tokens'] == 8192
+
+    def test_errored_request_reported(self, stub, client):
+        results = claude_batch.run_batch(
+            {'ok': {'model': 'm', 'max_tokens': 10, 'messages': []},
+             'fail': {'model': 'm', 'max_tokens': 10, 'messages': []}},
+            client=client, poll_interval=0, sleep=lambda _: None,
+        )
+        assert 'message' in results['ok']
+        assert results['fail'] == {'error': 'bad request'}
+
+    def test_on_submitted_receives_batch_id(self, client):
+        seen = []
+        claude_batch.run_batch({'a': {'model': 'm', 'max_tokens': 10, 'messages': []}},
+                               client=client, poll_interval=0, sleep=lambda _: None,
+                               on_submitted=seen.append)
+        assert seen == ['msgbatch_1']
+
+    def test_existing_batch_id_not_resubmitted(self, stub, client):
+        requests = {'topic-1': article_writer.build_article_request(TOPIC, ['zdroj'])}
+        claude_batch.run_batch(requests, client=client, poll_interval=0, sleep=lambda _: None)
+        seen = []
+        results = claude_batch.run_batch(requests, client=client, poll_interval=0, sleep=lambda _: None,
+                                         on_submitted=seen.append, batch_id='msgbatch_1')
+        assert list(stub.batches) == ['msgbatch_1']
+        assert seen == []
+        assert results['topic-1']['message'].content[0].text == ARTICLE_TEXT
+
+    def test_timeout_cancels_and_marks_incomplete(self, stub, client):
+        stub.polls_until_done = 100
+        results = claude_batch.run_batch({'a': {'model': 'm', 'max_tokens': 10, 'messages': []}},
+                                         client=client, poll_interval=0, timeout=0, sleep=lambda _: None)
+        assert results == {'a': {'error': 'batch_incomplete'}}
+        assert stub.canceled == ['msgbatch_1']
+
+    def test_empty_requests(self, client):
+        assert claude_batch.run_batch({}, client=client) == {}
+
+
+class TestBatchArticleParsing:
+    def test_batch_result_parsed_like_direct_call(self, client):
+        results = claude_batch.run_batch(
+            {'topic-1': article_writer.build_article_request(TOPIC, ['zdroj'])},
+            client=client, poll_interval=0, sleep=lambda _: None,
+        )
+        article = article_writer.parse_article_response(results['topic-1']['message'], batch=True)
+        assert article['corrected_title'] == 'Gothic remake má datum'
+        assert 'Český článek' in article['cs']
+        # 2000 in × $3 + 1000 out × $15 za MTok = $0.021, batch = polovina
+        assert article['cost'] == '$0.0105'
+
+    def test_build_request_matches_direct_prompt(self):
+        request = article_writer.build_article_request(TOPIC, ['zdroj'], length='short', structured=False)
+        assert request['system'][0]['text'] == article_writer.ARTICLE_SYSTEM_PROMPT
+        assert 'tools' not in request
+        assert request['system'][0]['cache_control'] == {'type': 'ephemeral'}
+        assert 'TÉMA: Gothic' in request['messages'][0]['content']
+        assert '600-800 slov' in request['messages'][0]['content']
+
+    def test_podcast_request(self):
+        request = article_writer.build_podcast_request('<p>Text článku</p>', lang='en')
+        assert request['temperature'] == 0.8
+        assert 'Text článku' in request['messages'][0]['content']
+        assert 'ALEX and MAYA' in request['messages'][0]['content']
+
+    def test_structured_request_uses_tool(self):
+        request = article_writer.build_article_request(TOPIC, ['zdroj'], structured=True)
+        assert request['tools'] == [article_writer.ARTICLE_TOOL]
+        assert request['tool_choice'] == {'type': 'tool', 'name': 'submit_article'}
+        assert request['system'][0]['text'] == article_writer.ARTICLE_TOOL_SYSTEM_PROMPT
@@ -0,0 +1,109 @@
+"""Tests for claude_client module (prompt caching + usage stats)."""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+
+import config
+import claude_client
+import claude_scheduler
+
+
+class TestCachedSystem:
+    def test_marks_block_ephemeral(self):
+        blocks = claude_client.cached_system("Pravidla")
+        assert blocks == [{
+            "type": "text",
+            "text": "Pravidla",
+            "cache_control": {"type": "ephemeral"},
+        }]
+
+
+class TestUsageStats:
+    def test_includes_cache_tokens(self):
+        usage = SimpleNamespace(input_tokens=100, output_tokens=50,
+                                cache_read_input_tokens=3000, cache_creation_input_tokens=0)
+        stats = claude_client.usage_stats(usage)
+        assert stats == {
+            'input_tokens': 100,
+            'output_tokens': 50,
+            'cache_read_tokens': 3000,
+            'cache_write_tokens': 0,
+        }
+
+    def test_missing_cache_fields(self):
+        usage = SimpleNamespace(input_tokens=10, output_tokens=5, cache_read_input_tokens=None)
+        stats = claude_client.usage_stats(usage)
+        assert stats['cache_read_tokens'] == 0
+        assert stats['cache_write_tokens'] == 0
+
+
+class TestEstimateCost:
+    def test_plain_usage(self):
+        usage = SimpleNamespace(input_tokens=1_000_000, output_tokens=1_000_000)
+        assert claude_client.estimate_cost(usage) == pytest.approx(18.00)
+
+    def test_cache_read_is_cheaper_than_write(self):
+        read = SimpleNamespace(input_tokens=0, output_tokens=0,
+                               cache_read_input_tokens=1_000_000, cache_creation_input_tokens=0)
+        write = SimpleNamespace(input_tokens=0, output_tokens=0,
+                                cache_read_input_tokens=0, cache_creation_input_tokens=1_000_000)
+        assert claude_client.estimate_cost(read) == pytest.approx(0.30)
+        assert claude_client.estimate_cost(write) == pytest.approx(3.75)
+
+    def test_model_pricing(self):
+        usage = SimpleNamespace(input_tokens=1_000_000, output_tokens=1_000_000)
+        assert claude_client.estimate_cost(usage, model='claude-haiku-4-5') == pytest.approx(6.00)
+        assert claude_client.estimate_cost(usage, model='claude-opus-4-1') == pytest.approx(90.00)
+        assert claude_client.estimate_cost(usage, model='neznamy-model') == pytest.approx(18.00)
+
+
+class TestGetClient:
+    @pytest.fixture(autouse=True)
+    def fresh_client(self):
+        claude_client.reset_client()
+        yield
+        claude_client.reset_client()
+
+    def test_returns_shared_instance(self):
+        with patch.object(config, 'CLAUDE_API_KEY', 'sk-ant-test-key-1'):
+            assert claude_client.get_client() is claude_client.get_client()
+
+    def test_rebuilt_after_key_change(self):
+        with patch.object(config, 'CLAUDE_API_KEY', 'sk-ant-test-key-1'):
+            first = claude_client.get_client()
+        with patch.object(config, 'CLAUDE_API_KEY', 'sk-ant-test-key-2'):
+            second = claude_client.get_client()
+        assert first is not second
+        assert second.api_key == 'sk-ant-test-key-2'
+
+    def test_uses_configured_timeouts(self):
+        with patch.object(config, 'CLAUDE_API_KEY', 'sk-ant-test-key-1'), \
+                patch.object(config, 'CLAUDE_CONNECT_TIMEOUT', 7.0):
+            client = claude_client.get_client()
+        assert client.timeout.connect == 7.0
+
+    def test_sdk_retries_disabled(self):
+        with patch.object(config, 'CLAUDE_API_KEY', 'sk-ant-test-key-1'):
+            assert claude_client.get_client().max_retries == 0
+
+    def test_sync_client_feeds_rate_limit_tracker(self):
+        def handler(request):
+            return httpx.Response(200, headers={'anthropic-ratelimit-requests-remaining': '7'}, json={
+                'id': 'msg_1', 'type': 'message', 'role': 'assistant', 'model': 'claude-sonnet-4-6',
+                'content': [{'type': 'text', 'text': 'ok'}], 'stop_reason': 'end_turn',
+                'usage': {'input_tokens': 1, 'output_tokens': 1},
+            })
+
+        tracker = claude_scheduler.RateLimitTracker()
+        transport = httpx.MockTransport(handler)
+        with patch.object(config, 'CLAUDE_API_KEY', 'sk-ant-test-key-1'), \
+                patch.object(claude_scheduler, 'tracker', tracker), \
+                patch('anthropic.DefaultHttpxClient', lambda **kw: httpx.Client(transport=transport, **{
+                    k: v for k, v in kw.items() if k != 'limits'})):
+            claude_client.get_client().messages.create(
+                model='claude-sonnet-4-6', max_tokens=10, messages=[{'role': 'user', 'content': 'hi'}])
+        # reserve() před odesláním nic neodečetl (stav neznámý), odpověď nastavila 7
+        assert tracker.requests_remaining == 7
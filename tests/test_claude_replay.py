@@ -0,0 +1,236 @@
+"""Tests for claude_replay module (lokální náhrada Messages API)."""
+
+import anthropic
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import analysis_cache
+import article_packer
+import config
+import claude_client
+import claude_replay
+import database
+import rss_scraper
+import topic_dedup
+
+PARAMS = {'model': 'claude-sonnet-4-6', 'max_tokens': 64,
+          'messages': [{'role': 'user', 'content': 'Ahoj'}]}
+
+
+def _client(server):
+    return anthropic.Anthropic(api_key='sk-ant-test', base_url=server.base_url, max_retries=0)
+
+
+class TestRequestKey:
+    def test_ignores_key_order_and_stream_flag(self):
+        a = claude_replay.request_key('/v1/messages', {'model': 'm', 'max_tokens': 1})
+        b = claude_replay.request_key('/v1/messages', {'max_tokens': 1, 'model': 'm', 'stream': True})
+        assert a == b
+
+    def test_differs_by_content(self):
+        a = claude_replay.request_key('/v1/messages', {'model': 'm'})
+        b = claude_replay.request_key('/v1/messages', {'model': 'n'})
+        assert a != b
+
+    def test_ignores_recent_topics_block(self):
+        def body(recent):
+            return {'model': 'm', 'messages': [{'role': 'user', 'content': f"{recent}\nČLÁNKY K ANALÝZE:\nx"}]}
+
+        with patch('topic_dedup.get_recent_published_topics',
+                   return_value=[{'topic': 'GTA 6', 'timestamp': '2026-01-01T10:00:00'}]):
+            monday = topic_dedup.format_recent_topics_for_prompt()
+        with patch('topic_dedup.get_recent_published_topics',
+                   return_value=[{'topic': 'Hollow Knight', 'timestamp': '2026-01-03T10:00:00'}]):
+            wednesday = topic_dedup.format_recent_topics_for_prompt()
+        assert monday != wednesday
+        keys = {claude_replay.request_key('/v1/messages', body(recent)) for recent in (monday, wednesday, '')}
+        assert len(keys) == 1
+
+
+class TestReplay:
+    def test_replays_saved_cassette(self, tmp_path):
+        with claude_replay.ReplayServer(mode='replay', cassette_dir=str(tmp_path)) as server:
+            key = claude_replay.request_key('/v1/messages', PARAMS)
+            server.save(key, PARAMS, 200, claude_replay.make_message('Nahráno'))
+            message = _client(server).messages.create(**PARAMS)
+        assert message.content[0].text == 'Nahráno'
+
+    def test_missing_cassette_is_404(self, tmp_path):
+        with claude_replay.ReplayServer(mode='replay', cassette_dir=str(tmp_path)) as server:
+            with pytest.raises(anthropic.NotFoundError):
+                _client(server).messages.create(**PARAMS)
+
+    def test_record_saves_upstream_response(self, tmp_path):
+        with claude_replay.ReplayServer(mode='mock', response=claude_replay.make_message('Z API')) as upstream:
+            with claude_replay.ReplayServer(mode='record', cassette_dir=str(tmp_path),
+                                            upstream_url=upstream.base_url) as recorder:
+                first = _client(recorder).messages.create(**PARAMS)
+            with claude_replay.ReplayServer(mode='replay', cassette_dir=str(tmp_path)) as replay:
+                second = _client(replay).messages.create(**PARAMS)
+        assert first.content[0].text == second.content[0].text == 'Z API'
+        assert len(upstream.log) == 1
+
+
+class TestFaults:
+    def test_injected_overload_with_retry_after(self):
+        with claude_replay.ReplayServer(mode='mock', faults=[529], retry_after=2) as server:
+            client = _client(server)
+            with pytest.raises(anthropic.APIStatusError) as exc:
+                client.messages.create(**PARAMS)
+            assert exc.value.status_code == 529
+            assert exc.value.response.headers['retry-after'] == '2'
+            assert client.messages.create(**PARAMS).content[0].text == 'OK'
+
+
+class TestStreaming:
+    def test_text_stream(self):
+        with claude_replay.ReplayServer(mode='mock', response=claude_replay.make_message('x' * 100)) as server:
+            with _client(server).messages.stream(**PARAMS) as stream:
+                chunks = list(stream.text_stream)
+                final = stream.get_final_message()
+        assert len(chunks) == 3
+        assert ''.join(chunks) == 'x' * 100
+        assert final.usage.output_tokens == 50
+
+    def test_tool_use_stream(self):
+        response = claude_replay.make_message(content=[{
+            'type': 'tool_use', 'id': 'toolu_1', 'name': 'submit_article',
+            'input': {'title_cs': 'Titulek', 'cs_html': '<p>Text</p>'},
+        }])
+        with claude_replay.ReplayServer(mode='mock', response=response) as server:
+            with _client(server).messages.stream(**PARAMS) as stream:
+                final = stream.get_final_message()
+        assert final.content[0].input == {'title_cs': 'Titulek', 'cs_html': '<p>Text</p>'}
+        assert final.stop_reason == 'tool_use'
+
+
+class TestBaseUrl:
+    @pytest.fixture(autouse=True)
+    def fresh_client(self):
+        claude_client.reset_client()
+        yield
+        claude_client.reset_client()
+
+    def test_shared_client_uses_configured_base_url(self):
+        with claude_replay.ReplayServer(mode='mock') as server, \
+                patch.object(config, 'CLAUDE_API_KEY', 'sk-ant-test'), \
+                patch.object(config, 'CLAUDE_BASE_URL', server.base_url):
+            message = claude_client.get_client().messages.create(**PARAMS)
+        assert message.content[0].text == 'OK'
+
+
+class TestBenchmark:
+    def test_retries_and_runs_concurrently(self):
+        original = (config.CLAUDE_BASE_URL, config.CLAUDE_API_KEY)
+        rows = claude_replay.benchmark(requests=6, latency=0.1, faults=[529], concurrency_levels=[1, 6])
+        serial, parallel = rows
+        assert serial['errors'] == parallel['errors'] == 0
+        assert serial['calls'] == parallel['calls'] == 7
+        assert serial['max_in_flight'] == 1
+        assert parallel['max_in_flight'] > 1
+        assert parallel['wall'] < serial['wall']
+        assert (config.CLAUDE_BASE_URL, config.CLAUDE_API_KEY) == original
+
+    def test_leaves_production_db_untouched(self):
+        analysis_cache.put('existing', 'text', 'm', 'report')
+        before = analysis_cache.get_stats()
+        claude_replay.benchmark(requests=2, latency=0, concurrency_levels=[2])
+
+        assert analysis_cache.get('existing') == 'report'
+        after = analysis_cache.get_stats()
+        assert after['misses'] == before['misses']
+        assert after['entries'] == 1
+        conn = database.get_db()
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM llm_calls").fetchone()[0] == 0
+        finally:
+            conn.close()
+
+
+class TestCompareAnalysis:
+    TOPIC = {
+        'topic': 'GTA 6', 'title': 'T', 'angle': 'A', 'context': 'C', 'hook': 'H', 'visual': 'V',
+        'virality_score': 90, 'why_now': 'W', 'sources': ['https://ign.com/gta6'],
+        'seo_keywords': 'gta', 'game_name': 'GTA VI', 'status_tag': 'news',
+    }
+
+    def _respond(self, body):
+        tool = body['tool_choice']['name']
+        data = {'cluster_ids': [1]} if tool == 'submit_shortlist' else {'topics': [self.TOPIC]}
+        tokens = sum(len(str(m['content'])) for m in body['messages']) // 4
+        return claude_replay.make_message(model=body['model'], input_tokens=tokens, content=[
+            {'type': 'tool_use', 'id': 'toolu_1', 'name': tool, 'input': data}])
+
+    def test_record_then_replay(self, tmp_path, sample_articles):
+        original_key = config.CLAUDE_API_KEY
+        articles = sample_articles * 4
+        for i, article in enumerate(articles):
+            article = articles[i] = dict(article, title=f"{article['title']} {i} unikát{i}")
+        with patch('feed_manager.get_source_weights', return_value={}), \
+                claude_replay.ReplayServer(mode='mock', response=self._respond) as upstream:
+            recorded = claude_replay.compare_analysis(
+                articles, mode='record', cassette_dir=str(tmp_path), shortlist=2,
+                prerank_model='claude-haiku-4-5', upstream_url=upstream.base_url)
+            replayed = claude_replay.compare_analysis(
+                articles, mode='replay', cassette_dir=str(tmp_path), shortlist=2,
+                prerank_model='claude-haiku-4-5')
+
+        assert len(upstream.log) == 3
+        assert recorded['single']['calls'] == 1
+        assert recorded['tiered']['calls'] == 2
+        assert replayed['single']['cost'] == recorded['single']['cost']
+        assert replayed['tiered']['topics'] == ['GTA 6']
+        assert replayed['tiered']['cost'] < replayed['single']['cost']
+        assert config.CLAUDE_BASE_URL == ''
+        assert config.CLAUDE_API_KEY == original_key
+
+    def test_existing_cache_and_ledger_survive(self, tmp_path, sample_articles):
+        analysis_cache.put('existing', 'structured', 'm', {'text': 'report', 'topics': []})
+        with patch('feed_manager.get_source_weights', return_value={}), \
+                claude_replay.ReplayServer(mode='mock', response=self._respond) as upstream:
+            report = claude_replay.compare_analysis(
+                sample_articles, mode='record', cassette_dir=str(tmp_path), shortlist=2,
+                prerank_model='claude-haiku-4-5', upstream_url=upstream.base_url)
+
+        assert report['single']['calls'] == 1
+        assert analysis_cache.get('existing') == {'text': 'report', 'topics': []}
+        stats = analysis_cache.get_stats()
+        assert stats['entries'] == 1
+        assert stats['misses'] == 0
+        conn = database.get_db()
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM llm_calls").fetchone()[0] == 0
+        finally:
+            conn.close()
+
+    def test_replay_matches_on_a_later_day(self, tmp_path):
+        fresh = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+        titles = ['Elden Ring DLC date', 'Hollow Knight Silksong release', 'Mafia remake sales', 'Nintendo Direct recap']
+        articles = [{'source': 'IGN', 'language': 'en', 'title': title, 'link': f'https://ign.com/{i}',
+                     'summary': 'x' * 300, 'published': fresh if i < 3 else ''}
+                    for i, title in enumerate(titles)]
+        # Budget na dva články — výběr závisí na čerstvosti vůči referenčnímu času
+        cost = article_packer.estimate_tokens(rss_scraper.format_articles_for_analysis(articles[:1])) + 1
+        kwargs = dict(cassette_dir=str(tmp_path), shortlist=2, prerank_model='claude-haiku-4-5')
+        with patch('feed_manager.get_source_weights', return_value={}), \
+                patch.object(config, 'ANALYSIS_TOKEN_BUDGET', 2 * cost + 1), \
+                claude_replay.ReplayServer(mode='mock', response=self._respond) as upstream:
+            with patch('topic_dedup.get_recent_published_topics', return_value=[]):
+                recorded = claude_replay.compare_analysis(articles, mode='record',
+                                                          upstream_url=upstream.base_url, **kwargs)
+
+            # O dva dny později: jiná nedávná témata v promptu, články o 48 h starší
+            class LaterDatetime(datetime):
+                @classmethod
+                def now(cls, tz=None):
+                    return datetime.now(tz) + timedelta(hours=48)
+
+            later = [{'topic': 'Hollow Knight', 'timestamp': '2026-01-03T10:00:00'}]
+            with patch('topic_dedup.get_recent_published_topics', return_value=later), \
+                    patch.object(article_packer, 'datetime', LaterDatetime):
+                replayed = claude_replay.compare_analysis(articles, mode='replay', **kwargs)
+
+        assert replayed['single']['topics'] == recorded['single']['topics'] == ['GTA 6']
+        assert replayed['tiered']['topics'] == recorded['tiered']['topics'] == ['GTA 6']
+        assert replayed['tiered']['cost'] == recorded['tiered']['cost']
@@ -0,0 +1,131 @@
+"""Tests for claude_scheduler module (retry-after backoff + rate limit scheduling)."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import anthropic
+import httpx
+import pytest
+
+import claude_scheduler
+
+
+def _error(cls, status, headers=None):
+    response = httpx.Response(
+        status, headers=headers or {},
+        request=httpx.Request('POST', 'https://api.anthropic.com/v1/messages'),
+    )
+    return cls('error', response=response, body=None)
+
+
+def _reset_in(seconds):
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
+class TestRetryAfter:
+    def test_seconds_header(self):
+        exc = _error(anthropic.RateLimitError, 429, {'retry-after': '7'})
+        assert claude_scheduler.retry_after_seconds(exc) == 7.0
+
+    def test_ms_header_preferred(self):
+        exc = _error(anthropic.RateLimitError, 429, {'retry-after-ms': '1500', 'retry-after': '7'})
+        assert claude_scheduler.retry_after_seconds(exc) == 1.5
+
+    def test_missing_header(self):
+        exc = _error(anthropic.InternalServerError, 500)
+        assert claude_scheduler.retry_after_seconds(exc) is None
+
+    def test_backoff_uses_header(self):
+        exc = _error(anthropic.RateLimitError, 429, {'retry-after': '3'})
+        assert claude_scheduler.backoff_seconds(4, exc) == 3.0
+
+    def test_backoff_caps_long_retry_after(self):
+        exc = _error(anthropic.RateLimitError, 429, {'retry-after': '3600'})
+        assert claude_scheduler.backoff_seconds(1, exc) == claude_scheduler.config.CLAUDE_MAX_RETRY_AFTER
+
+    def test_backoff_without_header_is_seconds_scale(self):
+        exc = _error(anthropic.InternalServerError, 500)
+        assert [claude_scheduler.backoff_seconds(n, exc) for n in (1, 2, 3)] == [1.0, 2.0, 4.0]
+        assert claude_scheduler.backoff_seconds(20, exc) == claude_scheduler.config.CLAUDE_MAX_BACKOFF
+
+
+class TestRateLimitTracker:
+    def test_no_headers_never_waits(self):
+        tracker = claude_scheduler.RateLimitTracker()
+        assert tracker.reserve(10_000, 4000) == 0.0
+
+    def test_waits_until_request_reset(self):
+        now = [100.0]
+        tracker = claude_scheduler.RateLimitTracker(clock=lambda: now[0])
+        tracker.update({
+            'anthropic-ratelimit-requests-remaining': '1',
+            'anthropic-ratelimit-requests-reset': _reset_in(10),
+        })
+        assert tracker.reserve() == 0.0
+        delay = tracker.reserve()
+        assert 9 < delay <= 10
+
+    def test_waits_for_input_tokens(self):
+        tracker = claude_scheduler.RateLimitTracker()
+        tracker.update({
+            'anthropic-ratelimit-input-tokens-remaining': '500',
+            'anthropic-ratelimit-input-tokens-reset': _reset_in(5),
+        })
+        assert tracker.reserve(estimated_input_tokens=400) == 0.0
+        assert tracker.reserve(estimated_input_tokens=400) > 0
+
+    def test_expired_reset_clears_state(self):
+        now = [0.0]
+        tracker = claude_scheduler.RateLimitTracker(clock=lambda: now[0])
+        tracker.update({
+            'anthropic-ratelimit-requests-remaining': '0',
+            'anthropic-ratelimit-requests-reset': _reset_in(2),
+        })
+        now[0] = 10.0
+        assert tracker.reserve() == 0.0
+        assert tracker.requests_remaining is None
+
+
+class TestTenacityWait:
+    def test_retry_wait_honours_retry_after(self):
+        exc = _error(anthropic.RateLimitError, 429, {'retry-after': '4'})
+        state = SimpleNamespace(attempt_number=1, outcome=SimpleNamespace(exception=lambda: exc))
+        assert claude_scheduler.retry_wait(state) == 4.0
+
+
+class TestSyncHooks:
+    def _request(self, path='/v1/messages', body=None):
+        return httpx.Request('POST', f'https://api.anthropic.com{path}',
+                             json=body or {'max_tokens': 100, 'messages': [{'role': 'user', 'content': 'x' * 350}]})
+
+    def test_response_updates_shared_tracker(self, monkeypatch):
+        tracker = claude_scheduler.RateLimitTracker()
+        monkeypatch.setattr(claude_scheduler, 'tracker', tracker)
+        response = httpx.Response(529, headers={'anthropic-ratelimit-requests-remaining': '0',
+                                                'anthropic-ratelimit-requests-reset': _reset_in(5)},
+                                  request=self._request())
+        claude_scheduler.sync_response_hook(response)
+        assert tracker.requests_remaining == 0
+
+    def test_request_waits_for_reset(self, monkeypatch):
+        tracker = claude_scheduler.RateLimitTracker()
+        tracker.update({'anthropic-ratelimit-requests-remaining': '0',
+                        'anthropic-ratelimit-requests-reset': _reset_in(3)})
+        monkeypatch.setattr(claude_scheduler, 'tracker', tracker)
+        sleeps = []
+
+        def fake_sleep(delay):
+            sleeps.append(delay)
+            tracker.requests_remaining = None  # reset proběhl
+
+        monkeypatch.setattr(claude_scheduler.time, 'sleep', fake_sleep)
+        claude_scheduler.sync_request_hook(self._request())
+        assert len(sleeps) == 1 and 2 < sleeps[0] <= 3
+
+    def test_batches_requests_not_gated(self, monkeypatch):
+        tracker = claude_scheduler.RateLimitTracker()
+        tracker.update({'anthropic-ratelimit-requests-remaining': '0',
+                        'anthropic-ratelimit-requests-reset': _reset_in(3)})
+        monkeypatch.setattr(claude_scheduler, 'tracker', tracker)
+        monkeypatch.setattr(claude_scheduler.time, 'sleep', lambda d: pytest.fail("nemá čekat"))
+        claude_scheduler.sync_request_hook(self._request('/v1/messages/batches'))
@@ -0,0 +1,129 @@
+"""Tests for content_extractor module."""
+
+import os
+
+import pytest
+
+import content_extractor
+from content_extractor import extract_text, get_backend
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'extractor_corpus')
+FAST_BACKENDS = [name for name in content_extractor.available_backends() if name != 'bs4']
+
+PARAGRAPH = "Tohle je dostatečně dlouhý odstavec s obsahem článku o videohrách. "
+
+
+class TestCorpusQuality:
+    @pytest.mark.parametrize("backend", FAST_BACKENDS)
+    def test_all_expected_and_no_boilerplate(self, backend):
+        for case in content_extractor.load_corpus(CORPUS_DIR):
+            text = extract_text(case['html'], case['url'], max_chars=0, backend=backend)
+            score = content_extractor.score_case(text, case)
+            assert score['recall'] == 1.0, case['file']
+            assert score['leaked'] == 0, case['file']
+
+    def test_benchmark_reports_each_backend(self):
+        rows = content_extractor.benchmark(CORPUS_DIR, backends=['html.parser'], repeat=1)
+        assert rows[0]['backend'] == 'html.parser'
+        assert rows[0]['recall'] == 1.0
+        assert rows[0]['ms_per_page'] > 0
+
+
+class TestStreamingExtractor:
+    @pytest.mark.parametrize("chunk", [97, 4096])
+    def test_corpus_quality_when_streamed(self, chunk):
+        for case in content_extractor.load_corpus(CORPUS_DIR):
+            data = case['html'].encode()
+            extractor = content_extractor.StreamingExtractor(case['url'])
+            for i in range(0, len(data), chunk):
+                if extractor.feed(data[i:i + chunk]):
+                    break
+            extractor.close()
+            score = content_extractor.score_case(extractor.extract(max_chars=0, backend='html.parser'), case)
+            assert score == {'recall': 1.0, 'leaked': 0}, case['file']
+
+    def test_domain_hint_container(self):
+        extractor = content_extractor.StreamingExtractor('https://www.pcgamer.com/x', encoding='utf-8')
+        assert not extractor.feed(f"<div id='article-body'><p>{PARAGRAPH * 4}</p>".encode())
+        assert extractor.feed(b"</div><div class='comments'>")
+
+    def test_short_container_does_not_stop(self):
+        extractor = content_extractor.StreamingExtractor(encoding='utf-8')
+        assert not extractor.feed(b"<article><p>Teaser</p></article>")
+
+    def test_related_card_before_article_does_not_stop(self):
+        card = f"<div class='related-posts'><article class='card'><p>{PARAGRAPH * 3}</p></article></div>"
+        body = ''.join(f"<p>Odstavec {i}: {PARAGRAPH}</p>" for i in range(12))
+        html = f"<html><body>{card}<article>{body}</article><div class='comments'>x</div></body></html>"
+        data = html.encode()
+        extractor = content_extractor.StreamingExtractor(encoding='utf-8')
+        stopped_at = None
+        for i in range(0, len(data), 1024):
+            if extractor.feed(data[i:i + 1024]):
+                stopped_at = i + 1024
+                break
+        extractor.close()
+
+        assert stopped_at is not None and stopped_at > data.index(b'</article>', data.index(body.encode()))
+        assert 'Odstavec 11' in extractor.extract(max_chars=0, backend='html.parser')
+
+    def test_sniff_encoding(self):
+        assert content_extractor.sniff_encoding(b'<meta charset="windows-1250">') == 'cp1250'
+        assert content_extractor.sniff_encoding(b'<meta charset="bogus">') == 'utf-8'
+        assert content_extractor.sniff_encoding(b'<html>') == 'utf-8'
+
+
+class TestExtractText:
+    def test_empty_html(self):
+        assert extract_text('') == ''
+        assert extract_text('   ') == ''
+
+    def test_skips_scripts_and_nav(self):
+        html = ("<html><body><nav><p>Menu odkaz číslo jedna až deset a další</p></nav>"
+                "<script>var x = 'skryto v skriptu';</script>"
+                f"<article><p>{PARAGRAPH * 4}</p></article></body></html>")
+        text = extract_text(html, backend='html.parser')
+        assert 'videohrách' in text
+        assert 'Menu' not in text
+        assert 'skryto' not in text
+
+    def test_max_chars(self):
+        html = f"<article><p>{'A' * 5000}</p></article>"
+        assert len(extract_text(html, max_chars=3000, backend='html.parser')) == 3000
+
+    def test_domain_hint_wins(self):
+        html = (f"<html><body><div class='article-body-wide'><p>{PARAGRAPH * 6}</p></div>"
+                f"<div id='article-body'><p>Správný text z hintu. {PARAGRAPH * 3}</p></div></body></html>")
+        text = extract_text(html, 'https://www.pcgamer.com/x', backend='html.parser')
+        assert text.startswith('Správný text z hintu.')
+
+    def test_fallback_to_root_text(self):
+        assert extract_text('<div><span>Krátký text</span></div>', backend='html.parser') == 'Krátký text'
+
+    def test_unclosed_tags(self):
+        html = f"<div class='content'><p>1. {PARAGRAPH}<p>2. {PARAGRAPH}<br><p>3. {PARAGRAPH}"
+        lines = extract_text(html, backend='html.parser').split('\n')
+        assert [line[:2] for line in lines] == ['1.', '2.', '3.']
+
+
+class TestBackends:
+    def test_unknown_backend_falls_back_to_stdlib(self):
+        assert isinstance(get_backend('neexistuje'), content_extractor.StdlibBackend)
+
+    def test_auto_picks_first_available(self):
+        expected = content_extractor.BACKENDS[content_extractor.available_backends()[0]]
+        assert isinstance(get_backend('auto'), expected)
+
+    def test_bs4_legacy(self):
+        html = f"<article><p>{PARAGRAPH}</p></article>"
+        assert 'videohrách' in extract_text(html, backend='bs4')
+
+    def test_lxml_matches_stdlib(self):
+        pytest.importorskip('lxml')
+        html = f"<main><h2>Nadpis článku o hrách</h2><p>{PARAGRAPH * 4}</p></main>"
+        assert extract_text(html, backend='lxml') == extract_text(html, backend='html.parser')
+
+    def test_selectolax_matches_stdlib(self):
+        pytest.importorskip('selectolax.lexbor')
+        html = f"<main><h2>Nadpis článku o hrách</h2><p>{PARAGRAPH * 4}</p></main>"
+        assert extract_text(html, backend='selectolax') == extract_text(html, backend='html.parser')
@@ -129,3 +129,14 @@ class TestDeleteFeed:
     def test_returns_false_for_missing(self, feeds_file):
         with patch.object(feed_manager, 'FEEDS_FILE', feeds_file):
             assert feed_manager.delete_feed("nonexistent") is False
+
+
+class TestGetSourceWeights:
+    def test_default_and_custom_weights(self, tmp_path, sample_feeds):
+        sample_feeds[1]["weight"] = 1.5
+        fpath = tmp_path / "weighted_feeds.json"
+        fpath.write_text(json.dumps({"feeds": sample_feeds}), encoding='utf-8')
+        with patch.object(feed_manager, 'FEEDS_FILE', str(fpath)):
+            weights = feed_manager.get_source_weights()
+        assert weights["IGN"] == 1.0
+        assert weights["Hrej.cz"] == 1.5
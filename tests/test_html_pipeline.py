@@ -0,0 +1,150 @@
+"""Tests for html_pipeline module (úpravy vygenerovaného HTML + golden výstupy)."""
+
+import json
+import os
+
+import pytest
+
+import html_pipeline
+from html_pipeline import process
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'html_pipeline')
+
+
+def _read(name):
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _cases():
+    with open(os.path.join(FIXTURES, 'cases.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _stage(html, stage):
+    return process(html, (stage,))['html']
+
+
+class TestGolden:
+    @pytest.mark.parametrize("case", _cases(), ids=lambda c: c['name'])
+    def test_generated_and_published(self, case):
+        stages = html_pipeline.GENERATED_STAGES if case['stages'] == 'generated' else html_pipeline.TOOL_STAGES
+        result = process(_read(f"{case['name']}.input.html").strip(), stages)
+        assert result['html'] == _read(f"{case['name']}.generated.html")
+        assert result['excerpt'] == case['excerpt']
+        published = process(result['html'], ('heading', 'blocks'))['html']
+        assert published == _read(f"{case['name']}.published.html")
+
+    def test_benchmark(self):
+        timings = html_pipeline.benchmark(FIXTURES, repeat=1)
+        assert set(timings) == {'generated_us', 'published_us', 'excerpt_us'}
+        assert all(value > 0 for value in timings.values())
+
+
+class TestMarkdown:
+    def test_removes_code_fences(self):
+        result = _stage("```html\n<p>Hello</p>\n```", 'markdown')
+        assert "```" not in result
+        assert "<p>Hello</p>" in result
+
+    def test_converts_markdown_headings(self):
+        assert "<h2>Nadpis</h2>" in _stage("## Nadpis", 'markdown')
+        assert _stage("### Menší", 'markdown') == "<h3>Menší</h3>"
+
+    def test_heading_only_at_line_start(self):
+        assert _stage("<p>Issue #1 opraven</p>", 'markdown') == "<p>Issue #1 opraven</p>"
+
+    def test_converts_bold(self):
+        assert "<strong>important text</strong>" in _stage("**important text**", 'markdown')
+
+    def test_bold_not_in_attributes(self):
+        html = '<a title="**x**" href="/a">odkaz</a>'
+        assert _stage(html, 'markdown') == html
+
+    def test_converts_hr(self):
+        assert "<hr>" in _stage("---", 'markdown')
+
+    def test_dashes_in_text_kept(self):
+        assert _stage("<p>Co-op -- nový režim</p>", 'markdown') == "<p>Co-op -- nový režim</p>"
+
+
+class TestFirstParagraphQuote:
+    def test_wraps_first_paragraph(self):
+        result = _stage("<p>First paragraph</p><p>Second paragraph</p>", 'quote')
+        assert '<blockquote class="wp-block-quote"><p>First paragraph</p></blockquote>' in result
+        # Druhý odstavec zůstává nezměněn
+        assert "<p>Second paragraph</p>" in result
+
+    def test_no_paragraphs(self):
+        html = "<h2>Just a heading</h2>"
+        assert _stage(html, 'quote') == html
+
+
+class TestSeparators:
+    def test_no_separator_before_first_h2(self):
+        result = _stage("<h2>First</h2><p>text</p>", 'separators')
+        assert '<hr class="wp-block-separator' not in result.split("<h2>First</h2>")[0]
+
+    def test_separator_before_second_h2(self):
+        result = _stage("<h2>First</h2><p>text</p><h2>Second</h2><p>more text</p>", 'separators')
+        assert result == ('<h2>First</h2><p>text</p>\n' + html_pipeline.SEPARATOR
+                          + '\n<h2>Second</h2><p>more text</p>')
+
+
+class TestGeneratedSources:
+    def test_strips_czech_sources(self):
+        result = _stage("<p>Content</p><h2>Zdroje</h2><ul><li>src1</li></ul>", 'sources')
+        assert result == "<p>Content</p>"
+
+    def test_strips_english_sources(self):
+        assert "<h2>Sources</h2>" not in _stage("<p>Content</p><h2>Sources</h2><ul><li>src1</li></ul>", 'sources')
+
+    def test_keeps_non_source_content(self):
+        html = "<p>Content</p><h2>Other</h2><p>More</p>"
+        assert _stage(html, 'sources') == html
+
+    def test_sources_heading_without_list_kept(self):
+        html = "<h2>Zdroje</h2>\n<p>Text</p>"
+        assert _stage(html, 'sources') == html
+
+    def test_separator_removed_with_sources(self):
+        html = "<h2>A</h2><p>x</p>\n<h2>Zdroje</h2>\n<ul><li>s</li></ul>\n"
+        assert process(html, ('separators', 'sources'))['html'] == "<h2>A</h2><p>x</p>"
+
+
+class TestExcerpt:
+    def test_skips_short_paragraphs(self):
+        html = "<p>Krátký</p><p>Tohle je dost dlouhý odstavec pro excerpt článku.</p>"
+        assert html_pipeline.excerpt(html) == "Tohle je dost dlouhý odstavec pro excerpt článku."
+
+    def test_inline_tags_and_entities(self):
+        html = "<p>Hra <strong>Silksong</strong> vyjde &amp; bude stát 20 eur.</p>"
+        assert html_pipeline.excerpt(html) == "Hra Silksong vyjde & bude stát 20 eur."
+
+    def test_truncates_on_word(self):
+        text = "slovo " * 60
+        result = html_pipeline.excerpt(f"<p>{text}</p>", max_len=50)
+        assert result.endswith('…')
+        assert len(result) <= 51
+        assert not result[:-1].endswith(' ')
+
+    def test_empty(self):
+        assert html_pipeline.excerpt('') == ''
+
+
+class TestProcess:
+    def test_no_stages_is_identity(self):
+        html = "<!-- x --><p>a<br>b</p>\n<h2 class='x'>H</h2> text < 5 <img src='a.png'/>"
+        assert process(html, ())['html'] == html
+
+    def test_unknown_stage(self):
+        with pytest.raises(ValueError):
+            process("<p>x</p>", ('nope',))
+
+    def test_blocks_nested_quote_paragraph(self):
+        result = _stage('<blockquote class="wp-block-quote"><p>Q</p></blockquote>', 'blocks')
+        assert result == ('<!-- wp:quote -->\n<blockquote class="wp-block-quote"><!-- wp:paragraph -->\n'
+                          '<p>Q</p>\n<!-- /wp:paragraph --></blockquote>\n<!-- /wp:quote -->')
+
+    def test_blocks_plain_hr_not_wrapped(self):
+        assert _stage('<hr>', 'blocks') == '<hr>'
@@ -0,0 +1,124 @@
+"""Tests for llm_ledger module (llm_calls tabulka v SQLite)."""
+
+import pytest
+from types import SimpleNamespace
+
+import database
+import llm_ledger
+
+USAGE = SimpleNamespace(input_tokens=1000, output_tokens=500,
+                        cache_read_input_tokens=2000, cache_creation_input_tokens=0)
+
+
+def _rows():
+    conn = database.get_db()
+    try:
+        return [dict(row) for row in conn.execute("SELECT * FROM llm_calls ORDER BY id")]
+    finally:
+        conn.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_run_id():
+    llm_ledger.set_run_id(None)
+    yield
+    llm_ledger.set_run_id(None)
+
+
+class TestRecordCall:
+    def test_stores_usage_and_cost(self):
+        llm_ledger.set_run_id('2026-10-19_08-00-00')
+        cost = llm_ledger.record_call('article', 'claude-sonnet-4-5', USAGE, latency=2.5, retries=1)
+        row = _rows()[0]
+        assert row['run_id'] == '2026-10-19_08-00-00'
+        assert row['purpose'] == 'article'
+        assert (row['input_tokens'], row['output_tokens'], row['cache_read_tokens']) == (1000, 500, 2000)
+        assert row['latency_ms'] == 2500
+        assert row['retries'] == 1
+        assert row['status'] == 'ok'
+        assert row['cost'] == pytest.approx(cost)
+        assert cost > 0
+
+    def test_batch_is_half_price(self):
+        direct = llm_ledger.record_call('article', 'claude-sonnet-4-5', USAGE)
+        batch = llm_ledger.record_call('article', 'claude-sonnet-4-5', USAGE, batch=True)
+        assert batch == pytest.approx(direct / 2)
+        assert _rows()[1]['batch'] == 1
+
+    def test_error_without_usage(self):
+        assert llm_ledger.record_call('analysis', 'm', error='overloaded') == 0.0
+        row = _rows()[0]
+        assert row['status'] == 'error'
+        assert row['error'] == 'overloaded'
+        assert row['input_tokens'] == 0
+
+
+class TestTrack:
+    def test_counts_retries(self):
+        with llm_ledger.track('analysis', 'claude-sonnet-4-5') as call:
+            llm_ledger.note_attempt()
+            llm_ledger.note_attempt()
+            call.set_usage(USAGE)
+        row = _rows()[0]
+        assert row['retries'] == 1
+        assert row['output_tokens'] == 500
+        assert row['latency_ms'] is not None
+
+    def test_records_error_and_reraises(self):
+        with pytest.raises(RuntimeError):
+            with llm_ledger.track('podcast', 'm'):
+                llm_ledger.note_attempt()
+                raise RuntimeError('boom')
+        row = _rows()[0]
+        assert row['status'] == 'error'
+        assert row['error'] == 'boom'
+
+    def test_note_attempt_outside_track_is_noop(self):
+        llm_ledger.note_attempt()
+        assert _rows() == []
+
+
+class TestGetUsage:
+    def test_aggregates_by_day_and_stage(self):
+        llm_ledger.record_call('analysis', 'claude-sonnet-4-5', USAGE, latency=1.0)
+        llm_ledger.record_call('article', 'claude-sonnet-4-5', USAGE, latency=3.0, retries=2)
+        llm_ledger.record_call('article', 'claude-sonnet-4-5', error='timeout')
+
+        usage = llm_ledger.get_usage(days=7)
+        assert usage['totals']['calls'] == 3
+        assert usage['totals']['errors'] == 1
+        assert usage['totals']['retries'] == 2
+        assert usage['totals']['input_tokens'] == 2000
+        assert len(usage['daily']) == 1
+        stages = {s['purpose']: s for s in usage['stages']}
+        assert stages['article']['calls'] == 2
+        assert stages['article']['avg_latency_ms'] == 3000
+
+    def test_empty_ledger(self):
+        usage = llm_ledger.get_usage()
+        assert usage['totals']['calls'] == 0
+        assert usage['totals']['cost'] == 0
+        assert usage['stages'] == []
+
+
+class TestWriterIntegration:
+    def test_write_article_recorded(self, monkeypatch):
+        import config
+        import article_writer
+        monkeypatch.setattr(config, 'ARTICLE_STRUCTURED_OUTPUT', False)
+        monkeypatch.setattr(article_writer, 'get_client', lambda: object())
+        message = SimpleNamespace(
+            content=[SimpleNamespace(type='text', text="TITULEK CZ: A\n=== ČESKY ===\n<p>x</p>")],
+            usage=USAGE, stop_reason='end_turn',
+        )
+
+        def fake_call(*args, **kwargs):
+            llm_ledger.note_attempt()
+            return message
+
+        monkeypatch.setattr(article_writer, '_call_api', fake_call)
+        article_writer.write_article({'topic': 'T', 'title': 'A'}, ['zdroj'])
+        row = _rows()[0]
+        assert row['purpose'] == 'article'
+        assert row['model'] == config.ARTICLE_MODEL
+        assert row['retries'] == 0
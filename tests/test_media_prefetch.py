@@ -0,0 +1,187 @@
+"""Tests for media_prefetch module."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+import media_prefetch
+from media_prefetch import MediaPrefetch
+
+TOPIC = {'topic': 'Nové DLC', 'title': 'Titulek', 'game_name': 'Elden Ring', 'seo_keywords': 'Elden Ring, DLC'}
+
+
+@pytest.fixture
+def pool():
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def services():
+    with patch('media_prefetch.search_rawg_image', return_value='https://rawg/elden.jpg') as rawg, \
+            patch('wp_publisher.check_wp_available', return_value=True), \
+            patch('wp_publisher.upload_media', return_value=(77, 'https://wp/elden.jpg', None)) as upload, \
+            patch('section_images.get_or_fetch_screenshots', return_value='[{"id": 1}]') as screens, \
+            patch('wp_publisher.prefetch_tag_ids', return_value=[5, 6]) as tags:
+        yield {'rawg': rawg, 'upload': upload, 'screens': screens, 'tags': tags}
+
+
+class TestTopicHelpers:
+    def test_game_name_fallback(self):
+        assert media_prefetch.topic_game_name({'topic': 'Téma', 'game_name': 'N/A'}) == 'Téma'
+        assert media_prefetch.topic_game_name(TOPIC) == 'Elden Ring'
+
+    def test_tag_names(self):
+        assert media_prefetch.topic_tag_names(TOPIC) == ['Elden Ring', 'DLC']
+        assert media_prefetch.topic_tag_names({'seo_keywords': ''}) is None
+
+
+class TestMediaPrefetch:
+    def test_results(self, pool, services):
+        media = MediaPrefetch(TOPIC, pool=pool)
+        assert media.featured_image() == ('https://rawg/elden.jpg', 77)
+        assert media.section_images() == '[{"id": 1}]'
+        assert media.tags() == [5, 6]
+        services['upload'].assert_called_once_with('https://rawg/elden.jpg', title='Titulek',
+                                                   on_created=media._track_created)
+        services['screens'].assert_called_once()
+        assert services['screens'].call_args.args[0] == 'Elden Ring'
+
+    def test_runs_in_background_before_join(self, pool, services):
+        done = threading.Event()
+        services['upload'].side_effect = lambda *a, **kw: (done.set(), (77, 'src', None))[1]
+        media = MediaPrefetch(TOPIC, pool=pool)
+        media.start_uploads()
+        assert done.wait(1.0)
+        assert media.featured_image()[1] == 77
+
+    def test_no_upload_until_started(self, pool, services):
+        media = MediaPrefetch(TOPIC, pool=pool)
+        assert media.tags() == [5, 6]
+        media._image_url.result()
+        services['rawg'].assert_called_once_with('Elden Ring')
+        services['upload'].assert_not_called()
+        services['screens'].assert_not_called()
+
+    def test_cancel_unprepared_topic_uploads_nothing(self, pool, services):
+        media = MediaPrefetch(TOPIC, pool=pool)
+        media.cancel()
+        media.start_uploads()
+        assert media.featured_image() == (None, None)
+        assert media.section_images() is None
+        services['upload'].assert_not_called()
+        services['screens'].assert_not_called()
+
+    def test_cancel_before_upload(self, pool, services):
+        release = threading.Event()
+
+        def slow_search(game_name):
+            release.wait(1.0)
+            return 'https://rawg/elden.jpg'
+
+        services['rawg'].side_effect = slow_search
+        media = MediaPrefetch(TOPIC, pool=pool)
+        media.start_uploads()
+        media.cancel()
+        release.set()
+        assert media.featured_image()[1] is None
+        services['upload'].assert_not_called()
+
+    def test_cancel_stops_screenshot_uploads(self, pool, services):
+        seen = {}
+
+        def screens(game_name, should_stop=None, on_created=None):
+            seen['should_stop'] = should_stop
+            return None
+
+        services['screens'].side_effect = screens
+        media = MediaPrefetch(TOPIC, pool=pool)
+        media.section_images()
+        assert seen['should_stop']() is False
+        media.cancel()
+        assert seen['should_stop']() is True
+
+    def test_discard_deletes_uploaded_media(self, pool, services):
+        def upload(url, title='', on_created=None):
+            on_created(77)
+            return 77, 'https://wp/elden.jpg', None
+
+        def screens(game_name, should_stop=None, on_created=None):
+            on_created(11)
+            on_created(12)
+            return '[{"id": 11}, {"id": 12}]'
+
+        services['upload'].side_effect = upload
+        services['screens'].side_effect = screens
+        media = MediaPrefetch(TOPIC, pool=pool)
+        media.section_images()
+        media.featured_image()
+        with patch('article_cleanup.delete_media', return_value=True) as delete:
+            assert sorted(media.cancel(discard_uploads=True)) == [11, 12, 77]
+            assert media.cancel(discard_uploads=True) == []
+        assert sorted(c.args[0] for c in delete.call_args_list) == [11, 12, 77]
+
+    def test_discard_keeps_existing_media(self, pool, services):
+        # upload_media vrátil existující médium (dedup) — on_created se nevolá
+        media = MediaPrefetch(TOPIC, pool=pool)
+        media.featured_image()
+        media.section_images()
+        with patch('article_cleanup.delete_media') as delete:
+            assert media.cancel(discard_uploads=True) == []
+        delete.assert_not_called()
+
+    def test_cancel_without_discard_keeps_media(self, pool, services):
+        services['upload'].side_effect = lambda url, title='', on_created=None: (
+            on_created(77), (77, 'src', None))[1]
+        media = MediaPrefetch(TOPIC, pool=pool)
+        media.featured_image()
+        with patch('article_cleanup.delete_media') as delete:
+            assert media.cancel() == []
+        delete.assert_not_called()
+
+    def test_upload_finishing_after_discard_is_deleted(self, pool, services):
+        uploading, release = threading.Event(), threading.Event()
+
+        def upload(url, title='', on_created=None):
+            uploading.set()
+            release.wait(1.0)
+            on_created(77)
+            return 77, 'src', None
+
+        services['upload'].side_effect = upload
+        media = MediaPrefetch(TOPIC, pool=pool)
+        media.start_uploads()
+        assert uploading.wait(1.0)
+        with patch('article_cleanup.delete_media', return_value=True) as delete:
+            assert media.cancel(discard_uploads=True) == []
+            release.set()
+            media._image.result()
+        delete.assert_called_once_with(77)
+
+    def test_pending_tasks_not_started_after_cancel(self, services):
+        single = ThreadPoolExecutor(max_workers=1)
+        blocker = threading.Event()
+        single.submit(blocker.wait, 1.0)
+        try:
+            media = MediaPrefetch(TOPIC, pool=single)
+            media.cancel()
+            blocker.set()
+            assert media.featured_image() == (None, None)
+            assert media.section_images() is None
+            assert media.tags() == []
+            services['rawg'].assert_not_called()
+        finally:
+            single.shutdown(wait=True)
+
+    def test_wp_unavailable_skips_upload(self, pool, services):
+        with patch('wp_publisher.check_wp_available', return_value=False):
+            media = MediaPrefetch(TOPIC, pool=pool)
+            assert media.featured_image() == ('https://rawg/elden.jpg', None)
+        services['upload'].assert_not_called()
+
+    def test_failure_returns_default(self, pool, services):
+        services['screens'].side_effect = RuntimeError("RAWG down")
+        assert MediaPrefetch(TOPIC, pool=pool).section_images() is None
@@ -1,7 +1,7 @@
 """Tests for Pydantic models (models.py)."""
 
 import pytest
-from models import Topic, AnalysisResult
+from models import Topic, AnalysisResult, ArticleOutput, StoryCard
 
 
 class TestTopic:
@@ -79,3 +79,29 @@ class TestAnalysisResult:
         result = AnalysisResult.model_validate(data)
         assert result.topics[0].topic == "GTA 6"
         assert result.topics[0].virality_score == 85
+
+
+class TestArticleOutput:
+    def _valid(self, **overrides):
+        data = {
+            'keyword_cs': 'gta 6', 'keyword_en': 'gta 6',
+            'title_cs': 'GTA 6 drží termín', 'title_en': 'GTA 6 keeps its date',
+            'meta_cs': 'Popis.', 'meta_en': 'Description.',
+            'cs_html': '<p>Text</p>', 'en_html': '<p>Text</p>',
+        }
+        data.update(overrides)
+        return data
+
+    def test_valid_output(self):
+        output = ArticleOutput.model_validate(self._valid(
+            story_cards_cs=[{'heading': 'Termín', 'body': 'Drží se listopadu.'}]))
+        assert output.story_cards_cs == [StoryCard(heading='Termín', body='Drží se listopadu.')]
+        assert output.story_cards_en == []
+
+    def test_empty_cs_html_rejected(self):
+        with pytest.raises(Exception):
+            ArticleOutput.model_validate(self._valid(cs_html=''))
+
+    def test_story_card_requires_body(self):
+        with pytest.raises(Exception):
+            StoryCard(heading='Bez textu', body='')
@@ -0,0 +1,118 @@
+"""Tests for page_cache module a jeho použití v scrape_full_article."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import config
+import database
+import article_writer
+import page_cache
+
+URL = "https://example.com/article"
+HTML = "<html><body><article><p>Obsah článku o hrách.</p></article></body></html>"
+
+
+def _response(status=200, text=HTML, headers=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.iter_content.return_value = [text.encode()]
+    resp.headers = headers or {}
+    resp.raise_for_status = MagicMock()
+    return resp
+
+
+def _age(hours):
+    old = (datetime.now() - timedelta(hours=hours)).isoformat()
+    conn = database.get_db()
+    conn.execute("UPDATE page_cache SET fetched_at = ?", (old,))
+    conn.commit()
+    conn.close()
+
+
+class TestCanonicalUrl:
+    def test_strips_tracking_and_fragment(self):
+        assert page_cache.canonical_url("HTTPS://Example.com/a/?utm_source=x&b=2&a=1#top") == \
+            "https://example.com/a?a=1&b=2"
+
+    def test_root_path(self):
+        assert page_cache.canonical_url("https://example.com") == "https://example.com/"
+
+
+class TestGetPut:
+    def test_roundtrip_by_canonical_url(self):
+        page_cache.put(URL + "?utm_medium=rss", "text", etag='"v1"')
+        entry = page_cache.get(URL)
+        assert entry['text'] == "text"
+        assert entry['etag'] == '"v1"'
+        assert entry['fresh'] is True
+
+    def test_stale_after_ttl(self):
+        page_cache.put(URL, "text")
+        _age(48)
+        assert page_cache.get(URL)['fresh'] is False
+
+    def test_lru_eviction(self):
+        for i in range(4):
+            page_cache.put(f"https://example.com/{i}", str(i), max_entries=3)
+        assert page_cache.get("https://example.com/0") is None
+        assert page_cache.get("https://example.com/3")['text'] == "3"
+
+    def test_conditional_headers(self):
+        assert page_cache.conditional_headers(None) == {}
+        headers = page_cache.conditional_headers({'etag': '"v1"', 'last_modified': 'Mon, 01 Jan 2026 00:00:00 GMT'})
+        assert headers == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 01 Jan 2026 00:00:00 GMT'}
+
+
+class TestScrapeUsesCache:
+    @patch('source_scraper.requests.Session.get')
+    def test_fresh_entry_skips_request(self, mock_get):
+        mock_get.return_value = _response(headers={'ETag': '"v1"'})
+        first = article_writer.scrape_full_article(URL)
+        second = article_writer.scrape_full_article(URL)
+        assert first == second
+        assert "Obsah článku" in first
+        assert mock_get.call_count == 1
+
+    @patch('source_scraper.requests.Session.get')
+    def test_stale_entry_revalidated_with_304(self, mock_get):
+        mock_get.return_value = _response(headers={'ETag': '"v1"'})
+        article_writer.scrape_full_article(URL)
+        _age(48)
+
+        mock_get.return_value = _response(status=304, text='')
+        assert "Obsah článku" in article_writer.scrape_full_article(URL)
+        assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"v1"'}
+        assert page_cache.get(URL)['fresh'] is True
+
+    @patch('source_scraper.requests.Session.get')
+    def test_changed_page_replaces_entry(self, mock_get):
+        mock_get.return_value = _response()
+        article_writer.scrape_full_article(URL)
+        _age(48)
+
+        mock_get.return_value = _response(text="<article><p>Nová verze</p></article>")
+        assert article_writer.scrape_full_article(URL) == "Nová verze"
+        assert page_cache.get(URL)['text'] == "Nová verze"
+
+    @patch('source_scraper.requests.Session.get')
+    def test_errors_not_cached(self, mock_get):
+        mock_get.side_effect = Exception("timeout")
+        assert article_writer.scrape_full_article(URL).startswith("[Chyba")
+        assert page_cache.get(URL) is None
+
+    @patch('source_scraper.requests.Session.get')
+    def test_stale_entry_used_when_refetch_fails(self, mock_get):
+        page_cache.put(URL, "starý text")
+        _age(48)
+        mock_get.side_effect = Exception("timeout")
+        assert article_writer.scrape_full_article(URL) == "starý text"
+
+    @patch('source_scraper.requests.Session.get')
+    def test_limit_applied_on_read_not_in_cache(self, mock_get):
+        mock_get.return_value = _response(text=f"<article><p>{'A' * 5000}</p></article>")
+        with patch.object(config, 'SOURCE_MAX_CHARS', 3000):
+            assert len(article_writer.scrape_full_article(URL)) == 3000
+        # Přepnutí SOURCE_CONDENSE (jiný limit) vrátí z cache delší text, ne ořez podle starého limitu
+        with patch.object(config, 'SOURCE_MAX_CHARS', 12000):
+            assert len(article_writer.scrape_full_article(URL)) == 5000
+        assert mock_get.call_count == 1
@@ -0,0 +1,146 @@
+"""Tests for podcast_batch module."""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import analysis_cache
+import article_writer
+import podcast_batch
+import podcast_cache
+
+
+def _message(text="ALEX: Ahoj\n\nMAYA: Čau"):
+    message = MagicMock()
+    message.content = [MagicMock(text=text)]
+    message.usage = MagicMock(input_tokens=100, output_tokens=50, cache_read_input_tokens=0,
+                              cache_creation_input_tokens=0)
+    return message
+
+
+def _write_run(tmp_path, count=2, langs=('cs', 'en')):
+    for i in range(count):
+        for lang in langs:
+            (tmp_path / f'article_{i}_{lang}.html').write_text(f'<p>Článek {i} {lang}</p>', encoding='utf-8')
+    return str(tmp_path)
+
+
+class TestFindArticles:
+    def test_lists_sorted_and_filters(self, tmp_path):
+        run_dir = _write_run(tmp_path, count=2)
+        (tmp_path / 'podcast_0_cs.txt').write_text('x')
+        (tmp_path / 'article_0_de.html').write_text('x')
+        found = [(i, lang) for i, lang, _ in podcast_batch.find_articles(run_dir)]
+        assert found == [(0, 'cs'), (0, 'en'), (1, 'cs'), (1, 'en')]
+        assert [lang for _, lang, _ in podcast_batch.find_articles(run_dir, ['en'])] == ['en', 'en']
+
+    def test_missing_dir(self, tmp_path):
+        assert podcast_batch.find_articles(str(tmp_path / 'nic')) == []
+
+
+class TestPodcastCache:
+    @patch('article_writer.get_client')
+    @patch('article_writer._call_api')
+    def test_same_article_hits_cache(self, mock_call, mock_client):
+        mock_call.return_value = _message()
+        first = article_writer.generate_podcast_script('<p>Stejný článek</p>', 'cs')
+        second = article_writer.generate_podcast_script('<p>Stejný článek</p>', 'cs')
+        assert mock_call.call_count == 1
+        assert first['cached'] is False
+        assert second['cached'] is True
+        assert second['script'] == first['script']
+        assert second['cost'] == "$0.0000"
+
+    @patch('article_writer.get_client')
+    @patch('article_writer._call_api')
+    def test_not_counted_in_analysis_cache(self, mock_call, mock_client):
+        mock_call.return_value = _message()
+        article_writer.generate_podcast_script('<p>Článek</p>', 'cs')
+        article_writer.generate_podcast_script('<p>Článek</p>', 'cs')
+        assert analysis_cache.get_stats() == {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'entries': 0}
+        stats = podcast_cache.get_stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+    @patch('article_writer.get_client')
+    @patch('article_writer._call_api')
+    def test_different_lang_or_force_misses(self, mock_call, mock_client):
+        mock_call.return_value = _message()
+        article_writer.generate_podcast_script('<p>Článek</p>', 'cs')
+        article_writer.generate_podcast_script('<p>Článek</p>', 'en')
+        article_writer.generate_podcast_script('<p>Článek</p>', 'cs', force=True)
+        assert mock_call.call_count == 3
+
+    @patch('article_writer.get_client')
+    @patch('article_writer._call_api', side_effect=Exception("API down"))
+    def test_error_not_cached(self, mock_call, mock_client):
+        assert 'error' in article_writer.generate_podcast_script('<p>Článek</p>', 'cs')
+        assert 'error' in article_writer.generate_podcast_script('<p>Článek</p>', 'cs')
+        assert mock_call.call_count == 2
+
+
+class TestGenerateRunPodcasts:
+    def test_writes_scripts_concurrently_bounded(self, tmp_path):
+        run_dir = _write_run(tmp_path, count=3)
+        lock = threading.Lock()
+        in_flight = {'now': 0, 'max': 0}
+
+        def fake_generate(article_html, lang, force=False):
+            with lock:
+                in_flight['now'] += 1
+                in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            time.sleep(0.05)
+            with lock:
+                in_flight['now'] -= 1
+            return {'script': f'script {lang}', 'cost': '$0.0100', 'cached': False}
+
+        with patch('podcast_batch.generate_podcast_script', side_effect=fake_generate):
+            results = podcast_batch.generate_run_podcasts(run_dir, max_workers=2)
+
+        assert len(results) == 6
+        assert in_flight['max'] == 2
+        assert (tmp_path / 'podcast_2_en.txt').read_text(encoding='utf-8') == 'script en'
+        assert [(r['topic_index'], r['lang']) for r in results][:2] == [(0, 'cs'), (0, 'en')]
+
+    def test_errors_reported_per_article(self, tmp_path):
+        run_dir = _write_run(tmp_path, count=1)
+
+        def fake_generate(article_html, lang, force=False):
+            if lang == 'en':
+                return {'error': 'rate limit'}
+            return {'script': 'ok', 'cost': '$0.0100', 'cached': True}
+
+        seen = []
+        with patch('podcast_batch.generate_podcast_script', side_effect=fake_generate):
+            results = podcast_batch.generate_run_podcasts(run_dir, on_result=seen.append)
+
+        assert results == [
+            {'topic_index': 0, 'lang': 'cs', 'cached': True, 'cost': '$0.0100'},
+            {'topic_index': 0, 'lang': 'en', 'error': 'rate limit'},
+        ]
+        assert len(seen) == 2
+        assert not (tmp_path / 'podcast_0_en.txt').exists()
+
+    def test_second_run_served_from_cache(self, tmp_path):
+        run_dir = _write_run(tmp_path, count=2)
+        with patch('article_writer.get_client'), \
+                patch('article_writer._call_api', return_value=_message()) as mock_call:
+            podcast_batch.generate_run_podcasts(run_dir)
+            results = podcast_batch.generate_run_podcasts(run_dir)
+        assert mock_call.call_count == 4
+        assert all(r['cached'] for r in results)
+
+
+class TestCli:
+    def test_missing_run_returns_error(self, tmp_path):
+        with patch.object(podcast_batch, 'OUTPUT_DIR', str(tmp_path)):
+            assert podcast_batch.main(['neexistuje']) == 1
+
+    def test_runs_selected_langs(self, tmp_path):
+        (tmp_path / 'run1').mkdir()
+        _write_run(tmp_path / 'run1', count=1)
+        with patch.object(podcast_batch, 'OUTPUT_DIR', str(tmp_path)), \
+                patch('podcast_batch.generate_podcast_script',
+                      return_value={'script': 's', 'cost': '$0', 'cached': False}) as mock_gen:
+            assert podcast_batch.main(['run1', '--lang', 'en', '--workers', '1']) == 0
+        assert mock_gen.call_count == 1
+        assert mock_gen.call_args.args[1] == 'en'
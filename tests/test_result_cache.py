@@ -0,0 +1,31 @@
+"""Tests for result_cache module (společná implementace cache)."""
+
+from unittest.mock import patch
+
+import config
+import result_cache
+
+analysis = result_cache.ResultCache('analysis', 'ANALYSIS_CACHE_TTL_HOURS', 'ANALYSIS_CACHE_MAX_ENTRIES')
+article = result_cache.ResultCache('article', 'ARTICLE_CACHE_TTL_HOURS', 'ARTICLE_CACHE_MAX_ENTRIES')
+
+
+class TestResultCache:
+    def test_caches_are_isolated(self):
+        analysis.put('k', 'analýza')
+        assert article.get('k') is None
+        assert analysis.get('k') == 'analýza'
+        assert analysis.get_stats()['entries'] == 1
+        assert article.get_stats()['entries'] == 0
+
+    def test_separate_counters(self):
+        analysis.get('missing')
+        article.put('k', {'cs': 'x'})
+        article.get('k')
+        assert (analysis.get_stats()['hits'], analysis.get_stats()['misses']) == (0, 1)
+        assert (article.get_stats()['hits'], article.get_stats()['misses']) == (1, 0)
+
+    def test_limits_read_from_config_at_call_time(self):
+        with patch.object(config, 'ARTICLE_CACHE_MAX_ENTRIES', 2):
+            for i in range(4):
+                article.put(f'k{i}', i)
+        assert article.get_stats()['entries'] == 2
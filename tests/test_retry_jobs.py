@@ -0,0 +1,61 @@
+"""Tests for retry_jobs module (SQLite backend)."""
+
+from datetime import datetime, timedelta
+
+import config
+import retry_jobs
+
+
+class TestSchedule:
+    def test_not_due_before_delay(self):
+        retry_jobs.schedule('r1', 'analysis', 30)
+        assert retry_jobs.claim_due() == []
+        assert [job['run_id'] for job in retry_jobs.list_pending()] == ['r1']
+
+    def test_due_after_delay(self):
+        due_at = retry_jobs.schedule('r1', 'analysis', 30, options={'batch': True, 'tiered': None})
+        later = datetime.fromisoformat(due_at) + timedelta(seconds=1)
+        jobs = retry_jobs.claim_due(now=later)
+        assert len(jobs) == 1
+        assert jobs[0]['run_id'] == 'r1'
+        assert jobs[0]['kind'] == 'analysis'
+        assert jobs[0]['options'] == {'batch': True, 'tiered': None}
+
+    def test_oldest_first(self):
+        retry_jobs.schedule('late', 'analysis', 20)
+        retry_jobs.schedule('early', 'analysis', 10)
+        jobs = retry_jobs.claim_due(now=datetime.now() + timedelta(hours=1))
+        assert [job['run_id'] for job in jobs] == ['early', 'late']
+
+
+class TestClaim:
+    def test_claimed_only_once(self):
+        retry_jobs.schedule('r1', 'analysis', 0)
+        now = datetime.now() + timedelta(seconds=1)
+        assert len(retry_jobs.claim_due(now=now)) == 1
+        assert retry_jobs.claim_due(now=now) == []
+        assert retry_jobs.list_pending() == []
+
+    def test_complete_keeps_new_job_for_same_run(self):
+        retry_jobs.schedule('r1', 'analysis', 0)
+        job = retry_jobs.claim_due(now=datetime.now() + timedelta(seconds=1))[0]
+        # Opakovaný běh znovu selhal a naplánoval další pokus
+        retry_jobs.schedule('r1', 'analysis', 30)
+        retry_jobs.complete(job['id'])
+        assert [j['run_id'] for j in retry_jobs.list_pending()] == ['r1']
+
+    def test_stale_running_job_reclaimed(self):
+        retry_jobs.schedule('r1', 'analysis', 0)
+        now = datetime.now() + timedelta(seconds=1)
+        assert len(retry_jobs.claim_due(now=now)) == 1
+        # Proces s úlohou spadl — před timeoutem se nepřevezme, po něm ano (jen jednou)
+        assert retry_jobs.claim_due(now=now + timedelta(minutes=10)) == []
+        later = now + timedelta(minutes=config.RETRY_JOB_STALE_MINUTES + 1)
+        assert [job['run_id'] for job in retry_jobs.claim_due(now=later)] == ['r1']
+        assert retry_jobs.claim_due(now=later) == []
+
+    def test_finished_job_not_reclaimed(self):
+        retry_jobs.schedule('r1', 'analysis', 0)
+        job = retry_jobs.claim_due(now=datetime.now() + timedelta(seconds=1))[0]
+        retry_jobs.complete(job['id'], 'failed')
+        assert retry_jobs.claim_due(now=datetime.now() + timedelta(days=1)) == []
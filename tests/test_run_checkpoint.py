@@ -0,0 +1,99 @@
+"""Tests for run_checkpoint module (SQLite backend)."""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import database
+import run_checkpoint
+
+
+def _age_run(run_id, days):
+    old = (datetime.now() - timedelta(days=days)).isoformat()
+    conn = database.get_db()
+    try:
+        conn.execute("UPDATE run_checkpoints SET updated_at = ? WHERE run_id = ?", (old, run_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class TestStageReached:
+    def test_order(self):
+        assert run_checkpoint.stage_reached('analyzed', 'scraped')
+        assert run_checkpoint.stage_reached('analyzed', 'analyzed')
+        assert not run_checkpoint.stage_reached('scraped', 'deduped')
+        assert not run_checkpoint.stage_reached('started', 'scraped')
+
+
+class TestRun:
+    def test_start_and_load(self):
+        run_checkpoint.start_run('20260101_080000', 'output/20260101_080000')
+        saved = run_checkpoint.load_run('20260101_080000')
+        assert saved['run_dir'] == 'output/20260101_080000'
+        assert saved['stage'] == 'started'
+        assert saved['status'] == 'running'
+        assert saved['artifacts'] == {}
+
+    def test_missing_run(self):
+        assert run_checkpoint.load_run('nope') is None
+
+    def test_save_merges_artifacts(self):
+        run_checkpoint.start_run('r1', 'output/r1')
+        run_checkpoint.save_run('r1', 'scraped', articles=[{'title': 'Článek', 'link': 'https://x'}])
+        run_checkpoint.save_run('r1', 'analyzed', analysis='report', topics=[{'topic': 'Hra'}])
+        saved = run_checkpoint.load_run('r1')
+        assert saved['stage'] == 'analyzed'
+        assert saved['artifacts']['articles'] == [{'title': 'Článek', 'link': 'https://x'}]
+        assert saved['artifacts']['topics'] == [{'topic': 'Hra'}]
+
+    def test_save_unknown_run_is_noop(self):
+        run_checkpoint.save_run('nope', 'scraped', articles=[])
+        assert run_checkpoint.load_run('nope') is None
+
+    def test_finish_complete(self):
+        run_checkpoint.start_run('r1', 'output/r1')
+        run_checkpoint.save_run('r1', 'deduped', deduped_topics=[])
+        run_checkpoint.finish_run('r1')
+        saved = run_checkpoint.load_run('r1')
+        assert (saved['stage'], saved['status']) == ('done', 'done')
+
+    def test_finish_incomplete_keeps_stage(self):
+        run_checkpoint.start_run('r1', 'output/r1')
+        run_checkpoint.save_run('r1', 'deduped', deduped_topics=[])
+        run_checkpoint.finish_run('r1', complete=False)
+        saved = run_checkpoint.load_run('r1')
+        assert (saved['stage'], saved['status']) == ('deduped', 'incomplete')
+        assert [r['run_id'] for r in run_checkpoint.list_runs(status='incomplete')] == ['r1']
+
+    def test_old_runs_pruned_on_start(self):
+        run_checkpoint.start_run('old', 'output/old')
+        run_checkpoint.save_topic('old', 1, 'published')
+        _age_run('old', 30)
+        with patch.object(run_checkpoint.config, 'RUN_CHECKPOINT_DAYS', 7):
+            run_checkpoint.start_run('new', 'output/new')
+        assert run_checkpoint.load_run('old') is None
+        assert run_checkpoint.load_topics('old') == {}
+        assert run_checkpoint.load_run('new') is not None
+
+
+class TestTopics:
+    def test_save_merges_and_tracks_stage(self):
+        run_checkpoint.start_run('r1', 'output/r1')
+        run_checkpoint.save_topic('r1', 1, 'prepared', source_texts=['text'], source_urls=['https://a'])
+        run_checkpoint.save_topic('r1', 1, 'cs_published', cs_result={'id': 5, 'view_url': 'https://gamefo.cz/x'})
+        run_checkpoint.save_topic('r1', 2, 'skipped')
+        topics = run_checkpoint.load_topics('r1')
+        assert topics[1]['stage'] == 'cs_published'
+        assert topics[1]['source_texts'] == ['text']
+        assert topics[1]['cs_result']['id'] == 5
+        assert topics[2] == {'stage': 'skipped'}
+
+    def test_discard_artifacts_keeps_stage(self):
+        run_checkpoint.save_topic('r1', 1, 'media', article={'cs': 'x'}, media={'featured_image_id': 77})
+        run_checkpoint.discard_topic_artifacts('r1', 1, 'media')
+        run_checkpoint.discard_topic_artifacts('r1', 2, 'media')
+        assert run_checkpoint.load_topics('r1') == {1: {'stage': 'media', 'article': {'cs': 'x'}}}
+
+    def test_topics_scoped_by_run(self):
+        run_checkpoint.save_topic('r1', 1, 'published')
+        assert run_checkpoint.load_topics('r2') == {}
@@ -0,0 +1,64 @@
+"""Tests for source_condenser module."""
+
+import source_condenser
+from source_condenser import condense_sources, split_sentences
+
+TOPIC = {
+    'topic': 'Hollow Knight Silksong datum vydání',
+    'title': 'Silksong konečně vychází',
+    'context': 'Team Cherry oznámil datum vydání Silksong',
+    'game_name': 'Hollow Knight: Silksong',
+    'seo_keywords': 'Silksong, Team Cherry',
+}
+
+FILLER = [
+    "The weather in Adelaide was unusually warm during the whole of last week.",
+    "Many readers have asked us about our favourite coffee shops around the office.",
+    "Our newsletter is available every Friday for subscribers of the website.",
+    "Cookies help us deliver a better experience across all of our services.",
+]
+
+
+class TestSplitSentences:
+    def test_blocks_and_sentences(self):
+        blocks = split_sentences("První věta tady. Druhá věta! \n\nNový odstavec? Ano.")
+        assert blocks == [['První věta tady.', 'Druhá věta!'], ['Nový odstavec?', 'Ano.']]
+
+    def test_keeps_abbreviated_numbers(self):
+        assert split_sentences("Verze 1.5 vyšla dnes.") == [['Verze 1.5 vyšla dnes.']]
+
+
+class TestCondenseSources:
+    def test_under_budget_unchanged(self):
+        texts = ["Silksong vychází brzy, říká Team Cherry ve svém oznámení."]
+        assert condense_sources(texts, TOPIC, token_budget=1000) == texts
+
+    def test_keeps_relevant_sentences(self):
+        relevant = "Team Cherry confirmed that Silksong releases on September 4, 2025."
+        texts = [' '.join(FILLER * 3) + ' ' + relevant, ' '.join(FILLER)]
+        result = condense_sources(texts, TOPIC, token_budget=40)
+        assert relevant in result[0]
+        assert 'Adelaide' not in ''.join(result)
+
+    def test_drops_cross_source_duplicates(self):
+        fact = "Team Cherry confirmed that Silksong releases on September 4, 2025 for all platforms."
+        texts = [fact + ' ' + ' '.join(FILLER), fact.replace('all platforms', 'all the platforms') + ' ' + ' '.join(FILLER)]
+        result = condense_sources(texts, TOPIC, token_budget=60)
+        assert ''.join(result).count('Silksong releases') == 1
+
+    def test_preserves_source_order(self):
+        first = "Silksong was first announced by Team Cherry back in 2019."
+        second = "Team Cherry now says Silksong launches in September 2025."
+        texts = [first + ' ' + ' '.join(FILLER * 3) + ' ' + second]
+        result = condense_sources(texts, TOPIC, token_budget=45)
+        assert result[0].index('announced') < result[0].index('launches')
+
+    def test_empty_query_keeps_lead(self):
+        texts = ['\n'.join(FILLER * 2)]
+        result = condense_sources(texts, {}, token_budget=25)
+        assert result[0].startswith(FILLER[0])
+
+    def test_result_fits_budget(self):
+        texts = [' '.join(FILLER * 10), ' '.join(FILLER * 10)]
+        result = condense_sources(texts, TOPIC, token_budget=50)
+        assert sum(source_condenser.estimate_tokens(t) for t in result) <= 50
@@ -0,0 +1,157 @@
+"""Tests for source_scraper module (souběžné stahování zdrojů)."""
+
+import threading
+import time
+
+import source_scraper
+
+
+def _fake_scrape(delays, errors=(), log=None):
+    """scrape funkce s umělou latencí podle URL."""
+    def scrape(url):
+        if log is not None:
+            log.append(url)
+        time.sleep(delays.get(url, 0))
+        if url in errors:
+            return "[Chyba pri stahovani: 404]"
+        return f"text {url}"
+    return scrape
+
+
+class _StreamedResponse:
+    """Odpověď se stream=True — zaznamenává, kolik bloků se přečetlo."""
+
+    def __init__(self, body: bytes, chunk=64, content_type='text/html', encoding='ISO-8859-1'):
+        self.headers = {'Content-Type': content_type}
+        self.encoding = encoding
+        self._chunks = [body[i:i + chunk] for i in range(0, len(body), chunk)]
+        self.read = 0
+
+    def iter_content(self, chunk_size):
+        for chunk in self._chunks:
+            self.read += 1
+            yield chunk
+
+    @property
+    def total(self):
+        return len(self._chunks)
+
+
+PARAGRAPH = "Odstavec článku o nové hře, který je dost dlouhý na skóre obsahu. "
+
+
+class TestScrapeSources:
+    def test_runs_concurrently_and_keeps_order(self):
+        urls = [f"https://site{i}.com/a" for i in range(4)]
+        scrape = _fake_scrape({url: 0.2 for url in urls})
+        start = time.monotonic()
+        result = source_scraper.scrape_sources(urls, scrape=scrape, max_workers=4)
+        assert time.monotonic() - start < 0.6
+        assert [url for url, _ in result] == urls
+        assert result[0][1] == "text https://site0.com/a"
+
+    def test_failed_sources_dropped(self):
+        urls = ["https://a.com/1", "https://b.com/2"]
+        result = source_scraper.scrape_sources(urls, scrape=_fake_scrape({}, errors={"https://a.com/1"}))
+        assert result == [("https://b.com/2", "text https://b.com/2")]
+
+    def test_returns_once_enough_sources(self):
+        urls = ["https://slow.com/1", "https://fast.com/2", "https://fast2.com/3"]
+        scrape = _fake_scrape({"https://slow.com/1": 2.0})
+        start = time.monotonic()
+        result = source_scraper.scrape_sources(urls, want=2, scrape=scrape)
+        assert time.monotonic() - start < 1.0
+        assert [url for url, _ in result] == ["https://fast.com/2", "https://fast2.com/3"]
+
+    def test_deadline(self):
+        scrape = _fake_scrape({"https://slow.com/1": 2.0})
+        start = time.monotonic()
+        result = source_scraper.scrape_sources(["https://slow.com/1"], deadline=0.2, scrape=scrape)
+        assert time.monotonic() - start < 1.0
+        assert result == []
+
+    def test_per_host_limit(self):
+        active = {'now': 0, 'max': 0}
+        lock = threading.Lock()
+
+        def scrape(url):
+            with lock:
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+            time.sleep(0.05)
+            with lock:
+                active['now'] -= 1
+            return "ok"
+
+        urls = [f"https://same.com/{i}" for i in range(6)]
+        result = source_scraper.scrape_sources(urls, per_host=2, max_workers=6, scrape=scrape)
+        assert len(result) == 6
+        assert active['max'] == 2
+
+    def test_duplicates_and_empty(self):
+        log = []
+        source_scraper.scrape_sources(["https://a.com/1", "https://a.com/1", ""],
+                                      scrape=_fake_scrape({}, log=log))
+        assert log == ["https://a.com/1"]
+        assert source_scraper.scrape_sources([]) == []
+
+
+class TestSession:
+    def test_shared_session(self):
+        source_scraper.reset_session()
+        try:
+            session = source_scraper.get_session()
+            assert session is source_scraper.get_session()
+            assert session.headers['User-Agent'] == source_scraper.USER_AGENT
+        finally:
+            source_scraper.reset_session()
+
+    def test_reset_creates_new_session(self):
+        source_scraper.reset_session()
+        try:
+            session = source_scraper.get_session()
+            source_scraper.reset_session()
+            assert source_scraper.get_session() is not session
+        finally:
+            source_scraper.reset_session()
+
+
+class TestStreamExtract:
+    def test_stops_after_main_container_closes(self):
+        body = (f"<html><body><article><p>{PARAGRAPH * 5}</p></article>"
+                f"<section class='comments'>{'<p>komentář</p>' * 500}</section>"
+                f"<script>{'x' * 20000}</script></body></html>").encode()
+        resp = _StreamedResponse(body)
+        text = source_scraper.stream_extract(resp, "https://example.com/a")
+        assert text.startswith("Odstavec článku")
+        assert "komentář" not in text
+        assert resp.read < resp.total / 4
+
+    def test_byte_cap(self):
+        body = f"<html><body><div>{PARAGRAPH * 200}</div></body></html>".encode()
+        resp = _StreamedResponse(body, chunk=1024)
+        text = source_scraper.stream_extract(resp, "https://example.com/a", max_bytes=4096, max_chars=0)
+        assert resp.read == 4
+        assert 0 < len(text) < len(PARAGRAPH * 200)
+
+    def test_small_article_reads_whole_page(self):
+        body = "<html><body><article><p>Krátká zpráva.</p></article><p>patička</p></body></html>".encode()
+        resp = _StreamedResponse(body, chunk=16)
+        assert source_scraper.stream_extract(resp, "https://example.com/a") == "Krátká zpráva."
+        assert resp.read == resp.total
+
+    def test_charset_from_meta(self):
+        body = ('<html><head><meta charset="windows-1250"></head><body>'
+                f'<article><p>Příliš žluťoučký kůň. {PARAGRAPH * 4}</p></article></body></html>').encode('cp1250')
+        resp = _StreamedResponse(body, chunk=32)
+        assert source_scraper.stream_extract(resp, "https://example.cz/a").startswith("Příliš žluťoučký kůň.")
+
+    def test_charset_from_header(self):
+        body = f"<article><p>Čeština z hlavičky. {PARAGRAPH * 4}</p></article>".encode('iso-8859-2')
+        resp = _StreamedResponse(body, content_type='text/html; charset=ISO-8859-2', encoding='ISO-8859-2')
+        assert source_scraper.stream_extract(resp, "https://example.cz/a").startswith("Čeština z hlavičky.")
+
+    def test_split_multibyte_characters(self):
+        body = f"<article><p>{'žluťoučký ' * 40}</p></article>".encode()
+        resp = _StreamedResponse(body, chunk=7)
+        assert source_scraper.stream_extract(resp, "https://example.cz/a") == ('žluťoučký ' * 40).strip()
@@ -0,0 +1,65 @@
+"""Tests for text_normalize module."""
+
+import text_normalize
+import topic_dedup
+
+
+class TestFoldDiacritics:
+    def test_removes_czech_diacritics(self):
+        assert text_normalize.fold_diacritics("Příběh žluťoučkého koně") == "pribeh zlutouckeho kone"
+
+    def test_lowercases(self):
+        assert text_normalize.fold_diacritics("GTA VI") == "gta vi"
+
+
+class TestStem:
+    def test_czech_case_endings(self):
+        assert text_normalize.stem("gothicu") == "gothic"
+        assert text_normalize.stem("remaku") == text_normalize.stem("remake")
+
+    def test_english_plural(self):
+        assert text_normalize.stem("trailers") == text_normalize.stem("trailer")
+
+    def test_short_words_untouched(self):
+        assert text_normalize.stem("hra") == "hra"
+
+    def test_digits_untouched(self):
+        assert text_normalize.stem("2026") == "2026"
+
+
+class TestNormalizeTokens:
+    def test_inflected_forms_match(self):
+        a = text_normalize.normalize_set("Remake Gothicu dostal datum")
+        b = text_normalize.normalize_set("Gothic remake release date")
+        assert {'gothic', 'remak'} <= (a & b)
+
+    def test_drops_stopwords(self):
+        tokens = text_normalize.normalize_tokens("The new trailer for GTA 6 a nové detaily")
+        assert 'the' not in tokens
+        assert 'for' not in tokens
+        assert 'nov' not in tokens
+        assert '6' in tokens
+
+    def test_empty(self):
+        assert text_normalize.normalize_tokens("") == ()
+
+    def test_memoized(self):
+        text_normalize.normalize_tokens.cache_clear()
+        text_normalize.normalize_tokens("Hollow Knight Silksong")
+        text_normalize.normalize_tokens("Hollow Knight Silksong")
+        assert text_normalize.normalize_tokens.cache_info().hits == 1
+
+
+class TestTopicDedupNormalization:
+    def test_inflected_duplicate_detected(self):
+        recent = [{'topic': 'Gothic remake', 'title': 'Gothic remake dostal datum vydání', 'timestamp': '2026-01-01'}]
+        topic = {'topic': 'Remake Gothicu', 'title': 'Remaku Gothicu dali datum vydání', 'game_name': 'Gothic'}
+        is_dup, match = topic_dedup.check_topic_duplicate(topic, recent)
+        assert is_dup
+        assert match is recent[0]
+
+    def test_different_topics_not_duplicate(self):
+        recent = [{'topic': 'GTA 6 trailer', 'title': 'GTA 6 trailer láme rekordy', 'timestamp': '2026-01-01'}]
+        topic = {'topic': 'Palworld update', 'title': 'Palworld dostal velký update', 'game_name': 'Palworld'}
+        is_dup, _ = topic_dedup.check_topic_duplicate(topic, recent)
+        assert not is_dup
@@ -0,0 +1,77 @@
+"""Tests for topic_pool module."""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import topic_pool
+import wp_publisher
+
+
+class TestMapTopics:
+    def test_preserves_order(self):
+        def slow_upper(i, item):
+            time.sleep(0.03 if i == 1 else 0)
+            return f"{i}:{item.upper()}"
+
+        assert topic_pool.map_topics(slow_upper, ['a', 'b', 'c'], max_workers=3) == ['1:A', '2:B', '3:C']
+
+    def test_exception_isolated(self):
+        def worker(i, item):
+            if i == 2:
+                raise RuntimeError("boom")
+            return item
+
+        assert topic_pool.map_topics(worker, ['a', 'b', 'c'], max_workers=2) == ['a', None, 'c']
+
+    def test_serial_runs_in_caller_thread(self):
+        threads = topic_pool.map_topics(lambda i, item: threading.current_thread(), [1, 2], max_workers=1)
+        assert threads == [threading.current_thread()] * 2
+
+    def test_empty(self):
+        assert topic_pool.map_topics(lambda i, item: item, []) == []
+
+
+class TestWallClock:
+    """Serial vs. souběžný průchod tématy na stubnutých službách (scrape, Claude, média, WP)."""
+
+    STAGE_LATENCY = 0.08   # scraping + Claude + YouTube/RAWG na téma
+    WP_LATENCY = 0.02      # jeden zápis do WP
+
+    def _run(self, topics, max_workers):
+        lock = threading.Lock()
+        in_flight = {'now': 0, 'max': 0}
+
+        def slow_post(*args, **kwargs):
+            with lock:
+                in_flight['now'] += 1
+                in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            time.sleep(self.WP_LATENCY)
+            with lock:
+                in_flight['now'] -= 1
+            return MagicMock(status_code=201, json=MagicMock(return_value={'id': 1, 'link': 'https://wp/?p=1'}))
+
+        def publish(i, topic):
+            time.sleep(self.STAGE_LATENCY)
+            for lang in ('cs', 'en'):
+                result, err = wp_publisher.create_draft(title=topic, content='<p>x</p>', lang=lang)
+                assert err is None
+            return True
+
+        with patch('wp_publisher.requests.post', side_effect=slow_post), \
+                patch('wp_publisher._write_interval', return_value=0.005), \
+                patch('wp_publisher._auth_headers', return_value={}):
+            start = time.monotonic()
+            results = topic_pool.map_topics(publish, topics, max_workers=max_workers)
+            wall = time.monotonic() - start
+        return wall, results, in_flight['max']
+
+    def test_parallel_faster_with_serialized_wp_writes(self):
+        topics = [f"Téma {i}" for i in range(4)]
+        serial, serial_results, _ = self._run(topics, max_workers=1)
+        parallel, parallel_results, max_wp_in_flight = self._run(topics, max_workers=4)
+
+        assert serial_results == parallel_results == [True] * 4
+        assert max_wp_in_flight == 1
+        # Sériově ~4 × (0.08 + 2 × 0.02) s, souběžně ~0.08 s + zápisy za sebou
+        assert parallel < serial * 0.6
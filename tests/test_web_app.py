@@ -1,6 +1,7 @@
 """Tests for web_app routes."""
 
 import json
+import time
 import pytest
 from unittest.mock import patch
 
@@ -112,3 +113,71 @@ class TestPublishStats:
         assert resp.status_code == 200
         data = json.loads(resp.data)
         assert 'total' in data
+
+
+class TestAnalysisCacheStats:
+    def test_returns_counters(self, app_client):
+        resp = app_client.get('/api/analysis-cache/stats')
+        assert resp.status_code == 200
+        data = json.loads(resp.data)
+        assert {'hits', 'misses', 'hit_rate', 'entries'} <= set(data)
+
+    def test_podcast_stats_separate(self, app_client):
+        resp = app_client.get('/api/podcast-cache/stats')
+        assert resp.status_code == 200
+        assert {'hits', 'misses', 'hit_rate', 'entries'} <= set(json.loads(resp.data))
+
+
+class TestLlmUsage:
+    def test_returns_aggregates(self, app_client):
+        import llm_ledger
+        llm_ledger.record_call('analysis', 'claude-sonnet-4-5', latency=1.0)
+        resp = app_client.get('/api/llm/usage?days=3')
+        assert resp.status_code == 200
+        data = json.loads(resp.data)
+        assert data['days'] == 3
+        assert data['totals']['calls'] == 1
+        assert data['stages'][0]['purpose'] == 'analysis'
+
+    def test_invalid_days(self, app_client):
+        resp = app_client.get('/api/llm/usage?days=abc')
+        assert resp.status_code == 400
+
+
+class TestPodcastBatch:
+    def test_invalid_run_id(self, app_client):
+        with patch.object(config, 'DASHBOARD_TOKEN', ''):
+            resp = app_client.post('/generate-podcast/batch', json={'run_id': '../etc'})
+            assert resp.status_code == 400
+
+    def test_invalid_langs(self, app_client):
+        with patch.object(config, 'DASHBOARD_TOKEN', ''):
+            resp = app_client.post('/generate-podcast/batch', json={'run_id': 'run1', 'langs': ['de']})
+            assert resp.status_code == 400
+
+    def test_run_without_articles(self, app_client, tmp_path):
+        from web.blueprints import podcasts
+        with patch.object(config, 'DASHBOARD_TOKEN', ''), \
+                patch.object(podcasts, 'OUTPUT_DIR', str(tmp_path)):
+            resp = app_client.post('/generate-podcast/batch', json={'run_id': 'run1'})
+            assert resp.status_code == 404
+
+    def test_starts_batch_and_reports_progress(self, app_client, tmp_path):
+        from web.blueprints import podcasts
+        run_dir = tmp_path / 'run1'
+        run_dir.mkdir()
+        (run_dir / 'article_0_cs.html').write_text('<p>Článek</p>', encoding='utf-8')
+        result = [{'topic_index': 0, 'lang': 'cs', 'cached': True, 'cost': '$0.0000'}]
+        with patch.object(config, 'DASHBOARD_TOKEN', ''), \
+                patch.object(podcasts, 'OUTPUT_DIR', str(tmp_path)), \
+                patch('podcast_batch.generate_run_podcasts', return_value=result):
+            resp = app_client.post('/generate-podcast/batch', json={'run_id': 'run1'})
+            assert resp.status_code == 200
+            assert json.loads(resp.data)['total'] == 1
+            for _ in range(100):
+                data = json.loads(app_client.get('/generate-podcast/batch/output').data)
+                if not data['running']:
+                    break
+                time.sleep(0.01)
+            assert data['results'] == result
+            assert data['run_id'] == 'run1'
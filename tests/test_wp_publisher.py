@@ -1,11 +1,21 @@
 """Tests for wp_publisher module."""
 
+import threading
+import time
+
 import pytest
 from unittest.mock import patch, MagicMock
 
 import wp_publisher
 
 
+@pytest.fixture(autouse=True)
+def no_write_interval():
+    """Testy zápisů nečekají na odstup mezi WP zápisy (kromě TestWriteGate)."""
+    with patch('wp_publisher._write_interval', return_value=0):
+        yield
+
+
 class TestToGutenbergBlocks:
     def test_wraps_paragraphs(self):
         html = "<p>Hello world</p>"
@@ -215,10 +225,21 @@ class TestUploadMedia:
         mock_upload_resp.json.return_value = {'id': 123, 'source_url': 'https://blog.example.com/wp-content/uploads/image.png'}
         mock_post.return_value = mock_upload_resp
 
-        media_id, source_url, error = wp_publisher.upload_media("https://example.com/image.png", title="Test")
+        created = []
+        media_id, source_url, error = wp_publisher.upload_media("https://example.com/image.png", title="Test",
+                                                                on_created=created.append)
         assert media_id == 123
         assert source_url == 'https://blog.example.com/wp-content/uploads/image.png'
         assert error is None
+        assert created == [123]
+
+    @patch('wp_publisher._find_existing_media', return_value=(55, 'https://blog.example.com/image.png'))
+    def test_existing_media_not_reported_as_created(self, mock_find):
+        created = []
+        media_id, _, error = wp_publisher.upload_media("https://example.com/image.png", on_created=created.append)
+        assert media_id == 55
+        assert error is None
+        assert created == []
 
     @patch('wp_publisher.requests.get')
     def test_handles_download_failure(self, mock_get):
@@ -263,3 +284,63 @@ class TestLinkTranslations:
         result, error = wp_publisher.link_translations(42, 43)
         assert result is None
         assert error is not None
+
+
+class TestWriteGate:
+    @patch('wp_publisher.requests.post')
+    def test_writes_serialized_across_threads(self, mock_post):
+        lock = threading.Lock()
+        in_flight = {'now': 0, 'max': 0}
+
+        def slow_post(*args, **kwargs):
+            with lock:
+                in_flight['now'] += 1
+                in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            time.sleep(0.02)
+            with lock:
+                in_flight['now'] -= 1
+            return MagicMock(status_code=201)
+
+        mock_post.side_effect = slow_post
+        threads = [threading.Thread(target=wp_publisher._post, args=('https://wp/x',)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert mock_post.call_count == 4
+        assert in_flight['max'] == 1
+
+    @patch('wp_publisher.requests.post')
+    def test_interval_between_writes(self, mock_post):
+        stamps = []
+        mock_post.side_effect = lambda *a, **kw: stamps.append(time.monotonic())
+        with patch('wp_publisher._write_interval', return_value=0.05):
+            wp_publisher._post('https://wp/a')
+            wp_publisher._post('https://wp/b')
+        assert stamps[1] - stamps[0] >= 0.045
+
+
+class TestTagIdsCache:
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        with patch.dict(wp_publisher._tag_ids_cache, clear=True):
+            yield
+
+    @patch('wp_publisher._post')
+    @patch('wp_publisher.requests.get')
+    @patch('wp_publisher._auth_headers', return_value={})
+    def test_prefetch_does_not_create(self, mock_auth, mock_get, mock_post):
+        mock_get.return_value = MagicMock(status_code=200, json=MagicMock(return_value=[{'id': 3, 'name': 'Elden Ring'}]))
+        assert wp_publisher.prefetch_tag_ids(['Elden Ring', 'Nový tag']) == [3]
+        mock_post.assert_not_called()
+
+    @patch('wp_publisher._post')
+    @patch('wp_publisher.requests.get')
+    @patch('wp_publisher._auth_headers', return_value={})
+    def test_cached_ids_skip_lookup(self, mock_auth, mock_get, mock_post):
+        mock_get.return_value = MagicMock(status_code=200, json=MagicMock(return_value=[{'id': 3, 'name': 'Elden Ring'}]))
+        wp_publisher.prefetch_tag_ids(['Elden Ring'])
+        mock_post.return_value = MagicMock(status_code=201, json=MagicMock(return_value={'id': 9}))
+        mock_get.return_value = MagicMock(status_code=200, json=MagicMock(return_value=[]))
+        assert wp_publisher._resolve_tag_ids(['elden ring', 'Nový tag']) == ([3, 9], None)
+        assert mock_get.call_count == 2
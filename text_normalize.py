@@ -0,0 +1,97 @@
+"""
+Normalizace textu pro porovnávání témat (CZ + EN).
+Odstranění diakritiky, stopwords a lehký suffix stemmer — "Gothicu", "Gothic"
+i "remaků" / "remake" se převedou na stejné tvary.
+Výsledky jsou memoizované, opakované řetězce nestojí nic.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# Stopwords CZ + EN (po odstranění diakritiky)
+STOPWORDS = frozenset({
+    # CZ
+    'a', 'aby', 'ale', 'ani', 'az', 'bude', 'budou', 'by', 'byl', 'byla', 'bylo',
+    'byly', 'co', 'do', 'i', 'jak', 'jako', 'je', 'jeho', 'jen', 'jeste', 'ji',
+    'jsou', 'k', 'kde', 'kdy', 'ktera', 'ktere', 'ktery', 'ma', 'maji', 'mezi',
+    'na', 'nad', 'neni', 'nova', 'nove', 'novy', 'o', 'od', 'po', 'pod', 'pro',
+    'proc', 'pri', 's', 'se', 'si', 'ta', 'tak', 'te', 'ten', 'to', 'tu', 'u',
+    'uz', 'v', 've', 'vse', 'z', 'za', 'ze',
+    # EN
+    'about', 'after', 'all', 'an', 'and', 'are', 'as', 'at', 'be', 'been', 'but',
+    'by', 'for', 'from', 'has', 'have', 'how', 'in', 'into', 'is', 'it', 'its',
+    'new', 'not', 'of', 'on', 'or', 'out', 'over', 'that', 'the', 'their', 'this',
+    'to', 'was', 'what', 'when', 'who', 'why', 'will', 'with',
+})
+
+# Koncovky seřazené od nejdelší — odřízne se první, která nechá kmen >= MIN_STEM_LEN
+_SUFFIXES = (
+    # CZ pádové a přídavné koncovky (bez diakritiky)
+    'ovymi', 'ovych', 'oveho', 'ovemu', 'ami', 'emi', 'ach', 'ech', 'ich',
+    'ove', 'ovi', 'ova', 'ych', 'ymi', 'eho', 'emu', 'ou', 'em', 'um', 'im',
+    'ym', 'os',
+    # EN
+    'ing', 'ies', 'ed', 'es', 's',
+    # jednopísmenné koncovky (CZ pády, EN tiché 'e')
+    'a', 'e', 'i', 'o', 'u', 'y',
+)
+MIN_STEM_LEN = 3
+
+_TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+@lru_cache(maxsize=8192)
+def fold_diacritics(text: str) -> str:
+    """Převede text na lowercase bez diakritiky ("Příběh" → "pribeh")."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+@lru_cache(maxsize=16384)
+def stem(word: str) -> str:
+    """Lehký CZ/EN stemmer — odřízne nejdelší známou koncovku. Čísla nechává beze změny."""
+    if word.isdigit() or len(word) <= MIN_STEM_LEN:
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LEN:
+            return word[:-len(suffix)]
+    return word
+
+
+@lru_cache(maxsize=4096)
+def normalize_tokens(text: str, min_len: int = 2) -> tuple:
+    """
+    Normalizuje text na tuple kmenů (pořadí zachováno, bez stopwords).
+
+    Args:
+        text: Vstupní text (titulek, téma, summary)
+        min_len: Minimální délka slova před stemmingem (čísla projdou vždy)
+
+    Returns:
+        Tuple normalizovaných kmenů
+    """
+    if not text:
+        return ()
+    tokens = []
+    for word in _TOKEN_RE.findall(fold_diacritics(text)):
+        if word in STOPWORDS:
+            continue
+        if len(word) < min_len and not word.isdigit():
+            continue
+        tokens.append(stem(word))
+    return tuple(tokens)
+
+
+def normalize_set(text: str, min_len: int = 2) -> frozenset:
+    """Normalizuje text na množinu kmenů (pro Jaccard / překryv klíčových slov)."""
+    return frozenset(normalize_tokens(text, min_len))
+
+
+def cache_info() -> dict:
+    """Vrátí statistiky memoizace (pro ladění výkonu)."""
+    return {
+        'fold_diacritics': fold_diacritics.cache_info()._asdict(),
+        'stem': stem.cache_info()._asdict(),
+        'normalize_tokens': normalize_tokens.cache_info()._asdict(),
+    }
@@ -4,11 +4,11 @@ Porovnává nová témata s historií v publish_log (posledních 7 dní).
 """
 
 import json
-import re
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 from database import get_db
 from logger import setup_logger
+from text_normalize import normalize_set
 
 log = setup_logger(__name__)
 
@@ -16,12 +16,9 @@ DEDUP_WINDOW_DAYS = 7
 SIMILARITY_THRESHOLD = 0.45
 
 
-def _normalize(text: str) -> set:
-    """Normalizuje text na množinu slov pro porovnání."""
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', ' ', text)
-    words = {w for w in text.split() if len(w) > 2}
-    return words
+def _normalize(text: str) -> frozenset:
+    """Normalizuje text na množinu kmenů pro porovnání (bez diakritiky, stopwords, koncovek)."""
+    return normalize_set(text, min_len=3)
 
 
 def _jaccard_similarity(set_a: set, set_b: set) -> float:
@@ -119,6 +116,11 @@ def filter_duplicate_topics(topics: List[Dict]) -> Tuple[List[Dict], List[Dict]]
     return (unique, duplicates)
 
 
+# Začátek a konec bloku nedávných témat v promptu analýzy (claude_replay ho vynechává z klíče)
+RECENT_TOPICS_HEADER = "\n\nNEDÁVNO PUBLIKOVANÁ TÉMATA (neopakuj je!):\n"
+RECENT_TOPICS_FOOTER = "Vyber JINÉ téma.\n"
+
+
 def format_recent_topics_for_prompt(days: int = 3) -> str:
     """Formátuje seznam nedávných témat pro vložení do Claude promptu."""
     recent = get_recent_published_topics(days=days)
@@ -128,8 +130,8 @@ def format_recent_topics_for_prompt(days: int = 3) -> str:
     lines = [f"- {entry['topic']} ({entry['timestamp'][:10]})" for entry in recent]
 
     return (
-        "\n\nNEDÁVNO PUBLIKOVANÁ TÉMATA (neopakuj je!):\n"
+        RECENT_TOPICS_HEADER
         + "\n".join(lines)
         + "\n\nVýše uvedená témata už byla publikována. NESMÍŠ je vybrat znovu, "
-        "i kdyby se ve zdrojových článcích objevovaly. Vyber JINÉ téma.\n"
+        "i kdyby se ve zdrojových článcích objevovaly. " + RECENT_TOPICS_FOOTER
     )
@@ -0,0 +1,47 @@
+"""
+Topic Pool — souběžné zpracování témat v omezeném poolu vláken.
+
+auto_publish na něm pouští přípravu zdrojů a generování + publikaci jednotlivých
+témat. Zápisy do WP serializuje wp_publisher (_post), sdílené vedlejší efekty
+(sociální sítě) si volající zamyká sám.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Sequence, TypeVar
+
+import config
+from logger import setup_logger
+
+log = setup_logger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def map_topics(func: Callable[[int, T], R], items: Sequence[T], max_workers: int = None) -> List[R]:
+    """
+    Zavolá func(index, položka) pro každou položku (index od 1), max. max_workers souběžně.
+
+    Args:
+        func: Zpracování jednoho tématu
+        items: Témata (nebo připravené n-tice)
+        max_workers: Max. souběžných témat (None = config.AUTO_PUBLISH_WORKERS, 1 = sériově)
+
+    Returns:
+        Výsledky ve stejném pořadí jako items; téma, které vyhodilo výjimku, má None
+        (chyba se zaloguje, ostatní témata běží dál)
+    """
+    max_workers = min(max_workers or config.AUTO_PUBLISH_WORKERS, len(items)) if items else 1
+
+    def call(index, item):
+        try:
+            return func(index, item)
+        except Exception as e:
+            log.error("❌ Téma %d selhalo: %s", index, e, exc_info=True)
+            return None
+
+    if max_workers <= 1:
+        return [call(i, item) for i, item in enumerate(items, 1)]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='topic') as pool:
+        futures = [pool.submit(call, i, item) for i, item in enumerate(items, 1)]
+        return [future.result() for future in futures]
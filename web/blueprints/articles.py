@@ -9,7 +9,8 @@ from flask import Blueprint, request
 from web.auth import require_auth
 from web.helpers import json_response
 import web.helpers as state
-from article_writer import parse_topics_from_report, scrape_full_article, write_article
+from article_writer import load_topics_from_report, write_article
+from source_scraper import scrape_sources
 
 articles_bp = Blueprint('articles', __name__)
 
@@ -27,6 +28,7 @@ def write_article_endpoint():
     run_id = data.get('run_id', '')
     topic_index = data.get('topic_index', 0)
     article_length = data.get('length', 'medium')
+    force = bool(data.get('force', False))
 
     if not re.match(r'^[\w\-]+$', run_id):
         return json_response({'error': 'Invalid run_id'}), 400
@@ -40,10 +42,7 @@ def write_article_endpoint():
         return json_response({'error': 'Report not found'}), 404
 
     try:
-        with open(report_path, 'r', encoding='utf-8') as f:
-            report_text = f.read()
-
-        topics = parse_topics_from_report(report_text)
+        topics = load_topics_from_report(report_path)
         if topic_index < 0 or topic_index >= len(topics):
             return json_response({'error': 'Invalid topic_index'}), 400
 
@@ -60,13 +59,9 @@ def write_article_endpoint():
 
     def generate():
         try:
-            source_texts = []
-            for url in topic.get('sources', []):
-                text = scrape_full_article(url)
-                if text:
-                    source_texts.append(text)
+            source_texts = [text for _, text in scrape_sources(topic.get('sources', []))]
 
-            result = write_article(topic, source_texts, length=article_length)
+            result = write_article(topic, source_texts, length=article_length, force=force)
 
             if 'error' in result:
                 with state.article_writer_lock:
@@ -1,13 +1,16 @@
-"""History routes: /history, /history/<run_id>, /topics/<run_id>."""
+"""History routes: /history, /history/<run_id>, /topics/<run_id>, /api/analysis-cache/stats, /api/podcast-cache/stats, /api/llm/usage."""
 
 import os
 import re
 import json
 
-from flask import Blueprint
+from flask import Blueprint, request
 
 from web.helpers import json_response
-from article_writer import parse_topics_from_report
+from article_writer import load_topics_from_report
+import analysis_cache
+import llm_ledger
+import podcast_cache
 
 history_bp = Blueprint('history', __name__)
 
@@ -80,10 +83,7 @@ def get_topics(run_id):
         return json_response({'error': 'Report not found'}), 404
 
     try:
-        with open(report_path, 'r', encoding='utf-8') as f:
-            report_text = f.read()
-
-        topics = parse_topics_from_report(report_text)
+        topics = load_topics_from_report(report_path)
 
         topics_out = []
         run_dir = os.path.join(OUTPUT_DIR, run_id)
@@ -106,3 +106,31 @@ def get_topics(run_id):
         return json_response({'topics': topics_out, 'run_id': run_id})
     except Exception as e:
         return json_response({'error': str(e)}), 500
+
+
+@history_bp.route('/api/analysis-cache/stats')
+def get_analysis_cache_stats():
+    try:
+        return json_response(analysis_cache.get_stats())
+    except Exception as e:
+        return json_response({'error': str(e)}), 500
+
+
+@history_bp.route('/api/podcast-cache/stats')
+def get_podcast_cache_stats():
+    try:
+        return json_response(podcast_cache.get_stats())
+    except Exception as e:
+        return json_response({'error': str(e)}), 500
+
+
+@history_bp.route('/api/llm/usage')
+def get_llm_usage():
+    try:
+        days = max(1, min(int(request.args.get('days', 7)), 365))
+    except ValueError:
+        return json_response({'error': 'days musí být číslo'}), 400
+    try:
+        return json_response(llm_ledger.get_usage(days))
+    except Exception as e:
+        return json_response({'error': str(e)}), 500
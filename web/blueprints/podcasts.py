@@ -1,4 +1,5 @@
-"""Podcast routes: /generate-podcast, /generate-podcast/output, /podcast/<run_id>/<topic_index>/<lang>."""
+"""Podcast routes: /generate-podcast, /generate-podcast/output, /generate-podcast/batch,
+/generate-podcast/batch/output, /podcast/<run_id>/<topic_index>/<lang>."""
 
 import os
 import re
@@ -10,6 +11,7 @@ from web.auth import require_auth
 from web.helpers import json_response
 import web.helpers as state
 from article_writer import generate_podcast_script
+import podcast_batch
 
 podcasts_bp = Blueprint('podcasts', __name__)
 
@@ -93,6 +95,69 @@ def generate_podcast_output():
     return json_response(s)
 
 
+@podcasts_bp.route('/generate-podcast/batch', methods=['POST'])
+@require_auth
+def generate_podcast_batch_endpoint():
+    try:
+        data = request.get_json(force=True)
+    except Exception:
+        return json_response({'error': 'Invalid JSON'}), 400
+    run_id = data.get('run_id', '')
+    langs = data.get('langs', list(podcast_batch.LANGS))
+    force = bool(data.get('force', False))
+
+    if not re.match(r'^[\w\-]+$', run_id):
+        return json_response({'error': 'Invalid run_id'}), 400
+
+    if not isinstance(langs, list) or not langs or any(lang not in podcast_batch.LANGS for lang in langs):
+        return json_response({'error': 'Invalid langs'}), 400
+
+    run_dir = os.path.join(OUTPUT_DIR, run_id)
+    articles = podcast_batch.find_articles(run_dir, langs)
+    if not articles:
+        return json_response({'error': 'No articles found. Generate articles first.'}), 404
+
+    with state.podcast_batch_lock:
+        if state.podcast_batch_state['running']:
+            return json_response({'error': 'Already generating podcasts'}), 409
+        state.podcast_batch_state = {
+            'running': True,
+            'run_id': run_id,
+            'total': len(articles),
+            'results': [],
+            'error': None,
+        }
+
+    def on_result(entry):
+        with state.podcast_batch_lock:
+            state.podcast_batch_state['results'].append(entry)
+
+    def generate():
+        try:
+            results = podcast_batch.generate_run_podcasts(run_dir, langs, force=force, on_result=on_result)
+            with state.podcast_batch_lock:
+                state.podcast_batch_state['results'] = results
+        except Exception as e:
+            with state.podcast_batch_lock:
+                state.podcast_batch_state['error'] = str(e)
+        finally:
+            with state.podcast_batch_lock:
+                state.podcast_batch_state['running'] = False
+
+    thread = threading.Thread(target=generate)
+    thread.start()
+
+    return json_response({'status': 'started', 'total': len(articles)})
+
+
+@podcasts_bp.route('/generate-podcast/batch/output')
+def generate_podcast_batch_output():
+    with state.podcast_batch_lock:
+        s = dict(state.podcast_batch_state)
+        s['results'] = list(s['results'])
+    return json_response(s)
+
+
 @podcasts_bp.route('/podcast/<run_id>/<int:topic_index>/<lang>')
 def get_saved_podcast(run_id, topic_index, lang):
     if not re.match(r'^[\w\-]+$', run_id):
@@ -31,6 +31,16 @@ podcast_writer_state = {
 }
 podcast_writer_lock = threading.Lock()
 
+# --- Podcast batch state (všechny články běhu) ---
+podcast_batch_state = {
+    'running': False,
+    'run_id': None,
+    'total': 0,
+    'results': [],
+    'error': None,
+}
+podcast_batch_lock = threading.Lock()
+
 
 def json_response(data):
     """Vytvoří JSON response s UTF-8."""
@@ -5,6 +5,7 @@
         let articleResult = null;
         let currentArticleLang = 'cs';
         let articlePolling = null;
+        let lastWriteRequest = null;
 
         document.addEventListener('DOMContentLoaded', loadHistory);
 
@@ -238,9 +239,11 @@
             document.getElementById('topicsPanel').classList.add('visible');
         }
 
-        function startWriteArticle(runId, topicIndex, length) {
+        function startWriteArticle(runId, topicIndex, length, force = false) {
             // Set context for podcast generation
             setArticleContext(runId, topicIndex);
+            lastWriteRequest = { runId, topicIndex, length };
+            document.getElementById('btnRegenerate').style.display = 'none';
 
             // Disable all write buttons
             document.querySelectorAll('.btn-write').forEach(btn => {
@@ -259,7 +262,7 @@
             fetch('/write-article', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ run_id: runId, topic_index: topicIndex, length: length })
+                body: JSON.stringify({ run_id: runId, topic_index: topicIndex, length: length, force: force })
             })
             .then(r => r.json())
             .then(data => {
@@ -298,7 +301,9 @@
                         if (data.result.tokens_in) meta.push('In: ' + data.result.tokens_in);
                         if (data.result.tokens_out) meta.push('Out: ' + data.result.tokens_out);
                         if (data.result.cost) meta.push(data.result.cost);
+                        if (data.result.cached) meta.push('CACHE');
                         document.getElementById('articleMeta').textContent = meta.join(' | ');
+                        document.getElementById('btnRegenerate').style.display = data.result.cached ? '' : 'none';
 
                         // Refresh topics to show VIEW button
                         if (currentRunId) loadTopics(currentRunId);
@@ -306,6 +311,11 @@
                 });
         }
 
+        function regenerateArticle() {
+            if (!lastWriteRequest) return;
+            startWriteArticle(lastWriteRequest.runId, lastWriteRequest.topicIndex, lastWriteRequest.length, true);
+        }
+
         function enableWriteButtons() {
             document.querySelectorAll('.btn-write').forEach(btn => {
                 btn.disabled = false;
@@ -316,6 +326,7 @@
         function viewSavedArticle(runId, topicIndex) {
             // Set context for podcast generation
             setArticleContext(runId, topicIndex);
+            document.getElementById('btnRegenerate').style.display = 'none';
 
             const modal = document.getElementById('articleModal');
             document.getElementById('articleModalTitle').textContent = 'Ulozeny clanek';
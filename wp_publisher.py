@@ -5,18 +5,26 @@ Podporuje kategorie, tagy, featured image upload a Polylang propojení.
 """
 
 import base64
-import re
+import threading
 import time
 import requests
 import config
+import html_pipeline
 
 
 # In-memory cache pro kategorie (per-language) a status tagy
 _categories_cache = {}
 _status_tags_cache = {'data': None, 'fetched_at': 0}
 _top_tags_cache = {'data': None, 'fetched_at': 0}
+# Název tagu (lowercase) → WP tag ID; tagy se nemažou, cache platí po celý proces
+_tag_ids_cache = {}
 _CACHE_TTL = 300  # 5 minut
 
+# Zápisy do WP (POST) jdou sériově s min. odstupem WP_WRITE_INTERVAL — souběžná
+# témata auto_publish nesmí hosting zahltit dávkou uploadů (prevence Fail2Ban)
+_write_lock = threading.Lock()
+_last_write_at = 0.0
+
 
 def _auth_headers():
     """Vrátí headers s Basic Auth pro WP REST API."""
@@ -33,6 +41,24 @@ def _api_url(path):
     return f"{base}/wp-json/wp/v2/{path.lstrip('/')}"
 
 
+def _write_interval():
+    """Min. odstup mezi zápisy do WP v sekundách."""
+    return float(config.WP_WRITE_INTERVAL)
+
+
+def _post(*args, **kwargs):
+    """requests.post serializovaný přes _write_lock s odstupem WP_WRITE_INTERVAL mezi zápisy."""
+    global _last_write_at
+    with _write_lock:
+        wait = _last_write_at + _write_interval() - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            return requests.post(*args, **kwargs)
+        finally:
+            _last_write_at = time.monotonic()
+
+
 def is_configured():
     """Wrapper pro config.is_wp_configured()."""
     return config.is_wp_configured()
@@ -60,61 +86,13 @@ def check_wp_available(timeout=8):
 
 def _to_gutenberg_blocks(html: str) -> str:
     """Převede surové HTML na Gutenberg block markup, aby WP nevyžadoval 'Převést na bloky'."""
-    # Seznamy (před <p>, aby se nechytly <p> uvnitř <li>)
-    html = re.sub(
-        r'(<ul[^>]*>[\s\S]*?</ul>)',
-        r'<!-- wp:list -->\n\1\n<!-- /wp:list -->',
-        html
-    )
-    html = re.sub(
-        r'(<ol[^>]*>[\s\S]*?</ol>)',
-        r'<!-- wp:list {"ordered":true} -->\n\1\n<!-- /wp:list -->',
-        html
-    )
-    # Blockquotes
-    html = re.sub(
-        r'(<blockquote[^>]*>[\s\S]*?</blockquote>)',
-        r'<!-- wp:quote -->\n\1\n<!-- /wp:quote -->',
-        html
-    )
-    # Nadpisy
-    html = re.sub(
-        r'(<h2[^>]*>.*?</h2>)',
-        r'<!-- wp:heading -->\n\1\n<!-- /wp:heading -->',
-        html
-    )
-    html = re.sub(
-        r'(<h3[^>]*>.*?</h3>)',
-        r'<!-- wp:heading {"level":3} -->\n\1\n<!-- /wp:heading -->',
-        html
-    )
-    # Oddělovače
-    html = re.sub(
-        r'(<hr[^>]*/>)',
-        r'<!-- wp:separator -->\n\1\n<!-- /wp:separator -->',
-        html
-    )
-    # Odstavce (poslední — nejčastější element)
-    html = re.sub(
-        r'(<p[^>]*>.*?</p>)',
-        r'<!-- wp:paragraph -->\n\1\n<!-- /wp:paragraph -->',
-        html,
-        flags=re.DOTALL
-    )
-    return html
+    return html_pipeline.process(html, ('blocks',))['html']
 
 
 def strip_first_heading(html):
     """Odstraní první h1/h2 z HTML obsahu (WP zobrazuje title zvlášť).
     Zvládne i markdown artefakty (```html, # heading) před/místo HTML tagu."""
-    # Nejdřív vyčisti markdown code fences a leading whitespace
-    cleaned = re.sub(r'^\s*```html\s*\n?', '', html)
-    cleaned = re.sub(r'```\s*$', '', cleaned, flags=re.MULTILINE)
-    # Odstraň markdown heading (# Title) na začátku
-    cleaned = re.sub(r'^\s*#{1,3}\s+.+\n?', '', cleaned, count=1)
-    # Odstraň HTML h1/h2 na začátku
-    cleaned = re.sub(r'^\s*<h[12][^>]*>.*?</h[12]>\s*', '', cleaned, count=1, flags=re.DOTALL)
-    return cleaned
+    return html_pipeline.process(html, ('heading',))['html']
 
 
 def get_categories(force_refresh=False, lang=None):
@@ -255,10 +233,11 @@ def _find_existing_media(filename):
     return (None, None)
 
 
-def upload_media(image_url, title="", custom_filename=""):
+def upload_media(image_url, title="", custom_filename="", on_created=None):
     """
     Stáhne obrázek z URL a uploadne ho do WP media library.
     Pokud media se stejným filename už existuje, vrátí existující.
+    on_created: volitelný callback(media_id) — jen pro nově vytvořené médium, ne pro existující.
     Vrací (media_id, source_url, None) nebo (None, None, error_string).
     """
     try:
@@ -294,7 +273,7 @@ def upload_media(image_url, title="", custom_filename=""):
         headers['Content-Disposition'] = f'attachment; filename="{filename}"'
         headers['Content-Type'] = content_type
 
-        resp = requests.post(
+        resp = _post(
             _api_url('media'),
             headers=headers,
             data=img_resp.content,
@@ -307,11 +286,13 @@ def upload_media(image_url, title="", custom_filename=""):
         media_data = resp.json()
         media_id = media_data['id']
         source_url = media_data.get('source_url', '')
+        if on_created:
+            on_created(media_id)
 
         # Nastav title a alt_text pokud byl zadán title
         if title:
             try:
-                requests.post(
+                _post(
                     _api_url(f'media/{media_id}'),
                     headers=_auth_headers(),
                     json={'title': title, 'alt_text': title},
@@ -338,7 +319,7 @@ def upload_media_file(file_data, filename, content_type, caption="", alt_text=""
         headers['Content-Disposition'] = f'attachment; filename="{filename}"'
         headers['Content-Type'] = content_type
 
-        resp = requests.post(
+        resp = _post(
             _api_url('media'),
             headers=headers,
             data=file_data,
@@ -358,7 +339,7 @@ def upload_media_file(file_data, filename, content_type, caption="", alt_text=""
                 update_data['caption'] = caption
             if alt_text:
                 update_data['alt_text'] = alt_text
-            requests.post(
+            _post(
                 _api_url(f'media/{media_id}'),
                 headers=_auth_headers(),
                 json=update_data,
@@ -373,10 +354,10 @@ def upload_media_file(file_data, filename, content_type, caption="", alt_text=""
         return (None, f"Media upload error: {str(e)}")
 
 
-def _resolve_tag_ids(tag_names):
+def _resolve_tag_ids(tag_names, create=True):
     """
-    Převede seznam tag názvů na WP tag IDs.
-    Pokud tag neexistuje, vytvoří ho.
+    Převede seznam tag názvů na WP tag IDs (s cache v paměti).
+    Pokud tag neexistuje, vytvoří ho (create=False = jen vyhledání, chybějící se přeskočí).
     Vrací (list_of_ids, None) nebo (None, error_string).
     """
     if not tag_names:
@@ -390,6 +371,11 @@ def _resolve_tag_ids(tag_names):
         if not tag_name:
             continue
 
+        cached_id = _tag_ids_cache.get(tag_name.lower())
+        if cached_id:
+            tag_ids.append(cached_id)
+            continue
+
         # Hledej existující tag
         try:
             resp = requests.get(
@@ -409,11 +395,15 @@ def _resolve_tag_ids(tag_names):
                         break
 
                 if found:
+                    _tag_ids_cache[tag_name.lower()] = found['id']
                     tag_ids.append(found['id'])
                     continue
 
+            if not create:
+                continue
+
             # Tag neexistuje — vytvoř ho
-            resp = requests.post(
+            resp = _post(
                 _api_url('tags'),
                 headers=headers,
                 json={'name': tag_name},
@@ -421,6 +411,7 @@ def _resolve_tag_ids(tag_names):
             )
 
             if resp.status_code in (200, 201):
+                _tag_ids_cache[tag_name.lower()] = resp.json()['id']
                 tag_ids.append(resp.json()['id'])
             else:
                 # Pokud se nepodaří vytvořit tag, pokračuj bez něj
@@ -433,6 +424,15 @@ def _resolve_tag_ids(tag_names):
     return (tag_ids, None)
 
 
+def prefetch_tag_ids(tag_names):
+    """
+    Dohledá ID existujících tagů do cache předem (bez vytváření nových).
+    create_draft pak resolvuje jen tagy, které ve WP ještě nejsou.
+    """
+    tag_ids, _ = _resolve_tag_ids(tag_names, create=False)
+    return tag_ids
+
+
 def get_top_tags(limit=30, force_refresh=False):
     """
     Vrátí top N tagů dle počtu článků (napříč všemi jazyky).
@@ -524,7 +524,7 @@ def create_draft(title, content, category_ids=None, tag_names=None, lang=None, f
         if lang:
             post_data['lang'] = lang
 
-        resp = requests.post(
+        resp = _post(
             _api_url('posts'),
             headers=_auth_headers(),
             json=post_data,
@@ -551,7 +551,7 @@ def create_draft(title, content, category_ids=None, tag_names=None, lang=None, f
         if rm_meta:
             try:
                 rm_url = config.WP_URL.rstrip('/') + '/wp-json/rankmath/v1/updateMeta'
-                rm_resp = requests.post(
+                rm_resp = _post(
                     rm_url,
                     headers={**_auth_headers(), 'Content-Type': 'application/json'},
                     json={
@@ -596,7 +596,7 @@ def link_translations(post_id_cs, post_id_en):
     """
     try:
         base = config.WP_URL.rstrip('/')
-        resp = requests.post(
+        resp = _post(
             f"{base}/wp-json/gamefo/v1/link-translations",
             headers=_auth_headers(),
             json={'cs': post_id_cs, 'en': post_id_en},